@@ -0,0 +1,148 @@
+# app/audit.py
+
+import hashlib
+import logging
+import random
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+# Import our custom modules
+from src.logger_config import audit_logger
+from app.cache import canonical_json
+
+# Client-supplied request ids longer than this are replaced by a generated one
+MAX_REQUEST_ID_LENGTH = 128
+
+# The id of the request being handled, set by RequestIdMiddleware
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+def current_request_id() -> Optional[str]:
+    """Returns the id of the request being handled, or None outside of a request."""
+    return _request_id.get()
+
+def input_hash(houses) -> str:
+    """
+    Hashes API input features, so that audit records identify their input without storing it.
+
+    Args:
+        houses: One house (a dict), a list of them, or a raw binary (e.g. Arrow) request body.
+
+    Returns:
+        str: A hex digest of the canonical JSON of the input, or of the bytes of a binary body.
+    """
+    data = houses if isinstance(houses, bytes) else canonical_json(houses).encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+class _InputHash:
+    """
+    The input hash of an audit record, computed when the record is formatted.
+
+    In queue mode that happens on the listener thread, so hashing a large
+    batch does not hold up the request.
+    """
+
+    def __init__(self, houses):
+        self.houses = houses
+
+    def __str__(self) -> str:
+        return input_hash(self.houses)
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware giving every request an id and returning it in the X-Request-ID header.
+
+    The id is taken from the request's X-Request-ID header when the client
+    (or a load balancer) sends a usable one, and generated otherwise.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id or len(request_id) > MAX_REQUEST_ID_LENGTH or not request_id.isprintable():
+            request_id = uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        token = _request_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_id.reset(token)
+
+class PredictionAuditLog:
+    """
+    Writes a sample of the prediction requests to the JSON audit log.
+
+    Whether a request is logged is decided first, so requests that are not
+    sampled only pay for a random draw. Failed requests have their own
+    sampling rate, so that errors can all be kept while only a share of
+    the successes are. In queue mode (LOG_QUEUE) a logged record is only
+    put on a bounded queue; it is hashed, formatted and written by the
+    listener thread, and dropped if the queue is full.
+    """
+
+    def __init__(self, sample_rate: float, error_sample_rate: float, logger: logging.Logger = audit_logger):
+        """
+        Args:
+            sample_rate (float): Share of successful requests logged, from 0 to 1.
+            error_sample_rate (float): Share of failed requests logged, from 0 to 1.
+            logger (logging.Logger): The audit logger.
+        """
+        self.sample_rate = sample_rate
+        self.error_sample_rate = error_sample_rate
+        self.logger = logger
+
+    def record(self, endpoint: str, model_version: str, houses, latency_seconds: float, path: str,
+               stage_seconds: Optional[dict] = None, predicted_price: Optional[float] = None,
+               n_houses: int = 1, n_errors: int = 0, error: Optional[str] = None) -> bool:
+        """
+        Logs one prediction request if it is sampled.
+
+        Args:
+            endpoint (str): The route, e.g. '/predict'.
+            model_version (str): The model version that scored the request.
+            houses: The input features, hashed into the record. They must not be modified afterwards.
+            latency_seconds (float): The time spent handling the request.
+            path (str): How it was scored, e.g. 'fast', 'pandas', 'micro_batch', 'cache' or 'batch'.
+            stage_seconds (dict): Inference stage -> seconds, from `collect_stage_timings`.
+            predicted_price (float): The prediction of a single-house request.
+            n_houses (int): The number of houses in the request.
+            n_errors (int): The number of houses that could not be scored.
+            error (str): Why the request failed, if it did.
+
+        Returns:
+            bool: True if the request was logged.
+        """
+        rate = self.sample_rate if error is None else self.error_sample_rate
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return False
+
+        self.logger.info("prediction", extra={
+            "request_id": current_request_id(),
+            "endpoint": endpoint,
+            "model_version": model_version,
+            "path": path,
+            "status": "ok" if error is None else "error",
+            "latency_ms": round(latency_seconds * 1000, 3),
+            "stage_ms": {stage: round(seconds * 1000, 3) for stage, seconds in (stage_seconds or {}).items()},
+            "input_hash": _InputHash(houses),
+            "n_houses": n_houses,
+            "n_errors": n_errors,
+            "predicted_price": predicted_price,
+            "error": error,
+        })
+        return True
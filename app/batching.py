@@ -0,0 +1,209 @@
+# app/batching.py
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, Union
+
+# Import our custom modules
+from src.logger_config import logger
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into vectorized batches.
+
+    Items submitted from request handlers are queued. A background task
+    takes the first waiting item, collects more items until either the
+    batching window has elapsed or the batch is full, runs `predict_fn`
+    once on the whole batch (awaited if it is a coroutine function,
+    otherwise in a worker thread), and hands each result back to the
+    handler that submitted the matching item.
+
+    Each batch is scored in its own task while the next one is collected,
+    with up to `max_concurrent_batches` batches in flight, so that every
+    inference worker can be busy.
+    """
+
+    def __init__(self, predict_fn: Callable[[list], Union[Optional[list], Awaitable[Optional[list]]]], max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 max_concurrent_batches: int = 1):
+        """
+        Args:
+            predict_fn (Callable): Scores a list of items and returns one result per item
+                (or None if the batch failed). May be a coroutine function.
+            max_batch_size (int): The maximum number of items in one batch.
+            max_wait_ms (float): How long to wait for more items after the first one arrives.
+            max_concurrent_batches (int): The number of batches scored at the same time,
+                e.g. the number of inference workers.
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._item_added: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # The tasks scoring a batch; a batch is only collected once one of the slots is free
+        self._in_flight: set = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        # Batch size histogram with power-of-two bucket upper bounds
+        self.batch_size_buckets = [1]
+        while self.batch_size_buckets[-1] < max_batch_size:
+            self.batch_size_buckets.append(min(self.batch_size_buckets[-1] * 2, max_batch_size))
+        self._batch_size_counts = [0] * len(self.batch_size_buckets)
+
+        self.total_batches = 0
+        self.total_items = 0
+        self._wait_seconds_sum = 0.0
+        self._wait_seconds_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of items waiting to be put in a batch."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        """Starts the background batching task on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._item_added = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Micro-batching started (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait_ms}, "
+            f"max_concurrent_batches={self.max_concurrent_batches})."
+        )
+
+    async def stop(self):
+        """Stops the background task, lets the batches in flight finish and fails any items still waiting."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped."))
+        logger.info("Micro-batching stopped.")
+
+    async def submit(self, item):
+        """
+        Queues one item and waits for its result.
+
+        Args:
+            item: The input for a single prediction.
+
+        Returns:
+            The result of `predict_fn` for this item.
+        """
+        if self._task is None:
+            raise RuntimeError("Micro-batcher is not running.")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        self._item_added.set()
+        return await future
+
+    def _drain(self, batch: list):
+        """Moves already-queued items into the batch, up to the maximum size."""
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _collect_batch(self) -> list:
+        """Waits for the first item, then gathers more until the window closes or the batch is full."""
+        batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_wait_ms / 1000
+
+        while True:
+            self._drain(batch)
+            remaining = deadline - time.perf_counter()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                return batch
+
+            self._item_added.clear()
+            try:
+                await asyncio.wait_for(self._item_added.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    def _record(self, batch: list):
+        """Updates the batch size and wait time statistics."""
+        dispatched_at = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            wait = dispatched_at - enqueued_at
+            self._wait_seconds_sum += wait
+            self._wait_seconds_max = max(self._wait_seconds_max, wait)
+
+        for i, upper_bound in enumerate(self.batch_size_buckets):
+            if len(batch) <= upper_bound:
+                self._batch_size_counts[i] += 1
+                break
+
+        self.total_batches += 1
+        self.total_items += len(batch)
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect_batch()
+            except BaseException:
+                self._slots.release()
+                raise
+            self._record(batch)
+
+            task = asyncio.create_task(self._score(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        self._slots.release()
+
+    async def _score(self, batch: list):
+        """Scores one batch and hands each result (or the failure) back to its submitter."""
+        items = [item for item, _, _ in batch]
+        try:
+            if asyncio.iscoroutinefunction(self.predict_fn):
+                results = await self.predict_fn(items)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(None, self.predict_fn, items)
+            if results is None or len(results) != len(items):
+                raise RuntimeError("Batch prediction failed.")
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """
+        Returns the batching statistics used to tune the latency/throughput trade-off.
+
+        Returns:
+            dict: Queue depth, batch size histogram and item wait times.
+        """
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "batches_in_flight": len(self._in_flight),
+            "queue_depth": self.queue_depth,
+            "total_batches": self.total_batches,
+            "total_items": self.total_items,
+            "mean_batch_size": self.total_items / self.total_batches if self.total_batches else 0.0,
+            "batch_size_histogram": {
+                f"le_{upper_bound}": count
+                for upper_bound, count in zip(self.batch_size_buckets, self._batch_size_counts)
+            },
+            "mean_wait_ms": 1000 * self._wait_seconds_sum / self.total_items if self.total_items else 0.0,
+            "max_wait_ms_observed": 1000 * self._wait_seconds_max,
+        }
@@ -0,0 +1,278 @@
+# app/cache.py
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# Import our custom modules
+from src.logger_config import logger
+
+def canonical_json(houses) -> str:
+    """
+    Serializes API input features with sorted keys and compact separators,
+    so the same features always give the same string regardless of field order.
+
+    Args:
+        houses: One house (a dict) or a list of them.
+
+    Returns:
+        str: The canonical JSON text.
+    """
+    return json.dumps(houses, sort_keys=True, separators=(",", ":"), default=str)
+
+def canonical_key(house: dict, model_version: str) -> str:
+    """
+    Builds a stable cache key for a house and a model version.
+
+    The payload is serialized with `canonical_json`, so the same features
+    always hash to the same key regardless of field order.
+
+    Args:
+        house (dict): The validated API input features for one house.
+        model_version (str): The version of the loaded model.
+
+    Returns:
+        str: A hex digest identifying the (house, model) pair.
+    """
+    payload = canonical_json(house)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_version.encode())
+    digest.update(b"\0")
+    digest.update(payload.encode())
+    return digest.hexdigest()
+
+class CacheBackend(ABC):
+    """
+    Storage interface for cached predictions.
+
+    Backends own size bounding (least recently used entries are evicted
+    first) and expiry, and count the entries they evict or expire. A
+    backend that does not implement every method cannot be instantiated.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.evictions = 0
+        self.expirations = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[float]:
+        """Returns the cached value, or None if it is missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: float, ttl_seconds: float):
+        """Stores a value that expires after `ttl_seconds`."""
+
+    @abstractmethod
+    def clear(self):
+        """Removes every entry."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """The number of stored entries."""
+
+class InMemoryBackend(CacheBackend):
+    """An in-process LRU + TTL store backed by an OrderedDict."""
+
+    def __init__(self, max_size: int):
+        super().__init__(max_size)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[float]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: float, ttl_seconds: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DiskBackend(CacheBackend):
+    """
+    An LRU + TTL store in a SQLite file.
+
+    Several uvicorn workers on the same host can point at the same file
+    to share cache hits. Each keeps its own count of the rows, so a write
+    does not have to count the table. The count is corrected every
+    `RECOUNT_EVERY` writes for the rows the other workers added.
+    """
+
+    RECOUNT_EVERY = 1000
+
+    def __init__(self, max_size: int, path: Path):
+        super().__init__(max_size)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "key TEXT PRIMARY KEY, value REAL NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used)")
+        self._writes = 0
+        self._size = len(self)
+
+    def get(self, key: str) -> Optional[float]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM predictions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                deleted = self._connection.execute("DELETE FROM predictions WHERE key = ?", (key,)).rowcount
+                self._size -= deleted
+                self.expirations += 1
+                return None
+            self._connection.execute("UPDATE predictions SET last_used = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: float, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            # Replacing a stored key updates it in place; only a new key adds a row
+            replaced = self._connection.execute(
+                "UPDATE predictions SET value = ?, expires_at = ?, last_used = ? WHERE key = ?",
+                (value, now + ttl_seconds, now, key),
+            ).rowcount
+            if not replaced:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO predictions (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, value, now + ttl_seconds, now),
+                )
+                self._size += 1
+            self._writes += 1
+            if self._writes % self.RECOUNT_EVERY == 0:
+                self._size = len(self)
+            overflow = self._size - self.max_size
+            if overflow > 0:
+                evicted = self._connection.execute(
+                    "DELETE FROM predictions WHERE key IN "
+                    "(SELECT key FROM predictions ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+                self._size -= evicted
+                self.evictions += evicted
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM predictions")
+            self._size = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._size = self._connection.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+            return self._size
+
+class PredictionCache:
+    """
+    Caches predicted prices keyed on the canonicalized house and the model version.
+
+    Loading a different model version clears the cache, so a prediction
+    from an older model is never returned.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float):
+        """
+        Args:
+            backend (CacheBackend): Where the predictions are stored.
+            ttl_seconds (float): How long a prediction stays valid.
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.model_version = None
+        self.hits = 0
+        self.misses = 0
+
+    def set_model_version(self, model_version: str):
+        """Invalidates every cached prediction if the model version changed."""
+        if model_version != self.model_version:
+            # Keys include the version, so a shared backend is only cleared on an actual
+            # model change, not when another worker starts with the same model.
+            if self.model_version is not None:
+                logger.info(f"Model changed ({self.model_version} -> {model_version}), clearing prediction cache.")
+                self.backend.clear()
+            self.model_version = model_version
+
+    def get(self, house: dict, model_version: str) -> Optional[float]:
+        """Returns the price of a house cached for a model version, or None on a miss."""
+        value = self.backend.get(canonical_key(house, model_version))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, house: dict, model_version: str, price: float):
+        """Caches the price of a house predicted by a model version."""
+        self.backend.set(canonical_key(house, model_version), price, self.ttl_seconds)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Size, hits, misses, hit rate, evictions and expirations.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "model_version": self.model_version,
+            "size": len(self.backend),
+            "max_size": self.backend.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.backend.evictions,
+            "expirations": self.backend.expirations,
+        }
+
+def create_prediction_cache(backend: str, max_size: int, ttl_seconds: float, path: Path) -> PredictionCache:
+    """
+    Creates a prediction cache with the configured backend.
+
+    Args:
+        backend (str): 'memory' for a per-process cache, 'disk' for a SQLite file shared by workers.
+        max_size (int): The maximum number of cached predictions.
+        ttl_seconds (float): How long a prediction stays valid.
+        path (Path): The SQLite file used by the 'disk' backend.
+
+    Returns:
+        PredictionCache: The configured cache.
+    """
+    if backend == "memory":
+        return PredictionCache(InMemoryBackend(max_size), ttl_seconds)
+    if backend == "disk":
+        return PredictionCache(DiskBackend(max_size, path), ttl_seconds)
+    raise ValueError(f"Unknown prediction cache backend: {backend!r}")
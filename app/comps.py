@@ -0,0 +1,133 @@
+# app/comps.py
+
+from pathlib import Path
+
+import numpy as np
+
+# Import our custom modules
+from src.comps import scale_points
+from src.logger_config import logger
+from app.fast_predict import engineer_one
+from app.metrics import stage_timer
+
+class ComparablesIndex:
+    """
+    Finds the training houses most similar to a house ("comps"), with their sale prices.
+
+    Houses are points in a small space of numeric features (COMPS_FEATURES),
+    imputed and standardized with the statistics of the model version's
+    preprocessor, so a feature's spread counts the same as in the model's
+    inputs. The training points are indexed once, at training time, by a
+    KD-tree (or a ball tree; see `src.comps.build_comps_index`), so a query
+    visits a few leaves instead of scanning every training house.
+    Distances are Euclidean, in standard deviations.
+
+    The index is saved with joblib next to the model version. Its arrays
+    can be memory-mapped when it is loaded, so API workers on one host
+    share them.
+    """
+
+    def __init__(self, features: list, fill_values, means, scales, tree, sale_prices, ids, values):
+        """
+        Args:
+            features (list): The engineered numeric features of the index space.
+            fill_values (np.ndarray): Value of each feature when it is missing.
+            means (np.ndarray): Mean of each feature, subtracted before scaling.
+            scales (np.ndarray): Standard deviation of each feature.
+            tree (KDTree or BallTree): The index of the scaled training points.
+            sale_prices (np.ndarray): Sale price of each training house.
+            ids (np.ndarray): Identifier of each training house (the 'Id' column).
+            values (np.ndarray): (n_houses, n_features) float32 raw feature values, NaN where missing.
+        """
+        self.features = list(features)
+        self.fill_values = fill_values
+        self.means = means
+        self.scales = scales
+        self.tree = tree
+        self.sale_prices = sale_prices
+        self.ids = ids
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.sale_prices)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the index: the tree's arrays, the prices, the ids and the raw values."""
+        tree_data, tree_indices, node_data, node_bounds = self.tree.get_arrays()[:4]
+        arrays = (tree_data, tree_indices, node_data, node_bounds, self.sale_prices, self.ids, self.values)
+        return sum(np.asarray(array).nbytes for array in arrays)
+
+    def points(self, houses: list) -> np.ndarray:
+        """
+        Places houses in the index space.
+
+        Args:
+            houses (list): The API input features of the houses.
+
+        Returns:
+            np.ndarray: The (n_houses, n_features) scaled points.
+        """
+        values = np.array(
+            [[features.get(feature) for feature in self.features] for features in map(engineer_one, houses)],
+            dtype=np.float64,
+        ).reshape(len(houses), len(self.features))
+        return scale_points(values, self.fill_values, self.means, self.scales)
+
+    def query(self, houses: list, k: int) -> list:
+        """
+        Finds the k training houses nearest to each house.
+
+        Args:
+            houses (list): The API input features of the houses.
+            k (int): The number of comparables per house (at most the number of training houses).
+
+        Returns:
+            list: For each house, its comparables, nearest first, each with its id, sale price,
+                distance and the raw values of the index features (None where missing).
+        """
+        if not houses:
+            return []
+        k = min(k, len(self))
+        with stage_timer("comps"):
+            distances, indices = self.tree.query(self.points(houses), k=k)
+
+        values = self.values[indices]
+        results = []
+        for house_distances, house_indices, house_values in zip(distances, indices, values):
+            results.append([
+                {
+                    "id": self.ids[i].item(),
+                    "sale_price": float(self.sale_prices[i]),
+                    "distance": float(distance),
+                    "features": {
+                        feature: (None if value != value else float(value))
+                        for feature, value in zip(self.features, row)
+                    },
+                }
+                for i, distance, row in zip(house_indices, house_distances, house_values.tolist())
+            ])
+        return results
+
+def load_comps_index(path: Path, mmap: bool = True):
+    """
+    Loads the comparables index saved with a model version.
+
+    Args:
+        path (Path): The index file.
+        mmap (bool): Memory-map its arrays instead of reading them.
+
+    Returns:
+        ComparablesIndex: The index, or None if the version has none (models trained before it was saved).
+    """
+    import joblib
+
+    if not Path(path).exists():
+        return None
+    try:
+        index = ComparablesIndex(**joblib.load(path, mmap_mode="r" if mmap else None))
+        logger.info(f"Loaded comparables index: {Path(path).name} ({len(index)} houses)")
+        return index
+    except Exception as e:
+        logger.warning(f"Could not load the comparables index {path}: {e}")
+        return None
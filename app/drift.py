@@ -0,0 +1,304 @@
+# app/drift.py
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# Import our custom modules
+from src.drift_profile import PROFILE_FORMAT_VERSION
+from src.logger_config import logger
+
+# Added to every share so that a bin empty on one side does not make PSI infinite
+PSI_EPSILON = 1e-4
+
+def load_reference_profile(path: Path) -> Optional[dict]:
+    """
+    Reads a reference profile.
+
+    Returns:
+        dict: The profile, or None if the model version has none.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        profile = json.load(f)
+    if profile.get("format_version") != PROFILE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported reference profile format: {profile.get('format_version')}")
+    return profile
+
+def population_stability_index(current: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """
+    Computes the PSI of every row of two (n_features, n_bins) arrays of shares.
+
+    Returns:
+        np.ndarray: One PSI per feature; above about 0.25 is usually read as a significant shift.
+    """
+    current = current + PSI_EPSILON
+    reference = reference + PSI_EPSILON
+    return ((current - reference) * np.log(current / reference)).sum(axis=1)
+
+def _shares(counts: np.ndarray) -> np.ndarray:
+    """Divides every row of counts by its total, leaving rows with no counts at zero."""
+    totals = counts.sum(axis=1, keepdims=True)
+    return np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+
+class _Shard:
+    """The counts written by one thread, for the current window and the one before it."""
+
+    def __init__(self, numeric_shape: tuple, categorical_shape: tuple):
+        self.numeric_shape = numeric_shape
+        self.categorical_shape = categorical_shape
+        self.window = None
+        self.current = None
+        self.previous = None
+
+    def counts(self, window: int) -> tuple:
+        """Returns the counts of the window, starting a new one (and keeping the last) when it changed."""
+        if self.window != window:
+            self.previous = self.current if self.window == window - 1 else None
+            self.current = (np.zeros(self.numeric_shape, np.int64), np.zeros(self.categorical_shape, np.int64), [0])
+            self.window = window
+        return self.current
+
+class DriftMonitor:
+    """
+    Keeps streaming statistics of the API inputs and scores their drift from a reference profile.
+
+    Each numeric feature is counted in the bins of its training quantiles,
+    and each categorical feature per training level, with extra bins for
+    missing values (None or NaN for numbers, None for categories) and
+    unseen levels. The memory used is therefore fixed,
+    and so is the cost of a house: a few vectorized NumPy operations for
+    the numeric features and one dict lookup per categorical feature.
+
+    Every thread counts in its own shard, so updates take no lock; the
+    shards are only summed when the scores are read (e.g. by a Prometheus
+    scrape). With a window, the scores cover the current window and the
+    previous one, i.e. between one and two windows of traffic.
+    """
+
+    def __init__(self, profile: dict, fields: list = None, window_seconds: float = 0, min_observations: int = 0):
+        """
+        Args:
+            profile (dict): The reference profile from `build_reference_profile`.
+            fields (list): The fields monitored; profile features not in it are left out.
+                Defaults to every feature of the profile.
+            window_seconds (float): The window length; 0 keeps counting since the monitor was created.
+            min_observations (int): The number of houses below which the scores are not reliable.
+        """
+        self.window_seconds = window_seconds
+        self.min_observations = min_observations
+        keep = (lambda name: True) if fields is None else set(fields).__contains__
+
+        # Numeric bins: values are compared to the padded edges, missing values go to the last column
+        numeric = {name: spec for name, spec in profile["numeric"].items() if keep(name)}
+        self.numeric_fields = list(numeric)
+        n_edges = max((len(spec["edges"]) for spec in numeric.values()), default=0)
+        self.numeric_edges = np.full((len(numeric), n_edges), np.inf)
+        self.numeric_missing_bin = n_edges + 1
+        numeric_reference = np.zeros((len(numeric), n_edges + 2))
+        for i, spec in enumerate(numeric.values()):
+            self.numeric_edges[i, :len(spec["edges"])] = spec["edges"]
+            numeric_reference[i, :len(spec["counts"])] = spec["counts"]
+            numeric_reference[i, -1] = spec["missing"]
+        self.numeric_reference = _shares(numeric_reference)
+
+        # Categorical levels, then one column for unseen levels and one for missing values
+        categorical = {name: spec for name, spec in profile["categorical"].items() if keep(name)}
+        self.categorical_fields = list(categorical)
+        n_levels = max((len(spec["categories"]) for spec in categorical.values()), default=0)
+        self.unseen_bin, self.categorical_missing_bin = n_levels, n_levels + 1
+        categorical_reference = np.zeros((len(categorical), n_levels + 2))
+        # Per field: its name, a lookup of level (or None, i.e. missing) -> position in the flattened
+        # count array, and the position of unseen levels
+        self._categorical_slots = []
+        for i, (field, spec) in enumerate(categorical.items()):
+            categorical_reference[i, :len(spec["counts"])] = spec["counts"]
+            categorical_reference[i, -1] = spec["missing"]
+            offset = i * (n_levels + 2)
+            lookup = {category: offset + index for index, category in enumerate(spec["categories"])}
+            lookup[None] = offset + self.categorical_missing_bin
+            self._categorical_slots.append((field, lookup, offset + self.unseen_bin))
+        self.categorical_reference = _shares(categorical_reference)
+
+        self._numeric_offsets = np.arange(len(self.numeric_fields))[:, None] * numeric_reference.shape[1]
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _window(self) -> int:
+        return int(time.monotonic() // self.window_seconds) if self.window_seconds > 0 else 0
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(self.numeric_reference.shape, self.categorical_reference.shape)
+            self._local.shard = shard
+            # The only lock, taken once per thread
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def update(self, houses: list):
+        """
+        Counts the features of some houses.
+
+        Args:
+            houses (list): The API input features, one dictionary per house.
+        """
+        if not houses:
+            return
+        values = None
+        if self.numeric_fields:
+            # None becomes NaN
+            values = np.array([[house.get(f) for f in self.numeric_fields] for house in houses], dtype=np.float64)
+        # One dict lookup per value; a missing value (None) is a key of every lookup
+        positions = [
+            lookup.get(house.get(field), unseen)
+            for house in houses
+            for field, lookup, unseen in self._categorical_slots
+        ]
+        self._count(values, positions, len(houses))
+
+    def update_columns(self, columns):
+        """
+        Counts the features of houses given column by column.
+
+        Args:
+            columns: A DataFrame or a dict of column arrays with every monitored field,
+                e.g. a batch decoded from Arrow. Missing categories must be None.
+        """
+        fields = self.numeric_fields + self.categorical_fields
+        n_houses = len(columns[fields[0]]) if fields else 0
+        if not n_houses:
+            return
+        values = None
+        if self.numeric_fields:
+            values = np.column_stack([np.asarray(columns[f], dtype=np.float64) for f in self.numeric_fields])
+        positions = [
+            lookup.get(value, unseen)
+            for field, lookup, unseen in self._categorical_slots
+            for value in columns[field]
+        ]
+        self._count(values, positions, n_houses)
+
+    def _count(self, values, positions: list, n: int):
+        """Adds an (n, n_numeric) array of numeric values and the flat positions of categorical values to this thread's counts."""
+        numeric_counts, categorical_counts, n_houses = self._shard().counts(self._window())
+
+        if values is not None:
+            # NaN compares False with every edge, then goes to the missing bin
+            bins = (values[:, :, None] >= self.numeric_edges).sum(axis=2)
+            bins[np.isnan(values)] = self.numeric_missing_bin
+            numeric_counts += np.bincount(
+                (bins.T + self._numeric_offsets).ravel(), minlength=numeric_counts.size
+            ).reshape(numeric_counts.shape)
+
+        if positions:
+            categorical_counts += np.bincount(positions, minlength=categorical_counts.size).reshape(categorical_counts.shape)
+
+        n_houses[0] += n
+
+    def counts(self) -> tuple:
+        """
+        Sums the counts of every thread over the current and the previous window.
+
+        Returns:
+            tuple: The numeric and categorical count arrays and the number of houses.
+        """
+        window = self._window()
+        numeric_counts = np.zeros(self.numeric_reference.shape, np.int64)
+        categorical_counts = np.zeros(self.categorical_reference.shape, np.int64)
+        n_houses = 0
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # Read once: the owner thread may start a new window meanwhile
+            shard_window, current, previous = shard.window, shard.current, shard.previous
+            if shard_window == window:
+                windows = [current, previous]
+            elif shard_window == window - 1:
+                windows = [current]
+            else:
+                windows = []
+            for counts in windows:
+                if counts is not None:
+                    numeric_counts += counts[0]
+                    categorical_counts += counts[1]
+                    n_houses += counts[2][0]
+        return numeric_counts, categorical_counts, n_houses
+
+    def scores(self) -> dict:
+        """
+        Scores the drift of every monitored feature.
+
+        PSI compares the shares of every bin, including missing values and
+        unseen levels. KS is the largest gap between the cumulative shares
+        of the non-missing numeric values, at the reference bin edges, so it
+        is a lower bound of the exact two-sample statistic.
+
+        Returns:
+            dict: The number of houses counted, and per feature its PSI, KS (numeric only),
+                missing rate and unseen level rate (categorical only).
+        """
+        numeric_counts, categorical_counts, n_houses = self.counts()
+        features = {}
+
+        if self.numeric_fields:
+            shares = _shares(numeric_counts)
+            psi = population_stability_index(shares, self.numeric_reference)
+            present = slice(0, self.numeric_missing_bin)
+            current_cdf = np.cumsum(_shares(numeric_counts[:, present]), axis=1)
+            reference_cdf = np.cumsum(_shares(self.numeric_reference[:, present]), axis=1)
+            ks = np.abs(current_cdf - reference_cdf).max(axis=1)
+            for i, field in enumerate(self.numeric_fields):
+                features[field] = {
+                    "psi": float(psi[i]),
+                    "ks": float(ks[i]),
+                    "missing_rate": float(shares[i, -1]),
+                }
+
+        if self.categorical_fields:
+            shares = _shares(categorical_counts)
+            psi = population_stability_index(shares, self.categorical_reference)
+            for i, field in enumerate(self.categorical_fields):
+                features[field] = {
+                    "psi": float(psi[i]),
+                    "missing_rate": float(shares[i, -1]),
+                    "unseen_rate": float(shares[i, self.unseen_bin]),
+                }
+
+        return {
+            "observations": n_houses,
+            "reliable": n_houses >= max(self.min_observations, 1),
+            "features": features,
+        }
+
+def load_drift_monitor(profile_path: Path, fields: list = None, window_seconds: float = 0,
+                       min_observations: int = 0) -> Optional[DriftMonitor]:
+    """
+    Creates the drift monitor of a model version from its reference profile.
+
+    Args:
+        profile_path (Path): The profile saved by src/train.py.
+        fields (list): The fields monitored.
+        window_seconds (float): The window length (0: since the monitor was created).
+        min_observations (int): The number of houses below which the scores are not reliable.
+
+    Returns:
+        DriftMonitor: The monitor, or None if the version has no usable profile.
+    """
+    try:
+        profile = load_reference_profile(profile_path)
+    except Exception as e:
+        logger.warning(f"Could not read the reference profile {profile_path}: {e}")
+        return None
+    if profile is None:
+        logger.warning(f"No reference profile at {profile_path}, input drift is not monitored for this model.")
+        return None
+    return DriftMonitor(profile, fields, window_seconds, min_observations)
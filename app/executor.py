@@ -0,0 +1,352 @@
+# app/executor.py
+
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+from threadpoolctl import threadpool_limits
+
+# Import our custom modules
+from src.logger_config import logger
+from app.metrics import capture_stages, record_stage, stage_timer
+from app.registry import ModelRegistry
+
+# Model bundles of a process-pool worker, loaded by `_init_process_worker`
+_worker_registry: Optional[ModelRegistry] = None
+# Shared by the process-pool workers, so that each takes exactly one of the tasks of `InferenceExecutor.preload`
+_worker_barrier = None
+# Version -> bundle of the versions a process worker was asked to use, most recent last. With A/B
+# routing requests alternate between versions, which must not reload a model on every switch.
+_worker_bundles: "OrderedDict[str, object]" = OrderedDict()
+_WORKER_MAX_BUNDLES = 4
+
+class ExecutorOverloaded(Exception):
+    """Raised when an inference task is rejected because too many are already waiting."""
+
+    def __init__(self, retry_after_seconds: int):
+        super().__init__(f"Inference queue is full, retry after {retry_after_seconds}s.")
+        self.retry_after_seconds = retry_after_seconds
+
+def predict_one(bundle, house: dict) -> Optional[float]:
+    """Scores one house with a model bundle, through its fast path when it has one."""
+    if bundle.fast_predictor is not None:
+        return bundle.fast_predictor.predict_one(house)
+    from app.predict import make_prediction
+
+    return make_prediction(house, bundle.model, bundle.preprocessor)
+
+def predict_many(bundle, houses: list) -> Optional[list]:
+    """Scores many houses with a model bundle in one vectorized pass."""
+    from app.predict import make_predictions
+
+    return make_predictions(houses, bundle.model, bundle.preprocessor)
+
+def predict_columns(bundle, df) -> Optional["np.ndarray"]:
+    """Scores a DataFrame of houses (e.g. decoded from Arrow) with a model bundle in one vectorized pass."""
+    from app.predict import make_frame_predictions
+
+    return make_frame_predictions(df, bundle.model, bundle.preprocessor)
+
+def predict_one_with_features(bundle, house: dict) -> tuple:
+    """Scores one house like `predict_one` and also returns its preprocessed features (None if it failed)."""
+    if bundle.fast_predictor is not None:
+        return bundle.fast_predictor.predict_one_with_features(house)
+    predictions, features = predict_many_with_features(bundle, [house])
+    return (predictions[0] if predictions is not None else None), features
+
+def predict_many_with_features(bundle, houses: list) -> tuple:
+    """Scores many houses like `predict_many` and also returns their preprocessed features (None if it failed)."""
+    import pandas as pd
+
+    if not houses:
+        return [], None
+    with stage_timer("build_frame"):
+        df = pd.DataFrame.from_records(houses)
+    predictions, features = predict_columns_with_features(bundle, df)
+    return (predictions.astype(float).tolist() if predictions is not None else None), features
+
+def predict_columns_with_features(bundle, df) -> tuple:
+    """Scores a DataFrame of houses like `predict_columns` and also returns their preprocessed features."""
+    from app.predict import make_frame_predictions_with_features
+
+    return make_frame_predictions_with_features(df, bundle.model, bundle.preprocessor)
+
+def predict_sweep(bundle, house: dict, grid: dict) -> Optional[tuple]:
+    """Scores a house over a grid of feature values in one vectorized pass; see `make_sweep`."""
+    from app.predict import make_sweep
+
+    result = make_sweep(house, grid, bundle.model, bundle.preprocessor)
+    if result is None:
+        return None
+    base_price, prices = result
+    return base_price, prices.astype(float).tolist()
+
+def explain_one(bundle, house: dict, top_k: int) -> Optional[dict]:
+    """Explains the prediction of one house, building its features with the fast path when there is one."""
+    explanations = explain_many(bundle, [house], top_k, fast=bundle.fast_predictor is not None)
+    return explanations[0] if explanations is not None else None
+
+def explain_many(bundle, houses: list, top_k: int, fast: bool = False) -> Optional[list]:
+    """Explains the predictions of many houses with one contributions call on the whole batch."""
+    if not houses:
+        return []
+    try:
+        if fast:
+            import numpy as np
+
+            with stage_timer("transform", path="fast"):
+                features = np.vstack([bundle.fast_predictor.transform_one(house) for house in houses])
+            return bundle.explainer.explain(features, houses, top_k, path="fast")
+
+        import pandas as pd
+        from app.predict import transform_frame
+
+        features = transform_frame(pd.DataFrame.from_records(houses), bundle.preprocessor)
+        return bundle.explainer.explain(features, houses, top_k)
+    except Exception as e:
+        logger.error(f"Error during prediction explanation: {e}", exc_info=True)
+        return None
+
+def comps_many(bundle, houses: list, k: int) -> Optional[tuple]:
+    """Prices houses and finds the k comparable sales of each in the bundle's index. Returns (prices, comparables)."""
+    prices = [predict_one(bundle, houses[0])] if len(houses) == 1 else predict_many(bundle, houses)
+    if prices is None or None in prices:
+        return None
+    try:
+        return prices, bundle.comps_index.query(houses, k)
+    except Exception as e:
+        logger.error(f"Error during comparable sales lookup: {e}", exc_info=True)
+        return None
+
+def pin_threads(n_threads: int):
+    """Caps the OpenMP (XGBoost) and BLAS thread pools used from the calling thread."""
+    if n_threads:
+        threadpool_limits(limits=n_threads)
+
+def _init_process_worker(n_threads: int, compile_fast_path: bool, version: Optional[str], barrier):
+    """Pins the threads of a process-pool worker and loads the served model version into it."""
+    global _worker_registry, _worker_barrier
+    pin_threads(n_threads)
+    _worker_barrier = barrier
+    _worker_registry = ModelRegistry(compile_fast_path=compile_fast_path, model_threads=n_threads)
+    if version is not None:
+        _worker_bundles[version] = _worker_registry.load(version)
+
+def _worker_ready() -> bool:
+    return _worker_registry is not None
+
+def _worker_bundle(version: str):
+    """Returns the bundle of a version in a process-pool worker, loading it first if the worker has not got it."""
+    bundle = _worker_bundles.get(version)
+    if bundle is None:
+        bundle = _worker_bundles[version] = _worker_registry.load(version)
+        if len(_worker_bundles) > _WORKER_MAX_BUNDLES:
+            _worker_bundles.popitem(last=False)
+    else:
+        _worker_bundles.move_to_end(version)
+    return bundle
+
+def _preload_in_worker(version: str, timeout: float) -> tuple:
+    """Loads a version into this worker, then waits for every other worker to have done the same."""
+    _worker_bundle(version)
+    _worker_barrier.wait(timeout)
+    return os.getpid(), list(_worker_bundles)
+
+def _run_in_process_worker(func: Callable, version: str, *args) -> tuple:
+    """
+    Runs func(bundle, *args) in a process-pool worker, loading the version first if it has not got it.
+
+    Returns:
+        tuple: The result of func and the stages it timed, for the API process to record.
+    """
+    bundle = _worker_bundle(version)
+    with capture_stages() as stages:
+        result = func(bundle, *args)
+    return result, stages
+
+class InferenceExecutor:
+    """
+    Runs inference on a dedicated, bounded pool of workers.
+
+    Each worker scores one task at a time with a fixed number of XGBoost
+    and BLAS threads, so concurrent requests never use more threads than
+    the machine has cores. Tasks beyond the free workers wait in a queue of
+    at most `max_queue`; when it is full, new tasks are rejected with
+    `ExecutorOverloaded` right away instead of adding to everyone's latency.
+
+    With the 'thread' kind the workers share the bundles loaded by the API.
+    With the 'process' kind every worker loads its own copy of the served
+    version (and of the other versions it is asked to use, keeping the
+    last few), which avoids
+    contention on the GIL at the cost of memory.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 1, threads_per_worker: int = 1, max_queue: int = 64,
+                 retry_after_seconds: int = 1, compile_fast_path: bool = True, version: Optional[str] = None):
+        """
+        Args:
+            kind (str): 'thread' or 'process'.
+            workers (int): The number of tasks scored at the same time.
+            threads_per_worker (int): XGBoost/BLAS threads per task (0 leaves them unpinned).
+            max_queue (int): The number of tasks that may wait for a worker.
+            retry_after_seconds (int): The Retry-After hint given with a rejection.
+            compile_fast_path (bool): Whether process workers compile the fast path of their bundles.
+            version (str): The model version process workers load at startup.
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor: {kind!r}")
+        self.kind = kind
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+
+        self._preload_lock = threading.Lock()
+        if kind == "process":
+            # 'spawn' rather than fork: forking after XGBoost's OpenMP pool has started can hang the child
+            context = multiprocessing.get_context("spawn")
+            self._barrier = context.Barrier(workers)
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_process_worker,
+                initargs=(threads_per_worker, compile_fast_path, version, self._barrier),
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="inference",
+                initializer=pin_threads,
+                initargs=(threads_per_worker,),
+            )
+
+        # Tasks submitted and not finished yet; only changed on the event loop thread
+        self.pending = 0
+        self.total_tasks = 0
+        self.total_rejected = 0
+        logger.info(
+            f"Inference executor started ({kind}, workers={workers}, threads_per_worker={threads_per_worker}, "
+            f"max_queue={max_queue})."
+        )
+
+    async def start(self):
+        """Starts every process worker now, so the first requests do not wait for them to load the model."""
+        if self.kind == "process":
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self._pool, _worker_ready) for _ in range(self.workers)))
+
+    def preload(self, version: str, timeout: float = 120.0) -> list:
+        """
+        Loads and warms up a model version in every process worker, so that no request waits for it.
+
+        One task per worker is submitted. Each task waits at a barrier of all
+        the workers once the version is loaded, so no worker can take two of
+        them. A worker busy with a request takes its task when it is done.
+        Thread workers share the API's bundles and need nothing. If the
+        workers do not all get the version within the timeout, the others
+        load it on first use.
+
+        Args:
+            version (str): The model version, e.g. a newly trained one about to be swapped in.
+            timeout (float): How long a worker waits for the others, in seconds.
+
+        Returns:
+            list: (process id, versions loaded) of every worker; empty for thread workers or on failure.
+        """
+        if self.kind != "process":
+            return []
+        with self._preload_lock:
+            # A previous timeout leaves the barrier broken
+            self._barrier.reset()
+            start = time.perf_counter()
+            futures = [self._pool.submit(_preload_in_worker, version, timeout) for _ in range(self.workers)]
+            try:
+                workers = [future.result() for future in futures]
+            except Exception as e:
+                logger.warning(f"Could not preload model version '{version}' into every inference worker: {e!r}")
+                return []
+        logger.info(f"Model {version} preloaded into {len(workers)} inference workers in {time.perf_counter() - start:.3f}s.")
+        return workers
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of tasks waiting for a free worker."""
+        return max(0, self.pending - self.workers)
+
+    def reject(self):
+        """Counts a rejected task and raises ExecutorOverloaded for it."""
+        self.total_rejected += 1
+        raise ExecutorOverloaded(self.retry_after_seconds)
+
+    def check_capacity(self):
+        """Raises ExecutorOverloaded if a new task would not fit in the queue."""
+        if self.pending >= self.workers + self.max_queue:
+            self.reject()
+
+    async def run(self, func: Callable, bundle, *args, admit: bool = True):
+        """
+        Runs func(bundle, *args) on a worker.
+
+        Args:
+            func (Callable): A module-level function taking a model bundle first, e.g. `predict_one`.
+            bundle: The model bundle to score with; process workers use the same version.
+            *args: The remaining arguments of func.
+            admit (bool): Check the queue limit first. Work that was already admitted
+                (e.g. a micro-batch of admitted requests) passes False.
+
+        Returns:
+            The result of func.
+
+        Raises:
+            ExecutorOverloaded: If the queue is full.
+        """
+        if admit:
+            self.check_capacity()
+        if self.kind == "process":
+            call = partial(_run_in_process_worker, func, bundle.version, *args)
+        else:
+            # In a copy of the caller's context, like asyncio.to_thread, so that per-request stage timings are collected
+            call = partial(contextvars.copy_context().run, func, bundle, *args)
+
+        self.pending += 1
+        self.total_tasks += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, call)
+        finally:
+            self.pending -= 1
+        if self.kind == "process":
+            # Recorded here, in the caller's context, so that they also count for its request
+            result, stages = result
+            for stage in stages:
+                record_stage(*stage)
+        return result
+
+    def stats(self) -> dict:
+        """
+        Returns the executor configuration and load.
+
+        Returns:
+            dict: Workers, queue limit, tasks in flight and rejection counters.
+        """
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "queue_depth": self.queue_depth,
+            "total_tasks": self.total_tasks,
+            "total_rejected": self.total_rejected,
+        }
+
+    def shutdown(self):
+        """Stops the workers once the tasks already submitted have finished."""
+        self._pool.shutdown(wait=True)
+        logger.info("Inference executor stopped.")
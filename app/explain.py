@@ -0,0 +1,175 @@
+# app/explain.py
+
+import numpy as np
+import xgboost as xgb
+
+# Import our custom modules
+from src.export import PreprocessorParams
+from src.logger_config import logger
+from app.fast_predict import engineer_one
+from app.metrics import stage_timer
+
+def column_fields(preprocessor) -> tuple:
+    """
+    Maps every output column of the fitted preprocessor back to the feature it was made from.
+
+    One-hot encoded features span one column per category; every other
+    feature is a single column. Engineered features (e.g. 'TotalSF') keep
+    their own name, as the model never sees the fields they were derived from.
+
+    Args:
+        preprocessor: The fitted ColumnTransformer from `create_preprocessor`, or its exported parameters.
+
+    Returns:
+        tuple: The feature names, in output order, and an array giving the index of
+            the feature of each output column.
+    """
+    if isinstance(preprocessor, PreprocessorParams):
+        return preprocessor.output_fields()
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    fields = []
+    field_of_column = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or len(columns) == 0:
+            continue
+        if name == 'remainder':
+            columns = [preprocessor.feature_names_in_[i] for i in columns]
+        indices = preprocessor.output_indices_[name]
+
+        if isinstance(transformer, Pipeline) and isinstance(transformer[-1], OneHotEncoder):
+            widths = [len(categories) for categories in transformer[-1].categories_]
+        else:
+            widths = [1] * len(columns)
+        if sum(widths) != indices.stop - indices.start:
+            raise ValueError(f"Cannot map the output columns of transformer '{name}' to its features.")
+
+        for column, width in zip(columns, widths):
+            field_of_column.extend([len(fields)] * width)
+            fields.append(column)
+
+    return fields, np.asarray(field_of_column, dtype=np.intp)
+
+class FeatureExplainer:
+    """
+    Explains the predictions of a model version per API field and in dollars.
+
+    The booster's built-in TreeSHAP (`pred_contribs`) gives the contribution
+    of every preprocessed column to the log price. The columns of each field
+    are summed with one matrix product over the whole batch, so a one-hot
+    encoded 'Neighborhood' gets a single contribution.
+
+    The model predicts log1p(price), so contributions add up in log space.
+    They are converted to dollars in proportion to their share of the log
+    change from the base price to the prediction:
+
+        dollars_i = phi_i * (price - base_price) / (log1p(price) - log1p(base_price))
+
+    The dollar contributions therefore add up exactly to the prediction,
+    minus the base price (the model's prediction with no information).
+    """
+
+    def __init__(self, model, preprocessor):
+        """
+        Args:
+            model: The trained XGBoost model.
+            preprocessor: The fitted ColumnTransformer from `create_preprocessor`, or its exported parameters.
+
+        Raises:
+            ValueError: If the preprocessor's output does not match the model's features.
+        """
+        self.booster = model.get_booster() if hasattr(model, "get_booster") else model
+        try:
+            self.iteration_range = (0, model.best_iteration + 1)
+        except AttributeError:
+            self.iteration_range = (0, 0)
+        self.feature_types = self.booster.feature_types
+
+        self.fields, field_of_column = column_fields(preprocessor)
+        n_columns = len(field_of_column)
+        if n_columns != self.booster.num_features():
+            raise ValueError(f"The preprocessor has {n_columns} output columns, the model {self.booster.num_features()}.")
+
+        # Sums the column contributions of each field; the last contribution (the bias) is left out
+        self.field_matrix = np.zeros((n_columns + 1, len(self.fields)))
+        self.field_matrix[np.arange(n_columns), field_of_column] = 1.0
+
+    def contributions(self, X, path: str = "pandas") -> tuple:
+        """
+        Computes the contribution of every field to the log-price predictions of a matrix.
+
+        Args:
+            X: Preprocessed features, as the preprocessor (dense or CSR) or the fast path outputs them.
+            path (str): The inference path, for the stage latency metrics.
+
+        Returns:
+            tuple: The (n_houses, n_fields) log contributions, the log base price
+                and the (n_houses,) log predictions.
+        """
+        with stage_timer("explain", path=path):
+            dmatrix = xgb.DMatrix(
+                X, feature_types=self.feature_types, enable_categorical='c' in (self.feature_types or ())
+            )
+            contributions = self.booster.predict(dmatrix, pred_contribs=True, iteration_range=self.iteration_range)
+            log_predictions = self.booster.predict(dmatrix, iteration_range=self.iteration_range)
+
+        field_contributions = contributions.astype(np.float64) @ self.field_matrix
+        return field_contributions, float(contributions[0, -1]), log_predictions.astype(np.float64)
+
+    def explain(self, X, houses: list, top_k: int, path: str = "pandas") -> list:
+        """
+        Explains the predictions of a matrix with the top-k fields in dollars.
+
+        Args:
+            X: Preprocessed features of the houses.
+            houses (list): The API input features of the houses, for the values of the fields.
+            top_k (int): The number of fields reported per house, largest effect first.
+            path (str): The inference path, for the stage latency metrics.
+
+        Returns:
+            list: One explanation per house, in the order of the input.
+        """
+        log_contributions, log_base, log_predictions = self.contributions(X, path)
+
+        predictions = np.expm1(log_predictions)
+        base_price = float(np.expm1(log_base))
+        log_change = log_contributions.sum(axis=1)
+        # Where the prediction equals the base price, use the derivative of expm1 instead of 0/0
+        tiny = np.abs(log_change) < 1e-12
+        dollars_per_log = np.where(
+            tiny, predictions + 1.0, (predictions - base_price) / np.where(tiny, 1.0, log_change)
+        )
+        dollar_contributions = log_contributions * dollars_per_log[:, None]
+
+        top_k = min(top_k, len(self.fields))
+        top = np.argsort(-np.abs(dollar_contributions), axis=1, kind="stable")[:, :top_k]
+        top_dollars = np.take_along_axis(dollar_contributions, top, axis=1)
+        other_dollars = dollar_contributions.sum(axis=1) - top_dollars.sum(axis=1)
+
+        explanations = []
+        for i, house in enumerate(houses):
+            features = engineer_one(house)
+            explanations.append({
+                "predicted_price": float(predictions[i]),
+                "base_price": base_price,
+                "contributions": [
+                    {"feature": self.fields[j], "value": features.get(self.fields[j]), "contribution": float(dollars)}
+                    for j, dollars in zip(top[i], top_dollars[i])
+                ],
+                "other_contribution": float(other_dollars[i]),
+            })
+        return explanations
+
+def create_explainer(model, preprocessor):
+    """
+    Builds the explainer of a model version.
+
+    Returns:
+        FeatureExplainer: The explainer, or None if the model cannot be explained per field.
+    """
+    try:
+        return FeatureExplainer(model, preprocessor)
+    except Exception as e:
+        logger.warning(f"Prediction explanations unavailable for this model: {e}")
+        return None
@@ -0,0 +1,165 @@
+# app/fast_predict.py
+
+import numpy as np
+
+# Import our custom modules
+from src.export import PreprocessorParams, is_missing
+from src.features import FEATURES
+from src.logger_config import logger
+from app.metrics import stage_timer
+
+def engineer_one(house: dict) -> dict:
+    """
+    Adds the derived features of the feature registry to a single house.
+
+    Args:
+        house (dict): The API input features for one house.
+
+    Returns:
+        dict: A copy of the input with the derived features added.
+    """
+    return {**house, **FEATURES.compute(house)}
+
+def _iteration_range(model) -> tuple:
+    """
+    The boosting rounds a model predicts with: up to its best iteration when one is set
+    (by early stopping, or by COMPACT_MODEL), else all of them.
+    """
+    try:
+        return (0, model.best_iteration + 1)
+    except AttributeError:
+        return (0, 0)
+
+class CompiledPredictor:
+    """
+    A pandas-free inference path for one house at a time.
+
+    It is built on the fitted parameters of the preprocessor (see
+    `src.export.PreprocessorParams`): imputer fill values, scaler means
+    and scales as flat NumPy arrays, and one-hot and ordinal vocabularies
+    as dict lookups. A house dictionary is then mapped straight to the
+    dense feature vector the ColumnTransformer would produce and scored
+    with the booster's in-place predict, or with the model's flat trees
+    when it is served by the NumPy flat evaluator.
+    """
+
+    def __init__(self, model, preprocessor):
+        """
+        Args:
+            model: The trained XGBoost model (or its Booster).
+            preprocessor: The fitted ColumnTransformer from `create_preprocessor`, or its exported parameters.
+
+        Raises:
+            ValueError: If the preprocessor contains steps this path cannot reproduce.
+        """
+        params = preprocessor if isinstance(preprocessor, PreprocessorParams) else PreprocessorParams.from_preprocessor(preprocessor)
+        self.booster = model.get_booster() if hasattr(model, "get_booster") else model
+        # The model's own range, which COMPACT_MODEL may have shortened since the parameters were exported
+        self.iteration_range = _iteration_range(model)
+        self.flat_trees = getattr(model, "flat_trees", None)
+        self.zeros_are_missing = params.zeros_are_missing
+        self.n_features = params.n_features
+        self.numeric_blocks = params.numeric_blocks
+        self.categorical_blocks = params.categorical_blocks
+        self.ordinal_blocks = params.ordinal_blocks
+
+    def transform_one(self, house: dict) -> np.ndarray:
+        """
+        Builds the preprocessed feature vector for one house.
+
+        Args:
+            house (dict): The API input features for one house.
+
+        Returns:
+            np.ndarray: A (1, n_features) float32 array, equal to the preprocessor's output.
+        """
+        features = engineer_one(house)
+        vector = np.zeros(self.n_features, dtype=np.float64)
+
+        for offset, columns, fill_values, means, scales in self.numeric_blocks:
+            values = np.array([features.get(column) for column in columns], dtype=np.float64)
+            missing = np.isnan(values)
+            values[missing] = fill_values[missing]
+            vector[offset:offset + len(columns)] = (values - means) / scales
+
+        for columns, fill_values, lookups, ignore_unknown in self.categorical_blocks:
+            for column, fill_value, lookup in zip(columns, fill_values, lookups):
+                value = features.get(column)
+                if is_missing(value):
+                    value = fill_value
+                index = lookup.get(value)
+                if index is not None:
+                    vector[index] = 1.0
+                elif not ignore_unknown:
+                    raise ValueError(f"Unknown category {value!r} for feature '{column}'.")
+
+        for offset, columns, fill_values, lookups, unknown_value in self.ordinal_blocks:
+            for i, (column, fill_value, lookup) in enumerate(zip(columns, fill_values, lookups)):
+                value = features.get(column)
+                if is_missing(value):
+                    value = fill_value
+                code = lookup.get(value, unknown_value)
+                if code is None:
+                    raise ValueError(f"Unknown category {value!r} for feature '{column}'.")
+                vector[offset + i] = code
+
+        if self.zeros_are_missing:
+            vector[vector == 0.0] = np.nan
+
+        return vector.astype(np.float32).reshape(1, -1)
+
+    def predict_one(self, house: dict) -> float:
+        """
+        Predicts the price of one house, like `make_prediction`.
+
+        Args:
+            house (dict): The API input features for one house.
+
+        Returns:
+            float: The predicted house price, or None if the prediction failed.
+        """
+        return self.predict_one_with_features(house)[0]
+
+    def predict_one_with_features(self, house: dict) -> tuple:
+        """
+        Predicts the price of one house and also returns its feature vector, for a shadow model
+        sharing the preprocessor.
+
+        Args:
+            house (dict): The API input features for one house.
+
+        Returns:
+            tuple: The predicted house price and the (1, n_features) feature vector, or (None, None)
+                if the prediction failed.
+        """
+        try:
+            with stage_timer("transform", path="fast"):
+                features = self.transform_one(house)
+            with stage_timer("predict", path="fast"):
+                if self.flat_trees is not None:
+                    log_prediction = self.flat_trees.predict(features)
+                else:
+                    log_prediction = self.booster.inplace_predict(features, iteration_range=self.iteration_range)
+            return float(np.expm1(log_prediction[0])), features
+        except Exception as e:
+            logger.error(f"Error during fast-path prediction: {e}", exc_info=True)
+            return None, None
+
+def compile_predictor(model, preprocessor):
+    """
+    Compiles the fast single-row inference path for a model and preprocessor.
+
+    Args:
+        model: The trained XGBoost model.
+        preprocessor: The fitted preprocessing pipeline.
+
+    Returns:
+        CompiledPredictor: The compiled predictor, or None if the pair cannot be compiled.
+    """
+    try:
+        predictor = CompiledPredictor(model, preprocessor)
+        logger.info(f"Compiled fast inference path with {predictor.n_features} features.")
+        return predictor
+    except Exception as e:
+        logger.warning(f"Fast inference path unavailable, using the pandas pipeline: {e}")
+        return None
@@ -0,0 +1,40 @@
+# app/flat_trees.py
+
+import numpy as np
+
+# Import our custom modules
+from src.flat_trees import FlatTreeEnsemble
+
+class FlatTreeRegressor:
+    """
+    Serves a model's predictions from its FlatTreeEnsemble while keeping the XGBoost model for the rest.
+
+    It stands in for the XGBRegressor in a ModelBundle: `predict` and the
+    fast path (through `flat_trees`) use the NumPy evaluator, while
+    explanations still run TreeSHAP on the booster, limited to the same
+    boosting rounds.
+    """
+
+    def __init__(self, model, flat_trees: FlatTreeEnsemble):
+        """
+        Args:
+            model: The trained XGBoost model, with `best_iteration` set to the compact tree count.
+            flat_trees (FlatTreeEnsemble): Its compiled trees.
+        """
+        self.model = model
+        self.flat_trees = flat_trees
+
+    def predict(self, X) -> np.ndarray:
+        """Predicts the log prices of preprocessed houses, like XGBRegressor.predict."""
+        return self.flat_trees.predict(X)
+
+    def get_booster(self):
+        return self.model.get_booster()
+
+    @property
+    def best_iteration(self) -> int:
+        return self.model.best_iteration
+
+    def set_params(self, **params) -> "FlatTreeRegressor":
+        self.model.set_params(**params)
+        return self
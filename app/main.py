@@ -1,12 +1,46 @@
 # app/main.py
 
-from fastapi import FastAPI, HTTPException, status
-from pydantic import BaseModel, Field
-from typing import Optional
+import asyncio
+import importlib
+import secrets
+import time
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Any, Dict, List, Optional
 
 # Import our custom modules
+from src.config import (
+    MAX_BATCH_SIZE, MAX_EXPLAIN_BATCH_SIZE, EXPLAIN_TOP_K, COMPS_K, MAX_COMPS_K, MAX_COMPS_BATCH_SIZE, PREDICT_BATCHING_ENABLED, PREDICT_BATCH_MAX_SIZE, PREDICT_BATCH_WINDOW_MS,
+    PREDICT_FAST_PATH_ENABLED, PREDICTION_CACHE_ENABLED, PREDICTION_CACHE_BACKEND,
+    PREDICTION_CACHE_MAX_SIZE, PREDICTION_CACHE_TTL_SECONDS, PREDICTION_CACHE_PATH,
+    MODEL_RELOAD_INTERVAL_SECONDS, ADMIN_TOKEN, INFERENCE_EXECUTOR, INFERENCE_WORKERS,
+    INFERENCE_THREADS_PER_WORKER, INFERENCE_MAX_QUEUE, INFERENCE_RETRY_AFTER_SECONDS,
+    STARTUP_MODE, WARMUP_PREDICTIONS, PREDICTION_LOG_SAMPLE_RATE, PREDICTION_LOG_ERROR_SAMPLE_RATE,
+    DRIFT_MONITORING_ENABLED, DRIFT_WINDOW_SECONDS, DRIFT_MIN_OBSERVATIONS, MAX_SWEEP_POINTS,
+    FAST_JSON_RESPONSES_ENABLED, MODEL_ROUTES, SHADOW_MODEL_VERSION, SHADOW_MAX_QUEUE, SHADOW_LOG_SAMPLE_RATE
+)
 from src.logger_config import logger
-from app.predict import load_latest_model, make_prediction
+from app.audit import PredictionAuditLog, RequestIdMiddleware
+from app.batching import MicroBatcher
+from app.cache import create_prediction_cache
+from app.executor import (
+    ExecutorOverloaded, InferenceExecutor, comps_many, explain_many, explain_one, predict_columns, predict_columns_with_features,
+    predict_many, predict_many_with_features, predict_one, predict_one_with_features, predict_sweep
+)
+from app.metrics import (
+    PrometheusMiddleware, capture_stages, collect_stage_timings, record_predictions, register_serving_state,
+    set_model_version
+)
+from app.registry import ModelRegistry
+from app.routing import ModelPool, ShadowScorer, parse_routes
+from app.serialization import (
+    COLUMNAR_MEDIA_TYPES, ArrowResponse, FastJSONResponse, RecordParser, TableParser, media_type, parse_json_array
+)
+from app.startup import StartupTracker
 
 # --- APP SETUP ---
 app = FastAPI(
@@ -14,22 +48,245 @@ app = FastAPI(
     description="API to predict house prices in Ames, Iowa.",
     version="0.1.0"
 )
+app.add_middleware(PrometheusMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 # --- GLOBAL VARIABLES ---
-model = None
-preprocessor = None
+registry = ModelRegistry(
+    compile_fast_path=PREDICT_FAST_PATH_ENABLED,
+    model_threads=INFERENCE_THREADS_PER_WORKER or None,
+)
+pool = ModelPool(registry)
+shadow_scorer = None
+batcher = None
+prediction_cache = None
+drift_monitor = None
+inference = None
+startup = StartupTracker()
+startup_task = None
+audit_log = PredictionAuditLog(PREDICTION_LOG_SAMPLE_RATE, PREDICTION_LOG_ERROR_SAMPLE_RATE)
+
+async def predict_micro_batch(input_data: list) -> list:
+    """Scores one micro-batch with the model bundle currently being served."""
+    # The requests in the batch were admitted one by one, so the batch itself is never rejected
+    return await inference.run(predict_many, registry.current, input_data, admit=False)
+
+def load_drift_monitor(version: str):
+    """Creates the input drift monitor of a model version, or returns None if drift is not monitored."""
+    if not DRIFT_MONITORING_ENABLED:
+        return None
+    from app.drift import load_drift_monitor as load_monitor
+    from app.predict import drift_profile_path
+
+    fields = [field.alias or name for name, field in HouseData.model_fields.items()]
+    return load_monitor(drift_profile_path(version), fields, DRIFT_WINDOW_SECONDS, DRIFT_MIN_OBSERVATIONS)
+
+def on_model_swap(bundle):
+    """
+    Invalidates the predictions cached for the previous model, publishes the new version
+    and measures input drift against the new model's training data.
+    """
+    global drift_monitor
+    if prediction_cache is not None:
+        prediction_cache.set_model_version(bundle.version)
+    set_model_version(bundle.version)
+    drift_monitor = load_drift_monitor(bundle.version)
+
+def preload_workers(bundle):
+    """Loads a newly loaded model version into every process worker before it is served."""
+    if inference is not None:
+        inference.preload(bundle.version)
+
+registry.add_listener(on_model_swap)
+registry.add_preload_hook(preload_workers)
+register_serving_state(
+    lambda: prediction_cache, lambda: batcher, lambda: inference, lambda: drift_monitor, lambda: shadow_scorer
+)
 
 # --- API EVENTS ---
-@app.on_event("startup")
-def startup_event():
-    """Load the model and preprocessor when the API starts."""
-    global model, preprocessor
-    logger.info("--- API starting up ---")
-    model, preprocessor = load_latest_model()
-    if model is None or preprocessor is None:
+def import_inference_modules():
+    """Imports the inference code, and with it pandas, scikit-learn and XGBoost."""
+    for module in ("app.predict", "app.fast_predict"):
+        importlib.import_module(module)
+
+async def warm_up(bundle, n_predictions: int):
+    """
+    Scores synthetic houses on the inference workers before the API reports ready.
+
+    The houses are scored concurrently so that every worker is started,
+    and once more as a batch for the vectorized path. One of them is also
+    parsed from JSON like a /predict body, so the validator is built.
+    The bundle's predictor is called directly, not through /predict, so
+    the houses never reach the prediction cache, the drift monitor or the
+    audit log, and the stages they time are dropped, so they do not reach
+    the latency metrics either.
+    """
+    import json
+    from src.synthetic import generate_payloads
+
+    houses = [house_records.validate(house) for house in generate_payloads(n_predictions, seed=0)]
+    with capture_stages():
+        await asyncio.gather(*(inference.run(predict_one, bundle, house, admit=False) for house in houses))
+        await inference.run(predict_many, bundle, houses, admit=False)
+    house_records.parse_json(json.dumps(houses[0]).encode())
+
+async def load_serving_state():
+    """Loads the model, starts the inference workers and warms them up, timing each phase."""
+    global batcher, prediction_cache, inference, shadow_scorer
+
+    if PREDICTION_CACHE_ENABLED:
+        with startup.phase("prediction_cache"):
+            prediction_cache = create_prediction_cache(
+                PREDICTION_CACHE_BACKEND,
+                PREDICTION_CACHE_MAX_SIZE,
+                PREDICTION_CACHE_TTL_SECONDS,
+                PREDICTION_CACHE_PATH,
+            )
+    registry.warmup_input = HouseData.model_config["json_schema_extra"]["example"]
+
+    with startup.phase("library_imports"):
+        await run_in_threadpool(import_inference_modules)
+
+    with startup.phase("model_load"):
+        try:
+            await run_in_threadpool(registry.refresh)
+        except Exception as e:
+            logger.error(f"Error loading model or preprocessor: {e}", exc_info=True)
+
+        try:
+            await run_in_threadpool(pool.configure, parse_routes(MODEL_ROUTES), SHADOW_MODEL_VERSION)
+        except Exception as e:
+            logger.error(f"Error setting up the model routes, serving the current model only: {e}", exc_info=True)
+
+    if registry.current is None:
         logger.error("FATAL: Model or preprocessor could not be loaded. API will not work.")
     else:
         logger.info("Model and preprocessor loaded successfully.")
+    registry.start_watcher(MODEL_RELOAD_INTERVAL_SECONDS)
+
+    with startup.phase("inference_executor"):
+        inference = InferenceExecutor(
+            INFERENCE_EXECUTOR,
+            workers=INFERENCE_WORKERS,
+            threads_per_worker=INFERENCE_THREADS_PER_WORKER,
+            max_queue=INFERENCE_MAX_QUEUE,
+            retry_after_seconds=INFERENCE_RETRY_AFTER_SECONDS,
+            compile_fast_path=PREDICT_FAST_PATH_ENABLED,
+            version=registry.current.version if registry.current is not None else None,
+        )
+        await inference.start()
+        # The comparisons go to the same logger as the prediction audit records
+        shadow_scorer = ShadowScorer(
+            SHADOW_MAX_QUEUE, SHADOW_LOG_SAMPLE_RATE, threads=INFERENCE_THREADS_PER_WORKER, logger=audit_log.logger
+        )
+
+    if WARMUP_PREDICTIONS > 0 and registry.current is not None:
+        with startup.phase("warmup"):
+            try:
+                await warm_up(registry.current, WARMUP_PREDICTIONS)
+            except Exception as e:
+                logger.error(f"Warm-up predictions failed: {e}", exc_info=True)
+
+    if PREDICT_BATCHING_ENABLED:
+        batcher = MicroBatcher(
+            predict_micro_batch,
+            max_batch_size=PREDICT_BATCH_MAX_SIZE,
+            max_wait_ms=PREDICT_BATCH_WINDOW_MS,
+            # One batch per inference worker, so that batching does not leave the others idle
+            max_concurrent_batches=inference.workers,
+        )
+        await batcher.start()
+
+    startup.mark_finished()
+
+@app.on_event("startup")
+async def startup_event():
+    """Load the model and preprocessor when the API starts, or in the background in STARTUP_MODE 'background'."""
+    global startup_task
+    logger.info(f"--- API starting up ({STARTUP_MODE}) ---")
+    startup.begin()
+
+    if STARTUP_MODE == "background":
+        # The API answers liveness checks (and 503 for predictions) while the model loads
+        startup_task = asyncio.create_task(load_serving_state())
+    else:
+        await load_serving_state()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the micro-batcher, the inference and shadow workers and the model watcher so that nothing is left running."""
+    global batcher, inference, shadow_scorer, startup_task
+    if startup_task is not None:
+        if not startup_task.done():
+            startup_task.cancel()
+        await asyncio.gather(startup_task, return_exceptions=True)
+        startup_task = None
+    if batcher is not None:
+        await batcher.stop()
+        batcher = None
+    if inference is not None:
+        await run_in_threadpool(inference.shutdown)
+        inference = None
+    if shadow_scorer is not None:
+        await run_in_threadpool(shadow_scorer.shutdown)
+        shadow_scorer = None
+    registry.stop_watcher()
+
+@app.exception_handler(ExecutorOverloaded)
+async def executor_overloaded_handler(request: Request, exc: ExecutorOverloaded):
+    """Sheds load with 429 Too Many Requests when the inference queue is full."""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many predictions in progress. Retry later."},
+        headers={"Retry-After": str(exc.retry_after_seconds)},
+    )
+
+# Request header naming the model version to score with, and response header naming the one that did
+MODEL_VERSION_HEADER = "X-Model-Version"
+
+def get_serving_bundle(requested_version: Optional[str] = None):
+    """
+    Returns the model bundle for one request, routed by weight or by the X-Model-Version header.
+
+    Raises:
+        HTTPException: 503 if no model is loaded, 404 if the requested version is not served.
+    """
+    if inference is None:
+        raise HTTPException(status_code=503, detail="API is starting up. Retry later.")
+    try:
+        bundle = pool.select(requested_version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Model version '{requested_version}' is not served.")
+    if bundle is None:
+        raise HTTPException(status_code=503, detail="Model not loaded. API is not ready.")
+    return bundle
+
+def get_shadow(bundle) -> tuple:
+    """
+    Returns the shadow bundle of a request scored by `bundle` (None if there is none) and what the
+    primary scoring must keep for it: its preprocessed 'features' when the two models share a
+    preprocessor, so that the houses are preprocessed once, else the 'houses'.
+    """
+    shadow = pool.shadow_for(bundle) if shadow_scorer is not None else None
+    if shadow is None:
+        return None, None
+    return shadow, "features" if shadow.preprocessor is bundle.preprocessor else "houses"
+
+def require_admin_token(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Protects the admin endpoints with the X-Admin-Token header.
+
+    They fail closed: without an ADMIN_TOKEN configured, every admin request
+    is refused, so reloading, pinning and routing models is never open to
+    whoever can reach the API.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Admin endpoints are disabled: set ADMIN_TOKEN to enable them.",
+        )
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token.")
 
 # --- DATA MODEL ---
 class HouseData(BaseModel):
@@ -140,6 +397,69 @@ class HouseData(BaseModel):
             }
         }
 
+class SweepAxis(BaseModel):
+    """One feature of a what-if sweep: explicit values, or `num` evenly spaced values from `start` to `stop`."""
+    feature: str = Field(..., examples=["GrLivArea"])
+    values: Optional[List[Any]] = None
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    num: int = Field(20, ge=2)
+
+class SweepRequest(BaseModel):
+    house: HouseData
+    sweeps: List[SweepAxis] = Field(..., min_length=1, max_length=2)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "house": HouseData.model_config["json_schema_extra"]["example"],
+                "sweeps": [{"feature": "GrLivArea", "start": 800, "stop": 3000, "num": 23}],
+            }
+        }
+
+def sweep_values(axis: SweepAxis) -> list:
+    """
+    Returns the validated values of one swept feature.
+
+    A range over an integer field is rounded to whole numbers, without duplicates.
+
+    Raises:
+        HTTPException: 422 if the feature is unknown or its values do not fit its type.
+    """
+    field = next(
+        (field for name, field in HouseData.model_fields.items() if (field.alias or name) == axis.feature), None
+    )
+    if field is None:
+        raise HTTPException(status_code=422, detail=f"Unknown feature: {axis.feature!r}.")
+
+    if axis.values is not None:
+        values = axis.values
+    elif axis.start is not None and axis.stop is not None:
+        step = (axis.stop - axis.start) / (axis.num - 1)
+        values = [axis.start + i * step for i in range(axis.num)]
+        if field.annotation is int:
+            values = list(dict.fromkeys(round(value) for value in values))
+    else:
+        raise HTTPException(status_code=422, detail=f"Sweep of {axis.feature!r} needs either values or start and stop.")
+
+    try:
+        return TypeAdapter(List[field.annotation]).validate_python(values)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=e.errors(include_url=False, include_context=False, include_input=False),
+        )
+
+# Validates request bodies straight into plain HouseData dicts (by alias), from the raw JSON bytes
+house_records = RecordParser(HouseData)
+# Decodes Arrow IPC and Parquet batch bodies into tables of the HouseData columns
+house_tables = TableParser(HouseData)
+
+def batch_response(content: dict, headers: Optional[dict] = None) -> Response:
+    """The response of an endpoint returning many results, serialized by pydantic-core when enabled."""
+    response_class = FastJSONResponse if FAST_JSON_RESPONSES_ENABLED else JSONResponse
+    return response_class(content, headers=headers)
+
 # --- API ENDPOINTS ---
 @app.get("/", tags=["General"])
 def read_root():
@@ -149,30 +469,708 @@ def read_root():
 @app.get("/health", tags=["Health Check"])
 def health_check():
     """
-    A more detailed health check that verifies the model is loaded.
+    A readiness check: 200 once the startup has finished and a model is loaded, 503 before.
+
+    The response also reports liveness and the startup timing breakdown.
+    """
+    bundle = registry.current
+    health = {
+        "live": True,
+        "ready": startup.finished and bundle is not None,
+        "model_loaded": bundle is not None,
+        "model_version": bundle.version if bundle is not None else None,
+        "startup": startup.status(),
+    }
+    if health["ready"]:
+        return {"status": "ok", **health}
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={"status": "starting" if not startup.finished else "error", **health},
+    )
+
+@app.get("/health/live", tags=["Health Check"])
+def liveness_check():
     """
-    if model is not None and preprocessor is not None:
-        return {"status": "ok", "model_loaded": True}
+    A liveness check: 200 as long as the API answers, even while the model is still loading.
+    """
+    return {"status": "alive"}
+
+async def _predict_one(input_dict: dict, bundle, keep_features: bool = False) -> tuple:
+    """
+    Scores one house through the micro-batcher, the fast path or the pandas pipeline.
+
+    Micro-batches are scored with the registry's current model, so houses
+    routed to another version skip the micro-batcher.
+
+    Args:
+        keep_features (bool): Also return the preprocessed features, for a shadow model
+            sharing the preprocessor. Micro-batched houses have none.
+
+    Returns:
+        tuple: The prediction (None if it failed), the inference path that made it and the
+            preprocessed features (or None).
+
+    Raises:
+        ExecutorOverloaded: If too many predictions are already waiting.
+    """
+    features = None
+    if batcher is not None and bundle is registry.current:
+        path = "micro_batch"
+        if batcher.queue_depth >= inference.max_queue:
+            inference.reject()
+        try:
+            prediction = await batcher.submit(input_dict)
+        except Exception as e:
+            logger.error(f"Error during micro-batched prediction: {e}")
+            prediction = None
     else:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={"status": "error", "model_loaded": False},
-        )
+        path = "fast" if bundle.fast_predictor is not None else "pandas"
+        if keep_features:
+            prediction, features = await inference.run(predict_one_with_features, bundle, input_dict)
+        else:
+            prediction = await inference.run(predict_one, bundle, input_dict)
 
-@app.post("/predict", tags=["Prediction"])
-def predict_price(house_data: HouseData):
-    """Predicts the price of a house based on its features."""
-    if model is None or preprocessor is None:
-        raise HTTPException(status_code=503, detail="Model not loaded. API is not ready.")
+    if prediction is None:
+        record_predictions(path, 0, n_errors=1)
+    else:
+        record_predictions(path, 1)
+    return prediction, path, features
+
+@app.get("/metrics", tags=["Health Check"], include_in_schema=False)
+def metrics():
+    """
+    Exposes request, prediction, per-stage latency, model and cache metrics for Prometheus.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.post("/predict", tags=["Prediction"], openapi_extra=house_records.request_body())
+async def predict_price(request: Request, response: Response):
+    """
+    Predicts the price of a house based on its features.
+
+    Repeated houses are answered from the prediction cache. Otherwise,
+    when micro-batching is enabled, concurrent requests are queued and
+    scored together; if not, the prediction runs on the inference
+    executor, through the compiled fast path when it is available. When
+    too many predictions are waiting, the request gets 429 with a
+    Retry-After header. A sample of the requests is written to the
+    prediction audit log. The body (a HouseData object) is validated from
+    its raw bytes into a plain dict, without building a model instance.
+
+    The model version is chosen by the A/B routes or the X-Model-Version
+    header, and returned in the X-Model-Version response header. A shadow
+    model, if there is one, scores the house after the response is ready.
+    """
+    start = time.perf_counter()
+    bundle = get_serving_bundle(request.headers.get(MODEL_VERSION_HEADER))
+    shadow, shadow_input = get_shadow(bundle)
     
-    input_dict = house_data.dict(by_alias=True)
+    input_dict = house_records.parse_json(await request.body())
+    monitor = drift_monitor
+    if monitor is not None:
+        monitor.update([input_dict])
     
-    prediction = make_prediction(input_dict, model, preprocessor)
+    with collect_stage_timings() as stage_seconds:
+        path = "cache"
+        features = None
+        prediction = prediction_cache.get(input_dict, bundle.version) if prediction_cache is not None else None
+        if prediction is None:
+            prediction, path, features = await _predict_one(input_dict, bundle, keep_features=shadow_input == "features")
+            if prediction is not None and prediction_cache is not None:
+                prediction_cache.set(input_dict, bundle.version, prediction)
     
-    if prediction is None:
-        raise HTTPException(status_code=500, detail="Prediction could not be made.")
+    error = "Prediction could not be made." if prediction is None else None
+    audit_log.record(
+        "/predict", bundle.version, input_dict, time.perf_counter() - start, path,
+        stage_seconds, predicted_price=prediction, error=error,
+    )
+    if error is not None:
+        raise HTTPException(status_code=500, detail=error)
+    if shadow is not None:
+        shadow_scorer.submit("/predict", bundle, shadow, [prediction], houses=[input_dict], features=features)
+    response.headers[MODEL_VERSION_HEADER] = bundle.version
     
     # Return the price in a formatted string as a response to the user in the frontend app (in dollars)
     return {
         "predicted_price_formatted": f"${prediction:,.2f}"
     }
+
+@app.get("/predict/cache/stats", tags=["Prediction"])
+def cache_stats():
+    """
+    Returns the prediction cache size, hit/miss counters and evictions.
+    """
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+@app.get("/predict/batching/stats", tags=["Prediction"])
+def batching_stats():
+    """
+    Returns the micro-batching queue depth, batch size histogram and wait times.
+    """
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+@app.get("/predict/drift/stats", tags=["Prediction"])
+def drift_stats():
+    """
+    Returns the drift scores of every input feature against the training data of the served model.
+    """
+    monitor = drift_monitor
+    if monitor is None:
+        return {"enabled": False}
+    return {"enabled": True, "window_seconds": monitor.window_seconds, **monitor.scores()}
+
+@app.get("/predict/routing/stats", tags=["Prediction"])
+def routing_stats():
+    """
+    Returns the A/B routes, the shadow model and the shadow scorer's load and counters.
+    """
+    return {**pool.status(), "shadow": shadow_scorer.stats() if shadow_scorer is not None else None}
+
+@app.get("/predict/executor/stats", tags=["Prediction"])
+def executor_stats():
+    """
+    Returns the inference executor's workers, queue limit, load and rejections.
+    """
+    if inference is None:
+        return {"enabled": False}
+    return {"enabled": True, **inference.stats()}
+
+def validate_batch(houses: list) -> tuple:
+    """
+    Validates a batch of raw houses one by one against HouseData, into plain dicts.
+
+    Returns:
+        tuple: One result per house (the errors of invalid houses, None for valid ones),
+            the indices of the valid houses and their validated features.
+    """
+    results = [None] * len(houses)
+    valid_indices = []
+    valid_rows = []
+    for index, raw_house in enumerate(houses):
+        try:
+            house = house_records.validate(raw_house)
+        except ValidationError as e:
+            results[index] = {
+                "index": index,
+                "errors": e.errors(include_url=False, include_context=False, include_input=False),
+            }
+            continue
+        valid_indices.append(index)
+        valid_rows.append(house)
+
+    return results, valid_indices, valid_rows
+
+def count_drift(houses, count: bool) -> Optional[object]:
+    """
+    Counts validated houses for input drift monitoring, from an inference task.
+
+    Thread workers share the API's drift monitor and count the houses
+    themselves, off the event loop. A process worker has no monitor, so it
+    returns the houses for the API process to count (see `count_returned_drift`).
+
+    Args:
+        houses: The houses, a list of dicts or a DataFrame.
+        count (bool): Whether the API monitors drift.
+
+    Returns:
+        The houses still to be counted, or None.
+    """
+    if not count:
+        return None
+    monitor = drift_monitor
+    if monitor is None:
+        return houses
+    _update_drift(monitor, houses)
+    return None
+
+def count_returned_drift(houses):
+    """Counts the houses an inference task returned because it could not count them (see `count_drift`)."""
+    monitor = drift_monitor
+    if houses is not None and monitor is not None:
+        _update_drift(monitor, houses)
+
+def _update_drift(monitor, houses):
+    if isinstance(houses, list):
+        monitor.update(houses)
+    else:
+        monitor.update_columns(houses)
+
+def score_batch(bundle, houses: list, shadow_input: Optional[str] = None, count: bool = False) -> tuple:
+    """
+    Validates and scores a batch of raw houses with one model bundle.
+
+    Runs on the inference executor, so that validating thousands of rows
+    (and counting them for drift monitoring) does not hold up the event loop.
+
+    Args:
+        shadow_input (str): What to keep for a shadow model (see `get_shadow`), or None.
+        count (bool): Count the valid houses for drift monitoring (see `count_drift`).
+
+    Returns:
+        tuple: One result per house (None where valid houses were not scored),
+            the indices of the valid houses, their predictions (None if the model failed),
+            the shadow model's input (None without one) and the valid houses left to count for drift.
+    """
+    results, valid_indices, valid_rows = validate_batch(houses)
+    uncounted = count_drift(valid_rows, count)
+    if shadow_input == "features":
+        predictions, features = predict_many_with_features(bundle, valid_rows)
+        return results, valid_indices, predictions, features, uncounted
+    kept = valid_rows if shadow_input == "houses" else None
+    return results, valid_indices, predict_many(bundle, valid_rows), kept, uncounted
+
+def score_table(bundle, body: bytes, body_media_type: str, shadow_input: Optional[str] = None,
+                count: bool = False) -> tuple:
+    """
+    Decodes, validates and scores a columnar (Arrow IPC or Parquet) batch with one model bundle.
+
+    Runs on the inference executor. The houses go from the decoded table to
+    the feature pipeline column by column, without per-row dictionaries.
+
+    Args:
+        shadow_input (str): What to keep for a shadow model (see `get_shadow`), or None.
+        count (bool): Count the scored houses for drift monitoring (see `count_drift`).
+
+    Returns:
+        tuple: The number of houses, a boolean array of the rows that were not scored
+            (a null in a required column), the predictions of the others (None if the model failed),
+            the shadow model's input (None without one; the DataFrame of houses for 'houses')
+            and the houses left to count for drift.
+
+    Raises:
+        RequestValidationError: If the body cannot be decoded or its columns do not fit HouseData.
+        HTTPException: 413 if the batch has more than MAX_BATCH_SIZE houses.
+    """
+    from app.predict import table_to_frame
+
+    table, invalid = house_tables.parse(body, body_media_type, max_rows=MAX_BATCH_SIZE)
+    n_houses = table.num_rows
+    if invalid.any():
+        table = table.filter(~invalid)
+
+    df = table_to_frame(table)
+    uncounted = count_drift(df, count)
+    if shadow_input == "features":
+        predictions, features = predict_columns_with_features(bundle, df)
+        return n_houses, invalid, predictions, features, uncounted
+    return n_houses, invalid, predict_columns(bundle, df), df if shadow_input == "houses" else None, uncounted
+
+def explain_batch(bundle, houses: list, top_k: int) -> tuple:
+    """
+    Validates a batch of raw houses and explains the predictions of the valid ones.
+
+    Returns:
+        tuple: One result per house (None where valid houses were not explained),
+            the indices of the valid houses and their explanations (None if the model failed).
+    """
+    results, valid_indices, valid_rows = validate_batch(houses)
+    return results, valid_indices, explain_many(bundle, valid_rows, top_k)
+
+def get_explaining_bundle(requested_version: Optional[str] = None):
+    """Returns the model bundle for one explanation request, or raises 501 if its model cannot be explained."""
+    bundle = get_serving_bundle(requested_version)
+    if bundle.explainer is None:
+        raise HTTPException(status_code=501, detail="Explanations are not available for the model being served.")
+    return bundle
+
+def comps_batch(bundle, houses: list, k: int) -> tuple:
+    """
+    Validates a batch of raw houses, prices the valid ones and finds their comparable sales.
+
+    Returns:
+        tuple: One result per house (None where valid houses were not priced),
+            the indices of the valid houses and their (prices, comparables) (None if the lookup failed).
+    """
+    results, valid_indices, valid_rows = validate_batch(houses)
+    return results, valid_indices, comps_many(bundle, valid_rows, k) if valid_rows else ([], [])
+
+def get_comps_bundle(requested_version: Optional[str] = None):
+    """Returns the model bundle for one comparables request, or raises 501 if its version has no comps index."""
+    bundle = get_serving_bundle(requested_version)
+    if bundle.comps_index is None:
+        raise HTTPException(
+            status_code=501, detail="Comparable sales are not available for the model being served (no comps index)."
+        )
+    return bundle
+
+@app.post(
+    "/predict/batch", tags=["Prediction"],
+    openapi_extra=house_records.request_body(many=True, binary_media_types=COLUMNAR_MEDIA_TYPES),
+)
+async def predict_price_batch(request: Request):
+    """
+    Predicts the prices of many houses in a single vectorized pass.
+
+    The body is a JSON array of HouseData objects. Each house is validated
+    on its own, so invalid rows are reported with their errors instead of
+    failing the whole batch.
+
+    High-volume clients can send the HouseData columns as an Arrow IPC
+    stream or file, or as Parquet, with the matching Content-Type. The
+    answer is then an Arrow IPC stream with a single `predicted_price`
+    column, null for rows with a null in a required column.
+
+    Batches are routed and shadowed like /predict.
+    """
+    start = time.perf_counter()
+    bundle = get_serving_bundle(request.headers.get(MODEL_VERSION_HEADER))
+    body_media_type = media_type(request.headers.get("content-type", ""))
+    if body_media_type in COLUMNAR_MEDIA_TYPES:
+        return await predict_columnar_batch(bundle, await request.body(), body_media_type, start)
+    houses = parse_json_array(await request.body())
+    shadow, shadow_input = get_shadow(bundle)
+
+    if len(houses) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(houses)} houses (max {MAX_BATCH_SIZE}).",
+        )
+
+    with collect_stage_timings() as stage_seconds:
+        results, valid_indices, predictions, kept, uncounted = await inference.run(
+            score_batch, bundle, houses, shadow_input, drift_monitor is not None
+        )
+    count_returned_drift(uncounted)
+
+    error = "Batch prediction could not be made." if predictions is None else None
+    audit_log.record(
+        "/predict/batch", bundle.version, houses, time.perf_counter() - start, "batch", stage_seconds,
+        n_houses=len(houses), n_errors=len(houses) - len(valid_indices), error=error,
+    )
+    if error is not None:
+        record_predictions("batch", 0, n_errors=len(valid_indices))
+        raise HTTPException(status_code=500, detail=error)
+    record_predictions("batch", len(predictions))
+    if shadow is not None and predictions:
+        shadow_scorer.submit(
+            "/predict/batch", bundle, shadow, predictions,
+            houses=kept if shadow_input == "houses" else None, features=kept if shadow_input == "features" else None,
+        )
+
+    for index, prediction in zip(valid_indices, predictions):
+        results[index] = {
+            "index": index,
+            "predicted_price": prediction,
+            "predicted_price_formatted": f"${prediction:,.2f}",
+        }
+
+    return batch_response({
+        "n_houses": len(houses),
+        "n_predicted": len(valid_indices),
+        "n_errors": len(houses) - len(valid_indices),
+        "results": results,
+    }, headers={MODEL_VERSION_HEADER: bundle.version})
+
+async def predict_columnar_batch(bundle, body: bytes, body_media_type: str, start: float) -> Response:
+    """Scores an Arrow IPC or Parquet batch body and answers with an Arrow column of prices."""
+    import numpy as np
+    import pyarrow as pa
+
+    shadow, shadow_input = get_shadow(bundle)
+    with collect_stage_timings() as stage_seconds:
+        n_houses, invalid, predictions, kept, uncounted = await inference.run(
+            score_table, bundle, body, body_media_type, shadow_input, drift_monitor is not None
+        )
+    count_returned_drift(uncounted)
+
+    n_errors = int(invalid.sum())
+    error = "Batch prediction could not be made." if predictions is None else None
+    audit_log.record(
+        "/predict/batch", bundle.version, body, time.perf_counter() - start, "batch", stage_seconds,
+        n_houses=n_houses, n_errors=n_errors, error=error,
+    )
+    if error is not None:
+        record_predictions("batch", 0, n_errors=n_houses - n_errors)
+        raise HTTPException(status_code=500, detail=error)
+    record_predictions("batch", len(predictions))
+    if shadow is not None and len(predictions):
+        shadow_scorer.submit(
+            "/predict/batch", bundle, shadow, predictions,
+            frame=kept if shadow_input == "houses" else None, features=kept if shadow_input == "features" else None,
+        )
+
+    prices = np.full(n_houses, np.nan)
+    prices[~invalid] = predictions
+    return ArrowResponse(
+        pa.table({"predicted_price": pa.array(prices, mask=invalid)}),
+        headers={"X-Houses": str(n_houses), "X-Errors": str(n_errors), MODEL_VERSION_HEADER: bundle.version},
+    )
+
+@app.post("/predict/explain", tags=["Prediction"], openapi_extra=house_records.request_body())
+async def explain_price(request: Request, response: Response, top_k: int = Query(EXPLAIN_TOP_K, ge=1)):
+    """
+    Predicts the price of a house and explains it with the fields that moved it most.
+
+    The contributions come from the model's TreeSHAP values, with the
+    one-hot columns of a field summed back into it. They are in dollars
+    and add up, with `other_contribution`, to the predicted price minus
+    `base_price`, the price predicted with no information about the house.
+    """
+    start = time.perf_counter()
+    bundle = get_explaining_bundle(request.headers.get(MODEL_VERSION_HEADER))
+
+    input_dict = house_records.parse_json(await request.body())
+
+    with collect_stage_timings() as stage_seconds:
+        explanation = await inference.run(explain_one, bundle, input_dict, top_k)
+
+    error = "Prediction could not be explained." if explanation is None else None
+    audit_log.record(
+        "/predict/explain", bundle.version, input_dict, time.perf_counter() - start, "explain", stage_seconds,
+        predicted_price=explanation["predicted_price"] if explanation is not None else None, error=error,
+    )
+    if error is not None:
+        record_predictions("explain", 0, n_errors=1)
+        raise HTTPException(status_code=500, detail=error)
+    record_predictions("explain", 1)
+    response.headers[MODEL_VERSION_HEADER] = bundle.version
+
+    return {
+        "predicted_price_formatted": f"${explanation['predicted_price']:,.2f}",
+        **explanation,
+    }
+
+@app.post("/predict/explain/batch", tags=["Prediction"], openapi_extra=house_records.request_body(many=True))
+async def explain_price_batch(request: Request, top_k: int = Query(EXPLAIN_TOP_K, ge=1)):
+    """
+    Explains the predictions of many houses with one contributions pass over the batch.
+
+    Invalid rows are reported with their errors, like /predict/batch.
+    """
+    start = time.perf_counter()
+    bundle = get_explaining_bundle(request.headers.get(MODEL_VERSION_HEADER))
+    houses = parse_json_array(await request.body())
+
+    if len(houses) > MAX_EXPLAIN_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(houses)} houses (max {MAX_EXPLAIN_BATCH_SIZE} for explanations).",
+        )
+
+    with collect_stage_timings() as stage_seconds:
+        results, valid_indices, explanations = await inference.run(explain_batch, bundle, houses, top_k)
+
+    error = "Batch explanation could not be made." if explanations is None else None
+    audit_log.record(
+        "/predict/explain/batch", bundle.version, houses, time.perf_counter() - start, "explain", stage_seconds,
+        n_houses=len(houses), n_errors=len(houses) - len(valid_indices), error=error,
+    )
+    if error is not None:
+        record_predictions("explain", 0, n_errors=len(valid_indices))
+        raise HTTPException(status_code=500, detail=error)
+    record_predictions("explain", len(explanations))
+
+    for index, explanation in zip(valid_indices, explanations):
+        results[index] = {
+            "index": index,
+            "predicted_price_formatted": f"${explanation['predicted_price']:,.2f}",
+            **explanation,
+        }
+
+    return batch_response({
+        "n_houses": len(houses),
+        "n_explained": len(valid_indices),
+        "n_errors": len(houses) - len(valid_indices),
+        "results": results,
+    }, headers={MODEL_VERSION_HEADER: bundle.version})
+
+@app.post("/predict/sweep", tags=["Prediction"])
+async def predict_price_sweep(
+    request: SweepRequest, model_version: Optional[str] = Header(default=None, alias=MODEL_VERSION_HEADER)
+):
+    """
+    Predicts the prices of a house with one or two of its features swept over ranges of values.
+
+    Every combination of the values is scored in a single vectorized pass,
+    so a 100-point curve costs about one batch prediction instead of 100
+    requests. With one feature, `predicted_prices` is the price curve; with
+    two, it is a grid indexed by the values of the first, then the second.
+    """
+    start = time.perf_counter()
+    bundle = get_serving_bundle(model_version)
+
+    features = [axis.feature for axis in request.sweeps]
+    if len(set(features)) != len(features):
+        raise HTTPException(status_code=422, detail="Each feature can only be swept once.")
+    grid = {axis.feature: sweep_values(axis) for axis in request.sweeps}
+    n_points = 1
+    for values in grid.values():
+        n_points *= len(values)
+    if n_points > MAX_SWEEP_POINTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Sweep too large: {n_points} points (max {MAX_SWEEP_POINTS}).",
+        )
+
+    input_dict = request.house.model_dump(by_alias=True)
+    with collect_stage_timings() as stage_seconds:
+        result = await inference.run(predict_sweep, bundle, input_dict, grid)
+
+    error = "Sweep prediction could not be made." if result is None else None
+    audit_log.record(
+        "/predict/sweep", bundle.version, input_dict, time.perf_counter() - start, "sweep", stage_seconds,
+        n_houses=n_points, predicted_price=result[0] if result is not None else None, error=error,
+    )
+    if error is not None:
+        record_predictions("sweep", 0, n_errors=n_points)
+        raise HTTPException(status_code=500, detail=error)
+    record_predictions("sweep", n_points + 1)
+
+    base_price, prices = result
+    return batch_response({
+        "base_price": base_price,
+        "base_price_formatted": f"${base_price:,.2f}",
+        "features": features,
+        "base_values": {feature: input_dict[feature] for feature in features},
+        "values": list(grid.values()),
+        "n_points": n_points,
+        "predicted_prices": prices,
+    }, headers={MODEL_VERSION_HEADER: bundle.version})
+
+@app.post("/comps", tags=["Prediction"], openapi_extra=house_records.request_body())
+async def find_comparables(request: Request, response: Response, k: int = Query(COMPS_K, ge=1, le=MAX_COMPS_K)):
+    """
+    Predicts the price of a house and finds the k most similar training houses, with their sale prices.
+
+    Similarity is the distance between the houses' standardized COMPS_FEATURES
+    (size, quality, condition, age, lot, garage and rooms), nearest first.
+    The training houses are indexed when the model is trained, so a lookup
+    reads a few leaves of a KD-tree instead of scanning the training set.
+    """
+    start = time.perf_counter()
+    bundle = get_comps_bundle(request.headers.get(MODEL_VERSION_HEADER))
+
+    input_dict = house_records.parse_json(await request.body())
+
+    with collect_stage_timings() as stage_seconds:
+        result = await inference.run(comps_many, bundle, [input_dict], k)
+
+    error = "Comparable sales could not be found." if result is None else None
+    audit_log.record(
+        "/comps", bundle.version, input_dict, time.perf_counter() - start, "comps", stage_seconds,
+        predicted_price=result[0][0] if result is not None else None, error=error,
+    )
+    if error is not None:
+        record_predictions("comps", 0, n_errors=1)
+        raise HTTPException(status_code=500, detail=error)
+    record_predictions("comps", 1)
+    response.headers[MODEL_VERSION_HEADER] = bundle.version
+
+    (prediction,), (comparables,) = result
+    return {
+        "predicted_price": prediction,
+        "predicted_price_formatted": f"${prediction:,.2f}",
+        "comparables": comparables,
+    }
+
+@app.post("/comps/batch", tags=["Prediction"], openapi_extra=house_records.request_body(many=True))
+async def find_comparables_batch(request: Request, k: int = Query(COMPS_K, ge=1, le=MAX_COMPS_K)):
+    """
+    Finds the comparable sales of many houses with one index query over the batch.
+
+    Invalid rows are reported with their errors, like /predict/batch.
+    """
+    start = time.perf_counter()
+    bundle = get_comps_bundle(request.headers.get(MODEL_VERSION_HEADER))
+    houses = parse_json_array(await request.body())
+
+    if len(houses) > MAX_COMPS_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(houses)} houses (max {MAX_COMPS_BATCH_SIZE} for comparables).",
+        )
+
+    with collect_stage_timings() as stage_seconds:
+        results, valid_indices, result = await inference.run(comps_batch, bundle, houses, k)
+
+    error = "Comparable sales could not be found." if result is None else None
+    audit_log.record(
+        "/comps/batch", bundle.version, houses, time.perf_counter() - start, "comps", stage_seconds,
+        n_houses=len(houses), n_errors=len(houses) - len(valid_indices), error=error,
+    )
+    if error is not None:
+        record_predictions("comps", 0, n_errors=len(valid_indices))
+        raise HTTPException(status_code=500, detail=error)
+    predictions, comparables = result
+    record_predictions("comps", len(predictions))
+
+    for index, prediction, house_comparables in zip(valid_indices, predictions, comparables):
+        results[index] = {
+            "index": index,
+            "predicted_price": prediction,
+            "predicted_price_formatted": f"${prediction:,.2f}",
+            "comparables": house_comparables,
+        }
+
+    return batch_response({
+        "n_houses": len(houses),
+        "n_found": len(valid_indices),
+        "n_errors": len(houses) - len(valid_indices),
+        "results": results,
+    }, headers={MODEL_VERSION_HEADER: bundle.version})
+
+# --- ADMIN ENDPOINTS ---
+@app.get("/admin/models", tags=["Admin"], dependencies=[Depends(require_admin_token)])
+def list_models():
+    """
+    Lists the available model versions, the one being served and recent swap timings.
+    """
+    return registry.status()
+
+@app.post("/admin/models/reload", tags=["Admin"], dependencies=[Depends(require_admin_token)])
+def reload_model():
+    """
+    Checks for a new model version now instead of waiting for the watcher.
+    """
+    swapped = registry.refresh()
+    return {"swapped": swapped, **registry.status()}
+
+@app.post("/admin/models/{version}/pin", tags=["Admin"], dependencies=[Depends(require_admin_token)])
+def pin_model(version: str):
+    """
+    Serves a specific model version (e.g. to roll back) until it is unpinned.
+    """
+    try:
+        registry.pin(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Model version '{version}' not found.")
+    return registry.status()
+
+@app.post("/admin/models/unpin", tags=["Admin"], dependencies=[Depends(require_admin_token)])
+def unpin_model():
+    """
+    Goes back to serving the newest model version.
+    """
+    registry.unpin()
+    return registry.status()
+
+class RoutingConfig(BaseModel):
+    routes: Dict[str, float] = Field(..., min_length=1)
+    shadow_version: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {"routes": {"current": 90, "20250301_000000": 10}, "shadow_version": None}
+        }
+
+@app.put("/admin/models/routing", tags=["Admin"], dependencies=[Depends(require_admin_token)])
+def set_model_routing(config: RoutingConfig):
+    """
+    Sets the A/B routes ('current' is the registry's version) and the shadow model.
+
+    The new versions are loaded and warmed up before any request is routed to them.
+    """
+    try:
+        pool.configure(config.routes, config.shadow_version)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return pool.status()
+
+# Everything else is loaded by startup_event
+startup.mark_imported()
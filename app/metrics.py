@@ -0,0 +1,295 @@
+# app/metrics.py
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from prometheus_client import Counter, Histogram, Info, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Import our custom modules
+from src.logger_config import log_queue_stats
+
+# --- METRICS ---
+# Latency buckets from 100us to 10s; single-house inference stages sit in the sub-millisecond range
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by route template and status code.",
+    ["method", "endpoint", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests, by route template.",
+    ["method", "endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+PREDICTIONS = Counter(
+    "predictions_total",
+    "Houses scored, by inference path.",
+    ["path"],
+)
+PREDICTION_ERRORS = Counter(
+    "prediction_errors_total",
+    "Predictions that failed, by inference path.",
+    ["path"],
+)
+INFERENCE_STAGE_DURATION = Histogram(
+    "inference_stage_duration_seconds",
+    "Time spent in each stage of the inference pipeline, by inference path.",
+    ["path", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+MODEL_INFO = Info("model", "The model version currently being served.")
+ROUTED_REQUESTS = Counter(
+    "routed_requests_total",
+    "Prediction requests, by the model version they were routed to and how ('weight' or 'header').",
+    ["version", "route"],
+)
+SHADOW_RELATIVE_DIFFERENCE = Histogram(
+    "shadow_relative_difference",
+    "Mean absolute difference between the shadow and the primary prices of a request, relative to the primary prices.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+# The stage timings of the request being handled, while `collect_stage_timings` is active
+_request_stage_seconds: ContextVar[Optional[dict]] = ContextVar("request_stage_seconds", default=None)
+# The inference path every stage is recorded under, while `stage_path` is active
+_stage_path: ContextVar[Optional[str]] = ContextVar("stage_path", default=None)
+# The stages timed while `capture_stages` is active, kept instead of recorded
+_captured_stages: ContextVar[Optional[list]] = ContextVar("captured_stages", default=None)
+
+@contextmanager
+def stage_timer(stage: str, path: str = "pandas"):
+    """
+    Records how long the enclosed block takes as one inference stage.
+
+    Args:
+        stage (str): The stage name, e.g. 'transform' or 'predict'.
+        path (str): The inference path, 'pandas' or 'fast'.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, path, time.perf_counter() - start)
+
+def record_stage(stage: str, path: str, seconds: float):
+    """
+    Records one timed inference stage in the latency histograms and the timings of the current request.
+
+    Args:
+        stage (str): The stage name.
+        path (str): The inference path, unless `stage_path` overrides it.
+        seconds (float): How long the stage took.
+    """
+    captured_stages = _captured_stages.get()
+    if captured_stages is not None:
+        captured_stages.append((stage, path, seconds))
+        return
+    INFERENCE_STAGE_DURATION.labels(path=_stage_path.get() or path, stage=stage).observe(seconds)
+    request_stage_seconds = _request_stage_seconds.get()
+    if request_stage_seconds is not None:
+        request_stage_seconds[stage] = request_stage_seconds.get(stage, 0.0) + seconds
+
+@contextmanager
+def capture_stages():
+    """
+    Keeps the stages timed in the enclosed block instead of recording them.
+
+    A process worker's metrics never reach the API process, so the worker
+    captures the stages of a task and returns them, and the API records
+    them with `record_stage`. Work that is not traffic, like the warm-up
+    predictions, captures its stages and drops them.
+
+    Yields:
+        list: (stage, path, seconds) of every stage, filled in as the stages finish.
+    """
+    captured_stages = []
+    token = _captured_stages.set(captured_stages)
+    try:
+        yield captured_stages
+    finally:
+        _captured_stages.reset(token)
+
+@contextmanager
+def collect_stage_timings():
+    """
+    Collects the stages timed in the enclosed block, e.g. for one request.
+
+    Stages timed in inference tasks started from the block are included:
+    InferenceExecutor's thread workers run in a copy of its context, and
+    its process workers return their stages to be recorded in it.
+
+    Yields:
+        dict: Stage name -> seconds, filled in as the stages finish.
+    """
+    stage_seconds = {}
+    token = _request_stage_seconds.set(stage_seconds)
+    try:
+        yield stage_seconds
+    finally:
+        _request_stage_seconds.reset(token)
+
+@contextmanager
+def stage_path(path: str):
+    """
+    Records the stages timed in the enclosed block under one inference path, whatever path they name.
+
+    Args:
+        path (str): The inference path, e.g. 'shadow', so that shadow scoring is not mixed with the served paths.
+    """
+    token = _stage_path.set(path)
+    try:
+        yield
+    finally:
+        _stage_path.reset(token)
+
+def record_predictions(path: str, n_predicted: int, n_errors: int = 0):
+    """Counts scored and failed houses for one inference path."""
+    if n_predicted:
+        PREDICTIONS.labels(path=path).inc(n_predicted)
+    if n_errors:
+        PREDICTION_ERRORS.labels(path=path).inc(n_errors)
+
+def set_model_version(version: str):
+    """Publishes the served model version as `model_info{version="..."}`."""
+    MODEL_INFO.info({"version": version})
+
+def record_route(version: str, route: str):
+    """Counts a prediction request routed to a model version, by weight or by header."""
+    ROUTED_REQUESTS.labels(version=version, route=route).inc()
+
+class ServingStateCollector:
+    """
+    Exports the prediction cache, micro-batcher, inference executor, shadow scorer, log queue and
+    input drift statistics at scrape time.
+
+    These components already keep their own statistics, so they are read
+    when Prometheus scrapes instead of being mirrored on every request.
+    """
+
+    def __init__(self, get_cache: Callable[[], Optional[object]], get_batcher: Callable[[], Optional[object]],
+                 get_executor: Callable[[], Optional[object]] = lambda: None,
+                 get_drift_monitor: Callable[[], Optional[object]] = lambda: None,
+                 get_shadow: Callable[[], Optional[object]] = lambda: None):
+        """
+        Args:
+            get_cache (Callable): Returns the prediction cache, or None if it is disabled.
+            get_batcher (Callable): Returns the micro-batcher, or None if it is disabled.
+            get_executor (Callable): Returns the inference executor, or None before startup.
+            get_drift_monitor (Callable): Returns the input drift monitor, or None if there is none.
+            get_shadow (Callable): Returns the shadow scorer, or None before startup.
+        """
+        self.get_cache = get_cache
+        self.get_batcher = get_batcher
+        self.get_executor = get_executor
+        self.get_drift_monitor = get_drift_monitor
+        self.get_shadow = get_shadow
+
+    def collect(self):
+        cache = self.get_cache()
+        if cache is not None:
+            stats = cache.stats()
+            yield GaugeMetricFamily("prediction_cache_size", "Predictions currently cached.", value=stats["size"])
+            yield GaugeMetricFamily("prediction_cache_max_size", "Maximum number of cached predictions.", value=stats["max_size"])
+            for name in ("hits", "misses", "evictions", "expirations"):
+                yield CounterMetricFamily(f"prediction_cache_{name}", f"Prediction cache {name}.", value=stats[name])
+
+        batcher = self.get_batcher()
+        if batcher is not None:
+            yield GaugeMetricFamily("micro_batcher_queue_depth", "Requests waiting to be put in a micro-batch.", value=batcher.queue_depth)
+            yield CounterMetricFamily("micro_batcher_batches", "Micro-batches scored.", value=batcher.total_batches)
+            yield CounterMetricFamily("micro_batcher_items", "Requests scored through micro-batches.", value=batcher.total_items)
+
+        executor = self.get_executor()
+        if executor is not None:
+            yield GaugeMetricFamily("inference_executor_workers", "Inference tasks that can run at the same time.", value=executor.workers)
+            yield GaugeMetricFamily("inference_executor_pending", "Inference tasks running or waiting for a worker.", value=executor.pending)
+            yield CounterMetricFamily("inference_executor_tasks", "Inference tasks submitted.", value=executor.total_tasks)
+            yield CounterMetricFamily("inference_executor_rejected", "Inference tasks rejected with 429 because the queue was full.", value=executor.total_rejected)
+
+        shadow = self.get_shadow()
+        if shadow is not None:
+            stats = shadow.stats()
+            yield GaugeMetricFamily("shadow_pending", "Shadow scoring tasks running or waiting.", value=stats["pending"])
+            yield CounterMetricFamily("shadow_tasks", "Requests scored by the shadow model.", value=stats["scored"])
+            yield CounterMetricFamily("shadow_houses", "Houses scored by the shadow model.", value=stats["houses"])
+            yield CounterMetricFamily("shadow_dropped", "Requests not scored by the shadow model because its queue was full.", value=stats["dropped"])
+            yield CounterMetricFamily("shadow_failed", "Requests the shadow model failed to score.", value=stats["failed"])
+
+        queue_stats = log_queue_stats()
+        if queue_stats:
+            queued = GaugeMetricFamily("log_queue_depth", "Log records waiting to be written, by logger.", labels=["logger"])
+            dropped = CounterMetricFamily("log_records_dropped", "Log records dropped because the log queue was full, by logger.", labels=["logger"])
+            for name, stats in queue_stats.items():
+                queued.add_metric([name], stats["queued"])
+                dropped.add_metric([name], stats["dropped"])
+            yield queued
+            yield dropped
+
+        drift_monitor = self.get_drift_monitor()
+        if drift_monitor is not None:
+            yield from self.collect_drift(drift_monitor.scores())
+
+    def collect_drift(self, scores: dict):
+        yield GaugeMetricFamily("input_drift_observations", "Houses counted in the input drift window.", value=scores["observations"])
+        if not scores["reliable"]:
+            return
+        families = {
+            "psi": GaugeMetricFamily("input_drift_psi", "Population stability index of an input feature against the training profile.", labels=["feature"]),
+            "ks": GaugeMetricFamily("input_drift_ks", "Kolmogorov-Smirnov distance of a numeric input feature to the training profile, on its quantile bins.", labels=["feature"]),
+            "missing_rate": GaugeMetricFamily("input_missing_rate", "Share of the houses missing an input feature.", labels=["feature"]),
+            "unseen_rate": GaugeMetricFamily("input_unseen_category_rate", "Share of the houses with a category of an input feature not seen in training.", labels=["feature"]),
+        }
+        for feature, feature_scores in scores["features"].items():
+            for name, value in feature_scores.items():
+                families[name].add_metric([feature], value)
+        yield from families.values()
+
+def register_serving_state(get_cache: Callable, get_batcher: Callable, get_executor: Callable = lambda: None,
+                           get_drift_monitor: Callable = lambda: None,
+                           get_shadow: Callable = lambda: None) -> ServingStateCollector:
+    """Registers the cache, micro-batcher, executor, drift monitor and shadow scorer collector with the default registry."""
+    collector = ServingStateCollector(get_cache, get_batcher, get_executor, get_drift_monitor, get_shadow)
+    REGISTRY.register(collector)
+    return collector
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware counting and timing every HTTP request.
+
+    Requests are labelled with the route template (e.g.
+    '/admin/models/{version}/pin') rather than the raw path, so that path
+    parameters do not create a new series per value.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "<unmatched>")
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method=method, endpoint=endpoint).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method=method, endpoint=endpoint, status=str(status_code)).inc()
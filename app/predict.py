@@ -1,49 +1,163 @@
 # app/predict.py
 
-import joblib
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
 # Import our custom modules
-from src.config import MODEL_DIR
+from src import model_store
+from src.config import (
+    COMPACT_MODEL, MODEL_DIR, MODEL_FORMAT, MODEL_MMAP_ENABLED,
+    get_versioned_comps_index_name, get_versioned_drift_profile_name, get_versioned_flat_model_name
+)
 from src.logger_config import logger
-from src.preprocessing import engineer_features
+from src.flat_trees import FlatTreeEnsemble
+from app.flat_trees import FlatTreeRegressor
+from app.metrics import stage_timer
+
+def list_model_versions() -> dict:
+    """
+    Finds the trained models in the model directory.
+
+    Returns:
+        dict: Model version -> model file path, from oldest to newest.
+    """
+    return model_store.list_model_versions(MODEL_DIR)
+
+def load_model_version(version: str):
+    """
+    Loads one model version and the preprocessor that was fitted with it, from MODEL_DIR.
+
+    The model is read in MODEL_FORMAT (see `src.model_store.load_model_version`)
+    and served in the compact form COMPACT_MODEL selects (see `load_compact_model`).
+
+    Args:
+        version (str): The model version, e.g. '20250827_101500'.
+
+    Returns:
+        tuple: A tuple containing the loaded model and preprocessor.
+    """
+    model, preprocessor = model_store.load_model_version(
+        version, MODEL_DIR, MODEL_FORMAT, compact=False, mmap=MODEL_MMAP_ENABLED
+    )
+    if COMPACT_MODEL != "off":
+        model = load_compact_model(model, version)
+    return model, preprocessor
+
+def load_compact_model(model, version: str, mode: str = None):
+    """
+    Limits a loaded model to the boosting rounds its compaction kept.
+
+    See `src.model_store.apply_compact_rounds`. In 'flat' mode the model
+    is also wrapped in a FlatTreeRegressor, so its predictions come from
+    the version's flat trees instead.
+
+    Args:
+        model: The loaded XGBoost model.
+        version (str): The model version.
+        mode (str): 'trees' or 'flat'. Defaults to COMPACT_MODEL.
+
+    Returns:
+        The model to serve: the full model if the version was trained before compaction.
+    """
+    mode = mode or COMPACT_MODEL
+    n_rounds = model_store.apply_compact_rounds(model, version)
+    if n_rounds is None:
+        return model
+
+    flat_model_path = Path(MODEL_DIR) / get_versioned_flat_model_name(version)
+    if mode == "flat":
+        if flat_model_path.exists():
+            logger.info(f"Loaded flat trees: {flat_model_path.name} ({n_rounds} rounds)")
+            return FlatTreeRegressor(model, FlatTreeEnsemble.load(flat_model_path))
+        logger.warning(f"Model version '{version}' has no flat trees, serving its compact form with XGBoost.")
+    logger.info(f"Serving the first {n_rounds} of {model.get_booster().num_boosted_rounds()} rounds of model version '{version}'.")
+    return model
+
+def drift_profile_path(version: str) -> Path:
+    """
+    Finds the training input profile saved with a model version.
+
+    Args:
+        version (str): The model version.
+
+    Returns:
+        Path: The profile file, which models trained before it was saved do not have.
+    """
+    return Path(MODEL_DIR) / get_versioned_drift_profile_name(version)
+
+def comps_index_path(version: str) -> Path:
+    """
+    Finds the comparable-sales index saved with a model version.
+
+    Args:
+        version (str): The model version.
+
+    Returns:
+        Path: The index file, which models trained before it was saved do not have.
+    """
+    return Path(MODEL_DIR) / get_versioned_comps_index_name(version)
 
 def load_latest_model():
     """
-    Loads the most recently trained model and the preprocessor.
+    Loads the most recently trained model and its preprocessor.
 
     Returns:
         tuple: A tuple containing the loaded model and preprocessor.
     """
     try:
-        # Find the most recent model file in the model directory
-        model_files = list(Path(MODEL_DIR).glob("*.joblib"))
-        if not model_files:
+        model_versions = list_model_versions()
+        if not model_versions:
             logger.error("No model files found in the directory.")
             return None, None
-        
-        # Filter out the preprocessor file before finding the latest model
-        model_files = [f for f in model_files if "preprocessor" not in f.name]
-        if not model_files:
-            logger.error("No model files (excluding preprocessor) found.")
-            return None, None
-
-        latest_model_path = max(model_files, key=lambda p: p.stat().st_mtime)
-        model = joblib.load(latest_model_path)
-        logger.info(f"Loaded latest model: {latest_model_path.name}")
 
-        # Load the preprocessor
-        preprocessor_path = Path(MODEL_DIR) / "preprocessor.joblib"
-        preprocessor = joblib.load(preprocessor_path)
-        logger.info("Loaded preprocessor.")
-        
-        return model, preprocessor
+        latest_version = list(model_versions)[-1]
+        return load_model_version(latest_version)
     except Exception as e:
         logger.error(f"Error loading model or preprocessor: {e}")
         return None, None
 
+def transform_frame(df: pd.DataFrame, preprocessor):
+    """
+    Engineers and preprocesses a DataFrame of raw house features into the model's input matrix,
+    timing each stage (see `src.model_store.transform_frame`).
+
+    Args:
+        df (pd.DataFrame): One row per house, with the API input columns. It is not modified.
+        preprocessor: The fitted preprocessing pipeline.
+
+    Returns:
+        The preprocessed features, dense or CSR like the preprocessor outputs them.
+    """
+    return model_store.transform_frame(df, preprocessor, timer=stage_timer)
+
+def predict_frame(df: pd.DataFrame, model, preprocessor) -> np.ndarray:
+    """
+    Runs the full inference pipeline on a DataFrame of raw house features, timing each stage.
+
+    Args:
+        df (pd.DataFrame): One row per house, with the API input columns.
+        model: The trained machine learning model.
+        preprocessor: The fitted preprocessing pipeline.
+
+    Returns:
+        np.ndarray: The predicted house prices, in dollars.
+    """
+    return model_store.predict_frame(df, model, preprocessor, timer=stage_timer)
+
+def predict_features(processed_data, model) -> np.ndarray:
+    """
+    Scores houses that are already preprocessed, e.g. by another model sharing the preprocessor.
+
+    Args:
+        processed_data: The preprocessed features, from `transform_frame` or the fast path.
+        model: The trained machine learning model.
+
+    Returns:
+        np.ndarray: The predicted house prices, in dollars.
+    """
+    return model_store.predict_features(processed_data, model, timer=stage_timer)
+
 def make_prediction(input_data: dict, model, preprocessor) -> float:
     """
     Makes a price prediction on a single instance of input data.
@@ -58,28 +172,135 @@ def make_prediction(input_data: dict, model, preprocessor) -> float:
     """
     try:
         # Convert the input dictionary to a pandas DataFrame
-        df = pd.DataFrame([input_data])
-        
-        # Manually calculate 'TotalBsmtSF' as it's not in the API input model
-        df['TotalBsmtSF'] = df['BsmtFinSF1'] + df['BsmtFinSF2'] + df['BsmtUnfSF']
-        
-        # Apply the same feature engineering as in training
-        df_engineered = engineer_features(df)
-
-        # Preprocess the data using the loaded preprocessor
-        processed_data = preprocessor.transform(df_engineered)
-        
-        # Make a prediction on the log-transformed scale
-        log_prediction = model.predict(processed_data)
-        
-        # Invert the log transformation to get the actual price
-        prediction = np.expm1(log_prediction[0])
-        
-        # --- START OF FIX ---
+        with stage_timer("build_frame"):
+            df = pd.DataFrame([input_data])
+
+        prediction = predict_frame(df, model, preprocessor)[0]
+
         # Convert the numpy float to a standard Python float
         return float(prediction)
-        # --- END OF FIX ---
 
     except Exception as e:
         logger.error(f"Error during prediction: {e}", exc_info=True)
         return None
+
+def make_predictions(input_data: list, model, preprocessor) -> list:
+    """
+    Makes price predictions for many houses in a single vectorized pass.
+
+    The houses are put in one DataFrame so that feature engineering,
+    preprocessing and the model are each run once for the whole batch.
+
+    Args:
+        input_data (list): A list of dictionaries, one per house.
+        model: The trained machine learning model.
+        preprocessor: The fitted preprocessing pipeline.
+
+    Returns:
+        list: The predicted house prices, in the order of the input.
+    """
+    if not input_data:
+        return []
+
+    try:
+        with stage_timer("build_frame"):
+            df = pd.DataFrame.from_records(input_data)
+
+        predictions = predict_frame(df, model, preprocessor)
+
+        return predictions.astype(float).tolist()
+
+    except Exception as e:
+        logger.error(f"Error during batch prediction: {e}", exc_info=True)
+        return None
+
+def table_to_frame(table) -> pd.DataFrame:
+    """
+    Converts an Arrow table of houses to the DataFrame the feature pipeline takes.
+
+    Numeric columns without nulls become DataFrame columns without a copy
+    (`split_blocks`), so a table read from an Arrow IPC body is scored
+    straight from the request's memory. String nulls become None.
+
+    Args:
+        table (pa.Table): One row per house, with the API input columns.
+
+    Returns:
+        pd.DataFrame: The houses.
+    """
+    with stage_timer("build_frame"):
+        return table.to_pandas(split_blocks=True)
+
+def make_frame_predictions(df: pd.DataFrame, model, preprocessor) -> np.ndarray:
+    """
+    Makes price predictions for a DataFrame of houses in a single vectorized pass.
+
+    Args:
+        df (pd.DataFrame): One row per house, with the API input columns.
+        model: The trained machine learning model.
+        preprocessor: The fitted preprocessing pipeline.
+
+    Returns:
+        np.ndarray: The predicted house prices, or None if the prediction failed.
+    """
+    try:
+        return predict_frame(df, model, preprocessor)
+    except Exception as e:
+        logger.error(f"Error during batch prediction: {e}", exc_info=True)
+        return None
+
+def make_frame_predictions_with_features(df: pd.DataFrame, model, preprocessor) -> tuple:
+    """
+    Makes price predictions like `make_frame_predictions` and also returns the preprocessed features,
+    so that a shadow model sharing the preprocessor can score them without preprocessing again.
+
+    Args:
+        df (pd.DataFrame): One row per house, with the API input columns.
+        model: The trained machine learning model.
+        preprocessor: The fitted preprocessing pipeline.
+
+    Returns:
+        tuple: The predicted house prices and the preprocessed features, or (None, None) if the prediction failed.
+    """
+    try:
+        processed_data = transform_frame(df, preprocessor)
+        return predict_features(processed_data, model), processed_data
+    except Exception as e:
+        logger.error(f"Error during batch prediction: {e}", exc_info=True)
+        return None, None
+
+def make_sweep(input_data: dict, grid: dict, model, preprocessor) -> tuple:
+    """
+    Predicts the prices of a house with some of its features swept over a grid of values, in one batch.
+
+    Every combination of the grid values is generated with NumPy (one row
+    per grid point, the other features copied from the house) and the
+    whole grid goes through the preprocessor and the model in one call,
+    together with the unchanged house.
+
+    Args:
+        input_data (dict): The features of the base house.
+        grid (dict): Feature name -> the values it takes, already validated.
+        model: The trained machine learning model.
+        preprocessor: The fitted preprocessing pipeline.
+
+    Returns:
+        tuple: The price of the base house and an array of prices with one axis per swept
+            feature, or None if the prediction failed.
+    """
+    try:
+        shape = tuple(len(values) for values in grid.values())
+        with stage_timer("build_frame"):
+            base = pd.DataFrame([input_data])
+            # Row 0 is the house itself, then one row per grid point
+            df = base.loc[np.zeros(1 + int(np.prod(shape)), dtype=np.intp)].reset_index(drop=True)
+            axes = np.meshgrid(*(np.asarray(values) for values in grid.values()), indexing="ij")
+            for feature, values in zip(grid, axes):
+                df[feature] = np.concatenate([base[feature].to_numpy(), values.ravel()])
+
+        prices = predict_frame(df, model, preprocessor)
+        return float(prices[0]), prices[1:].reshape(shape)
+
+    except Exception as e:
+        logger.error(f"Error during sweep prediction: {e}", exc_info=True)
+        return None
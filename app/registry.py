@@ -0,0 +1,253 @@
+# app/registry.py
+
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+# Import our custom modules
+from src.config import MODEL_MMAP_ENABLED
+from src.logger_config import logger
+from app.metrics import capture_stages
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    A model version loaded together with its preprocessor, compiled fast path, explainer
+    and comparable-sales index.
+
+    Versions whose preprocessors were fitted identically (e.g. models retrained
+    on the same feature store entry) share one preprocessor object, so
+    `a.preprocessor is b.preprocessor` tells that their features are the same.
+    """
+    version: str
+    model: Any
+    preprocessor: Any
+    fast_predictor: Any = None
+    explainer: Any = None
+    comps_index: Any = None
+    loaded_at: float = 0.0
+
+class ModelRegistry:
+    """
+    Holds the model bundle that serves requests and swaps it without a restart.
+
+    Request handlers read `registry.current` once and use that bundle until
+    they finish, so a swap never changes the model under an in-flight
+    request. New versions are loaded and warmed up before the swap, which
+    is a single reference assignment.
+    """
+
+    def __init__(self, compile_fast_path: bool = True, warmup_input: Optional[dict] = None,
+                 model_threads: Optional[int] = None):
+        """
+        Args:
+            compile_fast_path (bool): Whether to compile the pandas-free path for each bundle.
+            warmup_input (dict): A sample house scored on each new bundle before it serves traffic.
+            model_threads (int): Threads each prediction may use (None keeps the model's n_jobs).
+        """
+        self.compile_fast_path = compile_fast_path
+        self.warmup_input = warmup_input
+        self.model_threads = model_threads
+        self.current: Optional[ModelBundle] = None
+        self.pinned_version: Optional[str] = None
+        self.swap_history: List[dict] = []
+
+        self._listeners: List[Callable[[ModelBundle], None]] = []
+        self._preload_hooks: List[Callable[[ModelBundle], None]] = []
+        # Fitted-state digest -> preprocessor, for the preprocessors of the bundles still in use
+        self._preprocessors = weakref.WeakValueDictionary()
+        self._swap_lock = threading.Lock()
+        self._stop_watcher = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def add_listener(self, listener: Callable[[ModelBundle], None]):
+        """Registers a callback run with the new bundle after every swap."""
+        self._listeners.append(listener)
+
+    def add_preload_hook(self, hook: Callable[[ModelBundle], None]):
+        """
+        Registers a callback run with every newly loaded bundle as part of its warm-up, before
+        it is swapped in or returned, e.g. to load the version into the inference workers.
+        """
+        self._preload_hooks.append(hook)
+
+    def available_versions(self) -> List[str]:
+        """Returns the versions found in the model directory, oldest first."""
+        from app.predict import list_model_versions
+
+        return list(list_model_versions())
+
+    def _load_bundle(self, version: str) -> tuple:
+        """Loads and warms up one version. Returns the bundle and the timings in seconds."""
+        # Imported on first use, so that the API can answer liveness checks
+        # before pandas, scikit-learn and XGBoost are loaded
+        from app.comps import load_comps_index
+        from app.explain import create_explainer
+        from app.fast_predict import compile_predictor
+        from app.predict import comps_index_path, load_model_version, make_prediction
+
+        start = time.perf_counter()
+        model, preprocessor = load_model_version(version)
+        preprocessor = self._shared_preprocessor(preprocessor)
+        if self.model_threads:
+            # Trained with n_jobs=-1, every prediction would use all cores, however many run at once
+            model.set_params(n_jobs=self.model_threads)
+            model.get_booster().set_param("nthread", self.model_threads)
+        fast_predictor = None
+        if self.compile_fast_path:
+            fast_predictor = compile_predictor(model, preprocessor)
+        explainer = create_explainer(model, preprocessor)
+        comps_index = load_comps_index(comps_index_path(version), mmap=MODEL_MMAP_ENABLED)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if self.warmup_input is not None:
+            # Not traffic: the stages timed here are dropped rather than recorded in the latency metrics
+            with capture_stages():
+                if make_prediction(self.warmup_input, model, preprocessor) is None:
+                    raise RuntimeError(f"Warm-up prediction failed for model version '{version}'.")
+                if fast_predictor is not None:
+                    fast_predictor.predict_one(self.warmup_input)
+
+        bundle = ModelBundle(
+            version, model, preprocessor, fast_predictor, explainer, comps_index=comps_index, loaded_at=time.time()
+        )
+        for hook in self._preload_hooks:
+            hook(bundle)
+        warmup_seconds = time.perf_counter() - start
+        return bundle, load_seconds, warmup_seconds
+
+    def _shared_preprocessor(self, preprocessor):
+        """Returns the preprocessor already loaded for another version if it was fitted identically, else this one."""
+        import joblib
+
+        digest = joblib.hash(preprocessor)
+        shared = self._preprocessors.get(digest)
+        if shared is not None:
+            return shared
+        self._preprocessors[digest] = preprocessor
+        return preprocessor
+
+    def load(self, version: str) -> ModelBundle:
+        """
+        Loads and warms up a version without serving it, e.g. for A/B routing or shadow scoring.
+
+        Args:
+            version (str): The model version to load.
+
+        Returns:
+            ModelBundle: The loaded bundle.
+
+        Raises:
+            FileNotFoundError: If the version is not in the model directory.
+        """
+        bundle, load_seconds, warmup_seconds = self._load_bundle(version)
+        logger.info(f"Model {version} loaded (load {load_seconds:.3f}s, warm-up {warmup_seconds:.3f}s).")
+        return bundle
+
+    def _activate(self, version: str) -> ModelBundle:
+        """Loads a version in the calling thread and swaps it in. Must hold the swap lock."""
+        previous = self.current.version if self.current is not None else None
+        bundle, load_seconds, warmup_seconds = self._load_bundle(version)
+
+        start = time.perf_counter()
+        self.current = bundle
+        swap_seconds = time.perf_counter() - start
+
+        for listener in self._listeners:
+            listener(bundle)
+
+        self.swap_history.append({
+            "from_version": previous,
+            "to_version": version,
+            "swapped_at": bundle.loaded_at,
+            "load_seconds": load_seconds,
+            "warmup_seconds": warmup_seconds,
+            "swap_seconds": swap_seconds,
+        })
+        del self.swap_history[:-20]
+        logger.info(
+            f"Model swapped {previous} -> {version} "
+            f"(load {load_seconds:.3f}s, warm-up {warmup_seconds:.3f}s, swap {swap_seconds * 1e6:.1f}us)."
+        )
+        return bundle
+
+    def refresh(self) -> bool:
+        """
+        Serves the pinned version, or the newest one if nothing is pinned.
+
+        Returns:
+            bool: True if a different version was swapped in.
+        """
+        with self._swap_lock:
+            versions = self.available_versions()
+            target = self.pinned_version or (versions[-1] if versions else None)
+            if target is None or (self.current is not None and self.current.version == target):
+                return False
+            self._activate(target)
+            return True
+
+    def pin(self, version: str) -> ModelBundle:
+        """
+        Serves a specific version (e.g. to roll back) and stops following new models.
+
+        Args:
+            version (str): The model version to serve.
+
+        Returns:
+            ModelBundle: The bundle now serving requests.
+        """
+        with self._swap_lock:
+            if version not in self.available_versions():
+                raise KeyError(version)
+            bundle = self.current
+            if bundle is None or bundle.version != version:
+                bundle = self._activate(version)
+            self.pinned_version = version
+            return bundle
+
+    def unpin(self) -> bool:
+        """Follows the newest model again. Returns True if a different version was swapped in."""
+        self.pinned_version = None
+        return self.refresh()
+
+    def start_watcher(self, interval_seconds: float):
+        """Starts a background thread that checks for new model versions every interval."""
+        if self._watcher is not None or interval_seconds <= 0:
+            return
+        self._stop_watcher.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval_seconds,), name="model-registry-watcher", daemon=True
+        )
+        self._watcher.start()
+        logger.info(f"Watching for new model versions every {interval_seconds}s.")
+
+    def stop_watcher(self):
+        """Stops the background watcher thread."""
+        if self._watcher is not None:
+            self._stop_watcher.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval_seconds: float):
+        while not self._stop_watcher.wait(interval_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error while reloading the model: {e}", exc_info=True)
+
+    def status(self) -> dict:
+        """
+        Returns the served version, the available versions and recent swap timings.
+
+        Returns:
+            dict: The registry status.
+        """
+        return {
+            "current_version": self.current.version if self.current is not None else None,
+            "pinned_version": self.pinned_version,
+            "available_versions": self.available_versions(),
+            "swap_history": list(self.swap_history),
+        }
@@ -0,0 +1,324 @@
+# app/routing.py
+
+import bisect
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Import our custom modules
+from src.logger_config import audit_logger, logger
+from app.audit import current_request_id
+from app.executor import pin_threads
+from app.metrics import SHADOW_RELATIVE_DIFFERENCE, record_route, stage_path
+
+# The route to the version the registry serves: the newest model, or the pinned one
+CURRENT = "current"
+
+def parse_routes(spec: str) -> dict:
+    """
+    Parses model routes written as comma-separated 'version=weight' pairs.
+
+    Args:
+        spec (str): e.g. 'current=90,20250301_000000=10'.
+
+    Returns:
+        dict: Version -> weight, in the order given.
+
+    Raises:
+        ValueError: If a pair is not 'version=weight' or a weight is not a number.
+    """
+    routes = {}
+    for pair in filter(None, (part.strip() for part in spec.split(","))):
+        version, separator, weight = pair.partition("=")
+        if not separator or not version.strip():
+            raise ValueError(f"Invalid model route {pair!r}, expected 'version=weight'.")
+        routes[version.strip()] = float(weight)
+    return routes
+
+@dataclass(frozen=True)
+class RoutingTable:
+    """The routes of a ModelPool and the bundles they need, replaced as a whole when they change."""
+    routes: dict = field(default_factory=lambda: {CURRENT: 1.0})
+    shadow_version: Optional[str] = None
+    # Version -> bundle of every version routed to or shadowing, except 'current'
+    bundles: dict = field(default_factory=dict)
+    # The routed versions and their running weight totals, for the weighted draw
+    versions: tuple = field(init=False)
+    cumulative_weights: tuple = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "versions", tuple(self.routes))
+        object.__setattr__(self, "cumulative_weights", tuple(itertools.accumulate(self.routes.values())))
+
+class ModelPool:
+    """
+    Routes prediction requests between model versions for A/B tests, and picks the shadow model.
+
+    Requests go to the routed versions in proportion to their weights,
+    unless they ask for a version the pool serves in the X-Model-Version
+    header. The route 'current' follows the registry, so hot reload and
+    pinning keep working. Other versions are loaded (and warmed up) once,
+    when the routes are configured; versions whose preprocessors were fitted
+    identically share one preprocessor object (see ModelBundle).
+
+    The routing table is replaced with a single assignment, like the
+    registry's bundle, so a request keeps the bundles it was routed to.
+    """
+
+    def __init__(self, registry, rng: Optional[random.Random] = None):
+        """
+        Args:
+            registry (ModelRegistry): Serves the 'current' version and loads the others.
+            rng (random.Random): The source of the weighted draws (seeded in tests).
+        """
+        self.registry = registry
+        self.table = RoutingTable()
+        self._rng = rng or random.Random()
+        self._configure_lock = threading.Lock()
+
+    def configure(self, routes: dict, shadow_version: Optional[str] = None) -> RoutingTable:
+        """
+        Loads the versions of new routes and of the shadow model, then switches to them.
+
+        Args:
+            routes (dict): Version (or 'current') -> relative weight. A version with weight 0 gets
+                no weighted traffic but serves the requests asking for it.
+            shadow_version (str): The version (or 'current') that scores the same requests off the
+                response path, or None.
+
+        Returns:
+            RoutingTable: The table now in use.
+
+        Raises:
+            ValueError: If a weight is negative or none is positive.
+            FileNotFoundError: If a version is not in the model directory. The previous routes are kept.
+        """
+        if any(weight < 0 for weight in routes.values()) or not any(weight > 0 for weight in routes.values()):
+            raise ValueError("Model route weights must be non-negative, and at least one positive.")
+
+        with self._configure_lock:
+            loaded = dict(self.table.bundles)
+            current = self.registry.current
+            if current is not None:
+                loaded.setdefault(current.version, current)
+
+            bundles = {}
+            for version in [*routes, shadow_version]:
+                if version is None or version == CURRENT or version in bundles:
+                    continue
+                bundles[version] = loaded.get(version) or self.registry.load(version)
+
+            self.table = RoutingTable(dict(routes), shadow_version, bundles)
+            logger.info(f"Model routes set to {routes}, shadow model {shadow_version}.")
+            return self.table
+
+    def select(self, requested_version: Optional[str] = None):
+        """
+        Picks the bundle that scores a request.
+
+        Args:
+            requested_version (str): The version asked for in the X-Model-Version header, if any.
+
+        Returns:
+            ModelBundle: The bundle, or None if it is the registry's and no model is loaded yet.
+
+        Raises:
+            KeyError: If the requested version is not one the pool serves.
+        """
+        table = self.table
+        current = self.registry.current
+        if requested_version:
+            route = "header"
+            if requested_version == CURRENT or (current is not None and requested_version == current.version):
+                bundle = current
+            else:
+                bundle = table.bundles[requested_version]
+        else:
+            route = "weight"
+            if len(table.versions) == 1:
+                version = table.versions[0]
+            else:
+                draw = self._rng.random() * table.cumulative_weights[-1]
+                version = table.versions[bisect.bisect_right(table.cumulative_weights, draw)]
+            bundle = current if version == CURRENT else table.bundles[version]
+
+        if bundle is not None:
+            record_route(bundle.version, route)
+        return bundle
+
+    def shadow_for(self, primary):
+        """
+        Returns the shadow bundle of a request scored by `primary`, or None if there is no
+        shadow model or it is the same version.
+        """
+        table = self.table
+        if table.shadow_version is None:
+            return None
+        shadow = self.registry.current if table.shadow_version == CURRENT else table.bundles.get(table.shadow_version)
+        if shadow is None or shadow.version == primary.version:
+            return None
+        return shadow
+
+    def status(self) -> dict:
+        """
+        Returns the routes, the shadow model and the versions they resolve to.
+
+        Returns:
+            dict: The pool status.
+        """
+        table = self.table
+        current = self.registry.current
+        return {
+            "routes": dict(table.routes),
+            "shadow_version": table.shadow_version,
+            "current_version": current.version if current is not None else None,
+            "loaded_versions": list(table.bundles),
+        }
+
+def _init_shadow_thread(n_threads: int):
+    """Pins the threads of the shadow worker and lowers its CPU priority below the inference workers'."""
+    pin_threads(n_threads)
+    try:
+        # On Linux a thread id is a valid 'process' for setpriority, so this only lowers the shadow thread
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+class ShadowScorer:
+    """
+    Scores requests with the shadow model after the primary model has answered them.
+
+    Nothing waits for it. Tasks are handed to a single low-priority worker
+    and dropped (and counted) when `max_queue` are already pending, so the
+    shadow model may fall behind under load but never delays a response.
+    When the shadow model shares the primary model's preprocessor, it scores
+    the features the primary path already computed, so a house is only
+    preprocessed once. A sample of the comparisons goes to the audit log.
+    """
+
+    def __init__(self, max_queue: int = 16, log_sample_rate: float = 1.0, threads: int = 1, logger=audit_logger):
+        """
+        Args:
+            max_queue (int): Shadow tasks that may be pending; more are dropped.
+            log_sample_rate (float): Share of the comparisons written to the audit log, from 0 to 1.
+            threads (int): XGBoost/BLAS threads of the shadow worker (0 leaves them unpinned).
+            logger (logging.Logger): The audit logger.
+        """
+        self.max_queue = max_queue
+        self.log_sample_rate = log_sample_rate
+        self.logger = logger
+        self._pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="shadow", initializer=_init_shadow_thread, initargs=(threads,)
+        )
+        # The counters are changed from the event loop and from the shadow worker
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.scored = 0
+        self.houses = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, endpoint: str, primary, shadow, primary_prices, houses: Optional[list] = None,
+               frame=None, features=None) -> bool:
+        """
+        Hands a scored request to the shadow model without waiting for it.
+
+        Args:
+            endpoint (str): The route, e.g. '/predict'.
+            primary (ModelBundle): The bundle that answered the request.
+            shadow (ModelBundle): The shadow bundle, from `ModelPool.shadow_for`.
+            primary_prices: The prices the client got, one per scored house.
+            houses (list): The scored houses, as validated dicts.
+            frame (pd.DataFrame): Or the scored houses as a DataFrame.
+            features: The preprocessed features of the primary path, scored as they are when the
+                shadow model shares the primary's preprocessor. The houses are then not needed.
+
+        Returns:
+            bool: False if the task was dropped because too many were pending.
+        """
+        with self._lock:
+            if self.pending >= self.max_queue:
+                self.dropped += 1
+                return False
+            self.pending += 1
+        self._pool.submit(
+            self._score, endpoint, primary, shadow, primary_prices, houses, frame, features, current_request_id()
+        )
+        return True
+
+    def _score(self, endpoint: str, primary, shadow, primary_prices, houses, frame, features, request_id):
+        import numpy as np
+        from app.predict import make_frame_predictions, make_predictions, predict_features
+
+        start = time.perf_counter()
+        shared = features is not None and shadow.preprocessor is primary.preprocessor
+        try:
+            with stage_path("shadow"):
+                if shared:
+                    prices = predict_features(features, shadow.model)
+                elif frame is not None:
+                    prices = make_frame_predictions(frame, shadow.model, shadow.preprocessor)
+                else:
+                    prices = make_predictions(houses, shadow.model, shadow.preprocessor)
+            if prices is None:
+                raise RuntimeError("the shadow model could not score the houses")
+            latency_seconds = time.perf_counter() - start
+
+            shadow_prices = np.asarray(prices, dtype=float)
+            primary_prices = np.asarray(primary_prices, dtype=float)
+            difference = np.abs(shadow_prices - primary_prices)
+            relative_difference = float(np.mean(difference / np.abs(primary_prices)))
+            SHADOW_RELATIVE_DIFFERENCE.observe(relative_difference)
+            with self._lock:
+                self.scored += 1
+                self.houses += len(shadow_prices)
+
+            rate = self.log_sample_rate
+            if rate > 0 and (rate >= 1 or random.random() < rate):
+                single = len(shadow_prices) == 1
+                self.logger.info("shadow", extra={
+                    "request_id": request_id,
+                    "endpoint": endpoint,
+                    "model_version": primary.version,
+                    "shadow_version": shadow.version,
+                    "shared_preprocessing": shared,
+                    "latency_ms": round(latency_seconds * 1000, 3),
+                    "n_houses": len(shadow_prices),
+                    "predicted_price": float(primary_prices[0]) if single else None,
+                    "shadow_price": float(shadow_prices[0]) if single else None,
+                    "mean_abs_difference": float(difference.mean()),
+                    "max_abs_difference": float(difference.max()),
+                    "mean_relative_difference": relative_difference,
+                })
+        except Exception as e:
+            logger.error(f"Shadow prediction with model {shadow.version} failed: {e}", exc_info=True)
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self) -> dict:
+        """
+        Returns the shadow queue limit, load and counters.
+
+        Returns:
+            dict: Pending, scored, dropped and failed tasks, and the houses scored.
+        """
+        return {
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "scored": self.scored,
+            "houses": self.houses,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def shutdown(self):
+        """Stops the shadow worker once the tasks already submitted have finished."""
+        self._pool.shutdown(wait=True)
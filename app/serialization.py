@@ -0,0 +1,292 @@
+# app/serialization.py
+
+import typing
+from typing import Any
+
+from fastapi import HTTPException, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import Field, TypeAdapter, ValidationError
+from pydantic_core import from_json, to_json
+from typing_extensions import Annotated, TypedDict
+
+# Media types of the columnar batch bodies
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+ARROW_FILE_MEDIA_TYPE = "application/vnd.apache.arrow.file"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+COLUMNAR_MEDIA_TYPES = (ARROW_STREAM_MEDIA_TYPE, ARROW_FILE_MEDIA_TYPE, PARQUET_MEDIA_TYPE)
+
+def record_type(model: type) -> type:
+    """
+    Builds a TypedDict with the fields of a Pydantic model, keyed by their aliases.
+
+    Validating into it gives a plain dict in the model's field order, with
+    the defaults of optional fields filled in, which is what the inference
+    paths consume. It skips building a model instance and dumping it again.
+
+    Args:
+        model (type): The Pydantic model, e.g. HouseData.
+
+    Returns:
+        type: The TypedDict.
+    """
+    fields = {}
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        if not field.is_required():
+            annotation = Annotated[annotation, Field(default=field.default)]
+        fields[field.alias or name] = annotation
+    return TypedDict(f"{model.__name__}Record", fields)
+
+class RecordParser:
+    """
+    Validates request bodies into the plain dict records of a Pydantic model.
+
+    JSON bodies are parsed and validated in one pass by pydantic-core, from
+    the raw bytes, without `json.loads` or an intermediate model instance.
+    """
+
+    def __init__(self, model: type):
+        """
+        Args:
+            model (type): The Pydantic model the records follow.
+        """
+        self.model = model
+        self.adapter = TypeAdapter(record_type(model))
+
+    def parse_json(self, body: bytes) -> dict:
+        """
+        Parses and validates one JSON object.
+
+        Raises:
+            RequestValidationError: If the body is not valid JSON or not a valid record,
+                answered with 422 like a body FastAPI validated itself.
+        """
+        try:
+            return self.adapter.validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(_body_errors(e))
+
+    def validate(self, raw: Any) -> dict:
+        """
+        Validates one decoded object, e.g. a row of a batch.
+
+        Raises:
+            ValidationError: If it is not a valid record.
+        """
+        return self.adapter.validate_python(raw)
+
+    def request_body(self, many: bool = False, binary_media_types: tuple = ()) -> dict:
+        """
+        The OpenAPI request body of an endpoint reading one record, or a list of them, for `openapi_extra`.
+
+        Args:
+            many (bool): The body is a JSON array of records.
+            binary_media_types (tuple): Other media types the endpoint accepts, e.g. COLUMNAR_MEDIA_TYPES.
+        """
+        schema = self.model.model_json_schema(by_alias=True)
+        if many:
+            schema = {"type": "array", "items": schema}
+        content = {"application/json": {"schema": schema}}
+        for binary_media_type in binary_media_types:
+            content[binary_media_type] = {"schema": {"type": "string", "format": "binary"}}
+        return {"requestBody": {"required": True, "content": content}}
+
+def parse_json_array(body: bytes) -> list:
+    """
+    Parses a JSON array of objects without validating them, so that each one can be validated on its own.
+
+    Raises:
+        RequestValidationError: If the body is not valid JSON or not an array.
+    """
+    try:
+        items = from_json(body)
+    except ValueError as e:
+        raise RequestValidationError([{"type": "json_invalid", "loc": ("body",), "msg": f"Invalid JSON: {e}"}])
+    if not isinstance(items, list):
+        raise RequestValidationError([{"type": "list_type", "loc": ("body",), "msg": "Input should be a valid list"}])
+    return items
+
+def _body_errors(error: ValidationError) -> list:
+    """The errors of a body validation, located like FastAPI's."""
+    return [
+        {**e, "loc": ("body", *e["loc"])}
+        for e in error.errors(include_url=False, include_context=False, include_input=False)
+    ]
+
+class FastJSONResponse(JSONResponse):
+    """
+    A JSON response serialized by pydantic-core.
+
+    Endpoints return it directly with plain Python content (dicts, lists,
+    str, int, float, None), which also skips FastAPI's `jsonable_encoder`
+    pass over the content. NaN and infinity become null.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+def media_type(content_type: str) -> str:
+    """The media type of a Content-Type header, without its parameters."""
+    return content_type.split(";")[0].strip().lower()
+
+def arrow_schema(model: type):
+    """
+    Builds the Arrow schema of a Pydantic model's fields, keyed by their aliases.
+
+    int fields are int64, float fields float64 and str fields string.
+
+    Args:
+        model (type): The Pydantic model, e.g. HouseData.
+
+    Returns:
+        pa.Schema: The schema, in the model's field order.
+    """
+    import pyarrow as pa
+
+    arrow_types = {int: pa.int64(), float: pa.float64(), str: pa.string()}
+    fields = []
+    for name, field in model.model_fields.items():
+        # Optional[X] -> X
+        annotation = next((arg for arg in typing.get_args(field.annotation) if arg is not type(None)), field.annotation)
+        fields.append(pa.field(field.alias or name, arrow_types[annotation]))
+    return pa.schema(fields)
+
+class TableParser:
+    """
+    Decodes columnar request bodies (Arrow IPC or Parquet) into Arrow tables of a model's columns.
+
+    Arrow IPC bodies are read in place: the columns of the table point into
+    the request body, and columns that already have the model's type are
+    used as they are. Columns are checked as a whole (presence and type),
+    and rows with a null in a required column are reported, not the table.
+    """
+
+    def __init__(self, model: type):
+        """
+        Args:
+            model (type): The Pydantic model whose fields are the columns.
+        """
+        self.model = model
+        self.required = {field.alias or name for name, field in model.model_fields.items() if field.is_required()}
+        self._schema = None
+
+    @property
+    def schema(self):
+        """The Arrow schema of the model, built on first use so that pyarrow is only imported when needed."""
+        if self._schema is None:
+            self._schema = arrow_schema(self.model)
+        return self._schema
+
+    def parse(self, body: bytes, media_type: str, max_rows: int = None) -> tuple:
+        """
+        Decodes a columnar body and conforms it to the model's columns.
+
+        The row count is checked before the rows are decoded: from the footer
+        of a Parquet or Arrow file, and batch by batch for an Arrow stream.
+
+        Args:
+            body (bytes): The request body.
+            media_type (str): One of COLUMNAR_MEDIA_TYPES.
+            max_rows (int): The most rows accepted, or None for no limit.
+
+        Returns:
+            tuple: The table, with the model's columns in field order and types (extra columns are
+                left out, missing optional ones are null), and a boolean array of the rows with a
+                null in a required column.
+
+        Raises:
+            RequestValidationError: If the body cannot be decoded, a required column is missing
+                or a column cannot be converted to its type.
+            HTTPException: 413 if the body has more than max_rows rows.
+        """
+        import numpy as np
+        import pyarrow as pa
+
+        try:
+            buffer = pa.py_buffer(body)
+            if media_type == PARQUET_MEDIA_TYPE:
+                import pyarrow.parquet as pq
+
+                parquet_file = pq.ParquetFile(pa.BufferReader(buffer))
+                _check_rows(parquet_file.metadata.num_rows, max_rows)
+                table = parquet_file.read()
+            elif media_type == ARROW_FILE_MEDIA_TYPE:
+                reader = pa.ipc.open_file(buffer)
+                batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+                _check_rows(sum(batch.num_rows for batch in batches), max_rows)
+                table = pa.Table.from_batches(batches, schema=reader.schema)
+            else:
+                reader = pa.ipc.open_stream(buffer)
+                batches = []
+                n_rows = 0
+                for batch in reader:
+                    n_rows += batch.num_rows
+                    _check_rows(n_rows, max_rows)
+                    batches.append(batch)
+                table = pa.Table.from_batches(batches, schema=reader.schema)
+        except (pa.ArrowException, OSError) as e:
+            # A truncated body fails with an OSError rather than an ArrowException
+            raise RequestValidationError([{"type": "arrow_invalid", "loc": ("body",), "msg": f"Invalid {media_type} body: {e}"}])
+
+        columns = []
+        errors = []
+        invalid = np.zeros(table.num_rows, dtype=bool)
+        for field in self.schema:
+            if field.name not in table.column_names:
+                if field.name in self.required:
+                    errors.append({"type": "missing", "loc": ("body", field.name), "msg": "Column required"})
+                else:
+                    columns.append(pa.nulls(table.num_rows, field.type))
+                continue
+
+            column = table.column(field.name)
+            if column.type != field.type:
+                try:
+                    column = column.cast(field.type)
+                except pa.ArrowException as e:
+                    errors.append({"type": "arrow_cast", "loc": ("body", field.name), "msg": f"Invalid {column.type} column: {e}"})
+                    continue
+            if column.null_count and field.name in self.required:
+                invalid |= column.is_null().to_numpy(zero_copy_only=False)
+            columns.append(column)
+
+        if errors:
+            raise RequestValidationError(errors)
+        return pa.Table.from_arrays(columns, schema=self.schema), invalid
+
+def _check_rows(n_rows: int, max_rows: int):
+    """Rejects a columnar body with more than max_rows rows (no limit if None)."""
+    if max_rows is not None and n_rows > max_rows:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {n_rows} rows or more (max {max_rows}).")
+
+def encode_table(table, media_type: str) -> bytes:
+    """
+    Writes a pyarrow Table as a columnar body, the inverse of `TableParser.parse`.
+
+    Args:
+        table (pa.Table): The table.
+        media_type (str): ARROW_STREAM_MEDIA_TYPE or PARQUET_MEDIA_TYPE.
+
+    Returns:
+        bytes: The Arrow IPC stream or Parquet body.
+    """
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    if media_type == PARQUET_MEDIA_TYPE:
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+class ArrowResponse(Response):
+    """A response holding a pyarrow Table, written as an Arrow IPC stream."""
+
+    media_type = ARROW_STREAM_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return encode_table(content, ARROW_STREAM_MEDIA_TYPE)
@@ -0,0 +1,94 @@
+# app/startup.py
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# Import our custom modules
+from src.logger_config import logger
+
+def process_uptime() -> float:
+    """
+    Returns the seconds since the current process was created.
+
+    On Linux this is read from /proc to within a clock tick; elsewhere,
+    psutil's creation time is only precise to about a second.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # The fields after the command name, which is in parentheses, start with the 3rd one
+            fields = f.read().rsplit(")", 1)[1].split()
+        started = int(fields[22 - 3]) / os.sysconf("SC_CLK_TCK")
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - started
+    except (OSError, AttributeError, ValueError):
+        import psutil
+
+        return time.time() - psutil.Process().create_time()
+
+class StartupTracker:
+    """
+    Times the phases of the API startup and tracks whether it has finished.
+
+    The API is live as soon as it answers requests, and ready once the
+    startup has finished (the model is loaded, the inference workers are
+    started and the warm-up predictions have run) and a model is being
+    served. The 'imports' phase runs from the creation of the process
+    (interpreter and uvicorn startup included) to the end of the import of
+    the app.
+    """
+
+    def __init__(self):
+        self.process_started_at = time.time() - process_uptime()
+        self.imported_at: Optional[float] = None
+        self.phases = {}
+        self.finished_at: Optional[float] = None
+
+    def mark_imported(self):
+        """Records the end of the import of the app."""
+        self.imported_at = time.time()
+
+    def begin(self):
+        """Starts a new startup sequence, forgetting the phases of the previous one."""
+        self.phases = {}
+        if self.imported_at is not None:
+            self.phases["imports"] = self.imported_at - self.process_started_at
+        self.finished_at = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Times one startup phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def mark_finished(self):
+        """Ends the startup sequence and logs its timing breakdown."""
+        self.finished_at = time.time()
+        breakdown = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.phases.items())
+        logger.info(f"Startup finished {self.seconds_since_process_start():.2f}s after the process started ({breakdown}).")
+
+    def seconds_since_process_start(self) -> Optional[float]:
+        """Returns the time from the creation of the process to the end of the startup."""
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.process_started_at
+
+    def status(self) -> dict:
+        """
+        Returns the startup state and its timing breakdown.
+
+        Returns:
+            dict: Whether the startup has finished, when, and the seconds spent per phase.
+        """
+        return {
+            "finished": self.finished,
+            "seconds_since_process_start": self.seconds_since_process_start(),
+            "phases_seconds": dict(self.phases),
+        }
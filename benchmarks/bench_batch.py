@@ -0,0 +1,37 @@
+# benchmarks/bench_batch.py
+#
+# Compares N calls to make_prediction with one call to make_predictions.
+#
+# Usage: python -m benchmarks.bench_batch --sizes 1 100 10000
+
+import argparse
+
+from app.predict import make_prediction, make_predictions
+from benchmarks.common import fit_synthetic_pipeline, sample_payloads, time_call
+
+def run_single(payloads, model, preprocessor):
+    for payload in payloads:
+        make_prediction(payload, model, preprocessor)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch vs. single-row predictions.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    model, preprocessor = fit_synthetic_pipeline()
+
+    print(f"{'rows':>8} {'single (s)':>12} {'batch (s)':>12} {'single rows/s':>14} {'batch rows/s':>14} {'speedup':>9}")
+    for n_rows in args.sizes:
+        payloads = sample_payloads(n_rows)
+        # Single calls get one repetition at large sizes to keep the run short
+        single_repeat = args.repeat if n_rows <= 1000 else 1
+        single = time_call(run_single, payloads, model, preprocessor, repeat=single_repeat)
+        batch = time_call(make_predictions, payloads, model, preprocessor, repeat=args.repeat)
+        print(
+            f"{n_rows:>8} {single:>12.4f} {batch:>12.4f} "
+            f"{n_rows / single:>14.0f} {n_rows / batch:>14.0f} {single / batch:>8.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
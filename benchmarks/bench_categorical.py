@@ -0,0 +1,126 @@
+# benchmarks/bench_categorical.py
+#
+# One-hot vs. native categorical encoding (CATEGORICAL_ENCODING): accuracy,
+# training time, model size and inference latency, as a Markdown report.
+#
+# Usage: python -m benchmarks.bench_categorical --rows 20000 --output categorical_report.md
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Import our custom modules
+from app.fast_predict import CompiledPredictor
+from app.predict import make_prediction, predict_frame
+from benchmarks.common import sample_payloads
+from src.evaluate import calculate_r2, calculate_rmse
+from src.export import PreprocessorParams
+from src.model import create_model
+from src.preprocessing import create_preprocessor, engineer_features, model_feature_params
+from src.synthetic import generate_houses
+from src.train import save_native_model
+
+def latency_ms(func, payloads: list) -> tuple:
+    """Returns the p50 and p99 latency in milliseconds of func(payload) over the payloads."""
+    timings = []
+    for payload in payloads:
+        start = time.perf_counter()
+        func(payload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+def measure(encoding: str, n_rows: int, n_trees: int, n_latency: int) -> dict:
+    """Trains and measures one encoding on the same synthetic split."""
+    houses = generate_houses(n_rows + n_rows // 4, seed=42)
+    y_log = np.log1p(houses.pop("SalePrice"))
+    X = engineer_features(houses)
+    X_train, X_test, y_train, y_test = X.iloc[:n_rows], X.iloc[n_rows:], y_log.iloc[:n_rows], y_log.iloc[n_rows:]
+    numerical_features = X.select_dtypes(include=np.number).columns.tolist()
+    categorical_features = X.select_dtypes(exclude=np.number).columns.tolist()
+
+    preprocessor = create_preprocessor(numerical_features, categorical_features, encoding=encoding)
+    start = time.perf_counter()
+    X_train_processed = preprocessor.fit_transform(X_train)
+    transform_seconds = time.perf_counter() - start
+
+    tree_params = {} if n_trees is None else {"n_estimators": n_trees}
+    model = create_model(**model_feature_params(preprocessor), **tree_params)
+    start = time.perf_counter()
+    model.fit(X_train_processed, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    y_pred = model.predict(preprocessor.transform(X_test))
+
+    # Sizes of what src/train.py exports for the API
+    params = PreprocessorParams.from_preprocessor(preprocessor)
+    predictor = CompiledPredictor(model, params)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        save_native_model(model, tmp / "model.ubj")
+        params.save(tmp / "params")
+        model_kb = (tmp / "model.ubj").stat().st_size / 1024
+        params_kb = sum((tmp / f"params.{ext}").stat().st_size for ext in ("json", "npy")) / 1024
+
+    payloads = sample_payloads(n_latency, seed=0)
+    batch = generate_houses(10000, seed=7, with_target=False)
+    start = time.perf_counter()
+    predict_frame(batch, model, preprocessor)
+    batch_rows_per_second = len(batch) / (time.perf_counter() - start)
+
+    return {
+        "encoding": encoding,
+        "n_features": X_train_processed.shape[1],
+        "rmse": calculate_rmse(y_test, y_pred),
+        "r2": calculate_r2(y_test, y_pred),
+        "transform_seconds": transform_seconds,
+        "fit_seconds": fit_seconds,
+        "model_kb": model_kb,
+        "params_kb": params_kb,
+        "pandas": latency_ms(lambda payload: make_prediction(payload, model, preprocessor), payloads),
+        "fast": latency_ms(predictor.predict_one, payloads),
+        "batch_rows_per_second": batch_rows_per_second,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare one-hot and native categorical encoding.")
+    parser.add_argument("--rows", type=int, default=20000, help="Training rows (a quarter as many are held out).")
+    parser.add_argument("--trees", type=int, default=None, help="Trees per model. Defaults to XGBOOST_PARAMS.")
+    parser.add_argument("--latency-requests", type=int, default=500)
+    parser.add_argument("--output", type=Path, help="Also write the report to this Markdown file.")
+    args = parser.parse_args()
+
+    results = [measure(encoding, args.rows, args.trees, args.latency_requests) for encoding in ("onehot", "native")]
+
+    lines = [
+        "# One-hot vs. native categorical encoding",
+        "",
+        f"{args.rows} synthetic training rows, {args.rows // 4} held out; latency over {args.latency_requests} requests.",
+        "",
+        "| | " + " | ".join(r["encoding"] for r in results) + " |",
+        "| :-- | " + " | ".join("--:" for _ in results) + " |",
+    ]
+    rows = [
+        ("Features after preprocessing", lambda r: f"{r['n_features']}"),
+        ("Test RMSE (log price)", lambda r: f"{r['rmse']:.4f}"),
+        ("Test R²", lambda r: f"{r['r2']:.4f}"),
+        ("Preprocessing fit (s)", lambda r: f"{r['transform_seconds']:.2f}"),
+        ("Training (s)", lambda r: f"{r['fit_seconds']:.2f}"),
+        ("Model, UBJSON (KB)", lambda r: f"{r['model_kb']:.0f}"),
+        ("Compiled preprocessor (KB)", lambda r: f"{r['params_kb']:.0f}"),
+        ("make_prediction p50 / p99 (ms)", lambda r: f"{r['pandas'][0]:.2f} / {r['pandas'][1]:.2f}"),
+        ("Fast path p50 / p99 (ms)", lambda r: f"{r['fast'][0]:.3f} / {r['fast'][1]:.3f}"),
+        ("Batch of 10k (rows/s)", lambda r: f"{r['batch_rows_per_second']:.0f}"),
+    ]
+    for label, cell in rows:
+        lines.append(f"| {label} | " + " | ".join(cell(r) for r in results) + " |")
+
+    report = "\n".join(lines) + "\n"
+    print(report)
+    if args.output:
+        args.output.write_text(report)
+
+if __name__ == "__main__":
+    main()
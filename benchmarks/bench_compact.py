@@ -0,0 +1,98 @@
+# benchmarks/bench_compact.py
+#
+# The full model vs. its compact form (COMPACT_MODEL): the fewest boosting
+# rounds within the RMSE tolerance, served by XGBoost ('trees') or by the
+# NumPy flat evaluator ('flat'). Accuracy, size, and latency of the booster
+# alone, of the /predict fast path and of batch inference, as a Markdown report.
+#
+# Usage: python -m benchmarks.bench_compact --rows 20000 --tolerance 0.01
+
+import argparse
+import copy
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Import our custom modules
+from app.fast_predict import CompiledPredictor
+from app.flat_trees import FlatTreeRegressor
+from app.predict import load_compact_model, predict_frame
+from benchmarks.bench_categorical import latency_ms
+from benchmarks.common import sample_payloads
+from src.compact import compact_model
+from src.model import create_model
+from src.preprocessing import create_preprocessor, engineer_features
+from src.synthetic import generate_houses
+
+def best_seconds(func) -> float:
+    """The fastest of three calls to func, in seconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the full model with its compact forms.")
+    parser.add_argument("--rows", type=int, default=20000, help="Training rows (a quarter as many are held out).")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Allowed relative RMSE increase.")
+    parser.add_argument("--prune-tolerance", type=float, default=0.0)
+    parser.add_argument("--latency-requests", type=int, default=500)
+    parser.add_argument("--output", type=Path, help="Also write the report to this Markdown file.")
+    args = parser.parse_args()
+
+    houses = generate_houses(args.rows + args.rows // 4, seed=42)
+    y_log = np.log1p(houses.pop("SalePrice"))
+    X = engineer_features(houses)
+    X_train, X_test = X.iloc[:args.rows], X.iloc[args.rows:]
+    y_train, y_test = y_log.iloc[:args.rows], y_log.iloc[args.rows:]
+    numerical_features = X.select_dtypes(include=np.number).columns.tolist()
+    categorical_features = X.select_dtypes(exclude=np.number).columns.tolist()
+    preprocessor = create_preprocessor(numerical_features, categorical_features)
+    model = create_model().fit(preprocessor.fit_transform(X_train), y_train)
+
+    flat_trees, report = compact_model(model, preprocessor.transform(X_test), y_test, args.tolerance, args.prune_tolerance)
+    compact = load_compact_model(copy.deepcopy(model), "benchmark", mode="trees")
+    models = {"full": model, "compact": compact, "flat": FlatTreeRegressor(compact, flat_trees)}
+    for served in models.values():
+        served.set_params(n_jobs=1)
+
+    payloads = sample_payloads(args.latency_requests, seed=0)
+    batch = generate_houses(10000, seed=7, with_target=False)
+    fast_path, batch_rows_per_second = {}, {}
+    for name, served in models.items():
+        fast_path[name] = latency_ms(CompiledPredictor(served, preprocessor).predict_one, payloads)
+        batch_rows_per_second[name] = len(batch) / best_seconds(lambda: predict_frame(batch, served, preprocessor))
+
+    names = list(models)
+    lines = [
+        "# Full vs. compact model",
+        "",
+        f"{args.rows} synthetic training rows, {args.rows // 4} held out; RMSE tolerance {args.tolerance:.1%}, "
+        f"prune tolerance {args.prune_tolerance}; latency over {args.latency_requests} requests, one thread.",
+        "",
+        "| | " + " | ".join(names) + " |",
+        "| :-- | " + " | ".join("--:" for _ in names) + " |",
+    ]
+    rows = [
+        ("Boosting rounds", lambda n: str(report["n_rounds"] if n == "full" else report["n_rounds_compact"])),
+        ("Test RMSE (log price)", lambda n: f"{report['rmse'][n]:.4f}"),
+        ("Test R²", lambda n: f"{report['r2'][n]:.4f}"),
+        ("Size (KB)", lambda n: f"{report['size_bytes'][n] / 1024:.0f}"),
+        ("Trees only, one row (µs)", lambda n: f"{report['single_row_us'][n]:.0f}"),
+        ("Trees only, batch of 1k (µs/row)", lambda n: f"{report['batch_per_row_us'][n]:.1f}"),
+        ("Fast path p50 / p99 (ms)", lambda n: f"{fast_path[n][0]:.3f} / {fast_path[n][1]:.3f}"),
+        ("Batch of 10k (rows/s)", lambda n: f"{batch_rows_per_second[n]:.0f}"),
+    ]
+    for label, cell in rows:
+        lines.append(f"| {label} | " + " | ".join(cell(name) for name in names) + " |")
+
+    output = "\n".join(lines) + "\n"
+    print(output)
+    if args.output:
+        args.output.write_text(output)
+
+if __name__ == "__main__":
+    main()
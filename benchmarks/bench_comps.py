@@ -0,0 +1,135 @@
+# benchmarks/bench_comps.py
+#
+# The comparable-sales index (src/comps.py, app/comps.py) on growing synthetic training sets:
+# build time, memory, size on disk and query latency of the KD-tree and the
+# ball tree, next to a brute-force NumPy scan of the same points, as a
+# Markdown report.
+#
+# Usage: python -m benchmarks.bench_comps --rows 10000 100000 1000000 --k 5
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Import our custom modules
+from app.comps import ComparablesIndex, load_comps_index
+from benchmarks.bench_categorical import latency_ms
+from benchmarks.common import sample_payloads
+from src.comps import build_comps_index
+from src.config import COMPS_FEATURES
+from src.preprocessing import create_preprocessor, engineer_features
+from src.synthetic import generate_houses
+
+# Houses generated at once; 100k full houses take about 400 MB before only the index features are kept
+CHUNK_ROWS = 100_000
+
+def training_houses(n_rows: int) -> tuple:
+    """Generates n_rows engineered houses, keeping only the index features, and their sale prices."""
+    frames, prices = [], []
+    for seed, start in enumerate(range(0, n_rows, CHUNK_ROWS)):
+        houses = generate_houses(min(CHUNK_ROWS, n_rows - start), seed=seed)
+        prices.append(houses.pop("SalePrice").to_numpy())
+        frames.append(engineer_features(houses)[COMPS_FEATURES])
+    return pd.concat(frames, ignore_index=True), np.concatenate(prices)
+
+def fit_preprocessor():
+    """The preprocessor of a model trained on 10k houses, whose scaling the indexes use."""
+    X = engineer_features(generate_houses(10000, seed=42, with_target=False))
+    numerical_features = X.select_dtypes(include=np.number).columns.tolist()
+    categorical_features = X.select_dtypes(exclude=np.number).columns.tolist()
+    return create_preprocessor(numerical_features, categorical_features).fit(X)
+
+def brute_force(points: np.ndarray, k: int):
+    """A query function scanning every training point, the baseline of the tree indexes."""
+    def query(point: np.ndarray):
+        distances = ((points - point) ** 2).sum(axis=1)
+        nearest = np.argpartition(distances, k)[:k]
+        return nearest[np.argsort(distances[nearest])]
+    return query
+
+def measure(X, prices, preprocessor, algorithm: str, payloads: list, k: int) -> dict:
+    """Builds, saves, reloads and queries one index."""
+    start = time.perf_counter()
+    arrays = build_comps_index(X, prices, preprocessor, COMPS_FEATURES, algorithm=algorithm)
+    build_seconds = time.perf_counter() - start
+    memory_bytes = ComparablesIndex(**arrays).nbytes
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "comps_index.joblib"
+        joblib.dump(arrays, path)
+        del arrays
+        file_bytes = path.stat().st_size
+        start = time.perf_counter()
+        index = load_comps_index(path, mmap=True)
+        load_seconds = time.perf_counter() - start
+
+        single = latency_ms(lambda payload: index.query([payload], k), payloads)
+        start = time.perf_counter()
+        index.query(payloads, k)
+        batch_us = (time.perf_counter() - start) / len(payloads) * 1e6
+        del index
+    return {
+        "build_s": build_seconds, "memory_mb": memory_bytes / 2**20, "file_mb": file_bytes / 2**20, "load_ms": load_seconds * 1000,
+        "single": single, "batch_us": batch_us,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the comparable-sales index.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000], help="Training set sizes.")
+    parser.add_argument("--k", type=int, default=5, help="Comparables per query.")
+    parser.add_argument("--queries", type=int, default=1000, help="Query houses (single-query latency and one batch).")
+    parser.add_argument("--output", type=Path, help="Also write the report to this Markdown file.")
+    args = parser.parse_args()
+
+    preprocessor = fit_preprocessor()
+    payloads = sample_payloads(args.queries, seed=0)
+
+    lines = [
+        "# Comparable-sales index",
+        "",
+        f"{len(COMPS_FEATURES)} standardized features, k={args.k}; {args.queries} query houses, "
+        f"each alone (p50 / p99) and all in one batch; one thread. Memory is the index's arrays; "
+        "the brute-force baseline scans every training point with NumPy.",
+        "",
+        "| Rows | Index | Build (s) | Memory (MB) | File (MB) | Load, mmap (ms) | One house p50 / p99 (ms) "
+        "| Batch (µs/house) |",
+        "| --: | :-- | --: | --: | --: | --: | --: | --: |",
+    ]
+    for n_rows in args.rows:
+        X, prices = training_houses(n_rows)
+        for algorithm in ("kd_tree", "ball_tree"):
+            result = measure(X, prices, preprocessor, algorithm, payloads, args.k)
+            lines.append(
+                f"| {n_rows:,} | {algorithm} | {result['build_s']:.2f} | {result['memory_mb']:.1f} | {result['file_mb']:.1f} "
+                f"| {result['load_ms']:.1f} | {result['single'][0]:.3f} / {result['single'][1]:.3f} "
+                f"| {result['batch_us']:.0f} |"
+            )
+
+        # The same points, scanned: the scaling is shared, only the nearest-neighbour search differs
+        index = ComparablesIndex(**build_comps_index(X, prices, preprocessor, COMPS_FEATURES))
+        points = index.tree.get_arrays()[0]
+        query = brute_force(np.asarray(points), args.k)
+        query_points = index.points(payloads)
+        single = latency_ms(query, list(query_points[:100]))
+        start = time.perf_counter()
+        for point in query_points[:100]:
+            query(point)
+        brute_us = (time.perf_counter() - start) / 100 * 1e6
+        lines.append(
+            f"| {n_rows:,} | brute force | – | {points.nbytes / 2**20:.1f} | – | – "
+            f"| {single[0]:.3f} / {single[1]:.3f} | {brute_us:.0f} |"
+        )
+        del index, points, X, prices
+
+    output = "\n".join(lines) + "\n"
+    print(output)
+    if args.output:
+        args.output.write_text(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/bench_fast_path.py
+#
+# Single-row latency of make_prediction vs. the compiled fast path.
+#
+# Usage: python -m benchmarks.bench_fast_path --rows 1000
+
+import argparse
+import time
+
+import numpy as np
+
+from app.fast_predict import CompiledPredictor
+from app.predict import make_prediction
+from benchmarks.common import fit_synthetic_pipeline, sample_payloads
+
+def latencies_ms(func, payloads) -> np.ndarray:
+    timings = []
+    for payload in payloads:
+        start = time.perf_counter()
+        func(payload)
+        timings.append(time.perf_counter() - start)
+    return 1000 * np.array(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-row inference latency.")
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    model, preprocessor = fit_synthetic_pipeline()
+    predictor = CompiledPredictor(model, preprocessor)
+    payloads = sample_payloads(args.rows)
+
+    # Parity check before timing anything
+    max_diff = max(abs(predictor.predict_one(p) - make_prediction(p, model, preprocessor)) for p in payloads[:100])
+    print(f"max |fast - pandas| over 100 rows: ${max_diff:.6f}")
+
+    paths = {
+        "make_prediction": lambda p: make_prediction(p, model, preprocessor),
+        "compiled fast path": predictor.predict_one,
+    }
+    print(f"{'path':<20} {'p50 (ms)':>10} {'p90 (ms)':>10} {'p99 (ms)':>10}")
+    for name, func in paths.items():
+        func(payloads[0])  # warm-up
+        timings = latencies_ms(func, payloads)
+        p50, p90, p99 = np.percentile(timings, [50, 90, 99])
+        print(f"{name:<20} {p50:>10.3f} {p90:>10.3f} {p99:>10.3f}")
+
+if __name__ == "__main__":
+    main()
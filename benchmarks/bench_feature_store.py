@@ -0,0 +1,59 @@
+# benchmarks/bench_feature_store.py
+#
+# Preprocessing time of a training run with an empty vs. a warm feature store,
+# and the size of a store entry compared with the CSVs it replaces.
+#
+# Usage: python -m benchmarks.bench_feature_store --rows 1460 100000
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src import config
+from src.preprocessing import get_processed_data, processed_data_key
+from src.synthetic import generate_houses
+
+def directory_mb(path: Path) -> float:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the processed-data feature store.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1460, 100000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'cold (s)':>10} {'warm (s)':>10} {'saved (s)':>10} {'store (MB)':>11} {'CSVs (MB)':>10}")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            houses = generate_houses(n_rows, seed=42)
+            houses.insert(0, "Id", np.arange(n_rows))
+            houses.to_csv(tmp / "train.csv", index=False)
+            config.RAW_DATA_FILE = tmp / "train.csv"
+            config.FEATURE_STORE_DIR = tmp / "store"
+
+            start = time.perf_counter()
+            data = get_processed_data()
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            get_processed_data()
+            warm = time.perf_counter() - start
+
+            # The four CSVs that training used to write on every run
+            csv_dir = tmp / "csv"
+            csv_dir.mkdir()
+            data.X_train.to_csv(csv_dir / "X_train.csv", index=False)
+            data.X_test.to_csv(csv_dir / "X_test.csv", index=False)
+            data.y_train.to_csv(csv_dir / "y_train.csv", index=False)
+            data.y_test.to_csv(csv_dir / "y_test.csv", index=False)
+
+            store_mb = directory_mb(config.FEATURE_STORE_DIR / processed_data_key())
+            print(
+                f"{n_rows:>8} {cold:>10.2f} {warm:>10.2f} {cold - warm:>10.2f} "
+                f"{store_mb:>11.1f} {directory_mb(csv_dir):>10.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
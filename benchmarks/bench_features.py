@@ -0,0 +1,80 @@
+# benchmarks/bench_features.py
+#
+# Feature engineering time and memory per call: the previous implementation
+# (new columns assigned into the input, then a copy of the whole frame to drop
+# the replaced ones) vs. the feature registry of src/features.py on a DataFrame,
+# a NumPy structured array and a dict of column arrays. Memory is the peak of
+# the allocations made during the call (tracemalloc), i.e. what the call copies.
+#
+# Usage: python -m benchmarks.bench_features --rows 1000000
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+DROPPED = ['YrSold', 'YearBuilt', 'YearRemodAdd', 'TotalBsmtSF', '1stFlrSF', '2ndFlrSF']
+
+def legacy_engineer_features(data):
+    """The implementation before the feature registry, including the serving path's TotalBsmtSF."""
+    if 'TotalBsmtSF' not in data.columns:
+        data['TotalBsmtSF'] = data['BsmtFinSF1'] + data['BsmtFinSF2'] + data['BsmtUnfSF']
+    data['TotalSF'] = data['TotalBsmtSF'] + data['1stFlrSF'] + data['2ndFlrSF']
+    data['HouseAge'] = data['YrSold'] - data['YearBuilt']
+    data['WasRemodeled'] = (data['YearRemodAdd'] != data['YearBuilt']).astype(int)
+    return data.drop(DROPPED, axis=1)
+
+def measure(func, data, repeat: int) -> tuple:
+    """Returns the best time in seconds and the peak allocations in MB of func(data)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feature engineering before and after the feature registry.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from src.features import FEATURES
+    from src.synthetic import generate_houses
+
+    training = generate_houses(args.rows, seed=1, with_target=False)
+    # What the API builds from JSON: no TotalBsmtSF, and None for missing categories
+    serving = training.drop(columns=['TotalBsmtSF'])
+    serving = serving.astype({name: object for name in serving.select_dtypes(exclude=np.number).columns})
+    serving = serving.where(serving.notna(), None)
+    frame_mb = training.memory_usage(deep=False).sum() / 2**20
+
+    # The numeric columns as a structured array and as a dict of arrays
+    numeric = serving.select_dtypes(include=np.number)
+    records = numeric.to_records(index=False)
+    columns = {name: numeric[name].to_numpy() for name in numeric.columns}
+
+    # The previous implementation adds its columns to its input, so it gets its own copy of the frame (not timed)
+    cases = [
+        ("before, training frame", legacy_engineer_features, training.copy()),
+        ("registry, training frame", FEATURES.apply, training),
+        ("before, serving frame", legacy_engineer_features, serving.copy()),
+        ("registry, serving frame", FEATURES.apply, serving),
+        ("registry, serving frame, None as missing", lambda df: FEATURES.apply(df, none_as_missing=True), serving),
+        ("registry, structured array", FEATURES.apply, records),
+        ("registry, dict of arrays", FEATURES.apply, columns),
+    ]
+
+    print(f"{args.rows} rows, {training.shape[1]} columns, {frame_mb:.0f} MB frame (without object payloads)")
+    print(f"{'case':<42} {'ms':>9} {'ms / 1M rows':>13} {'allocated (MB)':>15}")
+    for name, func, data in cases:
+        seconds, peak_mb = measure(func, data, args.repeat)
+        print(f"{name:<42} {seconds * 1000:>9.1f} {seconds * 1000 * 1e6 / args.rows:>13.1f} {peak_mb:>15.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# benchmarks/bench_load.py
+#
+# Saturation load test of /predict through a real uvicorn server: p50/p99
+# latency, throughput and 429 rejections with the inference executor configured
+# like the old threadpool (40 unpinned threads, unbounded queue) vs. bounded
+# with pinned threads and backpressure.
+#
+# Usage: python -m benchmarks.bench_load --concurrency 32 --seconds 15
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+# Import our custom modules
+from benchmarks.common import export_model_version, fit_synthetic_pipeline, sample_payloads
+from src import config
+
+# The executor settings of each scenario; the pandas pipeline makes every request CPU-heavy
+SCENARIOS = {
+    # Starlette's default threadpool: 40 threads, XGBoost on every core, no limit on waiting requests
+    "unbounded": {"INFERENCE_WORKERS": "40", "INFERENCE_THREADS_PER_WORKER": "0", "INFERENCE_MAX_QUEUE": "1000000"},
+    "bounded": {},
+}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(model_dir: Path, port: int, settings: dict) -> subprocess.Popen:
+    """Starts uvicorn on the model directory and waits until /health answers."""
+    env = dict(
+        os.environ, MODEL_DIR=str(model_dir), PYTHONPATH=str(config.ROOT_DIR),
+        PREDICTION_CACHE="0", PREDICT_FAST_PATH="0", MODEL_RELOAD_INTERVAL_SECONDS="0", **settings,
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=config.ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("The API did not start.")
+
+async def drive(port: int, payloads: list, concurrency: int, seconds: float) -> dict:
+    """Keeps `concurrency` requests in flight for `seconds` and records every response."""
+    latencies = {200: [], 429: []}
+    other = 0
+    stop_at = time.perf_counter() + seconds
+
+    async def client_loop(client: httpx.AsyncClient, offset: int):
+        nonlocal other
+        i = offset
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            i += concurrency
+            try:
+                response = await client.post("/predict", json=payloads[i % len(payloads)])
+            except httpx.TransportError:
+                other += 1
+                continue
+            elapsed = time.perf_counter() - start
+            if response.status_code in latencies:
+                latencies[response.status_code].append(elapsed)
+            else:
+                other += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    ok = np.array(latencies[200]) * 1000
+    return {
+        "ok": len(ok),
+        "rejected": len(latencies[429]),
+        "errors": other,
+        "ok_per_s": len(ok) / elapsed,
+        "p50_ms": float(np.percentile(ok, 50)) if len(ok) else float("nan"),
+        "p99_ms": float(np.percentile(ok, 99)) if len(ok) else float("nan"),
+        "max_ms": float(ok.max()) if len(ok) else float("nan"),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Saturation load test of /predict with and without backpressure.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests kept in flight.")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--max-queue", type=int, default=8, help="INFERENCE_MAX_QUEUE of the bounded scenario.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    args = parser.parse_args()
+
+    model, preprocessor = fit_synthetic_pipeline()
+    payloads = sample_payloads(500, seed=11)
+
+    print(f"{args.concurrency} concurrent clients for {args.seconds:.0f}s on {os.cpu_count()} core(s), pandas pipeline")
+    print(f"{'scenario':>10} {'ok':>7} {'429':>7} {'ok/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9}")
+    with tempfile.TemporaryDirectory() as model_dir:
+        export_model_version(model, preprocessor, Path(model_dir))
+        for name in args.scenarios:
+            settings = dict(SCENARIOS[name])
+            if name == "bounded":
+                settings["INFERENCE_MAX_QUEUE"] = str(args.max_queue)
+            port = free_port()
+            server = start_server(Path(model_dir), port, settings)
+            try:
+                r = asyncio.run(drive(port, payloads, args.concurrency, args.seconds))
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{name:>10} {r['ok']:>7} {r['rejected']:>7} {r['ok_per_s']:>8.1f} "
+                f"{r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f}"
+                + (f"  ({r['errors']} other errors)" if r["errors"] else "")
+            )
+
+if __name__ == "__main__":
+    main()
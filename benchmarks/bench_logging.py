@@ -0,0 +1,109 @@
+# benchmarks/bench_logging.py
+#
+# Per-request cost of the prediction audit log: /predict latency through the
+# ASGI app (in process, no network) and the cost of one audit record, with the
+# audit log off, written synchronously, and queued (LOG_QUEUE) at full and at
+# sampled rates. Each mode runs in a fresh process, since the log handlers are
+# set up on import.
+#
+# Usage: python -m benchmarks.bench_logging --requests 2000
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# LOG_QUEUE and PREDICTION_LOG_SAMPLE_RATE of each mode
+MODES = {
+    "off": {"LOG_QUEUE": "1", "PREDICTION_LOG_SAMPLE_RATE": "0"},
+    "sync 100%": {"LOG_QUEUE": "0", "PREDICTION_LOG_SAMPLE_RATE": "1"},
+    "queue 100%": {"LOG_QUEUE": "1", "PREDICTION_LOG_SAMPLE_RATE": "1"},
+    "queue 1%": {"LOG_QUEUE": "1", "PREDICTION_LOG_SAMPLE_RATE": "0.01"},
+}
+
+def run_mode(n_requests: int) -> dict:
+    """Measures the mode configured in the environment of this process; see `main` for the columns."""
+    from pathlib import Path
+
+    import httpx
+    from app import main, predict
+    from benchmarks.common import export_model_version, fit_synthetic_pipeline, sample_payloads
+    from src.logger_config import flush_logs, log_queue_stats
+
+    model, preprocessor = fit_synthetic_pipeline()
+    payloads = sample_payloads(n_requests, seed=5)
+
+    async def drive(model_dir: str) -> list:
+        predict.MODEL_DIR = Path(model_dir)
+        main.PREDICTION_CACHE_ENABLED = False
+        await main.startup_event()
+        timings = []
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+            for payload in payloads:
+                start = time.perf_counter()
+                response = await client.post("/predict", json=payload)
+                timings.append(time.perf_counter() - start)
+                assert response.status_code == 200
+        await main.shutdown_event()
+        return timings
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        export_model_version(model, preprocessor, Path(model_dir))
+        timings = np.array(asyncio.run(drive(model_dir))) * 1000
+
+    # The cost of one record on the calling thread, on its own
+    stage_seconds = {"transform": 0.0001, "predict": 0.0002}
+    start = time.perf_counter()
+    for payload in payloads:
+        main.audit_log.record("/predict", "bench", payload, 0.001, "fast", stage_seconds, predicted_price=1.0)
+    record_us = (time.perf_counter() - start) / len(payloads) * 1e6
+    flush_logs()
+
+    return {
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p99_ms": float(np.percentile(timings, 99)),
+        "mean_ms": float(timings.mean()),
+        "record_us": record_us,
+        "dropped": sum(stats["dropped"] for stats in log_queue_stats().values()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the per-request overhead of the prediction audit log.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.requests)))
+        return
+
+    print(f"{args.requests} sequential /predict requests through the ASGI app (fast path, cache off)")
+    print(f"{'mode':>11} {'p50 (ms)':>9} {'p99 (ms)':>9} {'mean (ms)':>10} {'overhead (us)':>14} {'record (us)':>12} {'dropped':>8}")
+    baseline_ms = None
+    with tempfile.TemporaryDirectory() as log_dir:
+        for mode in args.modes:
+            env = dict(os.environ, LOG_DIR=log_dir, WARMUP_PREDICTIONS="8", **MODES[mode])
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_logging", "--child", "--requests", str(args.requests)],
+                capture_output=True, text=True, env=env,
+            )
+            if completed.returncode != 0:
+                print(f"{mode:>11} failed: {completed.stderr.strip()[-300:]}")
+                continue
+            r = json.loads(completed.stdout.strip().splitlines()[-1])
+            if baseline_ms is None:
+                baseline_ms = r["mean_ms"]
+            print(
+                f"{mode:>11} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['mean_ms']:>10.3f} "
+                f"{(r['mean_ms'] - baseline_ms) * 1000:>14.1f} {r['record_us']:>12.1f} {r['dropped']:>8}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_sparse.py
+#
+# Peak memory and time of preprocessing, training and batch inference with the
+# features kept in CSR form vs. densified (SPARSE_FEATURES). Each mode runs in a
+# fresh process so that its peak resident memory is measured on its own.
+#
+# Usage: python -m benchmarks.bench_sparse --rows 1000000 --trees 100
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def matrix_mb(matrix) -> float:
+    if hasattr(matrix, "indptr"):
+        return (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 2**20
+    return matrix.nbytes / 2**20
+
+def run_mode(sparse: bool, n_rows: int, n_trees: int, n_predict: int) -> dict:
+    """Measures one mode in this process; see `main` for the columns."""
+    import numpy as np
+    import psutil
+    from app.predict import predict_frame
+    from src.model import create_model
+    from src.preprocessing import create_preprocessor, engineer_features
+    from src.synthetic import generate_houses
+
+    houses = generate_houses(n_rows, seed=42)
+    y_log = np.log1p(houses.pop("SalePrice"))
+    X = engineer_features(houses)
+    numerical_features = X.select_dtypes(include=np.number).columns.tolist()
+    categorical_features = X.select_dtypes(exclude=np.number).columns.tolist()
+    raw_houses = generate_houses(n_predict, seed=7, with_target=False)
+    data_rss = psutil.Process().memory_info().rss / 2**20
+
+    start = time.perf_counter()
+    preprocessor = create_preprocessor(numerical_features, categorical_features, sparse=sparse)
+    X_processed = preprocessor.fit_transform(X)
+    transform_seconds = time.perf_counter() - start
+    transform_peak = peak_rss_mb()
+    del X
+
+    model = create_model(n_estimators=n_trees)
+    start = time.perf_counter()
+    model.fit(X_processed, y_log)
+    fit_seconds = time.perf_counter() - start
+    fit_peak = peak_rss_mb()
+
+    start = time.perf_counter()
+    predict_frame(raw_houses, model, preprocessor)
+    predict_seconds = time.perf_counter() - start
+
+    return {
+        "mode": "sparse" if sparse else "dense",
+        "matrix_mb": matrix_mb(X_processed),
+        "data_rss_mb": data_rss,
+        "transform_seconds": transform_seconds,
+        "transform_peak_mb": transform_peak,
+        "fit_seconds": fit_seconds,
+        "fit_peak_mb": fit_peak,
+        "predict_rows_per_second": n_predict / predict_seconds,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sparse vs. dense preprocessed features.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--trees", type=int, default=100, help="Trees per model (the default config trains 1000).")
+    parser.add_argument("--predict-rows", type=int, default=10000)
+    parser.add_argument("--modes", nargs="+", choices=["sparse", "dense"], default=["sparse", "dense"])
+    parser.add_argument("--child", choices=["sparse", "dense"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child == "sparse", args.rows, args.trees, args.predict_rows)))
+        return
+
+    print(f"{args.rows} rows, {args.trees} trees, batch inference on {args.predict_rows} rows")
+    print(
+        f"{'mode':>6} {'matrix (MB)':>12} {'data RSS (MB)':>14} {'transform (s)':>14} {'peak (MB)':>10} "
+        f"{'fit (s)':>8} {'peak (MB)':>10} {'predict (rows/s)':>17}"
+    )
+    for mode in args.modes:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_sparse", "--child", mode, "--rows", str(args.rows),
+             "--trees", str(args.trees), "--predict-rows", str(args.predict_rows)],
+            capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            # e.g. killed for running out of memory
+            print(f"{mode:>6} failed with exit code {completed.returncode}: {completed.stderr.strip()[-200:]}")
+            continue
+        r = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(
+            f"{r['mode']:>6} {r['matrix_mb']:>12.1f} {r['data_rss_mb']:>14.0f} {r['transform_seconds']:>14.2f} "
+            f"{r['transform_peak_mb']:>10.0f} {r['fit_seconds']:>8.2f} {r['fit_peak_mb']:>10.0f} "
+            f"{r['predict_rows_per_second']:>17.0f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_startup.py
+#
+# Restart-to-first-prediction of the API: starts uvicorn in a fresh process,
+# polls it like a load balancer and a client would, and reports when it first
+# answered, when /predict first succeeded and how long that first prediction
+# took, for each STARTUP_MODE / WARMUP_PREDICTIONS setting.
+#
+# Usage: python -m benchmarks.bench_startup --repeat 5
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+# Import our custom modules
+from benchmarks.bench_load import free_port
+from benchmarks.common import export_model_version, fit_synthetic_pipeline, sample_payloads
+from src import config
+
+SCENARIOS = {
+    "blocking, no warm-up": {"STARTUP_MODE": "blocking", "WARMUP_PREDICTIONS": "0"},
+    "blocking": {"STARTUP_MODE": "blocking"},
+    "background": {"STARTUP_MODE": "background"},
+}
+
+def measure_restart(app_dir: Path, model_dir: Path, settings: dict, payload: dict, poll_seconds: float) -> dict:
+    """Starts the API and polls it until a prediction succeeds. Times are seconds since the process was started."""
+    port = free_port()
+    env = dict(
+        os.environ, MODEL_DIR=str(model_dir), PYTHONPATH=str(app_dir),
+        PREDICTION_CACHE="0", MODEL_RELOAD_INTERVAL_SECONDS="0", **settings,
+    )
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    result = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            while time.perf_counter() - start < 120:
+                try:
+                    if "live" not in result:
+                        # Any answer counts, so that checkouts without /health/live can be compared
+                        client.get("/health/live")
+                        result["live"] = time.perf_counter() - start
+                    request_start = time.perf_counter()
+                    response = client.post("/predict", json=payload)
+                    if response.status_code == 200:
+                        result["first_prediction"] = time.perf_counter() - start
+                        result["first_prediction_ms"] = (time.perf_counter() - request_start) * 1000
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(poll_seconds)
+            else:
+                raise RuntimeError("The API did not serve a prediction within 120s.")
+
+            request_start = time.perf_counter()
+            client.post("/predict", json=payload)
+            result["second_prediction_ms"] = (time.perf_counter() - request_start) * 1000
+
+            # In background mode predictions may succeed before the warm-up has finished
+            while (health := client.get("/health")).status_code != 200:
+                time.sleep(poll_seconds)
+            result["startup"] = health.json().get("startup", {"phases_seconds": {}})
+    finally:
+        server.terminate()
+        server.wait()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Time from API process start to the first successful prediction.")
+    parser.add_argument("--repeat", type=int, default=5, help="Restarts per scenario; medians are reported.")
+    parser.add_argument("--poll-ms", type=float, default=10, help="Delay between polls of a starting API.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--app-dir", type=Path, default=config.ROOT_DIR,
+                        help="Run the API from another checkout, e.g. a git worktree of main, to compare.")
+    args = parser.parse_args()
+
+    model, preprocessor = fit_synthetic_pipeline()
+    payload = sample_payloads(1, seed=3)[0]
+
+    print(f"Median of {args.repeat} restarts; times in seconds since the process was started")
+    print(f"{'scenario':>22} {'live':>6} {'first ok':>9} {'1st (ms)':>9} {'2nd (ms)':>9}  startup phases (s)")
+    with tempfile.TemporaryDirectory() as model_dir:
+        export_model_version(model, preprocessor, Path(model_dir))
+        for name in args.scenarios:
+            runs = [measure_restart(args.app_dir, Path(model_dir), SCENARIOS[name], payload, args.poll_ms / 1000) for _ in range(args.repeat)]
+            median = {key: statistics.median(run[key] for run in runs) for key in runs[0] if key != "startup"}
+            phases = {
+                phase: statistics.median(run["startup"]["phases_seconds"][phase] for run in runs)
+                for phase in runs[0]["startup"]["phases_seconds"]
+            }
+            print(
+                f"{name:>22} {median['live']:>6.2f} {median['first_prediction']:>9.2f} "
+                f"{median['first_prediction_ms']:>9.1f} {median['second_prediction_ms']:>9.1f}  "
+                + ", ".join(f"{phase} {seconds:.2f}" for phase, seconds in phases.items())
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/bench_tune.py
+#
+# Wall-clock time of hyperparameter tuning vs. the number of worker processes.
+#
+# Usage: python -m benchmarks.bench_tune --workers 1 2 4 --n-candidates 27
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from src.preprocessing import engineer_features
+from src.synthetic import generate_houses
+from src.tune import build_fold_cache, tune
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tuning wall-clock time vs. worker processes.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rows", type=int, default=1460)
+    parser.add_argument("--n-candidates", type=int, default=27)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--strategy", choices=["random", "halving"], default="halving")
+    parser.add_argument("--max-estimators", type=int, default=500)
+    args = parser.parse_args()
+
+    houses = generate_houses(args.rows, seed=42)
+    y = np.log1p(houses.pop("SalePrice"))
+    X = engineer_features(houses)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Preprocess the folds up front so every run measures the search alone
+        build_fold_cache(X, y, args.folds, 42, cache_dir)
+
+        print(f"cores: {os.cpu_count()}")
+        print(f"{'workers':>8} {'threads':>8} {'wall (s)':>10} {'speedup':>9} {'best RMSE':>10}")
+        baseline = None
+        for workers in args.workers:
+            _, summary = tune(
+                X, y, strategy=args.strategy, n_candidates=args.n_candidates, n_folds=args.folds,
+                workers=workers, max_estimators=args.max_estimators, cache_dir=cache_dir,
+            )
+            baseline = baseline or summary["wall_seconds"]
+            print(
+                f"{workers:>8} {summary['threads_per_worker']:>8} {summary['wall_seconds']:>10.2f} "
+                f"{baseline / summary['wall_seconds']:>8.2f}x {summary['best_cv_rmse']:>10.4f}"
+            )
+
+if __name__ == "__main__":
+    main()
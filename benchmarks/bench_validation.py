@@ -0,0 +1,95 @@
+# benchmarks/bench_validation.py
+#
+# Cost of decoding and validating request bodies and serializing responses,
+# per /predict request and per 1k-house /predict/batch request: the previous
+# path (json.loads, a HouseData instance dumped back to a dict, and FastAPI's
+# jsonable_encoder + json.dumps for the response) vs. the current one (raw bytes
+# validated by pydantic-core into plain dicts, FastJSONResponse for batches).
+#
+# Usage: python -m benchmarks.bench_validation --batch-size 1000
+
+import argparse
+import json
+import time
+
+def best_seconds(func, repeat: int, number: int) -> float:
+    """Returns the best average time in seconds of `number` calls to func, over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark request validation and response serialization.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from typing import Any, Dict, List
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from app.main import HouseData, house_records
+    from app.serialization import FastJSONResponse, parse_json_array
+    from src.synthetic import generate_payloads
+
+    houses = generate_payloads(args.batch_size, seed=1)
+    single_body = json.dumps(houses[0]).encode()
+    batch_body = json.dumps(houses).encode()
+    # What FastAPI validated a `List[Dict[str, Any]]` batch body against
+    raw_batch = TypeAdapter(List[Dict[str, Any]])
+
+    single_result = {"predicted_price_formatted": "$181,234.56"}
+    batch_result = {
+        "n_houses": len(houses), "n_predicted": len(houses), "n_errors": 0,
+        "results": [
+            {"index": i, "predicted_price": 181234.5625 + i, "predicted_price_formatted": f"${181234.5625 + i:,.2f}"}
+            for i in range(len(houses))
+        ],
+    }
+
+    cases = {
+        "/predict": {
+            "before": (
+                lambda: HouseData.model_validate(json.loads(single_body)).model_dump(by_alias=True),
+                lambda: JSONResponse(jsonable_encoder(single_result)),
+            ),
+            "after": (
+                lambda: house_records.parse_json(single_body),
+                lambda: JSONResponse(jsonable_encoder(single_result)),
+            ),
+        },
+        f"/predict/batch ({len(houses)} houses)": {
+            "before": (
+                lambda: [
+                    HouseData.model_validate(house).model_dump(by_alias=True)
+                    for house in raw_batch.validate_python(json.loads(batch_body))
+                ],
+                lambda: JSONResponse(jsonable_encoder(batch_result)),
+            ),
+            "after": (
+                lambda: [house_records.validate(house) for house in parse_json_array(batch_body)],
+                lambda: FastJSONResponse(batch_result),
+            ),
+        },
+    }
+
+    print(f"{'request':<28} {'path':<7} {'parse + validate':>17} {'serialize':>10} {'total':>10}")
+    for request, paths in cases.items():
+        number = 2000 if request == "/predict" else 5
+        for path, (parse, serialize) in paths.items():
+            parse_seconds = best_seconds(parse, args.repeat, number)
+            serialize_seconds = best_seconds(serialize, args.repeat, number)
+            total = parse_seconds + serialize_seconds
+            unit, scale = ("µs", 1e6) if request == "/predict" else ("ms", 1e3)
+            print(
+                f"{request:<28} {path:<7} {parse_seconds * scale:>14.1f} {unit} {serialize_seconds * scale:>7.1f} {unit} "
+                f"{total * scale:>7.1f} {unit}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/common.py
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Import our custom modules
+from src import config
+from src.model import create_model
+from src.preprocessing import create_preprocessor, engineer_features, model_feature_params
+from src.synthetic import generate_houses, generate_payloads
+
+def fit_synthetic_pipeline(n_rows: int = 1460, seed: int = 42, encoding: str = None, **model_params):
+    """
+    Fits a preprocessor and model on synthetic houses, like src/train.py does.
+
+    Args:
+        n_rows (int): The number of synthetic training houses.
+        seed (int): Seed for the synthetic data.
+        encoding (str): The categorical encoding. Defaults to CATEGORICAL_ENCODING.
+        **model_params: Hyperparameters overriding XGBOOST_PARAMS.
+
+    Returns:
+        tuple: A tuple containing the fitted model and preprocessor.
+    """
+    houses = generate_houses(n_rows, seed=seed)
+    y_log = np.log1p(houses.pop("SalePrice"))
+    X = engineer_features(houses)
+
+    numerical_features = X.select_dtypes(include=np.number).columns.tolist()
+    categorical_features = X.select_dtypes(exclude=np.number).columns.tolist()
+    preprocessor = create_preprocessor(numerical_features, categorical_features, encoding=encoding)
+    X_processed = preprocessor.fit_transform(X)
+
+    model = create_model(**model_feature_params(preprocessor), **model_params)
+    model.fit(X_processed, y_log)
+    return model, preprocessor
+
+def export_model_version(model, preprocessor, model_dir: Path, version: str = None) -> Path:
+    """
+    Saves a model version with every export src/train.py writes, so an API can serve it from model_dir.
+
+    Returns:
+        Path: The model's joblib file.
+    """
+    import joblib
+    from src.export import PreprocessorParams
+    from src.train import save_native_model
+
+    version = version or config.get_model_version()
+    model_dir = Path(model_dir)
+    joblib.dump(preprocessor, model_dir / config.get_versioned_preprocessor_name(version))
+    PreprocessorParams.from_preprocessor(preprocessor).save(model_dir / config.get_versioned_preprocessor_params_name(version))
+    save_native_model(model, model_dir / config.get_versioned_native_model_name(version))
+    model_path = model_dir / config.get_versioned_model_name(version)
+    joblib.dump(model, model_path)
+    return model_path
+
+def sample_payloads(n_rows: int, seed: int = 0) -> list:
+    """
+    Generates synthetic houses validated against the API's HouseData schema.
+
+    Args:
+        n_rows (int): The number of houses.
+        seed (int): Seed for the synthetic data.
+
+    Returns:
+        list: One dictionary per house, as HouseData dumps it, with missing values as None.
+    """
+    from app.main import HouseData
+
+    return [HouseData.model_validate(house).model_dump(by_alias=True) for house in generate_payloads(n_rows, seed=seed)]
+
+def time_call(func, *args, repeat: int = 1) -> float:
+    """Returns the best wall-clock time in seconds of `repeat` calls to func(*args)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,388 @@
+# benchmarks/suite.py
+#
+# Reproducible inference benchmarks with a regression gate.
+#
+# Usage:
+#   python -m benchmarks.suite run --output benchmarks/results/current.json
+#   python -m benchmarks.suite compare benchmarks/results/current.json benchmarks/results/baseline.json --threshold 0.2
+#
+# `run` fits a model on synthetic houses, saves it like src/train.py does and
+# measures the library functions, a cold worker process and the FastAPI app
+# through an in-process test client. `compare` exits with status 1 when a
+# metric is worse than the baseline by more than the threshold, and both
+# commands exit with status 1 when a metric is over its latency budget.
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+# Import our custom modules
+from src import config
+from benchmarks.common import export_model_version, fit_synthetic_pipeline, sample_payloads, time_call
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Absolute limits, checked on every run whatever the baseline. Explanations run TreeSHAP
+# over every tree of the model, so they are allowed far more than a prediction.
+LATENCY_BUDGETS_MS = {
+    "library.explain_one.p99_ms": 25.0,
+    "api.predict_explain.p99_ms": 40.0,
+}
+
+def latency_metrics(name: str, func, payloads: list) -> dict:
+    """
+    Times `func` on each payload and summarizes the latency distribution.
+
+    Args:
+        name (str): The metric name prefix.
+        func (Callable): Scores one payload.
+        payloads (list): The payloads, scored one at a time.
+
+    Returns:
+        dict: p50, p90, p99 and mean latencies in milliseconds.
+    """
+    func(payloads[0])  # warm-up
+    timings = np.empty(len(payloads))
+    for i, payload in enumerate(payloads):
+        start = time.perf_counter()
+        func(payload)
+        timings[i] = time.perf_counter() - start
+    timings *= 1000
+    p50, p90, p99 = np.percentile(timings, [50, 90, 99])
+    return {
+        f"{name}.p50_ms": metric(p50, "ms"),
+        f"{name}.p90_ms": metric(p90, "ms"),
+        f"{name}.p99_ms": metric(p99, "ms"),
+        f"{name}.mean_ms": metric(timings.mean(), "ms"),
+    }
+
+def metric(value: float, unit: str, better: str = "lower", budget: float = None) -> dict:
+    """A single benchmark result; `better` says which direction is an improvement, `budget` the worst value allowed."""
+    result = {"value": float(value), "unit": unit, "better": better}
+    if budget is not None:
+        result["budget"] = float(budget)
+    return result
+
+def apply_budgets(results: dict, budgets: dict = LATENCY_BUDGETS_MS) -> dict:
+    """Attaches the budget of every metric that has one."""
+    for name, budget in budgets.items():
+        if name in results:
+            results[name]["budget"] = float(budget)
+    return results
+
+def bench_library(model, preprocessor, n_rows: int, batch_sizes: list, repeat: int) -> dict:
+    """Single-row latency and batch throughput of the functions in app/predict.py and app/fast_predict.py."""
+    from app.fast_predict import CompiledPredictor
+    from app.predict import make_prediction, make_predictions
+
+    payloads = sample_payloads(n_rows, seed=1)
+    results = {}
+    results.update(latency_metrics(
+        "library.make_prediction", lambda p: make_prediction(p, model, preprocessor), payloads
+    ))
+    results.update(latency_metrics(
+        "library.fast_path", CompiledPredictor(model, preprocessor).predict_one, payloads
+    ))
+    results.update(bench_explain(model, preprocessor, payloads, repeat))
+
+    for batch_size in batch_sizes:
+        batch = sample_payloads(batch_size, seed=2)
+        seconds = time_call(make_predictions, batch, model, preprocessor, repeat=repeat)
+        results[f"library.make_predictions.{batch_size}.rows_per_s"] = metric(batch_size / seconds, "rows/s", "higher")
+    return results
+
+def bench_explain(model, preprocessor, payloads: list, repeat: int, batch_size: int = 100) -> dict:
+    """Single-row latency and batch throughput of prediction explanations."""
+    from app.executor import explain_many, explain_one
+    from app.explain import FeatureExplainer
+    from app.fast_predict import CompiledPredictor
+    from app.registry import ModelBundle
+
+    bundle = ModelBundle(
+        "bench", model, preprocessor, CompiledPredictor(model, preprocessor), FeatureExplainer(model, preprocessor)
+    )
+    results = latency_metrics("library.explain_one", lambda p: explain_one(bundle, p, 10), payloads)
+
+    batch = sample_payloads(batch_size, seed=3)
+    seconds = time_call(explain_many, bundle, batch, 10, repeat=repeat)
+    results[f"library.explain_many.{batch_size}.rows_per_s"] = metric(batch_size / seconds, "rows/s", "higher")
+    return results
+
+def probe_worker(model_dir: Path) -> dict:
+    """
+    Starts a fresh interpreter (benchmarks/worker_probe.py) that loads the model like an API worker does.
+
+    Returns:
+        dict: Import, model load and first prediction times, and the worker's resident memory.
+    """
+    env = dict(os.environ, MODEL_DIR=str(model_dir), PYTHONPATH=str(config.ROOT_DIR))
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.worker_probe"],
+        cwd=config.ROOT_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def bench_cold_start(model_dir: Path, repeat: int) -> dict:
+    """Cold-start time and memory of a new worker, best of `repeat` fresh processes."""
+    probes = [probe_worker(model_dir) for _ in range(repeat)]
+    best = min(probes, key=lambda p: p["import_seconds"] + p["load_seconds"])
+    return {
+        "cold_start.import_ms": metric(1000 * best["import_seconds"], "ms"),
+        "cold_start.model_load_ms": metric(1000 * best["load_seconds"], "ms"),
+        "cold_start.first_prediction_ms": metric(1000 * best["first_prediction_seconds"], "ms"),
+        "memory.worker_rss_mb": metric(min(p["rss_mb"] for p in probes), "MB"),
+        "memory.model_rss_mb": metric(min(p["model_rss_mb"] for p in probes), "MB"),
+    }
+
+# An older version of the benchmark model that shadows the served one in `bench_api`
+SHADOW_VERSION = "19700101_000000"
+
+def bench_api(model_dir: Path, n_rows: int, batch_sizes: list, repeat: int, shadow_version: str = None) -> dict:
+    """
+    End-to-end latency, throughput and bytes on the wire through the FastAPI app with an in-process test client.
+
+    With a `shadow_version`, /predict latency is measured once more while that version shadows the served one.
+    """
+    import pyarrow as pa
+    from fastapi.testclient import TestClient
+    from app import main, predict
+    from app.serialization import ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE, encode_table
+
+    results = {}
+    # Measure the model, not the prediction cache; both settings are restored afterwards
+    with (
+        mock.patch.object(predict, "MODEL_DIR", model_dir),
+        mock.patch.object(main, "PREDICTION_CACHE_ENABLED", False),
+        TestClient(main.app) as client,
+    ):
+        payloads = sample_payloads(n_rows, seed=4)
+        results.update(latency_metrics(
+            "api.predict", lambda p: client.post("/predict", json=p).raise_for_status(), payloads
+        ))
+        results.update(latency_metrics(
+            "api.predict_explain", lambda p: client.post("/predict/explain", json=p).raise_for_status(), payloads
+        ))
+        for batch_size in batch_sizes:
+            batch = sample_payloads(batch_size, seed=5)
+            post = lambda: client.post("/predict/batch", json=batch).raise_for_status()
+            seconds = time_call(post, repeat=repeat)
+            results[f"api.predict_batch.{batch_size}.rows_per_s"] = metric(batch_size / seconds, "rows/s", "higher")
+
+            # The same batch as columnar bodies, encoded by the client from a table it already has
+            table = pa.Table.from_pylist(batch)
+            for name, media_type in (("arrow", ARROW_STREAM_MEDIA_TYPE), ("parquet", PARQUET_MEDIA_TYPE)):
+                post = lambda: client.post(
+                    "/predict/batch", content=encode_table(table, media_type), headers={"Content-Type": media_type},
+                ).raise_for_status()
+                seconds = time_call(post, repeat=repeat)
+                results[f"api.predict_batch_{name}.{batch_size}.rows_per_s"] = metric(batch_size / seconds, "rows/s", "higher")
+
+        # Bytes on the wire per house for the largest batch, request and response
+        batch_size = max(batch_sizes)
+        batch = sample_payloads(batch_size, seed=5)
+        table = pa.Table.from_pylist(batch)
+        bodies = {
+            "json": (json.dumps(batch).encode(), "application/json"),
+            "arrow": (encode_table(table, ARROW_STREAM_MEDIA_TYPE), ARROW_STREAM_MEDIA_TYPE),
+            "parquet": (encode_table(table, PARQUET_MEDIA_TYPE), PARQUET_MEDIA_TYPE),
+        }
+        for name, (body, media_type) in bodies.items():
+            response = client.post("/predict/batch", content=body, headers={"Content-Type": media_type})
+            response.raise_for_status()
+            results[f"wire.predict_batch_{name}.request_bytes_per_row"] = metric(len(body) / batch_size, "B")
+            results[f"wire.predict_batch_{name}.response_bytes_per_row"] = metric(len(response.content) / batch_size, "B")
+
+        # A 100-point what-if curve, which should cost about one 100-house batch
+        sweep = {"house": payloads[0], "sweeps": [{"feature": "GrLivArea", "start": 800, "stop": 3000, "num": 100}]}
+        seconds = time_call(lambda: client.post("/predict/sweep", json=sweep).raise_for_status(), repeat=repeat)
+        results["api.predict_sweep.100.ms"] = metric(seconds * 1000, "ms")
+
+        # The same requests with a shadow model, which must not show in their latency
+        if shadow_version is not None:
+            main.pool.configure({"current": 1}, shadow_version)
+            results.update(latency_metrics(
+                "api.predict_shadowed", lambda p: client.post("/predict", json=p).raise_for_status(), payloads
+            ))
+            main.pool.configure({"current": 1})
+    return results
+
+def run_suite(n_rows: int = 500, batch_sizes: list = (1, 100, 1000, 10000), repeat: int = 3) -> dict:
+    """
+    Runs every benchmark on a model fitted on synthetic houses.
+
+    Args:
+        n_rows (int): The number of houses timed one at a time.
+        batch_sizes (list): The batch sizes timed for throughput.
+        repeat (int): Repetitions per measurement; the best one is kept.
+
+    Returns:
+        dict: The run metadata and a flat mapping of metric name -> result.
+    """
+    model, preprocessor = fit_synthetic_pipeline()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as model_dir:
+        model_dir = Path(model_dir)
+        model_path = export_model_version(model, preprocessor, model_dir)
+        results["memory.model_file_mb"] = metric(model_path.stat().st_size / 2**20, "MB")
+
+        results.update(bench_library(model, preprocessor, n_rows, list(batch_sizes), repeat))
+        results.update(bench_cold_start(model_dir, repeat))
+        # The benchmark model again, under a version older than the served one, to shadow it
+        os.utime(export_model_version(model, preprocessor, model_dir, version=SHADOW_VERSION), (0, 0))
+        results.update(bench_api(model_dir, n_rows, list(batch_sizes), repeat, shadow_version=SHADOW_VERSION))
+
+    return {"meta": run_metadata(n_rows, batch_sizes, repeat), "metrics": apply_budgets(results)}
+
+def run_metadata(n_rows: int, batch_sizes: list, repeat: int) -> dict:
+    """Describes the machine and code a run was made on, so that results are compared like for like."""
+    import sklearn
+    import xgboost
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=config.ROOT_DIR, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "scikit-learn": sklearn.__version__,
+        "xgboost": xgboost.__version__,
+        "parameters": {"rows": n_rows, "batch_sizes": list(batch_sizes), "repeat": repeat},
+    }
+
+def compare_results(current: dict, baseline: dict, threshold: float, ignore: list = ()) -> list:
+    """
+    Compares two benchmark runs metric by metric.
+
+    Args:
+        current (dict): The run being checked.
+        baseline (dict): The stored reference run.
+        threshold (float): The tolerated relative slowdown, e.g. 0.2 for 20%.
+        ignore (list): Glob patterns of metrics reported but never counted as regressions.
+
+    Returns:
+        list: One row per metric present in both runs, with the relative change
+            (positive = worse) and whether it is a regression.
+    """
+    rows = []
+    for name, reference in baseline["metrics"].items():
+        if name not in current["metrics"]:
+            continue
+        value = current["metrics"][name]["value"]
+        change = (value - reference["value"]) / reference["value"] if reference["value"] else 0.0
+        if reference["better"] == "higher":
+            change = -change
+        rows.append({
+            "metric": name,
+            "baseline": reference["value"],
+            "current": value,
+            "unit": reference["unit"],
+            "change": change,
+            "regression": change > threshold and not any(fnmatch.fnmatch(name, p) for p in ignore),
+        })
+    return rows
+
+def check_budgets(results: dict) -> list:
+    """
+    Finds the metrics of a run that are over their budget.
+
+    Args:
+        results (dict): A benchmark run.
+
+    Returns:
+        list: One row per metric over its budget.
+    """
+    rows = []
+    for name, result in results["metrics"].items():
+        budget = result.get("budget")
+        if budget is None:
+            continue
+        over = result["value"] < budget if result["better"] == "higher" else result["value"] > budget
+        if over:
+            rows.append({"metric": name, "value": result["value"], "budget": budget, "unit": result["unit"]})
+    return rows
+
+def print_budgets(results: dict, over_budget: list):
+    n_budgets = sum("budget" in result for result in results["metrics"].values())
+    for row in over_budget:
+        print(f"OVER BUDGET: {row['metric']} = {row['value']:.3f} {row['unit']} (budget {row['budget']:.3f})")
+    print(f"{len(over_budget)} of {n_budgets} budgeted metric(s) over budget.")
+
+def print_results(results: dict):
+    for name, result in results["metrics"].items():
+        print(f"{name:<48} {result['value']:>14.3f} {result['unit']}")
+
+def print_comparison(rows: list, threshold: float):
+    print(f"{'metric':<48} {'baseline':>12} {'current':>12} {'change':>9}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['metric']:<48} {row['baseline']:>12.3f} {row['current']:>12.3f} "
+            f"{100 * row['change']:>+8.1f}%{flag}"
+        )
+    n_regressions = sum(row["regression"] for row in rows)
+    print(f"{n_regressions} regression(s) beyond {100 * threshold:.0f}% (positive change = worse).")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run or compare the inference benchmark suite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks and write the results as JSON.")
+    run.add_argument("--output", type=Path, default=RESULTS_DIR / "current.json")
+    run.add_argument("--rows", type=int, default=500, help="Houses timed one at a time.")
+    run.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--baseline", type=Path, default=None, help="Compare against this run afterwards.")
+    run.add_argument("--threshold", type=float, default=0.2)
+    run.add_argument("--ignore", nargs="*", default=[], help="Glob patterns of metrics not gated, e.g. '*.p99_ms'.")
+
+    compare = commands.add_parser("compare", help="Fail if a result regressed against a baseline.")
+    compare.add_argument("current", type=Path)
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("--threshold", type=float, default=0.2, help="Tolerated relative regression.")
+    compare.add_argument("--ignore", nargs="*", default=[], help="Glob patterns of metrics not gated, e.g. '*.p99_ms'.")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_suite(args.rows, args.batch_sizes, args.repeat)
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+        print_results(results)
+        print(f"Results written to {args.output}")
+        current = results
+        baseline = json.loads(args.baseline.read_text()) if args.baseline is not None else None
+    else:
+        current = json.loads(args.current.read_text())
+        baseline = json.loads(args.baseline.read_text())
+
+    failed = False
+    if baseline is not None:
+        rows = compare_results(current, baseline, args.threshold, args.ignore)
+        print_comparison(rows, args.threshold)
+        failed = any(row["regression"] for row in rows)
+    over_budget = check_budgets(current)
+    print_budgets(current, over_budget)
+    if failed or over_budget:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# benchmarks/worker_probe.py
+#
+# Started in a fresh interpreter by benchmarks/suite.py to measure what an API
+# worker pays at startup. Only the standard library is imported up front so
+# that the import time of the app is measured too.
+#
+# Usage: MODEL_DIR=models python -m benchmarks.worker_probe
+
+import json
+import time
+
+def main():
+    start = time.perf_counter()
+    import psutil
+    from app.main import HouseData, registry
+    import_seconds = time.perf_counter() - start
+
+    process = psutil.Process()
+    rss_before_load = process.memory_info().rss
+
+    start = time.perf_counter()
+    registry.refresh()
+    load_seconds = time.perf_counter() - start
+
+    payload = HouseData.model_config["json_schema_extra"]["example"]
+    start = time.perf_counter()
+    registry.current.fast_predictor.predict_one(payload)
+    first_prediction_seconds = time.perf_counter() - start
+
+    rss = process.memory_info().rss
+    print(json.dumps({
+        "import_seconds": import_seconds,
+        "load_seconds": load_seconds,
+        "first_prediction_seconds": first_prediction_seconds,
+        "rss_mb": rss / 2**20,
+        "model_rss_mb": (rss - rss_before_load) / 2**20,
+    }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# src/compact.py
+
+import time
+
+# Import our custom modules
+from src.config import COMPACT_ITERATIONS_ATTR
+from src.evaluate import calculate_rmse, calculate_r2
+from src.flat_trees import FlatTreeEnsemble, dense_features
+from src.logger_config import logger
+
+def find_tree_count(model, X_val, y_val, tolerance: float, step: int = 10) -> tuple:
+    """
+    Finds the fewest boosting rounds whose held-out RMSE is within a tolerance of the full model's.
+
+    The model is scored with `iteration_range=(0, n)` for every `step`
+    rounds, so it is not retrained. RMSE is not monotonic in the number of
+    rounds, so the first count that meets the tolerance is taken, not the
+    best one.
+
+    Args:
+        model: The trained XGBoost model.
+        X_val: The held-out preprocessed features.
+        y_val: The held-out targets.
+        tolerance (float): Allowed relative RMSE increase, e.g. 0.01 for 1%.
+        step (int): Spacing of the candidate round counts.
+
+    Returns:
+        tuple: The number of rounds, the full model's RMSE and the compact model's RMSE.
+    """
+    booster = model.get_booster()
+    n_rounds = booster.num_boosted_rounds()
+    full_rmse = calculate_rmse(y_val, booster.inplace_predict(X_val))
+    for n in [*range(step, n_rounds, step), n_rounds]:
+        rmse = calculate_rmse(y_val, booster.inplace_predict(X_val, iteration_range=(0, n)))
+        if rmse <= full_rmse * (1 + tolerance):
+            return n, full_rmse, rmse
+    return n_rounds, full_rmse, full_rmse
+
+def _best_seconds(func, repeat: int = 20) -> float:
+    """The fastest of `repeat` calls to func, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def compact_model(model, X_val, y_val, tolerance: float, prune_tolerance: float = None) -> tuple:
+    """
+    Finds the compact tree count of a trained model, compiles its flat evaluator and reports the cost of both.
+
+    The round count is stored on the booster (COMPACT_ITERATIONS_ATTR), so
+    it is saved with the model and the API can stop XGBoost there
+    (COMPACT_MODEL='trees'); the model itself keeps all its trees. The flat
+    evaluator holds the same rounds, with sibling leaves closer than
+    `prune_tolerance` merged (COMPACT_MODEL='flat').
+
+    Args:
+        model: The trained XGBoost model.
+        X_val: The held-out preprocessed features.
+        y_val: The held-out targets, on the model's (log) scale.
+        tolerance (float): Allowed relative RMSE increase of the compact model.
+        prune_tolerance (float): See `FlatTreeEnsemble.from_booster`.
+
+    Returns:
+        tuple: The FlatTreeEnsemble (None if the model cannot be flattened, e.g. with native
+            categorical splits) and a report of the RMSE, R², size and single-row and
+            per-row batch latency of the full, compact and flat models.
+    """
+    booster = model.get_booster()
+    n_rounds = booster.num_boosted_rounds()
+    n_compact, _, _ = find_tree_count(model, X_val, y_val, tolerance)
+    booster.set_attr(**{COMPACT_ITERATIONS_ATTR: str(n_compact)})
+
+    try:
+        flat_trees = FlatTreeEnsemble.from_booster(booster, (0, n_compact), prune_tolerance)
+    except ValueError as e:
+        logger.warning(f"The flat tree evaluator cannot reproduce this model: {e}")
+        flat_trees = None
+
+    # Latency is measured with one thread, like a prediction in an API inference worker
+    timed = booster.copy()
+    timed.set_param("nthread", 1)
+    X_dense = dense_features(X_val)
+    rows = X_dense[:1000]
+    scorers = {
+        "full": lambda X: timed.inplace_predict(X),
+        "compact": lambda X: timed.inplace_predict(X, iteration_range=(0, n_compact)),
+    }
+    sizes = {"full": len(booster.save_raw("ubj")), "compact": len(booster[:n_compact].save_raw("ubj"))}
+    if flat_trees is not None:
+        scorers["flat"] = flat_trees.predict
+        sizes["flat"] = flat_trees.nbytes
+
+    report = {
+        "n_rounds": n_rounds,
+        "n_rounds_compact": n_compact,
+        "rmse_tolerance": tolerance,
+        "prune_tolerance": prune_tolerance,
+        "flat_trees": flat_trees.n_trees if flat_trees is not None else None,
+        "flat_nodes": flat_trees.n_nodes if flat_trees is not None else None,
+        "rmse": {}, "r2": {}, "size_bytes": sizes, "single_row_us": {}, "batch_per_row_us": {},
+    }
+    for name, scorer in scorers.items():
+        y_pred = scorer(X_dense)
+        report["rmse"][name] = float(calculate_rmse(y_val, y_pred))
+        report["r2"][name] = float(calculate_r2(y_val, y_pred))
+        report["single_row_us"][name] = _best_seconds(lambda: scorer(rows[:1])) * 1e6
+        report["batch_per_row_us"][name] = _best_seconds(lambda: scorer(rows), repeat=3) / len(rows) * 1e6
+    report["rmse_delta"] = {name: rmse - report["rmse"]["full"] for name, rmse in report["rmse"].items() if name != "full"}
+    report["r2_delta"] = {name: r2 - report["r2"]["full"] for name, r2 in report["r2"].items() if name != "full"}
+    return flat_trees, report
+
+def log_report(report: dict):
+    """Logs a `compact_model` report, one line per model."""
+    logger.info(
+        f"Compact model: {report['n_rounds_compact']} of {report['n_rounds']} rounds "
+        f"(RMSE within {report['rmse_tolerance']:.1%})."
+    )
+    for name in report["rmse"]:
+        logger.info(
+            f"  - {name:<7} RMSE {report['rmse'][name]:.4f}, R² {report['r2'][name]:.4f}, "
+            f"{report['size_bytes'][name] / 2**20:.2f} MiB, single row {report['single_row_us'][name]:.0f}us, "
+            f"batch {report['batch_per_row_us'][name]:.1f}us/row"
+        )
@@ -0,0 +1,98 @@
+# src/comps.py
+
+import time
+
+import numpy as np
+
+# Import our custom modules
+from src.logger_config import logger
+
+# scikit-learn is imported where the index is built, as the API only needs `scale_points`
+INDEX_ALGORITHMS = ("kd_tree", "ball_tree")
+
+def numeric_scaling(preprocessor, features: list) -> tuple:
+    """
+    Reads the imputation and scaling the fitted preprocessor applies to some numeric features.
+
+    Args:
+        preprocessor: The fitted ColumnTransformer from `create_preprocessor`.
+        features (list): Numeric input columns of the preprocessor.
+
+    Returns:
+        tuple: The fill values, means and scales of the features, as float64 arrays.
+
+    Raises:
+        ValueError: If a feature is not imputed and standardized by the preprocessor.
+    """
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    scaling = {}
+    for name, transformer, columns in preprocessor.transformers_:
+        if not (isinstance(transformer, Pipeline) and isinstance(transformer[-1], StandardScaler)):
+            continue
+        imputer, scaler = transformer[0], transformer[-1]
+        fill_values = imputer.statistics_ if isinstance(imputer, SimpleImputer) else np.full(len(columns), np.nan)
+        for i, column in enumerate(columns):
+            scaling[column] = (fill_values[i], scaler.mean_[i], scaler.scale_[i])
+
+    missing = [feature for feature in features if feature not in scaling]
+    if missing:
+        raise ValueError(f"Features not standardized by the preprocessor: {missing}")
+    fill_values, means, scales = (np.array(values, dtype=np.float64) for values in zip(*(scaling[f] for f in features)))
+    return fill_values, means, scales
+
+def scale_points(values: np.ndarray, fill_values: np.ndarray, means: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Imputes and standardizes raw feature values like the preprocessor's numeric pipeline."""
+    values = np.where(np.isnan(values), fill_values, values)
+    return (values - means) / scales
+
+def build_comps_index(X, sale_prices, preprocessor, features: list, ids=None, algorithm: str = "kd_tree",
+                      leaf_size: int = 40) -> dict:
+    """
+    Indexes the training houses for the comparable-sales ("comps") lookup.
+
+    Houses are points in a small space of numeric features (COMPS_FEATURES),
+    imputed and standardized with the statistics of the model version's
+    preprocessor, so a feature's spread counts the same as in the model's
+    inputs. The points are indexed once, here, by a KD-tree (or a ball
+    tree), so a query visits a few leaves instead of scanning every
+    training house.
+
+    Args:
+        X (pd.DataFrame): The engineered training houses.
+        sale_prices: Their sale prices, in dollars.
+        preprocessor: The preprocessor fitted on them, for the imputation and scaling of the features.
+        features (list): The numeric features of the index space.
+        ids: Identifiers of the houses. Defaults to X's index.
+        algorithm (str): 'kd_tree' or 'ball_tree'.
+        leaf_size (int): Points per leaf of the tree.
+
+    Returns:
+        dict: The features, their fill values, means and scales, the tree, and the sale prices, ids and
+            (n_houses, n_features) float32 raw values (NaN where missing) of the training houses.
+            Saved with joblib next to the model version and queried by `app.comps.ComparablesIndex`.
+    """
+    if algorithm not in INDEX_ALGORITHMS:
+        raise ValueError(f"Unknown comparables index algorithm: {algorithm!r}")
+    from sklearn.neighbors import BallTree, KDTree
+
+    fill_values, means, scales = numeric_scaling(preprocessor, features)
+    values = X[features].to_numpy(dtype=np.float32, na_value=np.nan)
+
+    start = time.perf_counter()
+    points = scale_points(values, fill_values, means, scales)
+    tree = (KDTree if algorithm == "kd_tree" else BallTree)(points, leaf_size=leaf_size)
+    logger.info(f"Comparables index of {len(points)} houses built in {time.perf_counter() - start:.2f}s ({algorithm}).")
+
+    return {
+        "features": list(features),
+        "fill_values": fill_values,
+        "means": means,
+        "scales": scales,
+        "tree": tree,
+        "sale_prices": np.asarray(sale_prices, dtype=np.float64),
+        "ids": np.asarray(X.index if ids is None else ids),
+        "values": values,
+    }
@@ -1,5 +1,6 @@
 # src/config.py
 
+import os
 import pathlib
 from datetime import datetime
 
@@ -12,38 +13,71 @@ ROOT_DIR = pathlib.Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
-MODEL_DIR = ROOT_DIR / "models"
-
-# --- START OF FIX ---
-# Create directories if they don't exist, including parent directories
-PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
-MODEL_DIR.mkdir(parents=True, exist_ok=True)
-# --- END OF FIX ---
-
-# Create directories if they don't exist
-PROCESSED_DATA_DIR.mkdir(exist_ok=True)
-MODEL_DIR.mkdir(exist_ok=True)
+MODEL_DIR = pathlib.Path(os.getenv("MODEL_DIR", ROOT_DIR / "models"))
+# Directories are created by the code that writes to them, not on import, so
+# that the API can start from a read-only image
 
 # Raw data file
 RAW_DATA_FILE = RAW_DATA_DIR / "train.csv"
 
-# --- START OF NEW CODE ---
-# Processed data files
-# These files will be created by the preprocessing script
-PROCESSED_X_TRAIN_FILE = PROCESSED_DATA_DIR / "X_train.csv"
-PROCESSED_X_TEST_FILE = PROCESSED_DATA_DIR / "X_test.csv"
-PROCESSED_Y_TRAIN_FILE = PROCESSED_DATA_DIR / "y_train.csv"
-PROCESSED_Y_TEST_FILE = PROCESSED_DATA_DIR / "y_test.csv"
-# --- END OF NEW CODE ---
+# Feature store of processed splits and fitted preprocessors, one directory per
+# hash of the raw file, the feature settings and the preprocessing code
+FEATURE_STORE_DIR = PROCESSED_DATA_DIR
+
+# Train/test split of the raw data
+TEST_SIZE = 0.2
+SPLIT_RANDOM_STATE = 42
 
 # Naming convention for the saved model files
 MODEL_NAME_PREFIX = "xgboost_model"
+PREPROCESSOR_NAME_PREFIX = "preprocessor"
+COMPS_INDEX_NAME_PREFIX = "comps_index"
 MODEL_FILE_EXTENSION = ".joblib"
+# Native XGBoost format, loadable without unpickling the scikit-learn wrapper
+NATIVE_MODEL_FILE_EXTENSION = ".ubj"
+
+def get_model_version():
+    """Generates a model version from the current timestamp."""
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+def get_versioned_model_name(version: str = None):
+    """Generates a model filename with a timestamp (or the given version)."""
+    version = version or get_model_version()
+    return f"{MODEL_NAME_PREFIX}_{version}{MODEL_FILE_EXTENSION}"
+
+def get_versioned_preprocessor_name(version: str):
+    """Generates the filename of the preprocessor fitted together with a model version."""
+    return f"{PREPROCESSOR_NAME_PREFIX}_{version}{MODEL_FILE_EXTENSION}"
+
+def get_versioned_native_model_name(version: str):
+    """Generates the filename of a model version exported in XGBoost's UBJSON format."""
+    return f"{MODEL_NAME_PREFIX}_{version}{NATIVE_MODEL_FILE_EXTENSION}"
+
+def get_versioned_preprocessor_params_name(version: str):
+    """Generates the base filename (.json layout + .npy arrays) of a version's compiled preprocessor parameters."""
+    return f"{PREPROCESSOR_NAME_PREFIX}_{version}_params"
+
+def get_versioned_flat_model_name(version: str):
+    """Generates the filename of a model version's compact trees compiled for the NumPy flat evaluator."""
+    return f"{MODEL_NAME_PREFIX}_{version}_flat.npz"
+
+def get_versioned_compaction_report_name(version: str):
+    """Generates the filename of the latency, size and accuracy report of a model version's compaction."""
+    return f"compaction_{version}.json"
 
-def get_versioned_model_name():
-    """Generates a model filename with a timestamp."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"{MODEL_NAME_PREFIX}_{timestamp}{MODEL_FILE_EXTENSION}"
+def get_versioned_comps_index_name(version: str):
+    """Generates the filename of the comparable-sales index built from a model version's training houses."""
+    return f"{COMPS_INDEX_NAME_PREFIX}_{version}{MODEL_FILE_EXTENSION}"
+
+def get_versioned_drift_profile_name(version: str):
+    """Generates the filename of the training input profile that a model version's input drift is measured against."""
+    return f"drift_profile_{version}.json"
+
+def parse_model_version(model_filename: str):
+    """Extracts the version from a model filename (the whole stem for legacy names)."""
+    stem = pathlib.Path(model_filename).stem
+    prefix = f"{MODEL_NAME_PREFIX}_"
+    return stem[len(prefix):] if stem.startswith(prefix) else stem
 
 
 # --- FEATURE LISTS ---
@@ -94,4 +128,166 @@ XGBOOST_PARAMS = {
     'colsample_bytree': 0.8,
     'random_state': 42,
     'n_jobs': -1  # Use all available CPU cores
-}
\ No newline at end of file
+}
+
+# Keep the preprocessed features in CSR form from the one-hot encoder to the model (set SPARSE_FEATURES=0
+# to densify them). Otherwise ColumnTransformer picks the format from the share of non-zeros, and the
+# format matters to the model: XGBoost treats the zeros a CSR matrix does not store as missing values.
+SPARSE_FEATURES_ENABLED = os.getenv("SPARSE_FEATURES", "1").lower() in ("1", "true", "yes")
+
+# Compaction after training: the compact model keeps the fewest boosting rounds whose RMSE on the test split
+# is within this relative tolerance of the full model's (e.g. 0.01 = 1% higher at most)
+COMPACT_MODEL_RMSE_TOLERANCE = float(os.getenv("COMPACT_MODEL_RMSE_TOLERANCE", "0.01"))
+# In the flat evaluator's trees, sibling leaves whose values (log price) differ by at most this much are merged
+COMPACT_MODEL_PRUNE_TOLERANCE = float(os.getenv("COMPACT_MODEL_PRUNE_TOLERANCE", "0"))
+# Booster attribute holding the boosting rounds of the compact model, saved with the model
+COMPACT_ITERATIONS_ATTR = "compact_iterations"
+
+# How categorical features reach the model: 'onehot' expands each into one column per level, 'native'
+# keeps one column of integer codes per feature (vocabulary frozen when the preprocessor is fitted)
+# and lets XGBoost split on the categories directly
+CATEGORICAL_ENCODING = os.getenv("CATEGORICAL_ENCODING", "onehot")
+
+# The space comparable sales are searched in: engineered numeric features, standardized like the model's inputs
+COMPS_FEATURES = [
+    "TotalSF", "GrLivArea", "OverallQual", "OverallCond", "HouseAge",
+    "LotArea", "GarageCars", "FullBath", "BedroomAbvGr", "TotRmsAbvGrd"
+]
+# 'kd_tree' or 'ball_tree' (scikit-learn); with ten dimensions both answer a query from a few leaves
+COMPS_INDEX_ALGORITHM = os.getenv("COMPS_INDEX_ALGORITHM", "kd_tree")
+
+# --- HYPERPARAMETER TUNING ---
+
+# Search space of `python -m src.train tune`: (distribution, low, high) per XGBoost parameter.
+# 'uniform' and 'log_uniform' draw floats, 'int' draws integers in [low, high].
+TUNING_SEARCH_SPACE = {
+    'learning_rate': ('log_uniform', 0.01, 0.2),
+    'max_depth': ('int', 3, 8),
+    'min_child_weight': ('log_uniform', 1.0, 10.0),
+    'subsample': ('uniform', 0.5, 1.0),
+    'colsample_bytree': ('uniform', 0.3, 1.0),
+    'reg_alpha': ('log_uniform', 1e-3, 1.0),
+    'reg_lambda': ('log_uniform', 0.1, 10.0),
+}
+# 'random' evaluates every candidate with the full tree budget; 'halving' gives
+# all candidates a small budget and only the best 1/TUNING_HALVING_FACTOR move up
+TUNING_STRATEGY = "halving"
+TUNING_N_CANDIDATES = 27
+TUNING_CV_FOLDS = 5
+TUNING_HALVING_FACTOR = 3
+# Maximum number of trees per candidate; early stopping on the validation fold picks the actual number
+TUNING_MAX_ESTIMATORS = 2000
+TUNING_EARLY_STOPPING_ROUNDS = 50
+# Preprocessed fold matrices, reused by every candidate and by later runs on the same data
+TUNING_CACHE_DIR = ROOT_DIR / "cache" / "tuning"
+LEADERBOARD_NAME_PREFIX = "leaderboard"
+
+def get_versioned_leaderboard_name(version: str):
+    """Generates the filename of the tuning leaderboard saved next to a model version."""
+    return f"{LEADERBOARD_NAME_PREFIX}_{version}.csv"
+
+# --- API CONFIGURATION ---
+
+# Maximum number of houses accepted in a single batch prediction request
+MAX_BATCH_SIZE = 10000
+
+# Explanations (per-field TreeSHAP contributions) cost about one tree traversal per tree, depth and row,
+# far more than a prediction, so their batches are kept smaller
+MAX_EXPLAIN_BATCH_SIZE = int(os.getenv("MAX_EXPLAIN_BATCH_SIZE", "500"))
+# Fields reported per explained house when the request does not ask for a number
+EXPLAIN_TOP_K = int(os.getenv("EXPLAIN_TOP_K", "10"))
+
+# Comparable sales returned per house when the request does not ask for a number, and the most it may ask for
+COMPS_K = int(os.getenv("COMPS_K", "5"))
+MAX_COMPS_K = int(os.getenv("MAX_COMPS_K", "50"))
+# Each house of a comps batch carries up to MAX_COMPS_K comparables, so the batches are kept smaller than predictions
+MAX_COMPS_BATCH_SIZE = int(os.getenv("MAX_COMPS_BATCH_SIZE", "1000"))
+
+# Maximum number of grid points (the product of the swept features' value counts) in one what-if sweep
+MAX_SWEEP_POINTS = int(os.getenv("MAX_SWEEP_POINTS", "2500"))
+
+# Serialize batch, batch explanation and sweep responses with pydantic-core instead of FastAPI's encoder and json.dumps
+FAST_JSON_RESPONSES_ENABLED = os.getenv("FAST_JSON_RESPONSES", "1").lower() in ("1", "true", "yes")
+
+# Opt-in micro-batching of concurrent /predict requests (set PREDICT_BATCHING=1 to enable)
+PREDICT_BATCHING_ENABLED = os.getenv("PREDICT_BATCHING", "0").lower() in ("1", "true", "yes")
+# How long to wait for more requests after the first one arrives, in milliseconds
+PREDICT_BATCH_WINDOW_MS = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "2"))
+# Maximum number of requests scored together in one micro-batch
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+
+# Serve single /predict requests through the compiled, pandas-free path (set PREDICT_FAST_PATH=0 to disable)
+PREDICT_FAST_PATH_ENABLED = os.getenv("PREDICT_FAST_PATH", "1").lower() in ("1", "true", "yes")
+
+# In-process cache of predicted prices, keyed on the house features and the model version
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE", "1").lower() in ("1", "true", "yes")
+# 'memory' (per worker) or 'disk' (a SQLite file shared by all workers on the host)
+PREDICTION_CACHE_BACKEND = os.getenv("PREDICTION_CACHE_BACKEND", "memory")
+PREDICTION_CACHE_MAX_SIZE = int(os.getenv("PREDICTION_CACHE_MAX_SIZE", "10000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+PREDICTION_CACHE_PATH = pathlib.Path(os.getenv("PREDICTION_CACHE_PATH", ROOT_DIR / "cache" / "predictions.sqlite"))
+
+# Inference runs on a dedicated pool: 'thread' workers share the loaded model, 'process' workers
+# each load their own copy and do not contend for the GIL
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+# Predictions scored at the same time, and the XGBoost/BLAS threads each one may use (0 = unpinned);
+# workers x threads should not exceed the cores available to the API process
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+INFERENCE_THREADS_PER_WORKER = int(os.getenv("INFERENCE_THREADS_PER_WORKER", "1"))
+# Predictions that may wait for a free worker; beyond that requests get 429 with a Retry-After header
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+INFERENCE_RETRY_AFTER_SECONDS = int(os.getenv("INFERENCE_RETRY_AFTER_SECONDS", "1"))
+
+# 'blocking' loads the model before the API accepts connections; 'background' accepts them right away
+# (liveness) and reports ready on /health once the model is loaded and warmed up
+STARTUP_MODE = os.getenv("STARTUP_MODE", "blocking")
+# Synthetic predictions run through the inference workers at startup, so that the first requests are not slower
+WARMUP_PREDICTIONS = int(os.getenv("WARMUP_PREDICTIONS", "8"))
+
+# Streaming statistics of the API inputs, scored against the training profile of the served model
+# (set DRIFT_MONITORING=0 to disable)
+DRIFT_MONITORING_ENABLED = os.getenv("DRIFT_MONITORING", "1").lower() in ("1", "true", "yes")
+# Scores cover the current window and the previous one (0 counts everything since the model was loaded)
+DRIFT_WINDOW_SECONDS = float(os.getenv("DRIFT_WINDOW_SECONDS", "3600"))
+# Drift scores are only exported once this many houses have been counted, as they are noise before that
+DRIFT_MIN_OBSERVATIONS = int(os.getenv("DRIFT_MIN_OBSERVATIONS", "100"))
+# Maximum number of quantile bins per numeric feature in the training profile
+DRIFT_PROFILE_BINS = 10
+
+# A/B routing of prediction requests between model versions, as comma-separated 'version=weight' pairs;
+# 'current' is the version the registry serves (the newest or the pinned one). Requests may also ask for
+# a version in the X-Model-Version header.
+MODEL_ROUTES = os.getenv("MODEL_ROUTES", "current=1")
+# A model version (or 'current') that scores /predict and /predict/batch requests too, off the response
+# path, with its predictions logged next to the served ones for comparison
+SHADOW_MODEL_VERSION = os.getenv("SHADOW_MODEL_VERSION") or None
+# Shadow scoring tasks that may be pending; beyond that the shadow model skips requests, it never delays them
+SHADOW_MAX_QUEUE = int(os.getenv("SHADOW_MAX_QUEUE", "16"))
+# Share of the shadow comparisons written to the prediction audit log
+SHADOW_LOG_SAMPLE_RATE = float(os.getenv("SHADOW_LOG_SAMPLE_RATE", "1.0"))
+
+# How often the API checks MODEL_DIR for a newly trained model, in seconds (0 disables hot reload)
+MODEL_RELOAD_INTERVAL_SECONDS = float(os.getenv("MODEL_RELOAD_INTERVAL_SECONDS", "30"))
+# 'native' loads the UBJSON booster and compiled preprocessor parameters when a version has them; 'joblib' always unpickles
+MODEL_FORMAT = os.getenv("MODEL_FORMAT", "native")
+# 'off' serves all the trees; 'trees' stops XGBoost at the compact model's round count; 'flat' scores the
+# compact trees with the NumPy flat evaluator (models without a compaction are served in full)
+COMPACT_MODEL = os.getenv("COMPACT_MODEL", "off")
+# Memory-map the compiled preprocessor arrays, so uvicorn workers on the host share their pages
+MODEL_MMAP_ENABLED = os.getenv("MODEL_MMAP", "1").lower() in ("1", "true", "yes")
+# The /admin endpoints require this value in the X-Admin-Token header; they are disabled (503) when it is unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# --- LOGGING ---
+
+# The application log (app.log) and the prediction audit log (predictions.jsonl) are written here
+LOG_DIR = pathlib.Path(os.getenv("LOG_DIR", ROOT_DIR / "logs"))
+
+# Hand log records to a background thread through a bounded queue, so that request threads never wait
+# for stdout or the log files (set LOG_QUEUE=0 to write them synchronously)
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE", "1").lower() in ("1", "true", "yes")
+# Records waiting to be written; when the queue is full, new records are dropped and counted
+LOG_QUEUE_MAX_SIZE = int(os.getenv("LOG_QUEUE_MAX_SIZE", "10000"))
+# Share of successful and of failed prediction requests written to the JSON audit log (logs/predictions.jsonl)
+PREDICTION_LOG_SAMPLE_RATE = float(os.getenv("PREDICTION_LOG_SAMPLE_RATE", "0.01"))
+PREDICTION_LOG_ERROR_SAMPLE_RATE = float(os.getenv("PREDICTION_LOG_ERROR_SAMPLE_RATE", "1.0"))
@@ -0,0 +1,70 @@
+# src/drift_profile.py
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+PROFILE_FORMAT_VERSION = 1
+
+def build_reference_profile(frame, n_bins: int = 10) -> dict:
+    """
+    Summarizes the training inputs of a model, to compare the houses the API receives against.
+
+    Numeric features are binned on their training quantiles (at most
+    `n_bins` bins, fewer where quantiles coincide), so that every bin holds
+    about the same share of the training houses. Categorical features keep
+    the count of every level seen in training; any other level is 'unseen',
+    which the one-hot encoder silently encodes as all zeros.
+
+    Args:
+        frame (pd.DataFrame): The raw training features, one column per API field.
+        n_bins (int): The maximum number of bins per numeric feature.
+
+    Returns:
+        dict: A JSON-serializable profile, read back with `DriftMonitor`.
+    """
+    numeric = {}
+    categorical = {}
+    for column in frame.columns:
+        values = frame[column]
+        if values.dtype.kind in "biuf":
+            present = values.to_numpy(dtype=np.float64)
+            present = present[~np.isnan(present)]
+            edges = np.unique(np.quantile(present, np.arange(1, n_bins) / n_bins)) if len(present) else np.empty(0)
+            counts = np.bincount(np.searchsorted(edges, present, side="right"), minlength=len(edges) + 1)
+            numeric[column] = {
+                "edges": edges.tolist(),
+                "counts": counts.tolist(),
+                "missing": int(len(values) - len(present)),
+            }
+        else:
+            counts = values.dropna().value_counts()
+            categorical[column] = {
+                "categories": counts.index.tolist(),
+                "counts": counts.tolist(),
+                "missing": int(values.isna().sum()),
+            }
+
+    return {
+        "format_version": PROFILE_FORMAT_VERSION,
+        "n_rows": len(frame),
+        "numeric": numeric,
+        "categorical": categorical,
+    }
+
+def save_reference_profile(profile: dict, path: Path):
+    """
+    Writes a reference profile as JSON, atomically.
+
+    Args:
+        profile (dict): The profile from `build_reference_profile`.
+        path (Path): The destination file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(profile, f)
+    os.replace(tmp_path, path)
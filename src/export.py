@@ -0,0 +1,304 @@
+# src/export.py
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Version of the files written by `PreprocessorParams.save`
+PARAMS_FORMAT_VERSION = 1
+
+def is_missing(value) -> bool:
+    """
+    True for None and NaN. The pandas path replaces None by NaN before the
+    imputers, so both are missing, as in the training data.
+    """
+    return value is None or value != value
+
+class PreprocessorParams:
+    """
+    The fitted parameters of a preprocessor, without scikit-learn objects.
+
+    The imputer fill values and the scaler means and scales are flat NumPy
+    arrays, and the one-hot and ordinal vocabularies are lists, laid out
+    by the output columns of the ColumnTransformer they were read from.
+    src/train.py exports them next to each model version in a compact,
+    pickle-free format. They stand in for the ColumnTransformer when a
+    version is loaded in the native format (`transform`), and the API's
+    compiled fast path is built on them.
+    """
+
+    def __init__(self, n_features: int, zeros_are_missing: bool, numeric_blocks: list, categorical_blocks: list,
+                 ordinal_blocks: list):
+        """
+        Args:
+            n_features (int): The number of output columns.
+            zeros_are_missing (bool): The preprocessor outputs CSR, whose unstored zeros XGBoost treats as missing.
+            numeric_blocks (list): (offset, columns, fill_values, means, scales) of each imputed and scaled block.
+            categorical_blocks (list): (columns, fill_values, lookups, ignore_unknown) of each one-hot block,
+                where each lookup maps a category to its output column.
+            ordinal_blocks (list): (offset, columns, fill_values, lookups, unknown_value) of each ordinal block,
+                where each lookup maps a category to its code, and unknown_value is None when an unknown
+                category is an error.
+        """
+        self.n_features = n_features
+        self.zeros_are_missing = zeros_are_missing
+        self.numeric_blocks = numeric_blocks
+        self.categorical_blocks = categorical_blocks
+        self.ordinal_blocks = ordinal_blocks
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor) -> "PreprocessorParams":
+        """
+        Reads the parameters of a fitted ColumnTransformer from `create_preprocessor`.
+
+        Args:
+            preprocessor: The fitted preprocessing pipeline.
+
+        Returns:
+            PreprocessorParams: Its parameters.
+
+        Raises:
+            ValueError: If the preprocessor contains steps the parameters cannot reproduce.
+        """
+        from sklearn.impute import SimpleImputer
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+        # When the ColumnTransformer emits CSR, XGBoost treats every unstored zero as
+        # missing, so a dense vector must use NaN there to take the same tree branches.
+        params = cls(0, bool(getattr(preprocessor, 'sparse_output_', False)), [], [], [])
+
+        offset = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == 'drop' or len(columns) == 0:
+                continue
+            if name == 'remainder':
+                columns = [preprocessor.feature_names_in_[i] for i in columns]
+            columns = list(columns)
+
+            if transformer == 'passthrough':
+                params._add_numeric_block(offset, columns, None, None)
+                offset += len(columns)
+            elif isinstance(transformer, Pipeline) and isinstance(transformer[-1], StandardScaler):
+                imputer, scaler = transformer
+                if not isinstance(imputer, SimpleImputer):
+                    raise ValueError(f"Cannot compile numeric step '{name}': {transformer}")
+                params._add_numeric_block(offset, columns, imputer, scaler)
+                offset += len(columns)
+            elif isinstance(transformer, Pipeline) and isinstance(transformer[-1], OneHotEncoder):
+                imputer, encoder = transformer
+                if not isinstance(imputer, SimpleImputer):
+                    raise ValueError(f"Cannot compile categorical step '{name}': {transformer}")
+                offset = params._add_categorical_block(offset, columns, imputer, encoder)
+            elif isinstance(transformer, Pipeline) and isinstance(transformer[-1], OrdinalEncoder):
+                imputer, encoder = transformer
+                if not isinstance(imputer, SimpleImputer):
+                    raise ValueError(f"Cannot compile categorical step '{name}': {transformer}")
+                params._add_ordinal_block(offset, columns, imputer, encoder)
+                offset += len(columns)
+            else:
+                raise ValueError(f"Cannot compile transformer '{name}': {transformer}")
+
+        params.n_features = offset
+        return params
+
+    def _add_numeric_block(self, offset: int, columns: list, imputer, scaler):
+        n_columns = len(columns)
+        fill_values = np.full(n_columns, np.nan) if imputer is None else np.asarray(imputer.statistics_, dtype=np.float64)
+        means = np.zeros(n_columns) if scaler is None or scaler.mean_ is None else scaler.mean_
+        scales = np.ones(n_columns) if scaler is None or scaler.scale_ is None else scaler.scale_
+        self.numeric_blocks.append((offset, columns, fill_values, means, scales))
+
+    def _add_categorical_block(self, offset: int, columns: list, imputer, encoder) -> int:
+        if encoder.drop_idx_ is not None or getattr(encoder, '_infrequent_enabled', False):
+            raise ValueError("Cannot compile a OneHotEncoder with dropped or infrequent categories.")
+
+        fill_values = list(imputer.statistics_)
+        lookups = []
+        for categories in encoder.categories_:
+            lookups.append({category: offset + i for i, category in enumerate(categories)})
+            offset += len(categories)
+        ignore_unknown = encoder.handle_unknown != 'error'
+        self.categorical_blocks.append((columns, fill_values, lookups, ignore_unknown))
+        return offset
+
+    def _add_ordinal_block(self, offset: int, columns: list, imputer, encoder):
+        if getattr(encoder, '_infrequent_enabled', False):
+            raise ValueError("Cannot compile an OrdinalEncoder with infrequent categories.")
+
+        fill_values = list(imputer.statistics_)
+        lookups = [{category: float(code) for code, category in enumerate(categories)} for categories in encoder.categories_]
+        # None: an unknown category is an error, like OrdinalEncoder(handle_unknown='error')
+        unknown_value = float(encoder.unknown_value) if encoder.handle_unknown == 'use_encoded_value' else None
+        self.ordinal_blocks.append((offset, columns, fill_values, lookups, unknown_value))
+
+    def transform(self, X) -> np.ndarray:
+        """
+        Preprocesses engineered houses like the ColumnTransformer the parameters were read from.
+
+        Args:
+            X (pd.DataFrame): The engineered features, one row per house.
+
+        Returns:
+            np.ndarray: The (n_houses, n_features) float64 matrix. Where the preprocessor
+                output CSR, the zeros it would not store are NaN, which XGBoost also treats
+                as missing.
+
+        Raises:
+            ValueError: If a category is unknown to an encoder that does not accept unknown categories.
+        """
+        output = np.zeros((len(X), self.n_features))
+        for offset, columns, fill_values, means, scales in self.numeric_blocks:
+            values = X[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = np.where(np.isnan(values), fill_values, values)
+            output[:, offset:offset + len(columns)] = (values - means) / scales
+
+        rows = np.arange(len(X))
+        for columns, fill_values, lookups, ignore_unknown in self.categorical_blocks:
+            for column, fill_value, lookup in zip(columns, fill_values, lookups):
+                indices = _lookup(X[column], fill_value, lookup)
+                known = ~np.isnan(indices)
+                if not ignore_unknown and not known.all():
+                    raise ValueError(f"Unknown category for feature '{column}'.")
+                output[rows[known], indices[known].astype(np.intp)] = 1.0
+
+        for offset, columns, fill_values, lookups, unknown_value in self.ordinal_blocks:
+            for i, (column, fill_value, lookup) in enumerate(zip(columns, fill_values, lookups)):
+                codes = _lookup(X[column], fill_value, lookup)
+                unknown = np.isnan(codes)
+                if unknown.any():
+                    if unknown_value is None:
+                        raise ValueError(f"Unknown category for feature '{column}'.")
+                    codes[unknown] = unknown_value
+                output[:, offset + i] = codes
+
+        if self.zeros_are_missing:
+            output[output == 0.0] = np.nan
+        return output
+
+    def output_fields(self) -> tuple:
+        """
+        Maps every output column back to the feature it was made from, like `app.explain.column_fields`.
+
+        Returns:
+            tuple: The feature names, in output order, and an array giving the index of
+                the feature of each output column.
+        """
+        # (first output column, feature, number of output columns) of every feature
+        spans = []
+        for offset, columns, *_ in self.numeric_blocks + self.ordinal_blocks:
+            spans.extend((offset + i, column, 1) for i, column in enumerate(columns))
+        for columns, _, lookups, _ in self.categorical_blocks:
+            start = min((index for lookup in lookups for index in lookup.values()), default=0)
+            for column, lookup in zip(columns, lookups):
+                spans.append((start, column, len(lookup)))
+                start += len(lookup)
+
+        fields = []
+        field_of_column = []
+        for _, column, width in sorted(spans, key=lambda span: span[0]):
+            field_of_column.extend([len(fields)] * width)
+            fields.append(column)
+        return fields, np.asarray(field_of_column, dtype=np.intp)
+
+    def save(self, path: Path):
+        """
+        Exports the parameters in a compact, pickle-free format.
+
+        Two files are written: `<path>.npy` holds the numeric parameters as a
+        (3, n_numeric) float64 array (fill values, means, scales) that can be
+        memory-mapped, and `<path>.json` holds the layout and the one-hot
+        vocabularies.
+
+        Args:
+            path (Path): The base filename, without extension.
+        """
+        path = Path(path)
+        layout = {
+            "format_version": PARAMS_FORMAT_VERSION,
+            "n_features": self.n_features,
+            "zeros_are_missing": self.zeros_are_missing,
+            "numeric_blocks": [],
+            "categorical_blocks": [],
+            "ordinal_blocks": [],
+        }
+        arrays = []
+        start = 0
+        for offset, columns, fill_values, means, scales in self.numeric_blocks:
+            arrays.append(np.vstack([fill_values, means, scales]))
+            layout["numeric_blocks"].append({"offset": offset, "columns": columns, "start": start})
+            start += len(columns)
+        for columns, fill_values, lookups, ignore_unknown in self.categorical_blocks:
+            layout["categorical_blocks"].append({
+                "columns": columns,
+                "fill_values": list(fill_values),
+                "categories": [list(lookup) for lookup in lookups],
+                "offsets": [min(lookup.values(), default=0) for lookup in lookups],
+                "ignore_unknown": ignore_unknown,
+            })
+        for offset, columns, fill_values, lookups, unknown_value in self.ordinal_blocks:
+            layout["ordinal_blocks"].append({
+                "offset": offset,
+                "columns": columns,
+                "fill_values": list(fill_values),
+                "categories": [list(lookup) for lookup in lookups],
+                # NaN is not valid JSON, so it is stored as a flag
+                "unknown_is_nan": is_missing(unknown_value),
+                "unknown_value": None if is_missing(unknown_value) else unknown_value,
+            })
+        params = np.hstack(arrays) if arrays else np.empty((3, 0))
+
+        # Write to temporary files and rename, so a running API never sees half a file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        npy_path, json_path = path.with_name(path.name + ".npy"), path.with_name(path.name + ".json")
+        with open(npy_path.with_name(npy_path.name + ".tmp"), "wb") as f:
+            np.save(f, np.ascontiguousarray(params, dtype=np.float64))
+        with open(json_path.with_name(json_path.name + ".tmp"), "w") as f:
+            json.dump(layout, f)
+        os.replace(npy_path.with_name(npy_path.name + ".tmp"), npy_path)
+        os.replace(json_path.with_name(json_path.name + ".tmp"), json_path)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "PreprocessorParams":
+        """
+        Reads parameters written by `save`, without unpickling anything.
+
+        Args:
+            path (Path): The base filename, without extension.
+            mmap (bool): Memory-map the numeric parameters instead of reading them,
+                so processes loading the same file share its pages.
+
+        Returns:
+            PreprocessorParams: The parameters, equal to those of the original preprocessor.
+        """
+        path = Path(path)
+        with open(path.with_name(path.name + ".json")) as f:
+            layout = json.load(f)
+        if layout.get("format_version") != PARAMS_FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled parameters format: {layout.get('format_version')}")
+        params = np.load(path.with_name(path.name + ".npy"), mmap_mode="r" if mmap else None)
+
+        numeric_blocks = []
+        for block in layout["numeric_blocks"]:
+            stop = block["start"] + len(block["columns"])
+            fill_values, means, scales = params[:, block["start"]:stop]
+            numeric_blocks.append((block["offset"], block["columns"], fill_values, means, scales))
+        categorical_blocks = []
+        for block in layout["categorical_blocks"]:
+            lookups = [
+                {category: offset + i for i, category in enumerate(categories)}
+                for categories, offset in zip(block["categories"], block["offsets"])
+            ]
+            categorical_blocks.append((block["columns"], block["fill_values"], lookups, block["ignore_unknown"]))
+        ordinal_blocks = []
+        for block in layout.get("ordinal_blocks", []):
+            lookups = [{category: float(code) for code, category in enumerate(categories)} for categories in block["categories"]]
+            unknown_value = np.nan if block["unknown_is_nan"] else block["unknown_value"]
+            ordinal_blocks.append((block["offset"], block["columns"], block["fill_values"], lookups, unknown_value))
+        return cls(layout["n_features"], layout["zeros_are_missing"], numeric_blocks, categorical_blocks, ordinal_blocks)
+
+def _lookup(values, fill_value, lookup: dict) -> np.ndarray:
+    """Maps a column of categories, missing ones filled, through a vocabulary lookup; NaN where unknown."""
+    return values.where(values.notna(), fill_value).map(lookup).to_numpy(dtype=np.float64, na_value=np.nan)
@@ -0,0 +1,151 @@
+# src/feature_store.py
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Import our custom modules
+from src import config
+from src.logger_config import logger
+
+@dataclass
+class ProcessedData:
+    """The engineered train/test splits, their preprocessed matrices and the fitted preprocessor."""
+    X_train: pd.DataFrame
+    X_test: pd.DataFrame
+    y_train: pd.Series
+    y_test: pd.Series
+    X_train_processed: Any
+    X_test_processed: Any
+    preprocessor: Any
+
+def dataset_key(raw_path: Path, feature_config: dict, code_files: list) -> str:
+    """
+    Identifies processed data by everything it is derived from.
+
+    Args:
+        raw_path (Path): The raw data file; its content is hashed, not its name or mtime.
+        feature_config (dict): JSON-serializable settings that change the features or the split.
+        code_files (list): Source files whose changes must invalidate the processed data.
+
+    Returns:
+        str: A hex digest naming the store entry.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(raw_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(json.dumps(feature_config, sort_keys=True, default=str).encode())
+    for path in code_files:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+def _entry_dir(key: str) -> Path:
+    return Path(config.FEATURE_STORE_DIR) / key
+
+def _save_matrix(matrix, path: Path):
+    # XGBoost casts its input to float32, so storing float32 halves the size without changing the model
+    if sp.issparse(matrix):
+        sp.save_npz(path.with_suffix(".npz"), matrix.tocsr().astype(np.float32), compressed=False)
+    else:
+        np.save(path.with_suffix(".npy"), np.asarray(matrix, dtype=np.float32))
+
+def _load_matrix(path: Path):
+    if path.with_suffix(".npz").exists():
+        return sp.load_npz(path.with_suffix(".npz"))
+    return np.load(path.with_suffix(".npy"))
+
+def _save_frame(frame: pd.DataFrame, path: Path):
+    """Writes a frame as Parquet, with text columns dictionary-encoded as categoricals."""
+    frame = frame.copy()
+    text_columns = frame.select_dtypes(include="object").columns
+    frame[text_columns] = frame[text_columns].astype("category")
+    frame.to_parquet(path, index=True)
+
+def _load_frame(path: Path) -> pd.DataFrame:
+    """Reads a frame written by `_save_frame`, with text columns back as objects (NaN for missing)."""
+    frame = pd.read_parquet(path)
+    categorical_columns = frame.select_dtypes(include="category").columns
+    frame[categorical_columns] = frame[categorical_columns].astype(object)
+    return frame
+
+def save_processed_data(key: str, data: ProcessedData, preprocessing_seconds: float) -> Path:
+    """
+    Persists processed data under its key.
+
+    The entry is written to a temporary directory and renamed, so a
+    concurrent run never reads a partial entry.
+
+    Args:
+        key (str): The key from `dataset_key`.
+        data (ProcessedData): The processed data.
+        preprocessing_seconds (float): How long building it took, reported when it is reused.
+
+    Returns:
+        Path: The entry directory.
+    """
+    entry_dir = _entry_dir(key)
+    tmp_dir = entry_dir.with_name(entry_dir.name + f".tmp{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    _save_frame(data.X_train, tmp_dir / "X_train.parquet")
+    _save_frame(data.X_test, tmp_dir / "X_test.parquet")
+    pd.DataFrame({data.y_train.name or "y": data.y_train}).to_parquet(tmp_dir / "y_train.parquet")
+    pd.DataFrame({data.y_test.name or "y": data.y_test}).to_parquet(tmp_dir / "y_test.parquet")
+    _save_matrix(data.X_train_processed, tmp_dir / "X_train_processed")
+    _save_matrix(data.X_test_processed, tmp_dir / "X_test_processed")
+    joblib.dump(data.preprocessor, tmp_dir / "preprocessor.joblib")
+    (tmp_dir / "manifest.json").write_text(json.dumps({
+        "key": key,
+        "created_at": time.time(),
+        "preprocessing_seconds": preprocessing_seconds,
+        "n_train": len(data.X_train),
+        "n_test": len(data.X_test),
+        "n_features": data.X_train_processed.shape[1],
+    }, indent=2))
+
+    if entry_dir.exists():
+        shutil.rmtree(tmp_dir)
+    else:
+        os.replace(tmp_dir, entry_dir)
+    return entry_dir
+
+def load_processed_data(key: str) -> Optional[tuple]:
+    """
+    Loads processed data stored under a key.
+
+    Args:
+        key (str): The key from `dataset_key`.
+
+    Returns:
+        tuple: The ProcessedData and the entry's manifest, or None if there is no such entry.
+    """
+    entry_dir = _entry_dir(key)
+    manifest_path = entry_dir / "manifest.json"
+    if not manifest_path.exists():
+        return None
+    try:
+        data = ProcessedData(
+            X_train=_load_frame(entry_dir / "X_train.parquet"),
+            X_test=_load_frame(entry_dir / "X_test.parquet"),
+            y_train=pd.read_parquet(entry_dir / "y_train.parquet").iloc[:, 0],
+            y_test=pd.read_parquet(entry_dir / "y_test.parquet").iloc[:, 0],
+            X_train_processed=_load_matrix(entry_dir / "X_train_processed"),
+            X_test_processed=_load_matrix(entry_dir / "X_test_processed"),
+            preprocessor=joblib.load(entry_dir / "preprocessor.joblib"),
+        )
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable feature store entry {entry_dir}: {e}")
+        return None
+    return data, json.loads(manifest_path.read_text())
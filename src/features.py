@@ -0,0 +1,160 @@
+# src/features.py
+
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+import numpy as np
+import pandas as pd
+
+@dataclass(frozen=True)
+class DerivedFeature:
+    """
+    A feature computed from other columns by a vectorized expression.
+
+    Attributes:
+        name (str): The name of the new column.
+        inputs (tuple): The columns the expression takes, in order.
+        expression (Callable): Computes the feature from the input columns. It only uses
+            operators, so it works on NumPy arrays and on the scalars of a single house alike.
+        description (str): What the feature means.
+        if_missing (bool): Only derive the feature when the data does not have the column already.
+    """
+    name: str
+    inputs: tuple
+    expression: Callable
+    description: str = ""
+    if_missing: bool = False
+
+class FeatureRegistry:
+    """
+    Derives the engineered features of the model, the same way for training and serving.
+
+    The registry runs its features in order, so a feature can use the ones
+    before it, and then leaves out the columns the model does not use
+    directly. It works on:
+
+    - a DataFrame, returning a new DataFrame that shares the unchanged columns
+      with the input instead of copying them;
+    - a NumPy structured array or a dict of column arrays (or lists), returning
+      a dict of columns (the unchanged ones are views of the input);
+    - a dict of scalars, i.e. one house as the API receives it.
+
+    The input is never modified.
+    """
+
+    def __init__(self, features: list, drop: tuple = ()):
+        """
+        Args:
+            features (list): The DerivedFeature definitions, in the order they are computed.
+            drop (tuple): The columns removed from the output once the features are derived.
+        """
+        self.features = tuple(features)
+        self.drop = tuple(drop)
+        self.names = tuple(feature.name for feature in self.features)
+
+    def compute(self, data) -> dict:
+        """
+        Computes the derived features of some data.
+
+        Args:
+            data: A DataFrame, a NumPy structured array, a dict of columns or a dict of scalars.
+
+        Returns:
+            dict: Feature name -> values (arrays, or scalars for a single house).
+        """
+        get, has = _column_accessors(data)
+        derived = {}
+        for feature in self.features:
+            if feature.if_missing and has(feature.name):
+                continue
+            args = [derived[name] if name in derived else get(name) for name in feature.inputs]
+            derived[feature.name] = feature.expression(*args)
+        return derived
+
+    def apply(self, data, none_as_missing: bool = False):
+        """
+        Adds the derived features to some data and leaves out the columns in `drop`.
+
+        Args:
+            data: A DataFrame, a NumPy structured array, a dict of columns or a dict of scalars.
+            none_as_missing (bool): Replace None by NaN in the object columns of a DataFrame,
+                so that API input is imputed like the training data read from CSV.
+
+        Returns:
+            A DataFrame for a DataFrame, otherwise a dict of columns (or of scalars for a single house).
+        """
+        derived = self.compute(data)
+        dropped = set(self.drop)
+
+        if isinstance(data, pd.DataFrame):
+            columns = {}
+            for name in data.columns:
+                if name in dropped:
+                    continue
+                column = data[name]
+                if none_as_missing and column.dtype == object:
+                    column = _none_to_nan(column)
+                columns[name] = column
+            for name, values in derived.items():
+                if name not in dropped:
+                    columns[name] = values
+            # copy=False keeps every column in its own block instead of consolidating (copying) them
+            return pd.DataFrame(columns, index=data.index, copy=False)
+
+        names = data.dtype.names if isinstance(data, np.ndarray) else data.keys()
+        get, _ = _column_accessors(data)
+        columns = {name: get(name) for name in names if name not in dropped}
+        columns.update((name, values) for name, values in derived.items() if name not in dropped)
+        return columns
+
+def _column_accessors(data) -> tuple:
+    """Returns functions reading a column of the data and checking that it has one."""
+    if isinstance(data, pd.DataFrame):
+        return (lambda name: data[name].to_numpy()), data.columns.__contains__
+    if isinstance(data, np.ndarray) and data.dtype.names is not None:
+        return (lambda name: data[name]), data.dtype.names.__contains__
+    if isinstance(data, Mapping):
+        def get(name):
+            values = data[name]
+            return np.asarray(values) if isinstance(values, (list, tuple)) else values
+        return get, data.__contains__
+    raise TypeError(f"Cannot engineer features of {type(data).__name__}.")
+
+def _none_to_nan(column: pd.Series) -> pd.Series:
+    """Replaces None by NaN in an object column, copying it only when it has any."""
+    values = column.to_numpy()
+    missing = values == None  # noqa: E711, elementwise on object arrays
+    if not missing.any():
+        return column
+    values = values.copy()
+    values[missing] = np.nan
+    return pd.Series(values, index=column.index, name=column.name)
+
+# The engineered features of the model, used by training and by every inference path
+FEATURES = FeatureRegistry(
+    features=[
+        DerivedFeature(
+            'TotalBsmtSF', ('BsmtFinSF1', 'BsmtFinSF2', 'BsmtUnfSF'),
+            lambda finished1, finished2, unfinished: finished1 + finished2 + unfinished,
+            "Total basement area. The training data has it; the API input does not.",
+            if_missing=True,
+        ),
+        DerivedFeature(
+            'TotalSF', ('TotalBsmtSF', '1stFlrSF', '2ndFlrSF'),
+            lambda basement, first, second: basement + first + second,
+            "Square footage of the basement, 1st and 2nd floors.",
+        ),
+        DerivedFeature(
+            'HouseAge', ('YrSold', 'YearBuilt'),
+            lambda sold, built: sold - built,
+            "Age of the house when it was sold.",
+        ),
+        DerivedFeature(
+            'WasRemodeled', ('YearRemodAdd', 'YearBuilt'),
+            lambda remodeled, built: (remodeled != built) * 1,
+            "1 if the house was remodeled after it was built, else 0.",
+        ),
+    ],
+    # The columns the derived features replace, to reduce multicollinearity and model complexity
+    drop=('YrSold', 'YearBuilt', 'YearRemodAdd', 'TotalBsmtSF', '1stFlrSF', '2ndFlrSF'),
+)
@@ -0,0 +1,287 @@
+# src/flat_trees.py
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Rows scored together by FlatTreeEnsemble.predict; bounds its (rows x trees) work arrays
+_CHUNK_ROWS = 512
+
+def _tree_arrays(tree: dict, prune_tolerance: float = None) -> tuple:
+    """
+    Reads one tree of XGBoost's JSON model, optionally merging sibling leaves with close values.
+
+    Args:
+        tree (dict): A tree from the model's 'trees' list.
+        prune_tolerance (float): Sibling leaves whose values differ by at most this much become
+            one leaf holding their hessian-weighted mean, repeatedly up the tree. None keeps every node.
+
+    Returns:
+        tuple: Nodes in depth-first order as (feature, threshold, left, right, default_left, value)
+            lists with tree-local child indices, and the depth of the tree.
+
+    Raises:
+        ValueError: If the tree has categorical splits or vector leaves.
+    """
+    if int(tree["tree_param"].get("size_leaf_vector", "1")) > 1:
+        raise ValueError("Cannot flatten trees with vector leaves.")
+    if any(tree["split_type"]):
+        raise ValueError("Cannot flatten trees with categorical splits.")
+
+    left, right = tree["left_children"], tree["right_children"]
+    values = list(tree["split_conditions"])
+    hessians = list(tree["sum_hessian"])
+    is_leaf = [child == -1 for child in left]
+
+    if prune_tolerance is not None:
+        def prune(node):
+            if is_leaf[node]:
+                return
+            prune(left[node])
+            prune(right[node])
+            l, r = left[node], right[node]
+            if is_leaf[l] and is_leaf[r] and abs(values[l] - values[r]) <= prune_tolerance:
+                total = hessians[l] + hessians[r]
+                values[node] = (hessians[l] * values[l] + hessians[r] * values[r]) / total if total > 0 else values[l]
+                is_leaf[node] = True
+
+        prune(0)
+
+    # Renumber the nodes still reachable from the root, depth first
+    nodes = []
+    depth = 0
+    stack = [(0, 0, None, None)]
+    while stack:
+        node, node_depth, parent, slot = stack.pop()
+        index = len(nodes)
+        if parent is not None:
+            nodes[parent][slot] = index
+        depth = max(depth, node_depth)
+        if is_leaf[node]:
+            nodes.append([0, 0.0, index, index, False, values[node]])
+        else:
+            nodes.append([tree["split_indices"][node], values[node], None, None, bool(tree["default_left"][node]), 0.0])
+            stack.append((right[node], node_depth + 1, index, 3))
+            stack.append((left[node], node_depth + 1, index, 2))
+    return nodes, depth
+
+def dense_features(X) -> np.ndarray:
+    """
+    Converts preprocessed features to a dense float32 array, with NaN for the zeros a sparse matrix does not store.
+
+    XGBoost treats those zeros as missing values, so the dense array scores the same.
+    """
+    if hasattr(X, "tocoo"):
+        coo = X.tocoo()
+        dense = np.full(coo.shape, np.nan, dtype=np.float32)
+        dense[coo.row, coo.col] = coo.data
+        return dense
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+def _expand_missing(X: np.ndarray) -> np.ndarray:
+    """
+    Interleaves two copies of each feature: missing values as +inf, which no threshold is
+    above, then as -inf, which every threshold is above. Feature j of a row is read at 2j
+    by splits whose missing values go right and at 2j + 1 by those where they go left.
+    """
+    expanded = np.empty((*X.shape, 2), dtype=np.float32)
+    missing = np.isnan(X)
+    expanded[..., 0] = X
+    expanded[..., 1] = X
+    expanded[..., 0][missing] = np.inf
+    expanded[..., 1][missing] = -np.inf
+    return expanded
+
+class FlatTreeEnsemble:
+    """
+    A gradient-boosted tree ensemble compiled to flat NumPy arrays and scored with vectorized traversal.
+
+    The nodes of all trees are stored in a few parallel arrays (split
+    feature, threshold, children, leaf value). Leaves point to themselves,
+    so every (row, tree) pair can step down one level at a time with the
+    same array operations until the deepest tree's depth is reached, with
+    no per-tree Python loop. Splits follow XGBoost: a value below the
+    threshold goes left, and a missing value (NaN) goes to the split's
+    default child. For that, each row is expanded once into two copies,
+    with NaN as +inf (goes right) and as -inf (goes left), and a split
+    reads the copy of its default direction, so traversal needs no NaN
+    checks. Trees that pruning reduced to a single leaf are folded into
+    the base score.
+
+    The arrays are saved pickle-free in one .npz file.
+    """
+
+    def __init__(self, feature, threshold, default_left, children, value, roots, base_score: float, depth: int,
+                 n_iterations: int):
+        """
+        Args:
+            feature (np.ndarray): Split feature of each node (0 for leaves).
+            threshold (np.ndarray): float32 split threshold of each node.
+            default_left (np.ndarray): Whether a missing value goes left at each node.
+            children (np.ndarray): (n_nodes, 2) next node when the value is not below the threshold, and when it is.
+            value (np.ndarray): Leaf value of each node (0 for splits).
+            roots (np.ndarray): Root node of each tree.
+            base_score (float): The margin added to the sum of the leaves.
+            depth (int): The depth of the deepest tree.
+            n_iterations (int): The boosting rounds of the model the trees were taken from.
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.default_left = default_left
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.base_score = float(base_score)
+        self.depth = int(depth)
+        self.n_iterations = int(n_iterations)
+        # Where a split reads its value in a row expanded by `_expand_missing`
+        self._split_key = feature * 2 + default_left.astype(np.int32)
+        self._flat_children = children.reshape(-1)
+
+    @classmethod
+    def from_booster(cls, booster, iteration_range: tuple = (0, 0), prune_tolerance: float = None) -> "FlatTreeEnsemble":
+        """
+        Compiles the trees of an XGBoost booster.
+
+        Args:
+            booster: The trained XGBoost model or its Booster.
+            iteration_range (tuple): The boosting rounds to keep, like XGBoost's `iteration_range`;
+                (0, 0) keeps all of them.
+            prune_tolerance (float): Merge sibling leaves whose values differ by at most this much
+                (see `_tree_arrays`). None keeps the trees as they are.
+
+        Returns:
+            FlatTreeEnsemble: The compiled ensemble.
+
+        Raises:
+            ValueError: If the model is not a tree ensemble this evaluator can reproduce.
+        """
+        booster = booster.get_booster() if hasattr(booster, "get_booster") else booster
+        learner = json.loads(booster.save_raw("json"))["learner"]
+        gradient_booster = learner["gradient_booster"]
+        if gradient_booster["name"] != "gbtree":
+            raise ValueError(f"Cannot flatten a '{gradient_booster['name']}' booster.")
+        if int(learner["learner_model_param"].get("num_target", "1")) > 1:
+            raise ValueError("Cannot flatten a multi-target model.")
+        objective = learner["objective"]["name"]
+        # Objectives whose prediction is the margin itself
+        if objective not in ("reg:squarederror", "reg:squaredlogerror", "reg:absoluteerror", "reg:pseudohubererror"):
+            raise ValueError(f"Cannot flatten a model with objective '{objective}'.")
+
+        model = gradient_booster["model"]
+        indptr = model.get("iteration_indptr") or list(range(len(model["trees"]) + 1))
+        start, stop = iteration_range
+        stop = stop or len(indptr) - 1
+        # Stored as a string, or as a one-element list string like '[1.2E1]' by newer XGBoost versions
+        base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+
+        feature, threshold, default_left, children, value, roots = [], [], [], [], [], []
+        depth = 0
+        for tree in model["trees"][indptr[start]:indptr[stop]]:
+            nodes, tree_depth = _tree_arrays(tree, prune_tolerance)
+            if len(nodes) == 1:
+                base_score += nodes[0][5]
+                continue
+            offset = len(feature)
+            roots.append(offset)
+            depth = max(depth, tree_depth)
+            for split_feature, split_threshold, left, right, missing_left, leaf_value in nodes:
+                feature.append(split_feature)
+                threshold.append(split_threshold)
+                default_left.append(missing_left)
+                children.append((offset + right, offset + left))
+                value.append(leaf_value)
+
+        return cls(
+            np.asarray(feature, dtype=np.int32),
+            np.asarray(threshold, dtype=np.float32),
+            np.asarray(default_left, dtype=bool),
+            np.asarray(children, dtype=np.int32).reshape(-1, 2),
+            np.asarray(value, dtype=np.float32),
+            np.asarray(roots, dtype=np.int32),
+            base_score, depth, stop - start,
+        )
+
+    @property
+    def n_trees(self) -> int:
+        """The trees scored, without those folded into the base score."""
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the arrays, in bytes."""
+        arrays = (self.feature, self.threshold, self.default_left, self.children, self.value, self.roots)
+        return sum(array.nbytes for array in arrays)
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Scores rows of preprocessed features, like the booster's prediction on the margin scale.
+
+        Args:
+            X: A dense array or a SciPy sparse matrix. As in XGBoost, NaN and the zeros a sparse
+                matrix does not store are missing values.
+
+        Returns:
+            np.ndarray: One float32 prediction per row.
+        """
+        X = dense_features(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        predictions = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), _CHUNK_ROWS):
+            predictions[start:start + _CHUNK_ROWS] = self._predict_chunk(X[start:start + _CHUNK_ROWS])
+        return predictions
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        expanded = _expand_missing(X).reshape(-1)
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * (2 * n_features))[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots)))
+        for _ in range(self.depth):
+            below = expanded[row_offsets + self._split_key[nodes]] < self.threshold[nodes]
+            nodes = self._flat_children[nodes * 2 + below]
+        return self.value[nodes].sum(axis=1, dtype=np.float64) + self.base_score
+
+    def save(self, path: Path):
+        """
+        Writes the arrays to one .npz file, atomically.
+
+        Args:
+            path (Path): The destination file, ending in '.npz'.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f, feature=self.feature, threshold=self.threshold, default_left=self.default_left,
+                children=self.children, value=self.value,
+                roots=self.roots, meta=np.array([self.base_score, self.depth, self.n_iterations], dtype=np.float64),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "FlatTreeEnsemble":
+        """
+        Reads an ensemble written by `save`, without unpickling anything.
+
+        Args:
+            path (Path): The .npz file.
+
+        Returns:
+            FlatTreeEnsemble: The ensemble.
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            base_score, depth, n_iterations = arrays["meta"]
+            return cls(
+                arrays["feature"], arrays["threshold"], arrays["default_left"], arrays["children"], arrays["value"],
+                arrays["roots"],
+                base_score, int(depth), int(n_iterations),
+            )
@@ -1,29 +1,127 @@
 # src/logger_config.py
 
+import atexit
 import logging
+import os
+import queue
 import sys
-from logging.handlers import TimedRotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 
-# Import the root directory from our config file
-from src.config import ROOT_DIR
+from pythonjsonlogger.json import JsonFormatter
+
+# Import the logging settings from our config file
+from src.config import LOG_DIR, LOG_QUEUE_ENABLED, LOG_QUEUE_MAX_SIZE
 
 # --- LOGGER CONFIGURATION ---
 
 # Define the format for log messages
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
-LOG_DIR = ROOT_DIR / "logs"
-# --- START OF FIX ---
-LOG_DIR.mkdir(parents=True, exist_ok=True) # Create the logs directory if it doesn't exist
-# --- END OF FIX ---
-LOG_DIR.mkdir(exist_ok=True) # Create the logs directory if it doesn't exist
 LOG_FILE = LOG_DIR / "app.log"
+# The prediction audit log, one JSON object per line
+AUDIT_LOGGER_NAME = "ml_app.audit"
+AUDIT_LOG_FILE = LOG_DIR / "predictions.jsonl"
+
+# The queue handler of every logger set up in queue mode, by logger name
+_queue_handlers = {}
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Hands log records to a QueueListener thread without ever blocking the caller.
+
+    When the bounded queue is full, the record is dropped and counted
+    instead. Records are queued as they are: the queue never leaves the
+    process, so they do not need to be formatted and made picklable first,
+    and all formatting happens on the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+class LazyFileHandler(TimedRotatingFileHandler):
+    """
+    A daily-rotated log file whose directory is created when the first record is written.
+
+    Nothing touches the disk when the handler is created, so loggers can be
+    set up on import. If the file cannot be opened (e.g. a read-only
+    LOG_DIR), the records go to stderr instead of failing every log call.
+    """
+
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, when="midnight", interval=1, backupCount=7, encoding="utf-8", delay=True, **kwargs)
+        self.fallback = None
+
+    def emit(self, record: logging.LogRecord):
+        if self.fallback is None and self.stream is None:
+            try:
+                os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+                self.stream = self._open()
+            except OSError as e:
+                self.fallback = logging.StreamHandler(sys.stderr)
+                self.fallback.setFormatter(self.formatter)
+                sys.stderr.write(f"Cannot write the log file {self.baseFilename} ({e}); logging to stderr instead.\n")
+        if self.fallback is not None:
+            self.fallback.emit(record)
+            return
+        super().emit(record)
+
+def _stop_listener(listener: QueueListener):
+    """Writes the records still queued and stops the listener thread, at interpreter exit."""
+    try:
+        listener.stop()
+    except queue.Full:
+        # No room for the stop sentinel: the daemon thread dies with the process
+        pass
+
+def _add_handlers(logger: logging.Logger, handlers: list, use_queue: bool):
+    """Attaches the handlers to the logger, behind a bounded queue and a listener thread in queue mode."""
+    if not use_queue:
+        for handler in handlers:
+            logger.addHandler(handler)
+        return
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_MAX_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    queue_handler.listener = listener
+    logger.addHandler(queue_handler)
+    _queue_handlers[logger.name] = queue_handler
+
+def _write_synchronously_after_fork():
+    """
+    Attaches the handlers directly to the loggers in a forked child process
+    (e.g. a training worker), which does not inherit the listener threads.
+    """
+    for name, queue_handler in list(_queue_handlers.items()):
+        logger = logging.getLogger(name)
+        logger.removeHandler(queue_handler)
+        for handler in queue_handler.listener.handlers:
+            logger.addHandler(handler)
+    _queue_handlers.clear()
+
+os.register_at_fork(after_in_child=_write_synchronously_after_fork)
 
-def setup_logger(logger_name: str = "ml_app") -> logging.Logger:
+def setup_logger(logger_name: str = "ml_app", use_queue: bool = LOG_QUEUE_ENABLED) -> logging.Logger:
     """
     Sets up and returns a configured logger.
 
     Args:
         logger_name (str): The name for the logger.
+        use_queue (bool): Write the records from a background thread instead of the calling one.
 
     Returns:
         logging.Logger: A configured logger instance.
@@ -46,16 +144,57 @@ def setup_logger(logger_name: str = "ml_app") -> logging.Logger:
 
     # A handler for writing to a log file, with daily rotation
     # This creates a new log file every day and keeps the last 7 as backup.
-    file_handler = TimedRotatingFileHandler(
-        LOG_FILE, when="midnight", interval=1, backupCount=7, encoding="utf-8"
-    )
+    # The file and the logs directory are only created when the first message is written.
+    file_handler = LazyFileHandler(LOG_FILE)
     file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 
     # Add the handlers to the logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    _add_handlers(logger, [console_handler, file_handler], use_queue)
 
     return logger
 
+def setup_audit_logger(logger_name: str = AUDIT_LOGGER_NAME, use_queue: bool = LOG_QUEUE_ENABLED) -> logging.Logger:
+    """
+    Sets up the logger of the prediction audit log, which writes JSON lines to AUDIT_LOG_FILE.
+
+    Fields passed in `extra` become keys of the JSON object.
+
+    Args:
+        logger_name (str): The name for the logger.
+        use_queue (bool): Write the records from a background thread instead of the calling one.
+
+    Returns:
+        logging.Logger: A configured logger instance.
+    """
+    audit_logger = logging.getLogger(logger_name)
+    audit_logger.setLevel(logging.INFO)
+    audit_logger.propagate = False
+    if audit_logger.hasHandlers():
+        return audit_logger
+
+    file_handler = LazyFileHandler(AUDIT_LOG_FILE)
+    file_handler.setFormatter(JsonFormatter("%(levelname)s %(message)s", timestamp=True))
+    _add_handlers(audit_logger, [file_handler], use_queue)
+
+    return audit_logger
+
+def log_queue_stats() -> dict:
+    """
+    Returns the state of the log queues.
+
+    Returns:
+        dict: Logger name -> records waiting to be written and records dropped because the queue was full.
+    """
+    return {
+        name: {"queued": handler.queue.qsize(), "dropped": handler.dropped}
+        for name, handler in _queue_handlers.items()
+    }
+
+def flush_logs():
+    """Blocks until every record queued so far has been written."""
+    for handler in list(_queue_handlers.values()):
+        handler.queue.join()
+
 # Create a default logger instance to be imported by other modules
-logger = setup_logger()
\ No newline at end of file
+logger = setup_logger()
+audit_logger = setup_audit_logger()
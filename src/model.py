@@ -5,13 +5,16 @@ import xgboost as xgb
 # Import the model hyperparameters from our config file
 from src.config import XGBOOST_PARAMS
 
-def create_model() -> xgb.XGBRegressor:
+def create_model(**overrides) -> xgb.XGBRegressor:
     """
     Creates and returns an XGBoost Regressor model
     with predefined hyperparameters.
 
+    Args:
+        **overrides: Hyperparameters that replace the defaults, e.g. the best ones found by tuning.
+
     Returns:
         xgb.XGBRegressor: The XGBoost model instance.
     """
-    model = xgb.XGBRegressor(**XGBOOST_PARAMS)
+    model = xgb.XGBRegressor(**{**XGBOOST_PARAMS, **overrides})
     return model
\ No newline at end of file
@@ -0,0 +1,164 @@
+# src/model_store.py
+
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable
+
+import joblib
+import numpy as np
+import xgboost as xgb
+
+# Import our custom modules
+from src.config import (
+    COMPACT_ITERATIONS_ATTR, COMPACT_MODEL, COMPS_INDEX_NAME_PREFIX, MODEL_DIR, MODEL_FILE_EXTENSION, MODEL_FORMAT,
+    MODEL_MMAP_ENABLED, PREPROCESSOR_NAME_PREFIX, get_versioned_native_model_name, get_versioned_preprocessor_name,
+    get_versioned_preprocessor_params_name, parse_model_version
+)
+from src.export import PreprocessorParams
+from src.features import FEATURES
+from src.logger_config import logger
+
+def list_model_versions(model_dir: Path = None) -> dict:
+    """
+    Finds the trained models in a model directory.
+
+    Args:
+        model_dir (Path): The directory src/train.py saved the models to. Defaults to MODEL_DIR.
+
+    Returns:
+        dict: Model version -> model file path, from oldest to newest.
+    """
+    model_files = [
+        f for f in Path(model_dir or MODEL_DIR).glob(f"*{MODEL_FILE_EXTENSION}")
+        if not f.name.startswith((PREPROCESSOR_NAME_PREFIX, COMPS_INDEX_NAME_PREFIX))
+    ]
+    model_files.sort(key=lambda p: p.stat().st_mtime)
+    return {parse_model_version(f.name): f for f in model_files}
+
+def load_model_version(version: str, model_dir: Path = None, model_format: str = MODEL_FORMAT,
+                       compact: bool = COMPACT_MODEL != "off", mmap: bool = MODEL_MMAP_ENABLED):
+    """
+    Loads one model version and the preprocessor that was fitted with it.
+
+    With model_format 'native', the booster is read from the version's
+    UBJSON export and the preprocessing from its exported parameters
+    (`PreprocessorParams`, which transforms like the ColumnTransformer)
+    when there are ones, instead of unpickling the joblib files; neither
+    needs scikit-learn. Models trained before preprocessors were versioned
+    fall back to the shared 'preprocessor.joblib'.
+
+    Args:
+        version (str): The model version, e.g. '20250827_101500'.
+        model_dir (Path): The directory the version was saved to. Defaults to MODEL_DIR.
+        model_format (str): 'native' or 'joblib'.
+        compact (bool): Stop the model at its compact round count (see `apply_compact_rounds`).
+        mmap (bool): Memory-map the numeric preprocessor parameters instead of reading them.
+
+    Returns:
+        tuple: A tuple containing the loaded model and preprocessor.
+    """
+    model_dir = Path(model_dir or MODEL_DIR)
+    model_path = list_model_versions(model_dir).get(version)
+    if model_path is None:
+        raise FileNotFoundError(f"Model version '{version}' not found in {model_dir}.")
+
+    preprocessor_path = model_dir / get_versioned_preprocessor_name(version)
+    if not preprocessor_path.exists():
+        preprocessor_path = model_dir / f"{PREPROCESSOR_NAME_PREFIX}{MODEL_FILE_EXTENSION}"
+
+    native_model_path = model_dir / get_versioned_native_model_name(version)
+    if model_format == "native" and native_model_path.exists():
+        model = xgb.XGBRegressor()
+        model.load_model(native_model_path)
+        logger.info(f"Loaded model: {native_model_path.name}")
+    else:
+        model = joblib.load(model_path)
+        logger.info(f"Loaded model: {model_path.name}")
+    params_path = model_dir / get_versioned_preprocessor_params_name(version)
+    if model_format == "native" and params_path.with_name(params_path.name + ".json").exists():
+        preprocessor = PreprocessorParams.load(params_path, mmap=mmap)
+        logger.info(f"Loaded preprocessor parameters: {params_path.name}")
+    else:
+        preprocessor = joblib.load(preprocessor_path)
+        logger.info(f"Loaded preprocessor: {preprocessor_path.name}")
+
+    if compact:
+        apply_compact_rounds(model, version)
+    return model, preprocessor
+
+def apply_compact_rounds(model, version: str):
+    """
+    Limits a loaded model to the boosting rounds its compaction kept.
+
+    The booster's best iteration is set to the compact round count, which
+    XGBoost's predict, the fast path and the explainer all stop at.
+
+    Args:
+        model: The loaded XGBoost model.
+        version (str): The model version.
+
+    Returns:
+        int: The compact round count, or None if the version was trained before compaction.
+    """
+    booster = model.get_booster()
+    n_rounds = booster.attr(COMPACT_ITERATIONS_ATTR)
+    if n_rounds is None:
+        logger.warning(f"Model version '{version}' has no compact form, serving all its trees.")
+        return None
+    booster.set_attr(best_iteration=str(int(n_rounds) - 1))
+    return int(n_rounds)
+
+def untimed(stage: str):
+    """The default stage timer of the pipeline functions below: times nothing."""
+    return nullcontext()
+
+def transform_frame(df, preprocessor, timer: Callable = untimed):
+    """
+    Engineers and preprocesses a DataFrame of raw house features into the model's input matrix.
+
+    Args:
+        df (pd.DataFrame): One row per house, with the API input columns. It is not modified.
+        preprocessor: The fitted preprocessing pipeline.
+        timer (Callable): Returns a context manager timing a stage, given its name
+            ('engineer_features', 'transform'), e.g. the API's `stage_timer`.
+
+    Returns:
+        The preprocessed features, dense or CSR like the preprocessor outputs them.
+    """
+    with timer("engineer_features"):
+        # Apply the same feature engineering as in training; missing API values (None) become NaN like in the CSV
+        df_engineered = FEATURES.apply(df, none_as_missing=True)
+
+    with timer("transform"):
+        return preprocessor.transform(df_engineered)
+
+def predict_features(processed_data, model, timer: Callable = untimed) -> np.ndarray:
+    """
+    Scores houses that are already preprocessed.
+
+    Args:
+        processed_data: The preprocessed features.
+        model: The trained machine learning model.
+        timer (Callable): Times the 'predict' stage (see `transform_frame`).
+
+    Returns:
+        np.ndarray: The predicted house prices, in dollars.
+    """
+    with timer("predict"):
+        # The model predicts log prices; invert the log transformation to get the actual prices
+        return np.expm1(model.predict(processed_data))
+
+def predict_frame(df, model, preprocessor, timer: Callable = untimed) -> np.ndarray:
+    """
+    Runs the full inference pipeline on a DataFrame of raw house features.
+
+    Args:
+        df (pd.DataFrame): One row per house, with the API input columns.
+        model: The trained machine learning model.
+        preprocessor: The fitted preprocessing pipeline.
+        timer (Callable): Times each stage (see `transform_frame`).
+
+    Returns:
+        np.ndarray: The predicted house prices, in dollars.
+    """
+    return predict_features(transform_frame(df, preprocessor, timer), model, timer)
@@ -1,15 +1,22 @@
 # src/preprocessing.py
 
+import time
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 
 # Import configuration variables from our config file
 from src import config
+from src import features
+from src.features import FEATURES
+from src.feature_store import ProcessedData, dataset_key, load_processed_data, save_processed_data
+from src.logger_config import logger
 
 def load_data(filepath: str) -> pd.DataFrame:
     """
@@ -25,30 +32,19 @@ def load_data(filepath: str) -> pd.DataFrame:
 
 def engineer_features(data: pd.DataFrame) -> pd.DataFrame:
     """
-    Engineers new features based on existing ones.
+    Engineers new features based on existing ones, with the feature registry of `src.features`.
 
     Args:
-        data (pd.DataFrame): The input data.
+        data (pd.DataFrame): The input data. It is not modified.
 
     Returns:
-        pd.DataFrame: The data with new features added.
+        pd.DataFrame: The data with the derived features added and the columns they replace
+            left out. The other columns are shared with the input, not copied.
     """
-    # Create TotalSF by summing up the square footage of basement, 1st, and 2nd floors
-    data['TotalSF'] = data['TotalBsmtSF'] + data['1stFlrSF'] + data['2ndFlrSF']
-
-    # Create HouseAge from the difference between the year sold and year built
-    data['HouseAge'] = data['YrSold'] - data['YearBuilt']
-
-    # Create a binary feature indicating if a remodel occurred
-    data['WasRemodeled'] = (data['YearRemodAdd'] != data['YearBuilt']).astype(int)
-
-    # Drop the original columns that are now redundant or were used to create new features
-    # This helps to reduce multicollinearity and model complexity.
-    data = data.drop(['YrSold', 'YearBuilt', 'YearRemodAdd', 'TotalBsmtSF', '1stFlrSF', '2ndFlrSF'], axis=1)
-    
-    return data
+    return FEATURES.apply(data)
 
-def create_preprocessor(numerical_features: list, categorical_features: list) -> ColumnTransformer:
+def create_preprocessor(numerical_features: list, categorical_features: list, sparse: bool = None,
+                        encoding: str = None) -> ColumnTransformer:
     """
     Creates a scikit-learn preprocessing pipeline.
 
@@ -56,15 +52,35 @@ def create_preprocessor(numerical_features: list, categorical_features: list) ->
     1. Impute missing values for numerical features with the median.
     2. Scale numerical features.
     3. Impute missing values for categorical features with the string 'None'.
-    4. One-hot encode categorical features.
+    4. One-hot encode categorical features, or with the 'native' encoding,
+       replace each category by its code in the vocabulary seen at fit time
+       (unseen categories become NaN, i.e. missing).
+
+    The one-hot output is always a CSR matrix when `sparse` is set and always
+    a dense array otherwise, whatever the share of non-zeros in the data.
+    The native output is dense, with one column per feature.
 
     Args:
         numerical_features (list): List of numerical column names.
         categorical_features (list): List of categorical column names.
+        sparse (bool): Emit CSR instead of a dense array. Defaults to SPARSE_FEATURES_ENABLED.
+        encoding (str): 'onehot' or 'native'. Defaults to CATEGORICAL_ENCODING.
 
     Returns:
         ColumnTransformer: The scikit-learn preprocessing pipeline.
     """
+    if sparse is None:
+        sparse = config.SPARSE_FEATURES_ENABLED
+    encoding = encoding or config.CATEGORICAL_ENCODING
+
+    if encoding == 'onehot':
+        encoder = ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=sparse))
+    elif encoding == 'native':
+        encoder = ('ordinal', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=np.nan))
+        sparse = False
+    else:
+        raise ValueError(f"Unknown categorical encoding: {encoding!r}")
+
     numerical_pipeline = Pipeline(steps=[
         ('imputer', SimpleImputer(strategy='median')),
         ('scaler', StandardScaler())
@@ -72,7 +88,7 @@ def create_preprocessor(numerical_features: list, categorical_features: list) ->
 
     categorical_pipeline = Pipeline(steps=[
         ('imputer', SimpleImputer(strategy='constant', fill_value='None')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+        encoder
     ])
 
     preprocessor = ColumnTransformer(
@@ -80,14 +96,42 @@ def create_preprocessor(numerical_features: list, categorical_features: list) ->
             ('num', numerical_pipeline, numerical_features),
             ('cat', categorical_pipeline, categorical_features)
         ],
-        remainder='passthrough'
+        remainder='passthrough',
+        # 1.0 keeps any sparse output sparse, 0.0 densifies it
+        sparse_threshold=1.0 if sparse else 0.0
     )
 
     return preprocessor
 
-def run_preprocessing():
+def model_feature_params(preprocessor: ColumnTransformer) -> dict:
     """
-    Executes the full preprocessing pipeline and saves the processed data.
+    Describes the preprocessor's output columns to XGBoost.
+
+    Columns produced by an OrdinalEncoder hold category codes, which the
+    model must split on as categories rather than as ordered numbers.
+
+    Args:
+        preprocessor (ColumnTransformer): The fitted preprocessing pipeline.
+
+    Returns:
+        dict: 'enable_categorical' and 'feature_types' for `create_model`, or an empty dict for one-hot features.
+    """
+    feature_types = ['q'] * max(indices.stop for indices in preprocessor.output_indices_.values())
+    for name, transformer, _ in preprocessor.transformers_:
+        if isinstance(transformer, Pipeline) and isinstance(transformer[-1], OrdinalEncoder):
+            indices = preprocessor.output_indices_[name]
+            feature_types[indices] = ['c'] * (indices.stop - indices.start)
+
+    if 'c' not in feature_types:
+        return {}
+    return {'enable_categorical': True, 'feature_types': feature_types}
+
+def load_training_frames():
+    """
+    Loads the raw data, splits it into train and test sets and engineers the features.
+
+    Returns:
+        tuple: X_train, X_test (engineered, not yet preprocessed), y_train, y_test (log prices).
     """
     data = load_data(config.RAW_DATA_FILE)
 
@@ -96,19 +140,56 @@ def run_preprocessing():
     y_log = np.log1p(y)
 
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y_log, test_size=0.2, random_state=42
+        X, y_log, test_size=config.TEST_SIZE, random_state=config.SPLIT_RANDOM_STATE
     )
 
     X_train = engineer_features(X_train)
     X_test = engineer_features(X_test)
 
-    # --- START OF NEW CODE ---
-    # Save the engineered and split dataframes for inspection and debugging
-    X_train.to_csv(config.PROCESSED_X_TRAIN_FILE, index=False)
-    X_test.to_csv(config.PROCESSED_X_TEST_FILE, index=False)
-    y_train.to_csv(config.PROCESSED_Y_TRAIN_FILE, index=False)
-    y_test.to_csv(config.PROCESSED_Y_TEST_FILE, index=False)
-    # --- END OF NEW CODE ---
+    return X_train, X_test, y_train, y_test
+
+def processed_data_key() -> str:
+    """
+    Hashes the raw data file, the feature settings and the code of this module and the feature registry.
+
+    Returns:
+        str: The feature store key of the current processed data.
+    """
+    feature_config = {
+        "target": config.TARGET_VARIABLE,
+        "drop": config.FEATURES_TO_DROP,
+        "test_size": config.TEST_SIZE,
+        "random_state": config.SPLIT_RANDOM_STATE,
+        "sparse": config.SPARSE_FEATURES_ENABLED,
+        "encoding": config.CATEGORICAL_ENCODING,
+    }
+    return dataset_key(config.RAW_DATA_FILE, feature_config, [Path(__file__), Path(features.__file__)])
+
+def get_processed_data(rebuild: bool = False) -> ProcessedData:
+    """
+    Returns the processed data, from the feature store when nothing it depends on has changed.
+
+    Args:
+        rebuild (bool): Preprocess again even if the store has an entry.
+
+    Returns:
+        ProcessedData: The splits, their preprocessed matrices and the fitted preprocessor.
+    """
+    key = processed_data_key()
+    start = time.perf_counter()
+    stored = None if rebuild else load_processed_data(key)
+    if stored is not None:
+        data, manifest = stored
+        load_seconds = time.perf_counter() - start
+        logger.info(
+            f"Reused processed data {key[:12]} from the feature store in {load_seconds:.2f}s, skipping "
+            f"preprocessing ({manifest['preprocessing_seconds']:.2f}s, "
+            f"saved {manifest['preprocessing_seconds'] - load_seconds:.2f}s)."
+        )
+        return data
+
+    start = time.perf_counter()
+    X_train, X_test, y_train, y_test = load_training_frames()
 
     numerical_features = X_train.select_dtypes(include=np.number).columns.tolist()
     categorical_features = X_train.select_dtypes(exclude=np.number).columns.tolist()
@@ -118,6 +199,21 @@ def run_preprocessing():
     X_train_processed = preprocessor.fit_transform(X_train)
     X_test_processed = preprocessor.transform(X_test)
 
-    print("Preprocessing complete and intermediate files saved.")
-    
-    return X_train_processed, X_test_processed, y_train, y_test, preprocessor
+    data = ProcessedData(X_train, X_test, y_train, y_test, X_train_processed, X_test_processed, preprocessor)
+    preprocessing_seconds = time.perf_counter() - start
+    entry_dir = save_processed_data(key, data, preprocessing_seconds)
+    logger.info(f"Preprocessed data in {preprocessing_seconds:.2f}s and saved it to the feature store: {entry_dir}")
+    return data
+
+def run_preprocessing(rebuild: bool = False):
+    """
+    Executes the full preprocessing pipeline, reusing stored processed data when possible.
+
+    Args:
+        rebuild (bool): Preprocess again even if the feature store has an entry.
+
+    Returns:
+        tuple: X_train_processed, X_test_processed, y_train, y_test and the fitted preprocessor.
+    """
+    data = get_processed_data(rebuild)
+    return data.X_train_processed, data.X_test_processed, data.y_train, data.y_test, data.preprocessor
@@ -0,0 +1,189 @@
+# src/score.py
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Import our custom modules
+from src import config
+from src.logger_config import logger
+from src.model_store import list_model_versions, load_model_version, predict_frame
+
+PREDICTION_COLUMN = "PredictedPrice"
+
+# Model and preprocessor of a process-pool worker, loaded once by `_init_worker`
+_worker_model = None
+_worker_preprocessor = None
+
+def read_chunks(input_path: Path, chunksize: int):
+    """
+    Reads a CSV or Parquet file in fixed-size chunks.
+
+    Args:
+        input_path (Path): The input file (.csv or .parquet).
+        chunksize (int): The number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: The next chunk of rows.
+    """
+    if input_path.suffix == ".parquet":
+        parquet_file = pq.ParquetFile(input_path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            chunk = batch.to_pandas()
+            # Arrow nulls arrive as None in string columns; use NaN like pd.read_csv does,
+            # which is what the preprocessor's imputers were fitted on
+            categorical_columns = chunk.columns.intersection(config.CATEGORICAL_FEATURES)
+            chunk[categorical_columns] = chunk[categorical_columns].fillna(np.nan)
+            yield chunk
+    else:
+        # Categorical columns are read as strings even if a chunk only holds missing values
+        dtypes = {column: object for column in config.CATEGORICAL_FEATURES}
+        yield from pd.read_csv(input_path, chunksize=chunksize, dtype=dtypes)
+
+class PredictionWriter:
+    """Streams prediction chunks to a CSV or Parquet file."""
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, predictions: pd.DataFrame):
+        if self.output_path.suffix == ".parquet":
+            table = pa.Table.from_pandas(predictions, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            predictions.to_csv(self.output_path, mode="a" if self._wrote_header else "w", header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+def score_chunk(chunk: pd.DataFrame, model, preprocessor, id_column: str) -> pd.DataFrame:
+    """
+    Predicts the prices of one chunk of houses.
+
+    Args:
+        chunk (pd.DataFrame): Raw house features, as in train.csv.
+        model: The trained machine learning model.
+        preprocessor: The fitted preprocessing pipeline.
+        id_column (str): A column copied to the output to identify each house, if present.
+
+    Returns:
+        pd.DataFrame: The identifier column (if any) and the predicted prices.
+    """
+    output = pd.DataFrame(index=chunk.index)
+    if id_column in chunk.columns:
+        output[id_column] = chunk[id_column]
+
+    features = chunk.drop(columns=[id_column, config.TARGET_VARIABLE], errors="ignore")
+    output[PREDICTION_COLUMN] = predict_frame(features, model, preprocessor)
+    return output
+
+def _init_worker(version: str, model_dir: Path):
+    """Loads the model once per worker process, single-threaded to avoid oversubscribing cores."""
+    global _worker_model, _worker_preprocessor
+    _worker_model, _worker_preprocessor = load_model_version(version, model_dir)
+    _worker_model.set_params(n_jobs=1)
+
+def _score_chunk_in_worker(chunk: pd.DataFrame, id_column: str) -> pd.DataFrame:
+    return score_chunk(chunk, _worker_model, _worker_preprocessor, id_column)
+
+def score_file(input_path: Path, output_path: Path, version: str = None, chunksize: int = 50000,
+               workers: int = 1, id_column: str = "Id", model_dir: Path = None) -> dict:
+    """
+    Scores a CSV or Parquet file of houses chunk by chunk and streams the predictions to a file.
+
+    Memory use is bounded by the chunk size (times the number of chunks in
+    flight in process-pool mode), not by the size of the input file.
+
+    Args:
+        input_path (Path): The houses to score (.csv or .parquet).
+        output_path (Path): Where to write the predictions (.csv or .parquet).
+        version (str): The model version to use. Defaults to the newest one.
+        chunksize (int): The number of rows scored at a time.
+        workers (int): The number of worker processes; 1 scores in this process.
+        id_column (str): A column copied to the output to identify each house, if present.
+        model_dir (Path): The directory of the trained models. Defaults to MODEL_DIR.
+
+    Returns:
+        dict: The number of rows, elapsed seconds and throughput.
+    """
+    model_dir = Path(model_dir or config.MODEL_DIR)
+    versions = list(list_model_versions(model_dir))
+    if version is None:
+        if not versions:
+            raise FileNotFoundError(f"No model files found in {model_dir}.")
+        version = versions[-1]
+    logger.info(f"Scoring {input_path} with model version {version} ({workers} worker(s), chunks of {chunksize}).")
+
+    start = time.perf_counter()
+    n_rows = 0
+    writer = PredictionWriter(output_path)
+    try:
+        if workers <= 1:
+            model, preprocessor = load_model_version(version, model_dir)
+            for chunk in read_chunks(input_path, chunksize):
+                writer.write(score_chunk(chunk, model, preprocessor, id_column))
+                n_rows += len(chunk)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(version, model_dir)) as pool:
+                # Keep at most two chunks per worker in flight and write results in input order
+                pending = deque()
+                for chunk in read_chunks(input_path, chunksize):
+                    pending.append(pool.submit(_score_chunk_in_worker, chunk, id_column))
+                    if len(pending) >= 2 * workers:
+                        result = pending.popleft().result()
+                        writer.write(result)
+                        n_rows += len(result)
+                while pending:
+                    result = pending.popleft().result()
+                    writer.write(result)
+                    n_rows += len(result)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "rows": n_rows,
+        "seconds": elapsed,
+        "rows_per_second": n_rows / elapsed if elapsed > 0 else 0.0,
+        "model_version": version,
+    }
+    logger.info(f"Scored {n_rows} rows in {elapsed:.2f}s ({summary['rows_per_second']:,.0f} rows/sec) -> {output_path}")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of houses with a trained model.")
+    parser.add_argument("input", type=Path, help="Input file (.csv or .parquet).")
+    parser.add_argument("output", type=Path, help="Output file (.csv or .parquet).")
+    parser.add_argument("--model-version", default=None, help="Model version to use (default: newest).")
+    parser.add_argument("--model-dir", type=Path, default=None, help="Directory of the trained models (default: MODEL_DIR).")
+    parser.add_argument("--chunksize", type=int, default=50000, help="Rows scored at a time.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = all cores).")
+    parser.add_argument("--id-column", default="Id", help="Column copied to the output to identify each house.")
+    args = parser.parse_args()
+
+    score_file(
+        args.input,
+        args.output,
+        version=args.model_version,
+        chunksize=args.chunksize,
+        workers=args.workers or os.cpu_count(),
+        id_column=args.id_column,
+        model_dir=args.model_dir,
+    )
+
+if __name__ == "__main__":
+    main()
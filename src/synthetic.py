@@ -0,0 +1,213 @@
+# src/synthetic.py
+
+import numpy as np
+import pandas as pd
+
+# --- CATEGORY VOCABULARIES ---
+
+# Observed levels of each categorical column in the Ames training data.
+# A value of None stands for a missing entry (e.g. "no pool", "no garage").
+CATEGORY_LEVELS = {
+    "MSZoning": ["RL", "RM", "FV", "RH", "C (all)"],
+    "Street": ["Pave", "Grvl"],
+    "Alley": [None, "Grvl", "Pave"],
+    "LotShape": ["Reg", "IR1", "IR2", "IR3"],
+    "LandContour": ["Lvl", "Bnk", "HLS", "Low"],
+    "Utilities": ["AllPub", "NoSeWa"],
+    "LotConfig": ["Inside", "Corner", "CulDSac", "FR2", "FR3"],
+    "LandSlope": ["Gtl", "Mod", "Sev"],
+    "Neighborhood": [
+        "NAmes", "CollgCr", "OldTown", "Edwards", "Somerst", "Gilbert",
+        "NridgHt", "Sawyer", "NWAmes", "SawyerW", "BrkSide", "Crawfor",
+        "Mitchel", "NoRidge", "Timber", "IDOTRR", "ClearCr", "StoneBr",
+        "SWISU", "MeadowV", "Blmngtn", "BrDale", "Veenker", "NPkVill", "Blueste",
+    ],
+    "Condition1": ["Norm", "Feedr", "Artery", "RRAn", "PosN", "RRAe", "PosA", "RRNn", "RRNe"],
+    "Condition2": ["Norm", "Feedr", "Artery", "RRNn", "PosN", "PosA", "RRAn", "RRAe"],
+    "BldgType": ["1Fam", "TwnhsE", "Duplex", "Twnhs", "2fmCon"],
+    "HouseStyle": ["1Story", "2Story", "1.5Fin", "SLvl", "SFoyer", "1.5Unf", "2.5Unf", "2.5Fin"],
+    "RoofStyle": ["Gable", "Hip", "Flat", "Gambrel", "Mansard", "Shed"],
+    "RoofMatl": ["CompShg", "Tar&Grv", "WdShngl", "WdShake", "Metal", "Membran", "Roll", "ClyTile"],
+    "Exterior1st": [
+        "VinylSd", "HdBoard", "MetalSd", "Wd Sdng", "Plywood", "CemntBd",
+        "BrkFace", "WdShing", "Stucco", "AsbShng", "BrkComm", "Stone",
+    ],
+    "Exterior2nd": [
+        "VinylSd", "MetalSd", "HdBoard", "Wd Sdng", "Plywood", "CmentBd",
+        "Wd Shng", "Stucco", "BrkFace", "AsbShng", "ImStucc", "Brk Cmn",
+    ],
+    "MasVnrType": [None, "BrkFace", "Stone", "BrkCmn"],
+    "ExterQual": ["TA", "Gd", "Ex", "Fa"],
+    "ExterCond": ["TA", "Gd", "Fa", "Ex", "Po"],
+    "Foundation": ["PConc", "CBlock", "BrkTil", "Slab", "Stone", "Wood"],
+    "BsmtQual": ["TA", "Gd", "Ex", None, "Fa"],
+    "BsmtCond": ["TA", "Gd", "Fa", None, "Po"],
+    "BsmtExposure": ["No", "Av", "Gd", "Mn", None],
+    "BsmtFinType1": ["Unf", "GLQ", "ALQ", "BLQ", "Rec", "LwQ", None],
+    "BsmtFinType2": ["Unf", "Rec", "LwQ", "BLQ", "ALQ", "GLQ", None],
+    "Heating": ["GasA", "GasW", "Grav", "Wall", "OthW", "Floor"],
+    "HeatingQC": ["Ex", "TA", "Gd", "Fa", "Po"],
+    "CentralAir": ["Y", "N"],
+    "Electrical": ["SBrkr", "FuseA", "FuseF", "FuseP", "Mix", None],
+    "KitchenQual": ["TA", "Gd", "Ex", "Fa"],
+    "Functional": ["Typ", "Min2", "Min1", "Mod", "Maj1", "Maj2", "Sev"],
+    "FireplaceQu": [None, "Gd", "TA", "Fa", "Ex", "Po"],
+    "GarageType": ["Attchd", "Detchd", "BuiltIn", None, "Basment", "CarPort", "2Types"],
+    "GarageFinish": ["Unf", "RFn", "Fin", None],
+    "GarageQual": ["TA", None, "Fa", "Gd", "Ex", "Po"],
+    "GarageCond": ["TA", None, "Fa", "Gd", "Po", "Ex"],
+    "PavedDrive": ["Y", "N", "P"],
+    "PoolQC": [None, "Gd", "Ex", "Fa"],
+    "Fence": [None, "MnPrv", "GdPrv", "GdWo", "MnWw"],
+    "MiscFeature": [None, "Shed", "Gar2", "Othr", "TenC"],
+    "SaleType": ["WD", "New", "COD", "ConLD", "ConLI", "ConLw", "CWD", "Oth", "Con"],
+    "SaleCondition": ["Normal", "Partial", "Abnorml", "Family", "Alloca", "AdjLand"],
+}
+
+# Column order of the raw Kaggle training file (without 'Id' and the target)
+RAW_COLUMNS = [
+    "MSSubClass", "MSZoning", "LotFrontage", "LotArea", "Street", "Alley",
+    "LotShape", "LandContour", "Utilities", "LotConfig", "LandSlope",
+    "Neighborhood", "Condition1", "Condition2", "BldgType", "HouseStyle",
+    "OverallQual", "OverallCond", "YearBuilt", "YearRemodAdd", "RoofStyle",
+    "RoofMatl", "Exterior1st", "Exterior2nd", "MasVnrType", "MasVnrArea",
+    "ExterQual", "ExterCond", "Foundation", "BsmtQual", "BsmtCond",
+    "BsmtExposure", "BsmtFinType1", "BsmtFinSF1", "BsmtFinType2", "BsmtFinSF2",
+    "BsmtUnfSF", "TotalBsmtSF", "Heating", "HeatingQC", "CentralAir",
+    "Electrical", "1stFlrSF", "2ndFlrSF", "LowQualFinSF", "GrLivArea",
+    "BsmtFullBath", "BsmtHalfBath", "FullBath", "HalfBath", "BedroomAbvGr",
+    "KitchenAbvGr", "KitchenQual", "TotRmsAbvGrd", "Functional", "Fireplaces",
+    "FireplaceQu", "GarageType", "GarageYrBlt", "GarageFinish", "GarageCars",
+    "GarageArea", "GarageQual", "GarageCond", "PavedDrive", "WoodDeckSF",
+    "OpenPorchSF", "EnclosedPorch", "3SsnPorch", "ScreenPorch", "PoolArea",
+    "PoolQC", "Fence", "MiscFeature", "MiscVal", "MoSold", "YrSold",
+    "SaleType", "SaleCondition",
+]
+
+
+def _choice(rng: np.random.Generator, levels: list, n: int) -> np.ndarray:
+    """Draws n levels with a Zipf-like skew so the first level dominates."""
+    weights = 1.0 / np.arange(1, len(levels) + 1) ** 1.5
+    values = np.empty(len(levels), dtype=object)
+    # Missing entries are NaN, as pd.read_csv produces for train.csv
+    values[:] = [np.nan if level is None else level for level in levels]
+    return values[rng.choice(len(levels), size=n, p=weights / weights.sum())]
+
+
+def generate_houses(n_rows: int, seed: int = 42, with_target: bool = True) -> pd.DataFrame:
+    """
+    Generates synthetic Ames-like houses with the same columns and dtypes as train.csv.
+
+    The values are random but plausible (e.g. floor areas add up, garages
+    are built after the house) so that the preprocessing pipeline and the
+    model behave like they do on the real data.
+
+    Args:
+        n_rows (int): The number of houses to generate.
+        seed (int): Seed for the random number generator.
+        with_target (bool): Whether to add a 'SalePrice' column.
+
+    Returns:
+        pd.DataFrame: The generated houses.
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+
+    for column, levels in CATEGORY_LEVELS.items():
+        data[column] = _choice(rng, levels, n_rows)
+
+    year_built = rng.integers(1872, 2011, n_rows)
+    yr_sold = rng.integers(np.maximum(year_built, 2006), 2011)
+    remodeled = rng.random(n_rows) < 0.45
+    year_remod = np.where(remodeled, rng.integers(np.maximum(year_built, 1950), yr_sold + 1), np.maximum(year_built, 1950))
+
+    overall_qual = np.clip(np.round(rng.normal(6.1, 1.4, n_rows)), 1, 10).astype(int)
+    first_flr = np.clip(rng.normal(1160, 380, n_rows), 334, 4700).astype(int)
+    has_second = rng.random(n_rows) < 0.43
+    second_flr = np.where(has_second, np.clip(rng.normal(800, 200, n_rows), 110, 2065), 0).astype(int)
+    low_qual = np.where(rng.random(n_rows) < 0.02, rng.integers(50, 570, n_rows), 0)
+    gr_liv_area = first_flr + second_flr + low_qual
+
+    bsmt_total = np.clip(rng.normal(1050, 440, n_rows), 0, 6100).astype(int)
+    bsmt_fin1 = (bsmt_total * rng.uniform(0, 0.9, n_rows)).astype(int)
+    bsmt_fin2 = np.where(rng.random(n_rows) < 0.11, ((bsmt_total - bsmt_fin1) * rng.uniform(0, 0.8, n_rows)).astype(int), 0)
+    bsmt_unf = bsmt_total - bsmt_fin1 - bsmt_fin2
+
+    garage_cars = rng.choice([0, 1, 2, 3, 4], size=n_rows, p=[0.06, 0.25, 0.56, 0.12, 0.01])
+    has_garage = garage_cars > 0
+    garage_yr = np.where(has_garage, year_built + rng.integers(0, 5, n_rows), np.nan).astype(float)
+    garage_yr = np.minimum(garage_yr, yr_sold)
+
+    data.update({
+        "MSSubClass": rng.choice([20, 30, 40, 45, 50, 60, 70, 75, 80, 85, 90, 120, 160, 180, 190], size=n_rows),
+        "LotFrontage": np.where(rng.random(n_rows) < 0.18, np.nan, np.clip(rng.normal(70, 24, n_rows), 21, 313).round()),
+        "LotArea": np.clip(rng.lognormal(9.1, 0.5, n_rows), 1300, 215000).astype(int),
+        "OverallQual": overall_qual,
+        "OverallCond": np.clip(np.round(rng.normal(5.6, 1.1, n_rows)), 1, 9).astype(int),
+        "YearBuilt": year_built,
+        "YearRemodAdd": year_remod,
+        "MasVnrArea": np.where(pd.isna(data["MasVnrType"]), 0.0, np.clip(rng.normal(250, 180, n_rows), 14, 1600).round()),
+        "BsmtFinSF1": bsmt_fin1,
+        "BsmtFinSF2": bsmt_fin2,
+        "BsmtUnfSF": bsmt_unf,
+        "TotalBsmtSF": bsmt_total,
+        "1stFlrSF": first_flr,
+        "2ndFlrSF": second_flr,
+        "LowQualFinSF": low_qual,
+        "GrLivArea": gr_liv_area,
+        "BsmtFullBath": rng.choice([0, 1, 2], size=n_rows, p=[0.59, 0.40, 0.01]),
+        "BsmtHalfBath": rng.choice([0, 1], size=n_rows, p=[0.94, 0.06]),
+        "FullBath": rng.choice([1, 2, 3], size=n_rows, p=[0.45, 0.52, 0.03]),
+        "HalfBath": rng.choice([0, 1, 2], size=n_rows, p=[0.62, 0.37, 0.01]),
+        "BedroomAbvGr": rng.choice([1, 2, 3, 4, 5], size=n_rows, p=[0.04, 0.25, 0.55, 0.14, 0.02]),
+        "KitchenAbvGr": rng.choice([1, 2], size=n_rows, p=[0.95, 0.05]),
+        "TotRmsAbvGrd": np.clip(np.round(gr_liv_area / 230 + rng.normal(0, 0.8, n_rows)), 2, 14).astype(int),
+        "Fireplaces": rng.choice([0, 1, 2], size=n_rows, p=[0.47, 0.45, 0.08]),
+        "GarageYrBlt": garage_yr,
+        "GarageCars": garage_cars,
+        "GarageArea": np.where(has_garage, garage_cars * rng.integers(220, 300, n_rows), 0),
+        "WoodDeckSF": np.where(rng.random(n_rows) < 0.48, rng.integers(20, 860, n_rows), 0),
+        "OpenPorchSF": np.where(rng.random(n_rows) < 0.55, rng.integers(8, 550, n_rows), 0),
+        "EnclosedPorch": np.where(rng.random(n_rows) < 0.14, rng.integers(20, 550, n_rows), 0),
+        "3SsnPorch": np.where(rng.random(n_rows) < 0.02, rng.integers(20, 510, n_rows), 0),
+        "ScreenPorch": np.where(rng.random(n_rows) < 0.08, rng.integers(40, 480, n_rows), 0),
+        "PoolArea": np.where(pd.isna(data["PoolQC"]), 0, rng.integers(480, 740, n_rows)),
+        "MiscVal": np.where(pd.isna(data["MiscFeature"]), 0, rng.integers(50, 2500, n_rows)),
+        "MoSold": rng.integers(1, 13, n_rows),
+        "YrSold": yr_sold,
+    })
+
+    houses = pd.DataFrame({column: data[column] for column in RAW_COLUMNS})
+
+    if with_target:
+        neighborhood_effect = pd.Series(
+            np.linspace(0.25, -0.25, len(CATEGORY_LEVELS["Neighborhood"])),
+            index=CATEGORY_LEVELS["Neighborhood"],
+        )
+        log_price = (
+            10.6
+            + 0.11 * overall_qual
+            + 0.00028 * (gr_liv_area + bsmt_total)
+            - 0.0025 * (yr_sold - year_built)
+            + 0.04 * garage_cars
+            + neighborhood_effect.reindex(houses["Neighborhood"]).to_numpy()
+            + rng.normal(0, 0.08, n_rows)
+        )
+        houses["SalePrice"] = np.expm1(log_price).round().astype(int)
+
+    return houses
+
+def generate_payloads(n_rows: int, seed: int = 0) -> list:
+    """
+    Generates synthetic houses shaped like the API's HouseData payload.
+
+    Args:
+        n_rows (int): The number of houses to generate.
+        seed (int): Seed for the random number generator.
+
+    Returns:
+        list: One dictionary per house, with missing values as None.
+    """
+    houses = generate_houses(n_rows, seed=seed, with_target=False).drop(columns=["TotalBsmtSF"])
+    houses = houses.astype(object).where(pd.notna(houses), None)
+    return houses.to_dict(orient="records")
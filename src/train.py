@@ -1,5 +1,8 @@
 # src/train.py
 
+import argparse
+import json
+import os
 import joblib
 import numpy as np
 from src.evaluate import calculate_rmse, calculate_r2
@@ -7,33 +10,75 @@ from src.evaluate import calculate_rmse, calculate_r2
 # Import our custom modules
 from src import config
 from src.logger_config import logger
-from src.preprocessing import run_preprocessing
+from src.preprocessing import get_processed_data, load_data, model_feature_params
 from src.model import create_model
+from src.compact import compact_model, log_report
+from src.tune import tune
+from src.comps import build_comps_index
+from src.drift_profile import build_reference_profile, save_reference_profile
+from src.export import PreprocessorParams
 
-def train_model():
+def save_artifact(artifact, path):
+    """
+    Saves an artifact with joblib, atomically.
+
+    The artifact is written to a temporary file that is then renamed, so a
+    running API never sees a partially written file.
+
+    Args:
+        artifact: The object to save.
+        path (Path): The destination file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, path)
+
+def save_native_model(model, path):
+    """
+    Exports the booster in XGBoost's native format, atomically.
+
+    Args:
+        model: The trained XGBoost model.
+        path (Path): The destination file; the extension ('.ubj' or '.json') selects the format.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp" + path.suffix)
+    model.save_model(tmp_path)
+    os.replace(tmp_path, path)
+
+def train_model(model_params: dict = None, leaderboard=None, rebuild_features: bool = False):
     """
     Main function to train the model.
     It runs the preprocessing pipeline, trains the XGBoost model,
-    evaluates it, and saves the trained model and preprocessor.
+    compacts it, evaluates it, and saves the trained model and preprocessor.
+
+    Args:
+        model_params (dict): Hyperparameters overriding XGBOOST_PARAMS, e.g. from `tune_model`.
+        leaderboard (pd.DataFrame): A tuning leaderboard saved next to the model version.
+        rebuild_features (bool): Preprocess again even if the feature store has the processed data.
     """
     logger.info("--- Starting the training pipeline ---")
 
     # 1. Run the preprocessing pipeline
-    logger.info("Step 1/5: Running data preprocessing...")
+    logger.info("Step 1/6: Running data preprocessing...")
     try:
-        X_train, X_test, y_train, y_test, preprocessor = run_preprocessing()
+        data = get_processed_data(rebuild_features)
+        X_train, X_test, y_train, y_test = data.X_train_processed, data.X_test_processed, data.y_train, data.y_test
+        preprocessor = data.preprocessor
         logger.info("Data preprocessing completed successfully.")
     except Exception as e:
         logger.error(f"An error occurred during preprocessing: {e}")
         return
 
     # 2. Create the model
-    logger.info("Step 2/5: Creating the XGBoost model...")
-    model = create_model()
-    logger.info("Model created.")
+    logger.info("Step 2/6: Creating the XGBoost model...")
+    # With native categorical encoding, the model must know which columns hold category codes
+    model = create_model(**model_feature_params(preprocessor), **(model_params or {}))
+    logger.info(f"Model created{' with tuned hyperparameters' if model_params else ''}.")
 
     # 3. Train the model
-    logger.info("Step 3/5: Training the model...")
+    logger.info("Step 3/6: Training the model...")
     try:
         model.fit(X_train, y_train)
         logger.info("Model training completed.")
@@ -41,26 +86,83 @@ def train_model():
         logger.error(f"An error occurred during model training: {e}")
         return
 
-    # 4. Save the trained model and the preprocessor
-    logger.info("Step 4/5: Saving artifacts...")
+    # 4. Find the compact form of the model, served with COMPACT_MODEL
+    logger.info("Step 4/6: Compacting the model...")
     try:
-        # Get the versioned model name
-        model_filename = config.get_versioned_model_name()
-        model_save_path = config.MODEL_DIR / model_filename
-        joblib.dump(model, model_save_path)
-        logger.info(f"Model saved to: {model_save_path}")
+        flat_trees, compaction_report = compact_model(
+            model, X_test, y_test, config.COMPACT_MODEL_RMSE_TOLERANCE, config.COMPACT_MODEL_PRUNE_TOLERANCE
+        )
+        log_report(compaction_report)
+    except Exception as e:
+        # The full model is still saved and served
+        logger.error(f"An error occurred during model compaction: {e}", exc_info=True)
+        flat_trees, compaction_report = None, None
 
-        # Save the preprocessor
-        preprocessor_save_path = config.MODEL_DIR / "preprocessor.joblib"
-        joblib.dump(preprocessor, preprocessor_save_path)
+    # 5. Save the trained model and the preprocessor
+    logger.info("Step 5/6: Saving artifacts...")
+    try:
+        # The model and its preprocessor share one version so they are always loaded together
+        version = config.get_model_version()
+
+        # Save the preprocessor first: the API picks up a new version when its model file appears
+        preprocessor_save_path = config.MODEL_DIR / config.get_versioned_preprocessor_name(version)
+        save_artifact(preprocessor, preprocessor_save_path)
         logger.info(f"Preprocessor saved to: {preprocessor_save_path}")
 
+        # Pickle-free exports the API loads instead: compiled preprocessor arrays and the native booster
+        params_save_path = config.MODEL_DIR / config.get_versioned_preprocessor_params_name(version)
+        PreprocessorParams.from_preprocessor(preprocessor).save(params_save_path)
+        logger.info(f"Compiled preprocessor parameters saved to: {params_save_path}.json/.npy")
+
+        native_model_save_path = config.MODEL_DIR / config.get_versioned_native_model_name(version)
+        save_native_model(model, native_model_save_path)
+        logger.info(f"Native model saved to: {native_model_save_path}")
+
+        # The raw training split, as the API receives houses, for input drift monitoring
+        raw_train = load_data(config.RAW_DATA_FILE).loc[data.X_train.index]
+        train_ids = raw_train["Id"] if "Id" in raw_train else None
+        raw_train = raw_train.drop(columns=[config.TARGET_VARIABLE] + config.FEATURES_TO_DROP)
+        profile_save_path = config.MODEL_DIR / config.get_versioned_drift_profile_name(version)
+        save_reference_profile(build_reference_profile(raw_train, config.DRIFT_PROFILE_BINS), profile_save_path)
+        logger.info(f"Input reference profile saved to: {profile_save_path}")
+
+        # The training houses with their sale prices, indexed for the /comps endpoint
+        try:
+            comps_index = build_comps_index(
+                data.X_train, np.expm1(data.y_train), preprocessor, config.COMPS_FEATURES,
+                ids=train_ids, algorithm=config.COMPS_INDEX_ALGORITHM,
+            )
+            comps_index_save_path = config.MODEL_DIR / config.get_versioned_comps_index_name(version)
+            save_artifact(comps_index, comps_index_save_path)
+            logger.info(f"Comparables index saved to: {comps_index_save_path}")
+        except Exception as e:
+            # The model is still served, without /comps
+            logger.error(f"An error occurred while building the comparables index: {e}", exc_info=True)
+
+        if flat_trees is not None:
+            flat_model_save_path = config.MODEL_DIR / config.get_versioned_flat_model_name(version)
+            flat_trees.save(flat_model_save_path)
+            logger.info(f"Flat trees saved to: {flat_model_save_path}")
+        if compaction_report is not None:
+            report_save_path = config.MODEL_DIR / config.get_versioned_compaction_report_name(version)
+            report_save_path.write_text(json.dumps(compaction_report, indent=2))
+            logger.info(f"Compaction report saved to: {report_save_path}")
+
+        if leaderboard is not None:
+            leaderboard_save_path = config.MODEL_DIR / config.get_versioned_leaderboard_name(version)
+            leaderboard.to_csv(leaderboard_save_path, index=False)
+            logger.info(f"Tuning leaderboard saved to: {leaderboard_save_path}")
+
+        model_save_path = config.MODEL_DIR / config.get_versioned_model_name(version)
+        save_artifact(model, model_save_path)
+        logger.info(f"Model saved to: {model_save_path}")
+
     except Exception as e:
         logger.error(f"An error occurred while saving artifacts: {e}")
         return
 
-    # 5. Evaluate the model on the test set
-    logger.info("Step 5/5: Evaluating the model...")
+    # 6. Evaluate the model on the test set
+    logger.info("Step 6/6: Evaluating the model...")
     try:
         y_pred = model.predict(X_test)
 
@@ -78,5 +180,51 @@ def train_model():
     
     logger.info("--- Training pipeline finished successfully ---")
 
+def tune_model(strategy: str = None, n_candidates: int = None, n_folds: int = None, workers: int = 1,
+               rebuild_features: bool = False):
+    """
+    Tunes the hyperparameters with cross-validation, then trains and saves a model with the best ones.
+
+    Args:
+        strategy (str): 'random' or 'halving'. Defaults to TUNING_STRATEGY.
+        n_candidates (int): The number of sampled candidates. Defaults to TUNING_N_CANDIDATES.
+        n_folds (int): The number of cross-validation folds. Defaults to TUNING_CV_FOLDS.
+        workers (int): The number of worker processes.
+        rebuild_features (bool): Preprocess again even if the feature store has the processed data.
+    """
+    logger.info("--- Starting hyperparameter tuning ---")
+    try:
+        data = get_processed_data(rebuild_features)
+        leaderboard, summary = tune(
+            data.X_train, data.y_train, strategy=strategy, n_candidates=n_candidates, n_folds=n_folds, workers=workers
+        )
+    except Exception as e:
+        logger.error(f"An error occurred during hyperparameter tuning: {e}", exc_info=True)
+        return
+
+    logger.info(f"Best hyperparameters: {summary['best_params']}")
+    # Early stopping found the number of trees on the folds; the final model trains exactly that many.
+    # The processed data was just stored, so training reuses it.
+    train_model(
+        model_params={**summary["best_params"], "n_estimators": summary["best_n_estimators"]},
+        leaderboard=leaderboard,
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the house price model.")
+    parser.add_argument("--rebuild-features", action="store_true", help="Ignore the feature store and preprocess again.")
+    modes = parser.add_subparsers(dest="mode")
+    tune_parser = modes.add_parser("tune", help="Search hyperparameters with k-fold CV, then train the best model.")
+    tune_parser.add_argument("--strategy", choices=["random", "halving"], default=config.TUNING_STRATEGY)
+    tune_parser.add_argument("--n-candidates", type=int, default=config.TUNING_N_CANDIDATES)
+    tune_parser.add_argument("--folds", type=int, default=config.TUNING_CV_FOLDS)
+    tune_parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = all cores).")
+    args = parser.parse_args()
+
+    if args.mode == "tune":
+        tune_model(args.strategy, args.n_candidates, args.folds, args.workers or os.cpu_count(), args.rebuild_features)
+    else:
+        train_model(rebuild_features=args.rebuild_features)
+
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    main()
\ No newline at end of file
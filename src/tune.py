@@ -0,0 +1,299 @@
+# src/tune.py
+
+import hashlib
+import inspect
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.model_selection import KFold
+
+# Import our custom modules
+from src import config
+from src.evaluate import calculate_rmse
+from src.logger_config import logger
+from src.model import create_model
+from src.preprocessing import create_preprocessor, model_feature_params
+
+# Preprocessed folds of a process-pool worker, loaded once by `_init_worker`
+_worker_folds = None
+_worker_n_jobs = 1
+
+def sample_candidates(search_space: dict, n_candidates: int, seed: int = 42) -> list:
+    """
+    Draws random hyperparameter combinations from a search space.
+
+    Args:
+        search_space (dict): Parameter -> (distribution, low, high), see TUNING_SEARCH_SPACE.
+        n_candidates (int): The number of combinations.
+        seed (int): Seed for the random draws.
+
+    Returns:
+        list: One parameter dictionary per candidate.
+    """
+    rng = np.random.default_rng(seed)
+    candidates = []
+    for _ in range(n_candidates):
+        params = {}
+        for name, (distribution, low, high) in search_space.items():
+            if distribution == 'int':
+                params[name] = int(rng.integers(low, high + 1))
+            elif distribution == 'uniform':
+                params[name] = float(rng.uniform(low, high))
+            elif distribution == 'log_uniform':
+                params[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+            else:
+                raise ValueError(f"Unknown distribution '{distribution}' for parameter '{name}'.")
+        candidates.append(params)
+    return candidates
+
+def fold_cache_key(X: pd.DataFrame, y: pd.Series, n_folds: int, seed: int) -> str:
+    """
+    Identifies a set of preprocessed folds by the data, the split and the preprocessing code.
+
+    Args:
+        X (pd.DataFrame): The engineered training features.
+        y (pd.Series): The log-transformed training target.
+        n_folds (int): The number of folds.
+        seed (int): Seed of the fold split.
+
+    Returns:
+        str: A hex digest used as the cache directory name.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(X, index=True).values.tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=True).values.tobytes())
+    digest.update(json.dumps([n_folds, seed, config.SPARSE_FEATURES_ENABLED, config.CATEGORICAL_ENCODING, sklearn.__version__]).encode())
+    digest.update(inspect.getsource(create_preprocessor).encode())
+    return digest.hexdigest()
+
+def build_fold_cache(X: pd.DataFrame, y: pd.Series, n_folds: int, seed: int, cache_dir: Path) -> list:
+    """
+    Preprocesses every cross-validation fold once and stores the matrices on disk.
+
+    Each fold gets its own preprocessor, fitted on the training part only, so
+    the validation part never leaks into the imputers and scalers. Folds
+    already in the cache are reused.
+
+    Args:
+        X (pd.DataFrame): The engineered training features.
+        y (pd.Series): The log-transformed training target.
+        n_folds (int): The number of folds.
+        seed (int): Seed of the fold split.
+        cache_dir (Path): The root directory of the fold cache.
+
+    Returns:
+        list: The path of each preprocessed fold.
+    """
+    fold_dir = Path(cache_dir) / fold_cache_key(X, y, n_folds, seed)
+    fold_paths = [fold_dir / f"fold_{i}.joblib" for i in range(n_folds)]
+    if all(path.exists() for path in fold_paths):
+        logger.info(f"Reusing {n_folds} preprocessed folds from {fold_dir}")
+        return fold_paths
+
+    fold_dir.mkdir(parents=True, exist_ok=True)
+    numerical_features = X.select_dtypes(include=np.number).columns.tolist()
+    categorical_features = X.select_dtypes(exclude=np.number).columns.tolist()
+
+    start = time.perf_counter()
+    splits = KFold(n_splits=n_folds, shuffle=True, random_state=seed).split(X)
+    for path, (train_index, val_index) in zip(fold_paths, splits):
+        preprocessor = create_preprocessor(numerical_features, categorical_features)
+        fold = (
+            preprocessor.fit_transform(X.iloc[train_index]),
+            y.iloc[train_index].to_numpy(),
+            preprocessor.transform(X.iloc[val_index]),
+            y.iloc[val_index].to_numpy(),
+            model_feature_params(preprocessor),
+        )
+        tmp_path = path.with_name(path.name + ".tmp")
+        joblib.dump(fold, tmp_path)
+        os.replace(tmp_path, path)
+    logger.info(f"Preprocessed {n_folds} folds in {time.perf_counter() - start:.2f}s -> {fold_dir}")
+    return fold_paths
+
+def _init_worker(fold_paths: list, n_jobs: int):
+    """Loads the preprocessed folds once per worker process, memory-mapping their arrays."""
+    global _worker_folds, _worker_n_jobs
+    _worker_folds = [joblib.load(path, mmap_mode='r') for path in fold_paths]
+    _worker_n_jobs = n_jobs
+
+def _fit_fold(candidate_id: int, params: dict, fold_index: int, n_estimators: int, early_stopping_rounds: int) -> dict:
+    """
+    Fits one candidate on one fold, with early stopping on the validation part.
+
+    Returns:
+        dict: The validation RMSE, the best number of trees and the fit time.
+    """
+    X_train, y_train, X_val, y_val, feature_params = _worker_folds[fold_index]
+    start = time.perf_counter()
+    model = create_model(
+        **feature_params,
+        **params,
+        n_estimators=n_estimators,
+        early_stopping_rounds=early_stopping_rounds,
+        n_jobs=_worker_n_jobs,
+    )
+    model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+    return {
+        "candidate": candidate_id,
+        "fold": fold_index,
+        "rmse": calculate_rmse(y_val, model.predict(X_val)),
+        "best_n_estimators": model.best_iteration + 1,
+        "fit_seconds": time.perf_counter() - start,
+    }
+
+class _SerialPool:
+    """Runs tasks in this process, with the same interface as the process pool."""
+
+    def map(self, func, *iterables):
+        return map(func, *iterables)
+
+def evaluate_candidates(pool, candidates: dict, n_folds: int, n_estimators: int, early_stopping_rounds: int) -> list:
+    """
+    Cross-validates candidates, running every (candidate, fold) pair as a separate task.
+
+    Args:
+        pool: A process pool (or `_SerialPool`) whose workers hold the preprocessed folds.
+        candidates (dict): Candidate id -> parameters.
+        n_folds (int): The number of folds.
+        n_estimators (int): The maximum number of trees.
+        early_stopping_rounds (int): Rounds without improvement before a fit stops.
+
+    Returns:
+        list: One result per candidate with the mean and standard deviation of the fold RMSEs.
+    """
+    tasks = [(candidate_id, fold) for candidate_id in candidates for fold in range(n_folds)]
+    fold_results = list(pool.map(
+        _fit_fold,
+        [candidate_id for candidate_id, _ in tasks],
+        [candidates[candidate_id] for candidate_id, _ in tasks],
+        [fold for _, fold in tasks],
+        [n_estimators] * len(tasks),
+        [early_stopping_rounds] * len(tasks),
+    ))
+
+    results = []
+    for candidate_id, params in candidates.items():
+        folds = [r for r in fold_results if r["candidate"] == candidate_id]
+        rmses = [r["rmse"] for r in folds]
+        results.append({
+            "candidate": candidate_id,
+            "n_estimators_budget": n_estimators,
+            "cv_rmse_mean": float(np.mean(rmses)),
+            "cv_rmse_std": float(np.std(rmses)),
+            "best_n_estimators": int(round(np.mean([r["best_n_estimators"] for r in folds]))),
+            "fit_seconds": float(sum(r["fit_seconds"] for r in folds)),
+            **params,
+        })
+    return results
+
+def tune(X: pd.DataFrame, y: pd.Series, search_space: dict = None, strategy: str = None, n_candidates: int = None,
+         n_folds: int = None, workers: int = 1, max_estimators: int = None, early_stopping_rounds: int = None,
+         halving_factor: int = None, seed: int = 42, cache_dir: Path = None) -> tuple:
+    """
+    Searches the hyperparameter space with k-fold cross-validation.
+
+    Folds are preprocessed once (and cached on disk), then (candidate, fold)
+    fits are spread over a pool of worker processes. With the 'halving'
+    strategy, every candidate first gets a small tree budget and only the
+    best 1/halving_factor of them are re-evaluated with a larger one, until
+    the last round uses `max_estimators`.
+
+    Args:
+        X (pd.DataFrame): The engineered training features.
+        y (pd.Series): The log-transformed training target.
+        search_space (dict): Parameter -> (distribution, low, high). Defaults to TUNING_SEARCH_SPACE.
+        strategy (str): 'random' or 'halving'. Defaults to TUNING_STRATEGY.
+        n_candidates (int): The number of sampled candidates.
+        n_folds (int): The number of cross-validation folds.
+        workers (int): The number of worker processes; 1 runs in this process.
+        max_estimators (int): The largest tree budget of a candidate.
+        early_stopping_rounds (int): Rounds without improvement on the validation fold before a fit stops.
+        halving_factor (int): The fraction of candidates kept per halving round is 1/halving_factor.
+        seed (int): Seed for the candidates and the fold split.
+        cache_dir (Path): Where preprocessed folds are cached. Defaults to TUNING_CACHE_DIR.
+
+    Returns:
+        tuple: The leaderboard (pd.DataFrame, best first, one row per candidate
+            and round) and a summary dict with the best parameters and timings.
+    """
+    search_space = search_space or config.TUNING_SEARCH_SPACE
+    strategy = strategy or config.TUNING_STRATEGY
+    n_candidates = n_candidates or config.TUNING_N_CANDIDATES
+    n_folds = n_folds or config.TUNING_CV_FOLDS
+    max_estimators = max_estimators or config.TUNING_MAX_ESTIMATORS
+    early_stopping_rounds = early_stopping_rounds or config.TUNING_EARLY_STOPPING_ROUNDS
+    halving_factor = halving_factor or config.TUNING_HALVING_FACTOR
+    cache_dir = cache_dir or config.TUNING_CACHE_DIR
+    if strategy not in ("random", "halving"):
+        raise ValueError(f"Unknown tuning strategy: {strategy!r}")
+
+    start = time.perf_counter()
+    fold_paths = build_fold_cache(X, y, n_folds, seed, cache_dir)
+    all_candidates = dict(enumerate(sample_candidates(search_space, n_candidates, seed)))
+    candidates = all_candidates
+
+    # Tree budgets per round: a single full budget for random search, growing by the factor for halving
+    n_rounds = 1
+    if strategy == "halving":
+        n_rounds = max(1, int(math.floor(math.log(n_candidates, halving_factor))) + 1)
+    budgets = [max(early_stopping_rounds, max_estimators // halving_factor ** (n_rounds - 1 - r)) for r in range(n_rounds)]
+
+    # Split the cores between workers so that XGBoost threads do not oversubscribe them
+    n_jobs = max(1, (os.cpu_count() or 1) // workers)
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(fold_paths, n_jobs))
+    else:
+        _init_worker(fold_paths, n_jobs)
+        pool = _SerialPool()
+
+    leaderboard = []
+    try:
+        for round_index, budget in enumerate(budgets):
+            results = evaluate_candidates(pool, candidates, n_folds, budget, early_stopping_rounds)
+            results.sort(key=lambda r: r["cv_rmse_mean"])
+            for result in results:
+                result["round"] = round_index
+            leaderboard.extend(results)
+            logger.info(
+                f"Round {round_index + 1}/{n_rounds}: {len(candidates)} candidate(s) x {n_folds} folds, "
+                f"up to {budget} trees, best CV RMSE {results[0]['cv_rmse_mean']:.4f}"
+            )
+            n_keep = max(1, len(results) // halving_factor)
+            candidates = {r["candidate"]: candidates[r["candidate"]] for r in results[:n_keep]}
+    finally:
+        if workers > 1:
+            pool.shutdown()
+
+    wall_seconds = time.perf_counter() - start
+    leaderboard = pd.DataFrame(leaderboard).sort_values(["round", "cv_rmse_mean"], ascending=[False, True])
+    leaderboard = leaderboard.reset_index(drop=True)
+    best = leaderboard.iloc[0]
+    fit_seconds = float(leaderboard["fit_seconds"].sum())
+    summary = {
+        "strategy": strategy,
+        "n_candidates": n_candidates,
+        "n_folds": n_folds,
+        "workers": workers,
+        "threads_per_worker": n_jobs,
+        "cpu_count": os.cpu_count(),
+        "wall_seconds": wall_seconds,
+        "fit_seconds": fit_seconds,
+        "best_cv_rmse": float(best["cv_rmse_mean"]),
+        "best_n_estimators": int(best["best_n_estimators"]),
+        "best_params": all_candidates[int(best["candidate"])],
+    }
+    logger.info(
+        f"Tuning finished in {wall_seconds:.1f}s on {workers} worker(s) x {n_jobs} thread(s), "
+        f"{os.cpu_count()} core(s) ({fit_seconds:.1f}s summed over all fits). "
+        f"Best CV RMSE {summary['best_cv_rmse']:.4f} with {summary['best_n_estimators']} trees."
+    )
+    return leaderboard, summary
@@ -0,0 +1,152 @@
+# tests/conftest.py
+
+import io
+import itertools
+import logging
+import os
+from logging.handlers import TimedRotatingFileHandler
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from pythonjsonlogger.json import JsonFormatter
+
+from src import config, logger_config
+from src.logger_config import AUDIT_LOGGER_NAME, flush_logs, logger
+from src.preprocessing import create_preprocessor, engineer_features
+from src.synthetic import generate_houses
+
+def _log_file_handlers():
+    """The log files of the application and audit loggers, including those behind a log queue (not pytest's handlers)."""
+    for logger_name in (logger.name, AUDIT_LOGGER_NAME):
+        for handler in logging.getLogger(logger_name).handlers:
+            listener = getattr(handler, "listener", None)
+            for inner in (listener.handlers if listener is not None else [handler]):
+                if isinstance(inner, TimedRotatingFileHandler):
+                    yield inner
+
+@pytest.fixture(scope="session", autouse=True)
+def log_dir(tmp_path_factory):
+    """
+    Writes the application log and the prediction audit log under a temporary directory instead of logs/.
+
+    The loggers are set up when src.logger_config is imported, before any
+    fixture runs, but their files are only opened by the first record, so
+    pointing the handlers elsewhere here is enough.
+    """
+    log_dir = tmp_path_factory.mktemp("logs")
+    flush_logs()
+    with pytest.MonkeyPatch.context() as mp:
+        for module in (config, logger_config):
+            mp.setattr(module, "LOG_DIR", log_dir)
+        mp.setattr(logger_config, "LOG_FILE", log_dir / logger_config.LOG_FILE.name)
+        mp.setattr(logger_config, "AUDIT_LOG_FILE", log_dir / logger_config.AUDIT_LOG_FILE.name)
+        for handler in _log_file_handlers():
+            handler.acquire()
+            try:
+                if handler.stream is not None:
+                    handler.stream.close()
+                    handler.stream = None
+                # Not restored: records written after the session still belong to it
+                handler.baseFilename = str(log_dir / Path(handler.baseFilename).name)
+            finally:
+                handler.release()
+        yield log_dir
+        flush_logs()
+
+@pytest.fixture(scope="session")
+def fitted_pipeline():
+    """
+    A small model and preprocessor fitted on synthetic houses, like src/train.py does.
+    """
+    houses = generate_houses(400, seed=1)
+    y_log = np.log1p(houses.pop("SalePrice"))
+    X = engineer_features(houses)
+
+    numerical_features = X.select_dtypes(include=np.number).columns.tolist()
+    categorical_features = X.select_dtypes(exclude=np.number).columns.tolist()
+    preprocessor = create_preprocessor(numerical_features, categorical_features)
+
+    model = xgb.XGBRegressor(n_estimators=50, max_depth=4, random_state=42)
+    model.fit(preprocessor.fit_transform(X), y_log)
+    return model, preprocessor
+
+@pytest.fixture
+def house_payloads():
+    """
+    Synthetic houses shaped like the API's HouseData payload.
+    """
+    houses = generate_houses(50, seed=7, with_target=False).drop(columns=["TotalBsmtSF"])
+    houses = houses.astype(object).where(pd.notna(houses), None)
+    return houses.to_dict(orient="records")
+
+@pytest.fixture
+def save_version(tmp_path, monkeypatch, fitted_pipeline):
+    """
+    Saves model versions like src/train.py does, in a temporary model directory the API and the registry load from.
+
+    Call it with a version, and optionally the model and preprocessor to save instead of the fixture's.
+    Each version gets a later modification time than the one saved before it.
+    """
+    from app import predict
+
+    monkeypatch.setattr(predict, "MODEL_DIR", tmp_path)
+    mtimes = itertools.count(1_000, 1_000)
+
+    def save(version: str, model=None, preprocessor=None):
+        default_model, default_preprocessor = fitted_pipeline
+        joblib.dump(
+            default_preprocessor if preprocessor is None else preprocessor,
+            tmp_path / config.get_versioned_preprocessor_name(version),
+        )
+        model_path = tmp_path / config.get_versioned_model_name(version)
+        joblib.dump(default_model if model is None else model, model_path)
+        mtime = next(mtimes)
+        os.utime(model_path, (mtime, mtime))
+
+    return save
+
+# The admin token of the API under test, sent by `client_with_versions` clients
+ADMIN_TOKEN = "test-admin-token"
+
+@pytest.fixture
+def client_with_versions(monkeypatch, save_version):
+    """
+    Saves the given versions with the fixture's model and returns a TestClient of the API.
+
+    The API loads the newest version when the client is entered, so other
+    artifacts of the versions can still be written to the model directory
+    (tmp_path) before that. The client sends the admin token the API is
+    configured with.
+    """
+    from fastapi.testclient import TestClient
+    from app import main
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", ADMIN_TOKEN)
+
+    def client(*versions: str):
+        for version in versions:
+            save_version(version)
+        return TestClient(main.app, headers={"X-Admin-Token": ADMIN_TOKEN})
+
+    return client
+
+@pytest.fixture
+def json_logger(request):
+    """
+    A logger writing JSON lines to a string buffer, like the audit logger does to its file.
+
+    Returns:
+        tuple: The logger and the buffer.
+    """
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter("%(levelname)s %(message)s", timestamp=True))
+    test_logger = logging.getLogger(f"tests.{request.node.name}")
+    test_logger.handlers = [handler]
+    test_logger.propagate = False
+    test_logger.setLevel(logging.INFO)
+    return test_logger, stream
@@ -0,0 +1,74 @@
+# tests/test_audit.py
+
+import json
+import logging
+import queue
+
+from app import main
+from app.audit import PredictionAuditLog, input_hash
+from src.logger_config import DroppingQueueHandler
+
+def test_queue_handler_drops_records_instead_of_blocking():
+    """
+    Tests that a full log queue drops and counts new records rather than waiting for room.
+    """
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    test_logger = logging.getLogger("tests.dropping")
+    test_logger.handlers = [handler]
+    test_logger.propagate = False
+
+    # 1. Nothing consumes the queue, so only the first two records fit
+    for i in range(5):
+        test_logger.warning(f"record {i}")
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+    # 2. Queued records are not formatted on the calling thread
+    assert handler.queue.get_nowait().getMessage() == "record 0"
+
+def test_audit_log_samples_successes_and_errors_separately(json_logger):
+    """
+    Tests that successful and failed requests are sampled with their own rates.
+    """
+    test_logger, stream = json_logger
+    audit_log = PredictionAuditLog(sample_rate=0.0, error_sample_rate=1.0, logger=test_logger)
+
+    assert not audit_log.record("/predict", "v1", {"LotArea": 1}, 0.001, "fast", predicted_price=1.0)
+    assert audit_log.record("/predict", "v1", {"LotArea": 1}, 0.001, "fast", error="Prediction could not be made.")
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(records) == 1
+    assert records[0]["status"] == "error" and records[0]["error"] == "Prediction could not be made."
+
+def test_predict_writes_audit_record_with_request_id_and_stage_timings(monkeypatch, client_with_versions, json_logger, house_payloads):
+    """
+    Tests that a sampled /predict request is logged with its id, model version, stage timings and input hash.
+    """
+    monkeypatch.setattr(main, "PREDICTION_CACHE_ENABLED", False)
+    test_logger, stream = json_logger
+
+    with client_with_versions("20250101_000000") as client:
+        monkeypatch.setattr(main, "audit_log", PredictionAuditLog(1.0, 1.0, logger=test_logger))
+        # 1. The client's request id is echoed back; one is generated when it sends none
+        response = client.post("/predict", json=house_payloads[0], headers={"X-Request-ID": "req-123"})
+        assert response.status_code == 200
+        assert response.headers["X-Request-ID"] == "req-123"
+        assert len(client.get("/health").headers["X-Request-ID"]) == 32
+
+        client.post("/predict/batch", json=house_payloads[:3])
+
+    single, batch = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    # 2. The single-house record
+    assert single["request_id"] == "req-123"
+    assert single["model_version"] == "20250101_000000"
+    assert single["path"] == "fast" and single["status"] == "ok"
+    assert set(single["stage_ms"]) == {"transform", "predict"}
+    assert single["predicted_price"] > 0
+    expected_input = main.HouseData.model_validate(house_payloads[0]).model_dump(by_alias=True)
+    assert single["input_hash"] == input_hash(expected_input)
+
+    # 3. The batch record, with the stages of the pandas pipeline timed on the executor thread
+    assert batch["n_houses"] == 3 and batch["n_errors"] == 0
+    assert {"engineer_features", "transform", "predict"} <= set(batch["stage_ms"])
+    assert batch["input_hash"] == input_hash(house_payloads[:3])
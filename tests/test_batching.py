@@ -0,0 +1,84 @@
+# tests/test_batching.py
+
+import asyncio
+from app.batching import MicroBatcher
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    """
+    Tests that concurrent submissions are scored together and get their own results back.
+    """
+    batch_sizes = []
+
+    def predict_fn(items):
+        batch_sizes.append(len(items))
+        return [item * 10 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(predict_fn, max_batch_size=8, max_wait_ms=50)
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+        stats = batcher.stats()
+        await batcher.stop()
+        return results, stats
+
+    # 1. Submit 20 items concurrently
+    results, stats = asyncio.run(run())
+
+    # 2. Assert every caller got the result for its own item
+    assert results == [i * 10 for i in range(20)]
+
+    # 3. Assert the items were coalesced into full batches
+    assert batch_sizes == [8, 8, 4]
+    assert stats["total_items"] == 20
+    assert stats["total_batches"] == 3
+    assert stats["batch_size_histogram"]["le_8"] == 2
+    assert stats["batch_size_histogram"]["le_4"] == 1
+    assert stats["queue_depth"] == 0
+
+def test_micro_batcher_propagates_batch_failure():
+    """
+    Tests that a failed batch raises for every request in it.
+    """
+    async def run():
+        batcher = MicroBatcher(lambda items: None, max_batch_size=4, max_wait_ms=1)
+        await batcher.start()
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_micro_batcher_scores_batches_concurrently_up_to_its_limit():
+    """
+    Tests that the next batch is collected and scored while one is in flight, up to max_concurrent_batches.
+    """
+    in_flight = []
+    most_in_flight = 0
+
+    async def predict_fn(items):
+        nonlocal most_in_flight
+        in_flight.append(items)
+        most_in_flight = max(most_in_flight, len(in_flight))
+        await asyncio.sleep(0.05)
+        in_flight.remove(items)
+        return [item * 10 for item in items]
+
+    async def run(max_concurrent_batches):
+        batcher = MicroBatcher(predict_fn, max_batch_size=2, max_wait_ms=1, max_concurrent_batches=max_concurrent_batches)
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(8)))
+        stats = batcher.stats()
+        await batcher.stop()
+        return results, stats
+
+    # 1. Four batches of two, at most two scored at a time
+    results, stats = asyncio.run(run(2))
+    assert results == [i * 10 for i in range(8)]
+    assert most_in_flight == 2
+    assert stats["total_batches"] == 4 and stats["batches_in_flight"] == 0
+
+    # 2. One at a time when limited to one
+    most_in_flight = 0
+    asyncio.run(run(1))
+    assert most_in_flight == 1
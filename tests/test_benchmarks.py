@@ -0,0 +1,63 @@
+# tests/test_benchmarks.py
+
+from app import main, predict
+from benchmarks.suite import bench_api, check_budgets, compare_results, metric
+
+def test_compare_results_flags_regressions_beyond_threshold():
+    """
+    Tests that the regression gate accounts for the direction of each metric and the threshold.
+    """
+    # 1. A baseline with a lower-is-better latency and a higher-is-better throughput
+    baseline = {"metrics": {
+        "latency.p50_ms": metric(10.0, "ms"),
+        "latency.p99_ms": metric(20.0, "ms"),
+        "throughput.rows_per_s": metric(1000.0, "rows/s", "higher"),
+        "removed.metric": metric(1.0, "ms"),
+    }}
+    current = {"metrics": {
+        "latency.p50_ms": metric(11.0, "ms"),
+        "latency.p99_ms": metric(30.0, "ms"),
+        "throughput.rows_per_s": metric(700.0, "rows/s", "higher"),
+        "new.metric": metric(1.0, "ms"),
+    }}
+
+    # 2. 10% slower is tolerated, 50% slower and 30% less throughput are regressions
+    rows = {row["metric"]: row for row in compare_results(current, baseline, threshold=0.2)}
+    assert set(rows) == {"latency.p50_ms", "latency.p99_ms", "throughput.rows_per_s"}
+    assert not rows["latency.p50_ms"]["regression"]
+    assert rows["latency.p99_ms"]["regression"]
+    assert rows["throughput.rows_per_s"]["regression"]
+    assert abs(rows["throughput.rows_per_s"]["change"] - 0.3) < 1e-9
+
+    # 3. Ignored metrics are reported but not gated
+    rows = {row["metric"]: row for row in compare_results(current, baseline, 0.2, ignore=["*.p99_ms"])}
+    assert not rows["latency.p99_ms"]["regression"]
+
+def test_check_budgets_flags_metrics_over_their_budget():
+    """
+    Tests that latency budgets are absolute limits, checked in the direction of each metric.
+    """
+    results = {"metrics": {
+        "explain.p99_ms": metric(45.0, "ms", budget=40.0),
+        "predict.p99_ms": metric(3.0, "ms", budget=5.0),
+        "explain.rows_per_s": metric(150.0, "rows/s", "higher", budget=200.0),
+        "unbudgeted.p99_ms": metric(1000.0, "ms"),
+    }}
+
+    over_budget = {row["metric"] for row in check_budgets(results)}
+    assert over_budget == {"explain.p99_ms", "explain.rows_per_s"}
+
+def test_bench_api_restores_the_app_settings(tmp_path, monkeypatch, save_version):
+    """
+    Tests that the API benchmark does not leave the app on its model directory with the cache turned off.
+    """
+    # 1. The benchmark model, and app settings different from the benchmark's
+    save_version("20250101_000000")
+    monkeypatch.setattr(predict, "MODEL_DIR", tmp_path / "served")
+    monkeypatch.setattr(main, "PREDICTION_CACHE_ENABLED", True)
+
+    # 2. The benchmark serves its own model, then puts the settings back
+    results = bench_api(tmp_path, n_rows=2, batch_sizes=[1], repeat=1)
+    assert results["api.predict_batch.1.rows_per_s"]["value"] > 0
+    assert predict.MODEL_DIR == tmp_path / "served"
+    assert main.PREDICTION_CACHE_ENABLED
@@ -0,0 +1,90 @@
+# tests/test_cache.py
+
+import time
+import pytest
+from app.cache import CacheBackend, DiskBackend, InMemoryBackend, PredictionCache, canonical_key
+
+HOUSE = {"OverallQual": 7, "GrLivArea": 1710, "Alley": None}
+
+def test_canonical_key_ignores_field_order():
+    """
+    Tests that the key depends on the features and model version, not on field order.
+    """
+    reordered = dict(reversed(list(HOUSE.items())))
+    assert canonical_key(HOUSE, "v1") == canonical_key(reordered, "v1")
+    assert canonical_key(HOUSE, "v1") != canonical_key(HOUSE, "v2")
+    assert canonical_key(HOUSE, "v1") != canonical_key(dict(HOUSE, GrLivArea=1711), "v1")
+
+def test_in_memory_backend_evicts_least_recently_used():
+    """
+    Tests that the oldest unused entry is evicted when the cache is full.
+    """
+    backend = InMemoryBackend(max_size=2)
+    backend.set("a", 1.0, ttl_seconds=60)
+    backend.set("b", 2.0, ttl_seconds=60)
+    backend.get("a")  # 'a' is now more recently used than 'b'
+    backend.set("c", 3.0, ttl_seconds=60)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == 1.0
+    assert backend.get("c") == 3.0
+    assert backend.evictions == 1
+
+    # A backend missing part of the interface fails when it is created, not on first use
+    class GetOnlyBackend(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend(max_size=2)
+
+def test_disk_backend_evicts_without_counting_the_table_on_every_write(monkeypatch, tmp_path):
+    """
+    Tests that the disk backend keeps its size bounded from its own row count, recounting only periodically.
+    """
+    recounts = []
+    count_rows = DiskBackend.__len__
+    monkeypatch.setattr(DiskBackend, "__len__", lambda self: recounts.append(1) or count_rows(self))
+    monkeypatch.setattr(DiskBackend, "RECOUNT_EVERY", 4)
+    backend = DiskBackend(max_size=2, path=tmp_path / "cache.sqlite")
+    recounts.clear()
+
+    # 1. Replacing a stored key does not add a row
+    backend.set("a", 1.0, ttl_seconds=60)
+    backend.set("a", 1.5, ttl_seconds=60)
+    backend.set("b", 2.0, ttl_seconds=60)
+    assert backend.evictions == 0 and not recounts
+
+    # 2. The least recently used key is evicted, and the table is only counted every RECOUNT_EVERY writes
+    backend.get("a")
+    backend.set("c", 3.0, ttl_seconds=60)
+    assert len(recounts) == 1
+    assert backend.get("b") is None
+    assert backend.get("a") == 1.5 and backend.get("c") == 3.0
+    assert backend.evictions == 1 and len(backend) == 2
+
+def test_prediction_cache_ttl_counters_and_invalidation(tmp_path):
+    """
+    Tests expiry, hit/miss counting and clearing on a model change, for both backends.
+    """
+    for backend in (InMemoryBackend(max_size=10), DiskBackend(max_size=10, path=tmp_path / "cache.sqlite")):
+        cache = PredictionCache(backend, ttl_seconds=60)
+        cache.set_model_version("v1")
+
+        # 1. A miss, then a hit
+        assert cache.get(HOUSE, "v1") is None
+        cache.set(HOUSE, "v1", 208500.0)
+        assert cache.get(HOUSE, "v1") == 208500.0
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # 2. Loading a new model version invalidates the cached price
+        cache.set_model_version("v2")
+        assert len(backend) == 0
+        assert cache.get(HOUSE, "v1") is None
+
+        # 3. Entries expire after the TTL
+        cache.ttl_seconds = 0.01
+        cache.set(HOUSE, "v2", 208500.0)
+        time.sleep(0.02)
+        assert cache.get(HOUSE, "v2") is None
+        assert cache.stats()["expirations"] == 1
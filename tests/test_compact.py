@@ -0,0 +1,86 @@
+# tests/test_compact.py
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import xgboost as xgb
+from app import predict
+from app.fast_predict import CompiledPredictor
+from app.flat_trees import FlatTreeRegressor
+from app.predict import load_compact_model, make_predictions
+from src.compact import compact_model
+from src.flat_trees import FlatTreeEnsemble
+from src.preprocessing import engineer_features
+from src.synthetic import generate_houses
+
+def _fit_model(preprocessor, n_estimators=200):
+    """A model with more trees than compaction needs, on the fixture's preprocessor."""
+    houses = generate_houses(600, seed=5)
+    y_log = np.log1p(houses.pop("SalePrice"))
+    X = preprocessor.transform(engineer_features(houses))
+    model = xgb.XGBRegressor(n_estimators=n_estimators, max_depth=4, learning_rate=0.1, random_state=0)
+    return model.fit(X[:450], y_log[:450]), X[450:], y_log[450:]
+
+def test_flat_trees_match_the_booster(tmp_path, fitted_pipeline):
+    """
+    Tests that the flat evaluator scores like XGBoost on dense, missing and sparse inputs, before and after saving.
+    """
+    model, preprocessor = fitted_pipeline
+    X = preprocessor.transform(engineer_features(generate_houses(200, seed=11, with_target=False)))
+    dense = X.toarray() if sp.issparse(X) else np.array(X)
+    dense[::7, ::3] = np.nan
+
+    # 1. All rounds, and the first 20, like iteration_range
+    flat_trees = FlatTreeEnsemble.from_booster(model)
+    np.testing.assert_allclose(flat_trees.predict(X), model.predict(X), rtol=1e-6)
+    np.testing.assert_allclose(flat_trees.predict(dense), model.predict(dense), rtol=1e-6)
+    first_rounds = FlatTreeEnsemble.from_booster(model, iteration_range=(0, 20))
+    np.testing.assert_allclose(first_rounds.predict(dense), model.predict(dense, iteration_range=(0, 20)), rtol=1e-6)
+
+    # 2. Saved and loaded without pickle
+    flat_trees.save(tmp_path / "flat.npz")
+    loaded = FlatTreeEnsemble.load(tmp_path / "flat.npz")
+    np.testing.assert_array_equal(loaded.predict(dense), flat_trees.predict(dense))
+
+    # 3. Merging close sibling leaves removes nodes; each merge moves a tree's output by less than the tolerance
+    pruned = FlatTreeEnsemble.from_booster(model, prune_tolerance=1e-2)
+    assert pruned.n_nodes < flat_trees.n_nodes
+    max_shift = 1e-2 * flat_trees.depth * flat_trees.n_trees
+    assert np.abs(pruned.predict(dense) - flat_trees.predict(dense)).max() <= max_shift
+
+def test_compact_model_is_served_with_fewer_rounds(tmp_path, monkeypatch, fitted_pipeline, house_payloads):
+    """
+    Tests that compaction finds a shorter model within the RMSE tolerance and that the API serves it in either mode.
+    """
+    _, preprocessor = fitted_pipeline
+    model, X_test, y_test = _fit_model(preprocessor)
+
+    # 1. Fewer rounds, within the tolerance, recorded on the booster
+    flat_trees, report = compact_model(model, X_test, y_test, tolerance=0.02)
+    n_rounds = report["n_rounds_compact"]
+    assert n_rounds < 200 and flat_trees.n_iterations == n_rounds
+    assert report["rmse"]["compact"] <= report["rmse"]["full"] * 1.02
+    assert report["rmse"]["flat"] == pytest.approx(report["rmse"]["compact"], rel=1e-5)
+    assert report["size_bytes"]["compact"] < report["size_bytes"]["full"]
+
+    # 2. 'trees' stops XGBoost and the fast path at the compact round count
+    monkeypatch.setattr(predict, "MODEL_DIR", tmp_path)
+    flat_trees.save(tmp_path / predict.get_versioned_flat_model_name("20250101_000000"))
+    compact = load_compact_model(model, "20250101_000000", mode="trees")
+    expected = np.expm1(model.get_booster().inplace_predict(X_test[:5], iteration_range=(0, n_rounds)))
+    assert compact.best_iteration == n_rounds - 1
+    np.testing.assert_allclose(np.expm1(compact.predict(X_test[:5])), expected, rtol=1e-6)
+    trees_prices = make_predictions(house_payloads[:5], compact, preprocessor)
+    assert CompiledPredictor(compact, preprocessor).iteration_range == (0, n_rounds)
+
+    # 3. 'flat' gives the same prices from the flat trees, on the batch and the fast path
+    flat = load_compact_model(model, "20250101_000000", mode="flat")
+    assert isinstance(flat, FlatTreeRegressor)
+    assert make_predictions(house_payloads[:5], flat, preprocessor) == pytest.approx(trees_prices, rel=1e-5)
+    fast_predictor = CompiledPredictor(flat, preprocessor)
+    assert fast_predictor.flat_trees is flat.flat_trees
+    assert fast_predictor.predict_one(house_payloads[0]) == pytest.approx(trees_prices[0], rel=1e-5)
+
+    # 4. Models trained before compaction are served in full
+    full, _, _ = _fit_model(preprocessor, n_estimators=20)
+    assert load_compact_model(full, "20240101_000000", mode="flat") is full
@@ -0,0 +1,90 @@
+# tests/test_comps.py
+
+import joblib
+import numpy as np
+import pytest
+from app import main
+from app.comps import ComparablesIndex, load_comps_index
+from src import config
+from src.comps import build_comps_index
+from src.preprocessing import engineer_features
+from src.synthetic import generate_houses
+
+def _build_arrays(preprocessor, algorithm="kd_tree") -> dict:
+    """The index of synthetic training houses, as src/train.py builds and saves it."""
+    houses = generate_houses(400, seed=1)
+    prices = houses.pop("SalePrice")
+    return build_comps_index(
+        engineer_features(houses), prices, preprocessor, config.COMPS_FEATURES,
+        ids=np.arange(1, 401), algorithm=algorithm,
+    )
+
+def test_index_finds_the_nearest_training_houses(tmp_path, fitted_pipeline, house_payloads):
+    """
+    Tests that the tree index returns the same neighbours as a brute-force scan, before and after saving.
+    """
+    _, preprocessor = fitted_pipeline
+    arrays = _build_arrays(preprocessor)
+    index = ComparablesIndex(**arrays)
+    houses = house_payloads[:10]
+
+    # 1. The k nearest training points, nearest first, with their prices and raw values
+    comps = index.query(houses, k=5)
+    training_points = index.tree.get_arrays()[0]
+    for house, point, house_comps in zip(houses, index.points(houses), comps):
+        distances = np.sqrt(((training_points - point) ** 2).sum(axis=1))
+        nearest = np.argsort(distances)[:5]
+        assert [c["id"] for c in house_comps] == [int(index.ids[i]) for i in nearest]
+        assert [c["distance"] for c in house_comps] == pytest.approx(distances[nearest])
+        assert house_comps[0]["sale_price"] == index.sale_prices[nearest[0]]
+        assert house_comps[0]["features"]["GrLivArea"] == index.values[nearest[0], 1]
+    assert index.query(houses[:1], k=1)[0] == comps[0][:1]
+
+    # 2. A ball tree finds the same houses
+    ball_comps = ComparablesIndex(**_build_arrays(preprocessor, algorithm="ball_tree")).query(houses, k=5)
+    assert [[c["id"] for c in h] for h in ball_comps] == [[c["id"] for c in h] for h in comps]
+
+    # 3. Saved with joblib and memory-mapped back
+    joblib.dump(arrays, tmp_path / "comps.joblib")
+    loaded = load_comps_index(tmp_path / "comps.joblib", mmap=True)
+    assert isinstance(loaded.values, np.memmap)
+    assert loaded.query(houses, k=5) == comps
+    assert load_comps_index(tmp_path / "missing.joblib") is None
+
+def test_comps_endpoints(tmp_path, monkeypatch, save_version, client_with_versions, fitted_pipeline, house_payloads):
+    """
+    Tests the single and batch comparables endpoints, including k, invalid rows and versions without an index.
+    """
+    _, preprocessor = fitted_pipeline
+    joblib.dump(_build_arrays(preprocessor), tmp_path / config.get_versioned_comps_index_name("20250301_000000"))
+
+    with client_with_versions("20250301_000000") as client:
+        # 1. The index file is not taken for a model version
+        assert client.get("/admin/models").json()["available_versions"] == ["20250301_000000"]
+
+        # 2. One house: its price and its k comparables
+        response = client.post("/comps?k=3", json=house_payloads[0])
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["comparables"]) == 3
+        assert set(body["comparables"][0]) == {"id", "sale_price", "distance", "features"}
+        predicted = client.post("/predict", json=house_payloads[0]).json()
+        assert body["predicted_price_formatted"] == predicted["predicted_price_formatted"]
+        assert client.post("/comps?k=0", json=house_payloads[0]).status_code == 422
+
+        # 3. A batch, with its invalid rows reported
+        batch = house_payloads[:4] + [{"LotArea": "not a number"}]
+        response = client.post("/comps/batch", json=batch)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["n_found"] == 4 and body["n_errors"] == 1
+        assert "errors" in body["results"][4]
+        assert body["results"][0]["comparables"][:3] == client.post("/comps?k=3", json=batch[0]).json()["comparables"]
+
+        monkeypatch.setattr(main, "MAX_COMPS_BATCH_SIZE", 2)
+        assert client.post("/comps/batch", json=batch).status_code == 413
+
+        # 4. Models trained before the index was saved cannot answer
+        save_version("20250401_000000")
+        assert client.post("/admin/models/reload").status_code == 200
+        assert client.post("/comps", json=house_payloads[0]).status_code == 501
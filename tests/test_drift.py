@@ -0,0 +1,120 @@
+# tests/test_drift.py
+
+import threading
+
+from app import main
+from app.drift import DriftMonitor
+from src import config
+from src.drift_profile import build_reference_profile, save_reference_profile
+from src.synthetic import generate_houses, generate_payloads
+
+def _profile():
+    """A reference profile of synthetic training houses, with the API's columns."""
+    return build_reference_profile(generate_houses(1000, seed=1, with_target=False).drop(columns=["TotalBsmtSF"]))
+
+def test_drift_scores_separate_shifted_inputs_from_training_like_ones():
+    """
+    Tests that PSI, KS and the unseen category rate stay low for houses like the
+    training data and rise for shifted ones.
+    """
+    monitor = DriftMonitor(_profile())
+    houses = generate_payloads(1000, seed=2)
+
+    # 1. Houses from the training distribution
+    monitor.update(houses)
+    scores = monitor.scores()
+    assert scores["observations"] == 1000
+    assert max(feature["psi"] for feature in scores["features"].values()) < 0.1
+    assert scores["features"]["Neighborhood"]["unseen_rate"] == 0.0
+
+    # 2. Much larger lots, and a neighborhood the model has never seen
+    shifted = DriftMonitor(_profile())
+    shifted.update([{**house, "LotArea": house["LotArea"] * 3, "Neighborhood": "NotInAmes"} for house in houses])
+    features = shifted.scores()["features"]
+    assert features["LotArea"]["psi"] > 1.0 and features["LotArea"]["ks"] > 0.5
+    assert features["Neighborhood"]["unseen_rate"] == 1.0
+    assert features["OverallQual"]["psi"] < 0.1
+
+    # 3. Missing values are counted as such
+    monitor.update([{**houses[0], "LotFrontage": None}])
+    assert monitor.scores()["features"]["LotFrontage"]["missing_rate"] > 0
+
+def test_drift_monitor_sums_thread_shards_and_windows():
+    """
+    Tests that updates from several threads are all counted, and that old windows are forgotten.
+    """
+    monitor = DriftMonitor(_profile(), fields=["LotArea", "Neighborhood"], window_seconds=60)
+    window = [0]
+    monitor._window = lambda: window[0]
+    houses = generate_payloads(50, seed=3)
+
+    # 1. Four threads counting in their own shards
+    threads = [threading.Thread(target=lambda: [monitor.update([house]) for house in houses]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert monitor.scores()["observations"] == 200
+    assert set(monitor.scores()["features"]) == {"LotArea", "Neighborhood"}
+
+    # 2. The previous window still counts, the one before it does not
+    window[0] = 1
+    monitor.update(houses[:10])
+    assert monitor.scores()["observations"] == 200 + 10
+    window[0] = 2
+    assert monitor.scores()["observations"] == 10
+    window[0] = 3
+    assert monitor.scores()["observations"] == 0
+
+def test_api_exports_drift_metrics(tmp_path, monkeypatch, client_with_versions, house_payloads):
+    """
+    Tests that the API counts the houses it scores against the model's reference profile and exports the scores.
+    """
+    monkeypatch.setattr(main, "PREDICTION_CACHE_ENABLED", False)
+    monkeypatch.setattr(main, "DRIFT_MIN_OBSERVATIONS", 10)
+    client = client_with_versions("20250301_000000")
+    save_reference_profile(_profile(), tmp_path / config.get_versioned_drift_profile_name("20250301_000000"))
+
+    with client:
+        before = main.drift_monitor.scores()["observations"]
+        client.post("/predict", json=house_payloads[0])
+        client.post("/predict/batch", json=house_payloads[1:20])
+
+        # 1. Both endpoints count their houses
+        stats = client.get("/predict/drift/stats").json()
+        assert stats["enabled"] and stats["observations"] == before + 20
+        assert stats["features"]["Neighborhood"]["unseen_rate"] == 0.0
+
+        # 2. The scores are exported once enough houses were counted
+        metrics = client.get("/metrics").text
+        assert "input_drift_observations" in metrics
+        assert 'input_drift_psi{feature="LotArea"}' in metrics
+        assert 'input_unseen_category_rate{feature="Neighborhood"}' in metrics
+
+def test_batches_scored_in_process_workers_are_counted(tmp_path, monkeypatch, log_dir, client_with_versions, house_payloads):
+    """
+    Tests that JSON and Arrow batches count for drift when they are scored in process workers, which have no monitor.
+    """
+    import pyarrow as pa
+    from app.serialization import ARROW_STREAM_MEDIA_TYPE, encode_table
+
+    monkeypatch.setattr(main, "PREDICTION_CACHE_ENABLED", False)
+    monkeypatch.setattr(main, "INFERENCE_EXECUTOR", "process")
+    monkeypatch.setattr(main, "INFERENCE_WORKERS", 1)
+    # The spawned workers read their settings from the environment
+    monkeypatch.setenv("MODEL_DIR", str(tmp_path))
+    monkeypatch.setenv("LOG_DIR", str(log_dir))
+    client = client_with_versions("20250301_000000")
+    save_reference_profile(_profile(), tmp_path / config.get_versioned_drift_profile_name("20250301_000000"))
+
+    with client:
+        assert main.inference.kind == "process"
+        before = main.drift_monitor.scores()["observations"]
+        assert client.post("/predict", json=house_payloads[0]).status_code == 200
+        assert client.post("/predict/batch", json=house_payloads[1:11]).status_code == 200
+        body = encode_table(pa.Table.from_pylist(house_payloads[11:16]), ARROW_STREAM_MEDIA_TYPE)
+        response = client.post("/predict/batch", content=body, headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE})
+        assert response.status_code == 200
+
+        # 1 single house, 10 JSON rows and 5 Arrow rows
+        assert main.drift_monitor.scores()["observations"] == before + 16
@@ -0,0 +1,92 @@
+# tests/test_executor.py
+
+import asyncio
+import threading
+
+import pytest
+from app import main
+from app.executor import ExecutorOverloaded, InferenceExecutor
+
+def test_executor_rejects_tasks_beyond_the_queue_limit():
+    """
+    Tests that tasks wait for a free worker up to the queue limit and are rejected beyond it.
+    """
+    release = threading.Event()
+
+    def blocking(bundle, value):
+        release.wait(timeout=5)
+        return value * 10
+
+    async def run():
+        executor = InferenceExecutor("thread", workers=1, max_queue=1, retry_after_seconds=3)
+        # 1. One task runs and one waits
+        running = asyncio.ensure_future(executor.run(blocking, None, 1))
+        queued = asyncio.ensure_future(executor.run(blocking, None, 2))
+        await asyncio.sleep(0.05)
+        assert executor.pending == 2 and executor.queue_depth == 1
+
+        # 2. A third task is rejected right away, with the Retry-After hint
+        with pytest.raises(ExecutorOverloaded) as rejected:
+            await executor.run(blocking, None, 3)
+        assert rejected.value.retry_after_seconds == 3
+
+        # 3. Admitted work still completes
+        release.set()
+        results = await asyncio.gather(running, queued)
+        stats = executor.stats()
+        executor.shutdown()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+    assert results == [10, 20]
+    assert stats["pending"] == 0 and stats["total_tasks"] == 2 and stats["total_rejected"] == 1
+
+def test_predict_returns_429_with_retry_after_when_saturated(monkeypatch, client_with_versions, house_payloads):
+    """
+    Tests that /predict and /predict/batch shed load instead of queueing without bound.
+    """
+    monkeypatch.setattr(main, "PREDICTION_CACHE_ENABLED", False)
+
+    with client_with_versions("20250101_000000") as client:
+        # 1. Served normally while there is capacity
+        assert client.post("/predict", json=house_payloads[0]).status_code == 200
+
+        # 2. Every worker busy and the queue full
+        main.inference.pending = main.inference.workers + main.inference.max_queue
+        for response in (client.post("/predict", json=house_payloads[1]), client.post("/predict/batch", json=house_payloads[:2])):
+            assert response.status_code == 429
+            assert response.headers["Retry-After"] == str(main.inference.retry_after_seconds)
+        main.inference.pending = 0
+
+        assert client.get("/predict/executor/stats").json()["total_rejected"] == 2
+
+def test_process_workers_preload_a_new_version_before_it_is_served(monkeypatch, tmp_path, save_version, house_payloads):
+    """
+    Tests that a version being swapped in is loaded into every process worker before the swap.
+    """
+    from app.registry import ModelRegistry
+
+    # 1. Spawned workers find the model directory through the environment
+    monkeypatch.setenv("MODEL_DIR", str(tmp_path))
+    save_version("20250101_000000")
+    executor = InferenceExecutor("process", workers=2, version="20250101_000000")
+    try:
+        asyncio.run(executor.start())
+
+        # 2. The registry preloads the new version into the workers before it serves it
+        preloaded = []
+        registry = ModelRegistry(warmup_input=house_payloads[0])
+        registry.add_preload_hook(
+            lambda bundle: preloaded.append((registry.current, executor.preload(bundle.version)))
+        )
+        save_version("20250201_000000")
+        assert registry.refresh() is True
+        assert registry.current.version == "20250201_000000"
+
+        # 3. Both workers got it, and it was not yet being served
+        (served_during_preload, workers), = preloaded
+        assert served_during_preload is None
+        assert len({pid for pid, _ in workers}) == 2
+        assert all(versions == ["20250101_000000", "20250201_000000"] for _, versions in workers)
+    finally:
+        executor.shutdown()
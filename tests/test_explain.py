@@ -0,0 +1,95 @@
+# tests/test_explain.py
+
+import numpy as np
+import pytest
+from app import main
+from app.executor import explain_many
+from app.explain import FeatureExplainer, column_fields
+from app.fast_predict import CompiledPredictor
+from app.predict import make_predictions
+from app.registry import ModelBundle
+from benchmarks.common import fit_synthetic_pipeline
+from src.export import PreprocessorParams
+
+def test_contributions_add_up_to_the_prediction_in_dollars(fitted_pipeline, house_payloads):
+    """
+    Tests that per-field dollar contributions add up to the prediction, on the pandas and fast paths.
+    """
+    model, preprocessor = fitted_pipeline
+    explainer = FeatureExplainer(model, preprocessor)
+
+    # 1. Every input feature is one field; one-hot columns are grouped back into it
+    fields, field_of_column = column_fields(preprocessor)
+    assert len(fields) == len(set(fields)) == len(preprocessor.feature_names_in_)
+    assert len(field_of_column) == model.get_booster().num_features()
+    assert "Neighborhood" in fields and "TotalSF" in fields
+    params_fields, params_field_of_column = column_fields(PreprocessorParams.from_preprocessor(preprocessor))
+    assert params_fields == fields
+    np.testing.assert_array_equal(params_field_of_column, field_of_column)
+
+    bundle = ModelBundle("v1", model, preprocessor, CompiledPredictor(model, preprocessor), explainer)
+    houses = house_payloads[:20]
+    explanations = explain_many(bundle, houses, top_k=len(fields))
+    expected_prices = make_predictions(houses, model, preprocessor)
+
+    for explanation, expected_price in zip(explanations, expected_prices):
+        # 2. The prediction is the model's, and base + contributions = prediction
+        assert explanation["predicted_price"] == pytest.approx(expected_price, rel=1e-5)
+        total = explanation["base_price"] + sum(c["contribution"] for c in explanation["contributions"])
+        assert total == pytest.approx(explanation["predicted_price"], rel=1e-6)
+        assert explanation["other_contribution"] == pytest.approx(0.0, abs=1e-6)
+
+        # 3. Largest effect first
+        magnitudes = [abs(c["contribution"]) for c in explanation["contributions"]]
+        assert magnitudes == sorted(magnitudes, reverse=True)
+
+    # 4. The fast path's features give the same explanation
+    fast = explain_many(bundle, houses[:3], top_k=5, fast=True)
+    pandas = explain_many(bundle, houses[:3], top_k=5)
+    for fast_explanation, pandas_explanation in zip(fast, pandas):
+        assert [c["feature"] for c in fast_explanation["contributions"]] == [c["feature"] for c in pandas_explanation["contributions"]]
+        np.testing.assert_allclose(
+            [c["contribution"] for c in fast_explanation["contributions"]],
+            [c["contribution"] for c in pandas_explanation["contributions"]],
+            rtol=1e-4,
+        )
+
+def test_explainer_supports_native_categorical_features(house_payloads):
+    """
+    Tests that a model trained on category codes is explained with one contribution per field.
+    """
+    model, preprocessor = fit_synthetic_pipeline(n_rows=400, encoding="native", n_estimators=30)
+    bundle = ModelBundle("v1", model, preprocessor, None, FeatureExplainer(model, preprocessor))
+
+    explanation = explain_many(bundle, house_payloads[:1], top_k=3)[0]
+
+    assert len(explanation["contributions"]) == 3
+    total = explanation["base_price"] + sum(c["contribution"] for c in explanation["contributions"])
+    assert total + explanation["other_contribution"] == pytest.approx(explanation["predicted_price"], rel=1e-6)
+
+def test_explain_endpoints(monkeypatch, client_with_versions, house_payloads):
+    """
+    Tests the single and batch explanation endpoints, including top_k and invalid rows.
+    """
+    with client_with_versions("20250101_000000") as client:
+        # 1. One house, with the number of fields asked for
+        response = client.post("/predict/explain?top_k=3", json=house_payloads[0])
+        assert response.status_code == 200
+        explanation = response.json()
+        assert len(explanation["contributions"]) == 3
+        assert explanation["predicted_price_formatted"].startswith("$")
+        assert set(explanation["contributions"][0]) == {"feature", "value", "contribution"}
+
+        # 2. The same prices as /predict/batch
+        batch = house_payloads[:4] + [{"LotArea": "not a number"}]
+        response = client.post("/predict/explain/batch", json=batch)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["n_explained"] == 4 and body["n_errors"] == 1
+        assert "errors" in body["results"][4]
+        prices = [r["predicted_price"] for r in client.post("/predict/batch", json=batch[:4]).json()["results"]]
+        assert [r["predicted_price"] for r in body["results"][:4]] == pytest.approx(prices, rel=1e-5)
+
+        # 3. Explanation batches have their own, smaller limit
+        monkeypatch.setattr(main, "MAX_EXPLAIN_BATCH_SIZE", 2)
+        assert client.post("/predict/explain/batch", json=batch).status_code == 413
@@ -0,0 +1,169 @@
+# tests/test_fast_predict.py
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from app import predict
+from app.explain import FeatureExplainer, column_fields
+from app.fast_predict import CompiledPredictor, compile_predictor
+from app.predict import make_prediction, transform_frame
+from src import config
+from src.export import PreprocessorParams
+from src.preprocessing import create_preprocessor, engineer_features, model_feature_params
+from src.synthetic import generate_houses
+from src.train import save_native_model
+
+def _dense(processed, zeros_are_missing: bool) -> np.ndarray:
+    """A preprocessor output as a dense matrix, NaN where a CSR output does not store a value."""
+    if not hasattr(processed, "toarray"):
+        return processed
+    dense = np.full(processed.shape, np.nan if zeros_are_missing else 0.0)
+    rows, columns = processed.nonzero()
+    dense[rows, columns] = processed[rows, columns]
+    return dense
+
+def test_transform_one_matches_preprocessor(fitted_pipeline, house_payloads):
+    """
+    Tests that the compiled feature vector equals the ColumnTransformer output.
+    """
+    model, preprocessor = fitted_pipeline
+    predictor = CompiledPredictor(model, preprocessor)
+
+    for house in house_payloads[:10]:
+        # 1. Run the sklearn pipeline on a one-row DataFrame
+        expected = transform_frame(pd.DataFrame([house]), preprocessor)
+        expected = expected.toarray() if hasattr(expected, "toarray") else expected
+
+        # 2. Compare with the compiled vector (unstored sparse zeros are NaN there)
+        vector = predictor.transform_one(house)
+        np.testing.assert_array_equal(np.nan_to_num(vector), expected.astype(np.float32))
+
+def test_predict_one_matches_make_prediction(fitted_pipeline, house_payloads):
+    """
+    Tests that the fast path gives the same prices as make_prediction,
+    including missing numeric values and unseen categories.
+    """
+    model, preprocessor = fitted_pipeline
+    predictor = CompiledPredictor(model, preprocessor)
+
+    house_payloads[0]["LotFrontage"] = None
+    house_payloads[1]["Neighborhood"] = "NotInAmes"
+    house_payloads[2]["GarageType"] = None
+
+    for house in house_payloads:
+        assert predictor.predict_one(house) == make_prediction(house, model, preprocessor)
+
+def _fit_pipeline(**preprocessor_options):
+    """Fits a small model like the `fitted_pipeline` fixture, with other preprocessor options."""
+    houses = generate_houses(400, seed=1)
+    y_log = np.log1p(houses.pop("SalePrice"))
+    X = engineer_features(houses)
+    numerical_features = X.select_dtypes(include=np.number).columns.tolist()
+    categorical_features = X.select_dtypes(exclude=np.number).columns.tolist()
+    preprocessor = create_preprocessor(numerical_features, categorical_features, **preprocessor_options)
+    X_processed = preprocessor.fit_transform(X)
+    model = xgb.XGBRegressor(n_estimators=50, max_depth=4, random_state=42, **model_feature_params(preprocessor))
+    model.fit(X_processed, y_log)
+    return model, preprocessor
+
+def test_predict_one_matches_make_prediction_with_dense_features(house_payloads):
+    """
+    Tests that the fast path also matches a pipeline trained on dense features,
+    where zeros are values rather than missing.
+    """
+    model, preprocessor = _fit_pipeline(sparse=False)
+    predictor = CompiledPredictor(model, preprocessor)
+    assert not predictor.zeros_are_missing
+    for house in house_payloads:
+        assert predictor.predict_one(house) == make_prediction(house, model, preprocessor)
+
+def test_predict_one_matches_make_prediction_with_native_categoricals(tmp_path, house_payloads):
+    """
+    Tests that the fast path matches a model with native categorical splits,
+    before and after exporting its parameters, including unseen categories.
+    """
+    # 1. One column of category codes per categorical feature
+    model, preprocessor = _fit_pipeline(encoding='native')
+    predictor = CompiledPredictor(model, preprocessor)
+    assert predictor.n_features == len(preprocessor.feature_names_in_) and predictor.ordinal_blocks
+
+    # 2. Export and reload the parameters
+    PreprocessorParams.from_preprocessor(preprocessor).save(tmp_path / "params")
+    reloaded = CompiledPredictor(model, PreprocessorParams.load(tmp_path / "params"))
+
+    house_payloads[1]["Neighborhood"] = "NotInAmes"
+    for house in house_payloads:
+        expected = make_prediction(house, model, preprocessor)
+        assert predictor.predict_one(house) == expected
+        assert reloaded.predict_one(house) == expected
+
+def test_compile_predictor_falls_back_for_unknown_pipelines():
+    """
+    Tests that an unsupported model/preprocessor pair is not compiled.
+    """
+    assert compile_predictor(object(), object()) is None
+
+def test_exported_params_and_native_model_round_trip(tmp_path, monkeypatch, fitted_pipeline, house_payloads):
+    """
+    Tests that the pickle-free exports written by src/train.py give the same prices.
+    """
+    model, preprocessor = fitted_pipeline
+    monkeypatch.setattr(predict, "MODEL_DIR", tmp_path)
+    version = "20250101_000000"
+
+    # 1. Export like src/train.py does
+    joblib.dump(preprocessor, tmp_path / config.get_versioned_preprocessor_name(version))
+    PreprocessorParams.from_preprocessor(preprocessor).save(tmp_path / config.get_versioned_preprocessor_params_name(version))
+    save_native_model(model, tmp_path / config.get_versioned_native_model_name(version))
+    joblib.dump(model, tmp_path / config.get_versioned_model_name(version))
+
+    # 2. The native booster and the memory-mapped parameters are loaded instead of the pickles
+    loaded_model, loaded_preprocessor = predict.load_model_version(version)
+    assert isinstance(loaded_preprocessor, PreprocessorParams)
+    assert isinstance(loaded_preprocessor.numeric_blocks[0][2], np.memmap)
+    predictor = compile_predictor(loaded_model, loaded_preprocessor)
+
+    # 3. The parameters preprocess, predict and explain like the ColumnTransformer
+    house_payloads[1]["Neighborhood"] = "NotInAmes"
+    house_payloads[2]["LotFrontage"] = None
+    frame = pd.DataFrame(house_payloads[:20])
+    expected = _dense(transform_frame(frame, preprocessor), loaded_preprocessor.zeros_are_missing)
+    np.testing.assert_array_equal(transform_frame(frame, loaded_preprocessor), expected)
+    for house in house_payloads[:20]:
+        expected = make_prediction(house, model, preprocessor)
+        assert predictor.predict_one(house) == expected
+        assert make_prediction(house, loaded_model, loaded_preprocessor) == expected
+
+    assert column_fields(loaded_preprocessor)[0] == column_fields(preprocessor)[0]
+    np.testing.assert_array_equal(column_fields(loaded_preprocessor)[1], column_fields(preprocessor)[1])
+    explained = FeatureExplainer(loaded_model, loaded_preprocessor).explain(
+        transform_frame(frame, loaded_preprocessor), house_payloads[:20], top_k=5
+    )
+    assert explained == FeatureExplainer(model, preprocessor).explain(
+        transform_frame(frame, preprocessor), house_payloads[:20], top_k=5
+    )
+
+
+def test_exported_params_transform_like_the_preprocessor(house_payloads):
+    """
+    Tests the parameters' DataFrame transform against the ColumnTransformer for every encoding,
+    including missing values and unseen categories.
+    """
+    house_payloads[0]["LotFrontage"] = None
+    house_payloads[1]["Neighborhood"] = "NotInAmes"
+    house_payloads[2]["GarageType"] = None
+    frame = pd.DataFrame(house_payloads)
+
+    # 1. Sparse and dense one-hot, and native category codes
+    for options in ({"encoding": "onehot", "sparse": True}, {"encoding": "onehot", "sparse": False}, {"encoding": "native"}):
+        _, preprocessor = _fit_pipeline(**options)
+        params = PreprocessorParams.from_preprocessor(preprocessor)
+        expected = _dense(transform_frame(frame, preprocessor), params.zeros_are_missing)
+        np.testing.assert_array_equal(transform_frame(frame, params), expected)
+
+    # 2. An encoder that does not accept unknown categories rejects them
+    params.ordinal_blocks = [block[:4] + (None,) for block in params.ordinal_blocks]
+    with pytest.raises(ValueError, match="Neighborhood"):
+        transform_frame(frame, params)
@@ -0,0 +1,39 @@
+# tests/test_feature_store.py
+
+import numpy as np
+import pandas as pd
+from src import config
+from src.preprocessing import get_processed_data, processed_data_key
+from src.synthetic import generate_houses
+
+def test_processed_data_is_reused_until_the_raw_data_changes(tmp_path, monkeypatch):
+    """
+    Tests that processed data is stored, reloaded unchanged, and rebuilt for new raw data.
+    """
+    # 1. A raw train.csv and an empty feature store
+    raw_path = tmp_path / "train.csv"
+    houses = generate_houses(200, seed=4)
+    houses.insert(0, "Id", np.arange(len(houses)))
+    houses.to_csv(raw_path, index=False)
+    monkeypatch.setattr(config, "RAW_DATA_FILE", raw_path)
+    monkeypatch.setattr(config, "FEATURE_STORE_DIR", tmp_path / "store")
+
+    built = get_processed_data()
+    key = processed_data_key()
+    assert (tmp_path / "store" / key / "manifest.json").exists()
+
+    # 2. The second run loads the same splits, matrices and preprocessor from the store
+    loaded = get_processed_data()
+    pd.testing.assert_frame_equal(loaded.X_train, built.X_train)
+    pd.testing.assert_series_equal(loaded.y_test, built.y_test)
+    assert (loaded.X_train_processed != built.X_train_processed.astype(np.float32)).nnz == 0
+    assert (loaded.preprocessor.transform(built.X_test) != built.X_test_processed).nnz == 0
+
+    # 3. Text columns are stored dictionary-encoded
+    stored = pd.read_parquet(tmp_path / "store" / key / "X_train.parquet")
+    assert isinstance(stored["Neighborhood"].dtype, pd.CategoricalDtype)
+
+    # 4. Changing the raw data changes the key
+    houses.loc[0, "LotArea"] += 1
+    houses.to_csv(raw_path, index=False)
+    assert processed_data_key() != key
@@ -0,0 +1,66 @@
+# tests/test_features.py
+
+import io
+
+import numpy as np
+import pandas as pd
+from app.fast_predict import engineer_one
+from app.predict import transform_frame
+from src.features import FEATURES
+from src.preprocessing import engineer_features
+from src.synthetic import generate_houses
+
+def test_registry_gives_the_same_features_for_every_input_type():
+    """
+    Tests that a DataFrame, a structured array, a dict of columns and single houses get the same
+    derived features, without modifying or copying the input.
+    """
+    houses = generate_houses(100, seed=2, with_target=False).drop(columns=["TotalBsmtSF"])
+    numeric = houses.select_dtypes(include=np.number)
+    columns_before = list(houses.columns)
+
+    # 1. DataFrame: derived columns added, replaced ones left out, the rest shared with the input
+    engineered = FEATURES.apply(houses)
+    assert list(houses.columns) == columns_before
+    assert {"TotalSF", "HouseAge", "WasRemodeled"} <= set(engineered.columns)
+    assert not set(FEATURES.drop) & set(engineered.columns)
+    assert np.shares_memory(engineered["LotArea"].to_numpy(), houses["LotArea"].to_numpy())
+    expected = houses["BsmtFinSF1"] + houses["BsmtFinSF2"] + houses["BsmtUnfSF"] + houses["1stFlrSF"] + houses["2ndFlrSF"]
+    np.testing.assert_array_equal(engineered["TotalSF"], expected)
+
+    # 2. Structured array and dict of lists
+    from_records = FEATURES.apply(numeric.to_records(index=False))
+    from_lists = FEATURES.apply({name: numeric[name].tolist() for name in numeric.columns})
+    for name in FEATURES.names:
+        if name not in FEATURES.drop:
+            np.testing.assert_array_equal(from_records[name], engineered[name])
+            np.testing.assert_array_equal(from_lists[name], engineered[name])
+
+    # 3. One house at a time, as the fast path does
+    house = houses.iloc[0].to_dict()
+    one = engineer_one(house)
+    assert one["TotalSF"] == engineered["TotalSF"].iloc[0]
+    assert one["WasRemodeled"] == engineered["WasRemodeled"].iloc[0]
+    assert "TotalBsmtSF" not in house
+
+    # 4. The training data's own TotalBsmtSF is used when it has one
+    training = generate_houses(10, seed=2, with_target=False)
+    training["TotalBsmtSF"] = 0
+    assert (engineer_features(training)["TotalSF"] == training["1stFlrSF"] + training["2ndFlrSF"]).all()
+
+def test_serving_treats_none_like_missing_training_values(fitted_pipeline, house_payloads):
+    """
+    Tests that None in API input is preprocessed like NaN in the training data.
+    """
+    _, preprocessor = fitted_pipeline
+    house = {**house_payloads[0], "GarageType": None, "Alley": None, "LotFrontage": None}
+
+    # 1. The training representation: read from CSV, missing values are NaN
+    training_like = pd.read_csv(io.StringIO(pd.DataFrame([house]).to_csv(index=False)))
+    training_like["TotalBsmtSF"] = training_like["BsmtFinSF1"] + training_like["BsmtFinSF2"] + training_like["BsmtUnfSF"]
+    expected = preprocessor.transform(engineer_features(training_like))
+
+    # 2. The serving path gets the same matrix
+    served = transform_frame(pd.DataFrame([house]), preprocessor)
+    to_dense = lambda X: X.toarray() if hasattr(X, "toarray") else X
+    np.testing.assert_array_equal(to_dense(served), to_dense(expected))
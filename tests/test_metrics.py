@@ -0,0 +1,63 @@
+# tests/test_metrics.py
+
+def test_metrics_endpoint_exposes_requests_stages_and_model(client_with_versions, house_payloads):
+    """
+    Tests that /metrics reports request counts, per-stage latencies and the served model version.
+    """
+    with client_with_versions("20250101_000000") as client:
+        # 1. A single prediction (fast path) and a batch prediction (pandas path)
+        assert client.post("/predict", json=house_payloads[0]).status_code == 200
+        assert client.post("/predict/batch", json=house_payloads[:5]).status_code == 200
+        assert client.post("/admin/models/unknown/pin").status_code == 404
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        body = response.text
+
+    # 2. Requests are labelled with the route template, not the raw path
+    assert 'http_requests_total{endpoint="/predict",method="POST",status="200"}' in body
+    assert 'endpoint="/admin/models/{version}/pin",method="POST",status="404"' in body
+
+    # 3. Every stage of the pandas pipeline and of the fast path is timed
+    for stage in ("build_frame", "engineer_features", "transform", "predict"):
+        assert f'inference_stage_duration_seconds_count{{path="pandas",stage="{stage}"}}' in body
+    assert 'inference_stage_duration_seconds_count{path="fast",stage="predict"}' in body
+    assert 'predictions_total{path="batch"}' in body
+
+    # 4. The model version and the cache counters are exported
+    assert 'model_info{version="20250101_000000"} 1.0' in body
+    assert "prediction_cache_misses_total" in body
+
+def test_stages_timed_in_process_workers_are_recorded(monkeypatch, log_dir, client_with_versions, house_payloads):
+    """
+    Tests that the stages timed by process workers reach the API's histograms and the request's audit record.
+    """
+    from prometheus_client import REGISTRY
+    from app import main, predict
+
+    monkeypatch.setattr(main, "PREDICTION_CACHE_ENABLED", False)
+    monkeypatch.setattr(main, "prediction_cache", None)
+    monkeypatch.setattr(main, "INFERENCE_EXECUTOR", "process")
+    monkeypatch.setattr(main, "INFERENCE_WORKERS", 1)
+    # The spawned workers read their settings from the environment
+    monkeypatch.setenv("MODEL_DIR", str(predict.MODEL_DIR))
+    monkeypatch.setenv("LOG_DIR", str(log_dir))
+    recorded = []
+    monkeypatch.setattr(main.audit_log, "record", lambda *args, **kwargs: recorded.append(args[5]))
+
+    def count(path, stage):
+        return REGISTRY.get_sample_value("inference_stage_duration_seconds_count", {"path": path, "stage": stage}) or 0
+
+    with client_with_versions("20250101_000000") as client:
+        assert main.inference.kind == "process"
+        fast_before, pandas_before = count("fast", "predict"), count("pandas", "predict")
+        for house in house_payloads[:3]:
+            assert client.post("/predict", json=house).status_code == 200
+        assert client.post("/predict/batch", json=house_payloads[:5]).status_code == 200
+
+    # 1. One observation per request, in the API process
+    assert count("fast", "predict") == fast_before + 3
+    assert count("pandas", "predict") == pandas_before + 1
+
+    # 2. The request's timings include the worker's stages
+    assert all("predict" in stage_seconds for stage_seconds in recorded[-4:])
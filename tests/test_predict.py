@@ -2,7 +2,9 @@
 
 import numpy as np
 import pandas as pd
-from app.predict import make_prediction
+import pytest
+from app import main
+from app.predict import make_prediction, make_predictions, make_sweep
 
 # Create a mock model and preprocessor for testing
 class MockModel:
@@ -36,4 +38,86 @@ def test_make_prediction():
     # 4. Assert that the output is a float
     assert isinstance(prediction, float)
     # 5. Assert that the prediction is not None
-    assert prediction is not None
\ No newline at end of file
+    assert prediction is not None
+
+class MockBatchModel:
+    def predict(self, data):
+        return np.full(len(data), 12.2) # One log-transformed prediction per row
+
+def test_make_predictions():
+    """
+    Tests that make_predictions returns one float per input house, in order.
+    """
+    # 1. Create a small batch of sample input data
+    sample_input = {
+        "1stFlrSF": 856, "2ndFlrSF": 854, "YrSold": 2008, "YearRemodAdd": 2003,
+        "YearBuilt": 2003, "BsmtFinSF1": 706, "BsmtFinSF2": 0, "BsmtUnfSF": 150
+    }
+    batch = [sample_input, dict(sample_input, YearBuilt=1990), dict(sample_input, BsmtUnfSF=0)]
+
+    # 2. Run the batch prediction function
+    predictions = make_predictions(batch, MockBatchModel(), MockPreprocessor())
+
+    # 3. Assert one float prediction per house, matching the single-row path
+    assert len(predictions) == len(batch)
+    assert all(isinstance(p, float) for p in predictions)
+    assert predictions[0] == make_prediction(sample_input, MockBatchModel(), MockPreprocessor())
+
+def test_make_predictions_empty_batch():
+    """
+    Tests that an empty batch returns an empty list without touching the model.
+    """
+    assert make_predictions([], None, None) == []
+
+def test_make_sweep_matches_predicting_each_variant(fitted_pipeline, house_payloads):
+    """
+    Tests that a two-feature sweep scores every combination like make_predictions does, in grid order.
+    """
+    model, preprocessor = fitted_pipeline
+    house = house_payloads[0]
+    grid = {"GrLivArea": [900, 1500, 2400], "Neighborhood": ["CollgCr", "OldTown"]}
+
+    # 1. One price per combination, indexed by the first feature then the second
+    base_price, prices = make_sweep(house, grid, model, preprocessor)
+    assert prices.shape == (3, 2)
+
+    # 2. The same prices as scoring the variants one by one, and the house itself
+    variants = [dict(house, GrLivArea=area, Neighborhood=name) for area in grid["GrLivArea"] for name in grid["Neighborhood"]]
+    np.testing.assert_allclose(prices.ravel(), make_predictions(variants, model, preprocessor), rtol=1e-6)
+    assert base_price == pytest.approx(make_prediction(house, model, preprocessor), rel=1e-6)
+
+def test_sweep_endpoint(monkeypatch, client_with_versions, house_payloads):
+    """
+    Tests the what-if sweep endpoint: ranges, explicit values, and invalid or oversized sweeps.
+    """
+    house = house_payloads[0]
+
+    with client_with_versions("20250101_000000") as client:
+        # 1. A range over an integer field is rounded and de-duplicated
+        response = client.post("/predict/sweep", json={
+            "house": house, "sweeps": [{"feature": "OverallQual", "start": 1, "stop": 10, "num": 19}],
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert body["values"] == [list(range(1, 11))]
+        assert len(body["predicted_prices"]) == body["n_points"] == 10
+
+        # 2. A grid of two features, matching /predict for one of its points
+        response = client.post("/predict/sweep", json={
+            "house": house,
+            "sweeps": [{"feature": "1stFlrSF", "start": 500.0, "stop": 1500.0, "num": 5},
+                       {"feature": "Neighborhood", "values": ["CollgCr", "NAmes", "OldTown"]}],
+        })
+        body = response.json()
+        assert body["n_points"] == 15 and len(body["predicted_prices"][0]) == 3
+        single = client.post("/predict", json=dict(house, **{"1stFlrSF": 750, "Neighborhood": "NAmes"})).json()
+        assert single["predicted_price_formatted"] == f"${body['predicted_prices'][1][1]:,.2f}"
+
+        # 3. Unknown features, values of the wrong type, repeated features and oversized grids
+        assert client.post("/predict/sweep", json={"house": house, "sweeps": [{"feature": "Pool", "values": [1]}]}).status_code == 422
+        assert client.post("/predict/sweep", json={"house": house, "sweeps": [{"feature": "GarageCars", "values": [1.5]}]}).status_code == 422
+        repeated = [{"feature": "GarageCars", "values": [1, 2]}] * 2
+        assert client.post("/predict/sweep", json={"house": house, "sweeps": repeated}).status_code == 422
+        monkeypatch.setattr(main, "MAX_SWEEP_POINTS", 10)
+        too_many = [{"feature": "LotArea", "start": 5000, "stop": 9000, "num": 11}]
+        assert client.post("/predict/sweep", json={"house": house, "sweeps": too_many}).status_code == 413
@@ -1,7 +1,10 @@
 # tests/test_preprocessing.py
 
+import numpy as np
 import pandas as pd
-from src.preprocessing import engineer_features
+import scipy.sparse as sp
+from src.preprocessing import create_preprocessor, engineer_features, model_feature_params
+from src.synthetic import generate_houses
 
 def test_engineer_features():
     """
@@ -29,4 +32,49 @@ def test_engineer_features():
     # 4. Assert that the calculations are correct
     assert df_engineered['TotalSF'].iloc[0] == 3000
     assert df_engineered['HouseAge'].iloc[0] == 10
-    assert df_engineered['WasRemodeled'].iloc[0] == 1
\ No newline at end of file
+    assert df_engineered['WasRemodeled'].iloc[0] == 1
+
+def test_create_preprocessor_output_format():
+    """
+    Tests that the sparse switch fixes the output format, not the data's share of non-zeros.
+    """
+    # 1. Mostly numeric columns, which ColumnTransformer would densify by default
+    houses = engineer_features(generate_houses(200, seed=3, with_target=False))
+    numerical_features = houses.select_dtypes(include=np.number).columns.tolist()
+    categorical_features = ['Street', 'CentralAir']
+    X = houses[numerical_features + categorical_features]
+
+    # 2. CSR when sparse, a dense array otherwise
+    sparse_output = create_preprocessor(numerical_features, categorical_features, sparse=True).fit_transform(X)
+    dense_output = create_preprocessor(numerical_features, categorical_features, sparse=False).fit_transform(X)
+    assert sp.isspmatrix_csr(sparse_output)
+    assert isinstance(dense_output, np.ndarray)
+
+    # 3. Both hold the same values
+    np.testing.assert_array_equal(sparse_output.toarray(), dense_output)
+
+def test_native_encoding_freezes_the_vocabulary():
+    """
+    Tests that native encoding gives one code column per categorical feature,
+    marked as categorical for XGBoost, with unseen categories as missing.
+    """
+    # 1. Fit on houses without 'Grvl' streets
+    houses = engineer_features(generate_houses(200, seed=3, with_target=False))
+    numerical_features = ['LotArea', 'OverallQual']
+    categorical_features = ['Street', 'Neighborhood']
+    houses = houses.loc[houses['Street'] == 'Pave', numerical_features + categorical_features]
+    preprocessor = create_preprocessor(numerical_features, categorical_features, encoding='native')
+    preprocessor.fit(houses)
+
+    # 2. Codes of the fitted vocabulary, NaN for 'Grvl'
+    unseen = houses.head(1).assign(Street='Grvl')
+    codes = preprocessor.transform(unseen)
+    assert codes.shape == (1, 4)
+    assert np.isnan(codes[0, 2])
+    assert codes[0, 3] == list(preprocessor.named_transformers_['cat'][-1].categories_[1]).index(unseen['Neighborhood'].iloc[0])
+
+    # 3. Only the code columns are categorical
+    params = model_feature_params(preprocessor)
+    assert params['enable_categorical']
+    assert params['feature_types'] == ['q', 'q', 'c', 'c']
+    assert model_feature_params(create_preprocessor(numerical_features, categorical_features).fit(houses)) == {}
@@ -0,0 +1,52 @@
+# tests/test_registry.py
+
+from app import main
+from app.registry import ModelRegistry
+
+def test_registry_swaps_pins_and_rolls_back(save_version, house_payloads):
+    """
+    Tests that the registry follows the newest model, can pin an older one and unpin again.
+    """
+    # 1. Two trained versions on disk
+    save_version("20250101_000000")
+    save_version("20250201_000000")
+
+    swapped_to = []
+    registry = ModelRegistry(warmup_input=house_payloads[0])
+    registry.add_listener(lambda bundle: swapped_to.append(bundle.version))
+
+    # 2. The newest version is loaded and warmed up
+    assert registry.refresh() is True
+    assert registry.current.version == "20250201_000000"
+    assert registry.current.fast_predictor is not None
+    assert registry.refresh() is False
+
+    # 3. Pinning rolls back; a request holding the old bundle keeps working
+    in_flight = registry.current
+    registry.pin("20250101_000000")
+    assert registry.current.version == "20250101_000000"
+    assert in_flight.fast_predictor.predict_one(house_payloads[1]) is not None
+
+    # 4. A newer model does not replace a pinned one until it is unpinned
+    save_version("20250301_000000")
+    assert registry.refresh() is False
+    assert registry.unpin() is True
+    assert registry.current.version == "20250301_000000"
+
+    assert swapped_to == ["20250201_000000", "20250101_000000", "20250301_000000"]
+    assert len(registry.status()["swap_history"]) == 3
+
+def test_admin_endpoints_fail_closed(monkeypatch, client_with_versions):
+    """
+    Tests that the admin endpoints need the configured token and are disabled when none is configured.
+    """
+    with client_with_versions("20250101_000000") as client:
+        # 1. The configured token opens them, any other is refused
+        assert client.get("/admin/models").status_code == 200
+        assert client.get("/admin/models", headers={"X-Admin-Token": "guess"}).status_code == 403
+
+        # 2. Without ADMIN_TOKEN (the default), even a request with a token is refused
+        monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+        for method, path in (("GET", "/admin/models"), ("POST", "/admin/models/reload"),
+                             ("POST", "/admin/models/20250101_000000/pin"), ("POST", "/admin/models/unpin")):
+            assert client.request(method, path).status_code == 503
@@ -0,0 +1,122 @@
+# tests/test_routing.py
+
+import json
+import random
+import time
+
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.base import clone
+from app import main
+from app.audit import PredictionAuditLog
+from app.executor import predict_one, predict_one_with_features
+from app.registry import ModelRegistry
+from app.routing import ModelPool, ShadowScorer, parse_routes
+from src.preprocessing import engineer_features
+from src.synthetic import generate_houses
+
+def challenger(preprocessor):
+    """A second, smaller model trained on the same preprocessed features."""
+    houses = generate_houses(200, seed=3)
+    y_log = np.log1p(houses.pop("SalePrice"))
+    model = xgb.XGBRegressor(n_estimators=10, max_depth=2, random_state=0)
+    return model.fit(preprocessor.transform(engineer_features(houses)), y_log)
+
+def test_pool_routes_by_weight_and_header_and_shadows_with_shared_features(save_version, json_logger, fitted_pipeline, house_payloads):
+    """
+    Tests weighted and header routing, preprocessor sharing between versions and shadow scoring.
+    """
+    _, preprocessor = fitted_pipeline
+    # Same preprocessor with another model, and a model with a preprocessor fitted on other houses
+    refitted = clone(preprocessor).fit(engineer_features(generate_houses(300, seed=9, with_target=False)))
+    save_version("20250101_000000")
+    save_version("20250102_000000", challenger(preprocessor))
+    save_version("20250103_000000", challenger(refitted), refitted)
+
+    registry = ModelRegistry(warmup_input=house_payloads[0])
+    registry.pin("20250101_000000")
+    pool = ModelPool(registry, rng=random.Random(0))
+    pool.configure(parse_routes("current=3, 20250102_000000=1"), shadow_version="20250103_000000")
+    current, challenger_bundle, refitted_bundle = (
+        registry.current, pool.table.bundles["20250102_000000"], pool.table.bundles["20250103_000000"]
+    )
+
+    # 1. Versions fitted with the same preprocessor share it
+    assert challenger_bundle.preprocessor is current.preprocessor
+    assert refitted_bundle.preprocessor is not current.preprocessor
+
+    # 2. Weighted draws, and versions asked for in the header
+    versions = [pool.select().version for _ in range(4000)]
+    assert versions.count("20250102_000000") / len(versions) == pytest.approx(0.25, abs=0.03)
+    assert pool.select("20250102_000000") is challenger_bundle and pool.select("current") is current
+    with pytest.raises(KeyError):
+        pool.select("20240101_000000")
+    with pytest.raises(ValueError):
+        pool.configure({"current": 0})
+
+    # 3. The shadow scores the primary's features when it shares the preprocessor, else the houses
+    house = house_payloads[0]
+    test_logger, stream = json_logger
+    scorer = ShadowScorer(max_queue=4, logger=test_logger)
+    price, features = predict_one_with_features(current, house)
+    assert scorer.submit("/predict", current, challenger_bundle, [price], houses=[house], features=features)
+    assert scorer.submit("/predict", current, refitted_bundle, [price], houses=[house])
+    scorer.shutdown()
+    shared, unshared = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert shared["shared_preprocessing"] is True and unshared["shared_preprocessing"] is False
+    assert shared["shadow_price"] == pytest.approx(predict_one(challenger_bundle, house), rel=1e-5)
+    assert unshared["shadow_price"] == pytest.approx(predict_one(refitted_bundle, house), rel=1e-5)
+    assert shared["predicted_price"] == price and scorer.stats()["scored"] == 2
+
+    # 4. A full shadow queue drops the task instead of waiting
+    full = ShadowScorer(max_queue=0, logger=test_logger)
+    assert full.submit("/predict", current, challenger_bundle, [price], houses=[house]) is False
+    assert full.stats()["dropped"] == 1
+    full.shutdown()
+
+def test_api_routes_by_header_and_shadows_requests(monkeypatch, save_version, client_with_versions, json_logger,
+                                                   fitted_pipeline, house_payloads):
+    """
+    Tests routing through the API, the routing admin endpoint and shadow scoring off the response path.
+    """
+    _, preprocessor = fitted_pipeline
+    monkeypatch.setattr(main, "pool", ModelPool(main.registry))
+    # Audit and shadow records go to a buffer, not to the audit log file
+    test_logger, stream = json_logger
+    monkeypatch.setattr(main, "audit_log", PredictionAuditLog(0.0, 0.0, logger=test_logger))
+    save_version("20250401_000000", challenger(preprocessor))
+    save_version("20250402_000000")
+
+    with client_with_versions() as client:
+        # 1. A version routed with weight 0 only serves the requests asking for it
+        response = client.put("/admin/models/routing", json={"routes": {"current": 1, "20250401_000000": 0}})
+        assert response.status_code == 200 and response.json()["loaded_versions"] == ["20250401_000000"]
+        assert client.post("/predict", json=house_payloads[0]).headers["X-Model-Version"] == "20250402_000000"
+        response = client.post("/predict", json=house_payloads[0], headers={"X-Model-Version": "20250401_000000"})
+        assert response.status_code == 200 and response.headers["X-Model-Version"] == "20250401_000000"
+        assert client.post("/predict", json=house_payloads[0], headers={"X-Model-Version": "nope"}).status_code == 404
+
+        # 2. Unknown versions and invalid weights are rejected, and the routes in place kept
+        assert client.put("/admin/models/routing", json={"routes": {"20240101_000000": 1}}).status_code == 404
+        assert client.put("/admin/models/routing", json={"routes": {"current": -1}}).status_code == 422
+
+        # 3. The shadow model scores single and batch requests after they are answered
+        client.put("/admin/models/routing", json={"routes": {"current": 1}, "shadow_version": "20250401_000000"})
+        assert client.post("/predict", json=house_payloads[1]).status_code == 200
+        assert client.post("/predict/batch", json=house_payloads[:10]).status_code == 200
+        deadline = time.monotonic() + 10
+        while client.get("/predict/routing/stats").json()["shadow"]["houses"] < 11 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = client.get("/predict/routing/stats").json()
+        assert stats["shadow_version"] == "20250401_000000"
+        assert stats["shadow"]["houses"] == 11 and stats["shadow"]["failed"] == 0
+        shadow_records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert {record["shadow_version"] for record in shadow_records} == {"20250401_000000"}
+
+        # 4. Routing is an admin endpoint: it needs the token, and is disabled without one
+        routes = {"routes": {"20250401_000000": 1}}
+        assert client.put("/admin/models/routing", json=routes, headers={"X-Admin-Token": "guess"}).status_code == 403
+        monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+        assert client.put("/admin/models/routing", json=routes).status_code == 503
+        assert client.get("/predict/routing/stats").json()["shadow_version"] == "20250401_000000"
@@ -0,0 +1,57 @@
+# tests/test_score.py
+
+import joblib
+import numpy as np
+import pandas as pd
+from src import config
+from src.model_store import predict_frame
+from src.score import PREDICTION_COLUMN, score_file
+from src.synthetic import generate_houses
+
+def _save_houses(tmp_path, fitted_pipeline) -> pd.DataFrame:
+    """Saves the fixture's model as version 'v1' and a raw input file like train.csv, with an Id and the target column."""
+    model, preprocessor = fitted_pipeline
+    joblib.dump(preprocessor, tmp_path / config.get_versioned_preprocessor_name("v1"))
+    joblib.dump(model, tmp_path / config.get_versioned_model_name("v1"))
+
+    houses = generate_houses(250, seed=3)
+    houses.insert(0, "Id", np.arange(1, len(houses) + 1))
+    houses.to_csv(tmp_path / "houses.csv", index=False)
+    houses.to_parquet(tmp_path / "houses.parquet", index=False)
+    return houses
+
+def _read(path) -> pd.DataFrame:
+    return pd.read_csv(path) if path.suffix == ".csv" else pd.read_parquet(path)
+
+def test_score_file_streams_chunks(tmp_path, fitted_pipeline):
+    """
+    Tests that chunked scoring of CSV and Parquet files matches scoring the whole frame at once.
+    """
+    model, preprocessor = fitted_pipeline
+    houses = _save_houses(tmp_path, fitted_pipeline)
+    expected = predict_frame(houses.drop(columns=["Id", "SalePrice"]), model, preprocessor)
+
+    for input_name, output_name in [("houses.csv", "out.csv"), ("houses.parquet", "out.parquet")]:
+        # 1. Score in chunks smaller than the file
+        summary = score_file(tmp_path / input_name, tmp_path / output_name, chunksize=100, model_dir=tmp_path)
+        assert summary["rows"] == len(houses)
+
+        # 2. Every row is scored once, in order, with the same price
+        output = _read(tmp_path / output_name)
+        assert output["Id"].tolist() == houses["Id"].tolist()
+        np.testing.assert_allclose(output[PREDICTION_COLUMN], expected, rtol=1e-5)
+
+def test_score_file_with_worker_processes(tmp_path, fitted_pipeline):
+    """
+    Tests that scoring with a process pool writes the same rows, in the same order, as scoring in-process.
+    """
+    houses = _save_houses(tmp_path, fitted_pipeline)
+
+    for input_name, suffix in [("houses.csv", ".csv"), ("houses.parquet", ".parquet")]:
+        # 1. More chunks than the two per worker kept in flight
+        score_file(tmp_path / input_name, tmp_path / f"one{suffix}", chunksize=40, workers=1, model_dir=tmp_path)
+        summary = score_file(tmp_path / input_name, tmp_path / f"two{suffix}", chunksize=40, workers=2, model_dir=tmp_path)
+        assert summary["rows"] == len(houses)
+
+        # 2. The worker processes load the same model and keep the input order
+        pd.testing.assert_frame_equal(_read(tmp_path / f"two{suffix}"), _read(tmp_path / f"one{suffix}"))
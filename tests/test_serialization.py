@@ -0,0 +1,131 @@
+# tests/test_serialization.py
+
+import json
+
+import pytest
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from app import main
+from app.main import HouseData, house_records, house_tables
+from app.serialization import (
+    ARROW_FILE_MEDIA_TYPE, ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE, FastJSONResponse, encode_table, parse_json_array
+)
+
+def test_records_match_the_model_dump(house_payloads):
+    """
+    Tests that validating raw JSON into a record gives what HouseData.model_dump(by_alias=True) gave.
+    """
+    # 1. Same keys, order, values and defaults, optional fields left out included
+    house = {key: value for key, value in house_payloads[0].items() if key != "Alley"}
+    house["LotArea"] = str(house["LotArea"])
+    record = house_records.parse_json(json.dumps(house).encode())
+    expected = HouseData.model_validate(house).model_dump(by_alias=True)
+    assert record == expected and list(record) == list(expected)
+    assert record["Alley"] is None and isinstance(record["LotArea"], int)
+
+    # 2. Invalid bodies raise FastAPI's validation error, located in the body
+    with pytest.raises(RequestValidationError) as error:
+        house_records.parse_json(json.dumps({**house, "GarageCars": "two"}).encode())
+    assert error.value.errors()[0]["loc"] == ("body", "GarageCars")
+    with pytest.raises(RequestValidationError):
+        parse_json_array(b'{"not": "a list"}')
+
+    # 3. The fast response class writes the same JSON
+    content = {"results": [{"index": 0, "predicted_price": 181234.56, "predicted_price_formatted": "$181,234.56"}]}
+    assert json.loads(FastJSONResponse(content).body) == content
+
+def test_batch_responses_are_the_same_with_either_serializer(monkeypatch, client_with_versions, house_payloads):
+    """
+    Tests that /predict/batch answers the same with and without FastJSONResponse, and that /predict validates raw bodies.
+    """
+    batch = house_payloads[:5] + [{"LotArea": "not a number"}, 1]
+
+    with client_with_versions("20250101_000000") as client:
+        # 1. Per-row errors, including rows that are not objects
+        fast = client.post("/predict/batch", json=batch)
+        assert fast.status_code == 200 and fast.json()["n_errors"] == 2
+        monkeypatch.setattr(main, "FAST_JSON_RESPONSES_ENABLED", False)
+        assert client.post("/predict/batch", json=batch).json() == fast.json()
+
+        # 2. Bodies that are not JSON, or not a list, are rejected as a whole
+        assert client.post("/predict/batch", content=b"[{").status_code == 422
+        assert client.post("/predict/batch", json=house_payloads[0]).status_code == 422
+
+        # 3. Single houses are validated from the raw body
+        assert client.post("/predict", json=house_payloads[0]).status_code == 200
+        response = client.post("/predict", json={**house_payloads[0], "OverallQual": "high"})
+        assert response.status_code == 422 and response.json()["detail"][0]["loc"] == ["body", "OverallQual"]
+
+def test_columnar_batches_are_size_checked_before_decoding(monkeypatch, client_with_versions, house_payloads):
+    """
+    Tests that columnar bodies with too many rows are rejected with 413 from their metadata or first batches.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pylist(house_payloads[:5])
+
+    # 1. Parquet and Arrow files are checked against their footer
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    for body, media_type in (
+        (encode_table(table, PARQUET_MEDIA_TYPE), PARQUET_MEDIA_TYPE),
+        (sink.getvalue().to_pybytes(), ARROW_FILE_MEDIA_TYPE),
+    ):
+        with pytest.raises(HTTPException) as error:
+            house_tables.parse(body, media_type, max_rows=4)
+        assert error.value.status_code == 413
+        assert house_tables.parse(body, media_type, max_rows=5)[0].num_rows == 5
+
+    # 2. An Arrow stream is rejected at the first batch over the limit, before its corrupt end is read
+    stream = encode_table(pa.Table.from_batches(table.to_batches(max_chunksize=1)), ARROW_STREAM_MEDIA_TYPE)
+    with pytest.raises(RequestValidationError):
+        house_tables.parse(stream[:-50], ARROW_STREAM_MEDIA_TYPE)
+    with pytest.raises(HTTPException) as error:
+        house_tables.parse(stream[:-50], ARROW_STREAM_MEDIA_TYPE, max_rows=2)
+    assert error.value.status_code == 413
+
+    # 3. The endpoint applies MAX_BATCH_SIZE
+    monkeypatch.setattr(main, "MAX_BATCH_SIZE", 4)
+    with client_with_versions("20250101_000000") as client:
+        response = client.post("/predict/batch", content=stream, headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE})
+        assert response.status_code == 413
+
+def test_columnar_batches_match_json_batches(client_with_versions, house_payloads):
+    """
+    Tests that /predict/batch gives the same prices for Arrow IPC and Parquet bodies as for JSON,
+    returned as an Arrow column with null for invalid rows.
+    """
+    import pyarrow as pa
+
+    batch = house_payloads[:5]
+    # Optional columns may be left out, and int columns may come as any int type
+    table = pa.Table.from_pylist(batch).drop_columns(["Alley"])
+    table = table.set_column(table.schema.get_field_index("LotArea"), "LotArea", table["LotArea"].cast(pa.int32()))
+
+    with client_with_versions("20250101_000000") as client:
+        without_alley = [{key: value for key, value in house.items() if key != "Alley"} for house in batch]
+        expected = [row["predicted_price"] for row in client.post("/predict/batch", json=without_alley).json()["results"]]
+
+        # 1. Same prices from either columnar body
+        for media_type in (ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE):
+            response = client.post("/predict/batch", content=encode_table(table, media_type), headers={"Content-Type": media_type})
+            assert response.status_code == 200 and response.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+            prices = pa.ipc.open_stream(response.content).read_all()["predicted_price"].to_pylist()
+            assert prices == pytest.approx(expected)
+
+        # 2. A null in a required column fails that row only
+        invalid = table.set_column(
+            table.schema.get_field_index("GrLivArea"), "GrLivArea", pa.array([None, *table["GrLivArea"].to_pylist()[1:]], pa.int64()),
+        )
+        response = client.post("/predict/batch", content=encode_table(invalid, ARROW_STREAM_MEDIA_TYPE), headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE})
+        prices = pa.ipc.open_stream(response.content).read_all()["predicted_price"].to_pylist()
+        assert response.headers["X-Errors"] == "1" and prices[0] is None and prices[1:] == pytest.approx(expected[1:])
+
+        # 3. Missing required columns, unconvertible columns and corrupt bodies are rejected as a whole
+        for body in (
+            encode_table(table.drop_columns(["GrLivArea"]), ARROW_STREAM_MEDIA_TYPE),
+            encode_table(table.set_column(0, table.column_names[0], pa.array(["x"] * len(batch))), ARROW_STREAM_MEDIA_TYPE),
+            b"not arrow",
+        ):
+            assert client.post("/predict/batch", content=body, headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE}).status_code == 422
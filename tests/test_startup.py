@@ -0,0 +1,97 @@
+# tests/test_startup.py
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from prometheus_client import REGISTRY
+from app import main
+from src.config import ROOT_DIR
+
+def test_blocking_startup_is_warmed_up_and_reports_its_phases(monkeypatch, client_with_versions):
+    """
+    Tests that a blocking startup runs the warm-up before serving and reports its timing breakdown.
+    """
+    monkeypatch.setattr(main, "WARMUP_PREDICTIONS", 3)
+    predict_requests = {"endpoint": "/predict", "method": "POST", "status": "200"}
+    predict_requests_before = REGISTRY.get_sample_value("http_requests_total", predict_requests) or 0
+    stage_counts = [{"path": path, "stage": "predict"} for path in ("fast", "pandas")]
+    stage_counts_before = [REGISTRY.get_sample_value("inference_stage_duration_seconds_count", labels) for labels in stage_counts]
+
+    with client_with_versions("20250101_000000") as client:
+        response = client.get("/health")
+
+        # 1. Ready as soon as the app has started, with every phase timed
+        assert response.status_code == 200
+        health = response.json()
+        assert health["live"] and health["ready"] and health["model_version"] == "20250101_000000"
+        phases = health["startup"]["phases_seconds"]
+        for phase in ("imports", "library_imports", "model_load", "inference_executor", "warmup"):
+            assert phases[phase] >= 0
+
+        # 2. The warm-up ran on the inference workers, leaving no trace in the traffic, cache or monitoring
+        assert main.inference.total_tasks >= 3 + 1
+        assert (REGISTRY.get_sample_value("http_requests_total", predict_requests) or 0) == predict_requests_before
+        assert [
+            REGISTRY.get_sample_value("inference_stage_duration_seconds_count", labels) for labels in stage_counts
+        ] == stage_counts_before
+        if main.prediction_cache is not None:
+            assert main.prediction_cache.stats()["size"] == 0
+        if main.drift_monitor is not None:
+            assert main.drift_monitor.counts()[2] == 0
+
+def test_background_startup_is_live_before_it_is_ready(monkeypatch, client_with_versions, house_payloads):
+    """
+    Tests that in background mode the API answers liveness checks while the model loads.
+    """
+    monkeypatch.setattr(main, "STARTUP_MODE", "background")
+
+    release = threading.Event()
+    refresh = main.registry.refresh
+
+    def slow_refresh():
+        release.wait(timeout=10)
+        return refresh()
+
+    monkeypatch.setattr(main.registry, "refresh", slow_refresh)
+
+    with client_with_versions("20250101_000000") as client:
+        # 1. Live, but neither ready nor serving predictions while the model loads
+        assert client.get("/health/live").status_code == 200
+        response = client.get("/health")
+        assert response.status_code == 503
+        assert response.json()["detail"]["status"] == "starting"
+        assert client.post("/predict", json=house_payloads[0]).status_code == 503
+
+        # 2. Ready once the model is loaded and warmed up
+        release.set()
+        deadline = time.time() + 10
+        while client.get("/health").status_code != 200 and time.time() < deadline:
+            time.sleep(0.02)
+        assert client.get("/health").json()["startup"]["finished"]
+        assert client.post("/predict", json=house_payloads[0]).status_code == 200
+
+def test_app_imports_and_logs_without_a_writable_log_dir(tmp_path):
+    """
+    Tests that the app can be imported, and can log, when the log directory cannot be created.
+    """
+    # 1. LOG_DIR below a regular file: neither the import nor the first records may create it
+    (tmp_path / "read_only").write_text("")
+    log_dir = tmp_path / "read_only" / "logs"
+    script = (
+        "from app import main\n"
+        "from src.logger_config import audit_logger, flush_logs, logger\n"
+        "logger.info('app log record')\n"
+        "audit_logger.info('audit record')\n"
+        "flush_logs()\n"
+    )
+    env = {**os.environ, "LOG_DIR": str(log_dir), "PYTHONPATH": str(ROOT_DIR)}
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT_DIR, env=env, capture_output=True, text=True, timeout=120)
+
+    # 2. The records go to stderr instead of the files
+    assert result.returncode == 0, result.stderr
+    assert "Cannot write the log file" in result.stderr
+    assert "app log record" in result.stderr and "audit record" in result.stderr
+    assert "app log record" in result.stdout
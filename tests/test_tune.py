@@ -0,0 +1,51 @@
+# tests/test_tune.py
+
+import numpy as np
+from src.preprocessing import engineer_features
+from src.synthetic import generate_houses
+from src.tune import build_fold_cache, sample_candidates, tune
+
+SEARCH_SPACE = {
+    'learning_rate': ('log_uniform', 0.05, 0.3),
+    'max_depth': ('int', 2, 4),
+    'subsample': ('uniform', 0.6, 1.0),
+}
+
+def test_sample_candidates_respects_search_space():
+    """
+    Tests that sampled candidates are reproducible and inside their bounds.
+    """
+    candidates = sample_candidates(SEARCH_SPACE, 20, seed=3)
+    assert candidates == sample_candidates(SEARCH_SPACE, 20, seed=3)
+    for params in candidates:
+        assert 0.05 <= params['learning_rate'] <= 0.3
+        assert params['max_depth'] in (2, 3, 4)
+
+def test_tune_halving_with_process_pool(tmp_path):
+    """
+    Tests successive halving over a process pool, the leaderboard and the fold cache.
+    """
+    # 1. Synthetic training data, engineered like src/train.py does
+    houses = generate_houses(300, seed=2)
+    y = np.log1p(houses.pop("SalePrice"))
+    X = engineer_features(houses)
+
+    # 2. 9 candidates, halving factor 3: rounds of 9, 3 and 1 candidates with growing budgets
+    leaderboard, summary = tune(
+        X, y, search_space=SEARCH_SPACE, strategy="halving", n_candidates=9, n_folds=3, workers=2,
+        max_estimators=90, early_stopping_rounds=10, halving_factor=3, cache_dir=tmp_path,
+    )
+    assert leaderboard.groupby("round").size().to_dict() == {0: 9, 1: 3, 2: 1}
+    assert sorted(leaderboard["n_estimators_budget"].unique()) == [10, 30, 90]
+
+    # 3. The winner is the single candidate of the last round, and its parameters come from the space
+    best = leaderboard.iloc[0]
+    assert best["round"] == 2
+    assert summary["best_cv_rmse"] == best["cv_rmse_mean"]
+    assert set(summary["best_params"]) == set(SEARCH_SPACE)
+    assert 1 <= summary["best_n_estimators"] <= 90
+
+    # 4. The preprocessed folds are cached and reused
+    fold_paths = build_fold_cache(X, y, 3, 42, tmp_path)
+    assert len(fold_paths) == 3 and all(path.exists() for path in fold_paths)
+    assert len(list(tmp_path.iterdir())) == 1
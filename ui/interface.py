@@ -1,9 +1,12 @@
 # ui/interface.py
 
 import streamlit as st
+import pandas as pd
 import requests
 import json
 
+API_BASE_URL = "http://predictor-prod-env.eba-hetgzns3.us-east-1.elasticbeanstalk.com"
+
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
     page_title="Real Estate Price Predictor",
@@ -20,6 +23,7 @@ Welcome to the Ames Housing Price Predictor! This application leverages a sophis
 1.  Use the **sidebar on the left** to adjust the key features of a house.
 2.  The most impactful features (like overall quality and living area) are available for you to modify.
 3.  Click the **"Predict Price"** button to see the model's prediction.
+4.  Use the **What-if Analysis** panel to see how the price changes as one or two features vary.
 
 """)
 
@@ -66,9 +70,9 @@ tot_rms_abv_grd = st.sidebar.slider("Total Rooms Above Grade", 1, 15, default_da
 year_built = st.sidebar.slider("Year Built", 1870, 2025, default_data["YearBuilt"])
 year_remod_add = st.sidebar.slider("Year Remodeled", 1950, 2025, default_data["YearRemodAdd"])
 
-# --- PREDICTION LOGIC ---
-if st.sidebar.button("Predict Price"):
-    # 1. Create the payload for the API
+# --- PAYLOAD ---
+def build_payload():
+    """Builds the API payload from the default data and the sidebar inputs."""
     # Start with the default data and update it with user inputs
     api_payload = default_data.copy()
     
@@ -90,10 +94,16 @@ if st.sidebar.button("Predict Price"):
     # A simple assumption for 2nd floor SF
     second_flr_sf = gr_liv_area - first_flr_sf
     api_payload["2ndFlrSF"] = second_flr_sf if second_flr_sf > 0 else 0
+    return api_payload
+
+# --- PREDICTION LOGIC ---
+if st.sidebar.button("Predict Price"):
+    # 1. Create the payload for the API
+    api_payload = build_payload()
 
     # 2. Send the request to the FastAPI backend
     try:
-        api_url = "http://predictor-prod-env.eba-hetgzns3.us-east-1.elasticbeanstalk.com/predict"
+        api_url = f"{API_BASE_URL}/predict"
         response = requests.post(api_url, data=json.dumps(api_payload))
         response.raise_for_status()
 
@@ -108,3 +118,59 @@ if st.sidebar.button("Predict Price"):
         st.error(f"Could not connect to the API. Please ensure it is running. Error: {e}")
     except Exception as e:
         st.error(f"An error occurred: {e}")
+
+# --- WHAT-IF ANALYSIS ---
+# Features that can be swept, with the range offered by default
+SWEEP_FEATURES = {
+    "Overall Quality": ("OverallQual", 1, 10),
+    "Above Grade Living Area (sq ft)": ("GrLivArea", 500, 4000),
+    "Garage Capacity (cars)": ("GarageCars", 0, 5),
+    "Garage Area (sq ft)": ("GarageArea", 0, 1200),
+    "Full Bathrooms": ("FullBath", 0, 4),
+    "Total Rooms Above Grade": ("TotRmsAbvGrd", 1, 15),
+    "Year Built": ("YearBuilt", 1870, 2025),
+    "Year Remodeled": ("YearRemodAdd", 1950, 2025),
+}
+
+st.header("What-if Analysis")
+st.markdown("See how the predicted price changes as a feature varies, with every other feature as in the sidebar. The whole curve is computed in a single request.")
+
+col1, col2 = st.columns(2)
+with col1:
+    sweep_label = st.selectbox("Feature to vary", list(SWEEP_FEATURES))
+    sweep_feature, low, high = SWEEP_FEATURES[sweep_label]
+    sweep_range = st.slider("Range", low, high, (low, high))
+    num_points = st.slider("Number of points", 2, 100, 50)
+with col2:
+    compare_label = st.selectbox("Compare across (optional)", ["None"] + [label for label in SWEEP_FEATURES if label != sweep_label])
+    if compare_label != "None":
+        compare_feature, low, high = SWEEP_FEATURES[compare_label]
+        compare_range = st.slider("Comparison range", low, high, (low, high))
+        compare_points = st.slider("Number of curves", 2, 6, 3)
+
+if st.button("Run What-if Analysis"):
+    sweeps = [{"feature": sweep_feature, "start": sweep_range[0], "stop": sweep_range[1], "num": num_points}]
+    if compare_label != "None":
+        sweeps.append({"feature": compare_feature, "start": compare_range[0], "stop": compare_range[1], "num": compare_points})
+
+    try:
+        response = requests.post(f"{API_BASE_URL}/predict/sweep", json={"house": build_payload(), "sweeps": sweeps})
+        response.raise_for_status()
+        result = response.json()
+
+        # One line per value of the comparison feature, if there is one
+        prices = result["predicted_prices"]
+        if len(result["features"]) == 1:
+            chart_data = pd.DataFrame({"Predicted Price": prices}, index=result["values"][0])
+        else:
+            columns = [f"{compare_label}: {value}" for value in result["values"][1]]
+            chart_data = pd.DataFrame(prices, index=result["values"][0], columns=columns)
+        chart_data.index.name = sweep_label
+
+        st.line_chart(chart_data)
+        st.caption(f"Price of the house as set in the sidebar: {result['base_price_formatted']}")
+
+    except requests.exceptions.RequestException as e:
+        st.error(f"Could not connect to the API. Please ensure it is running. Error: {e}")
+    except Exception as e:
+        st.error(f"An error occurred: {e}")